@@ -4,6 +4,9 @@ from typing import Dict, Iterable, Optional
 
 from sage.database.core.graph import Graph
 from sage.database.statefull.statefull_manager import StatefullManager
+from sage.http_server.page_cache import PageCache
+from sage.http_server.query_scheduler import QueryScheduler
+from sage.query_engine.optimizer.plan_cache import PlanCache
 
 
 class Dataset(object):
@@ -18,9 +21,14 @@ class Dataset(object):
       * analytics: Google analytics credentials.
       * stateless: True if the dataset is queried in sateless mode, False if its is queried in statefull mode.
       * statefull_manager: StatefullManager used to store saved plan (required in statefull mode).
+      * plan_cache: (Optional) Cache of query execution plans, used to skip the parsing of frequent queries.
+      * workers: Number of worker processes used by the HTTP server to execute queries, or 0 to execute them in the server process.
+      * page_cache: (Optional) Cache of pages of query results, used for the queries over immutable RDF graphs in stateless mode.
+      * stream_results: True if the HTTP server sends query results as soon as they are produced, False if it sends them at the end of the time quantum.
+      * scheduler: (Optional) Scheduler which limits the number of time quanta executed at once by the server.
     """
 
-    def __init__(self, name: str, description: str, graphs: Dict[str, Graph], public_url: Optional[str] = None, default_query: Optional[str] = None, analytics=None, stateless=True, statefull_manager: Optional[StatefullManager] = None):
+    def __init__(self, name: str, description: str, graphs: Dict[str, Graph], public_url: Optional[str] = None, default_query: Optional[str] = None, analytics=None, stateless=True, statefull_manager: Optional[StatefullManager] = None, plan_cache: Optional[PlanCache] = None, workers: int = 0, stream_results: bool = False, page_cache: Optional[PageCache] = None, scheduler: Optional[QueryScheduler] = None):
         super(Dataset, self).__init__()
         self._name = name
         self._desciption = description
@@ -30,6 +38,11 @@ class Dataset(object):
         self._analytics = analytics
         self._stateless = stateless
         self._statefull_manager = statefull_manager
+        self._plan_cache = plan_cache
+        self._page_cache = page_cache
+        self._workers = workers
+        self._stream_results = stream_results
+        self._scheduler = scheduler
         # open the statefull manager (if needed)
         if (not self._stateless) and self._statefull_manager is not None:
             self._statefull_manager.open()
@@ -46,6 +59,26 @@ class Dataset(object):
     def statefull_manager(self) -> StatefullManager:
         return self._statefull_manager
 
+    @property
+    def plan_cache(self) -> Optional[PlanCache]:
+        return self._plan_cache
+
+    @property
+    def page_cache(self) -> Optional[PageCache]:
+        return self._page_cache
+
+    @property
+    def workers(self) -> int:
+        return self._workers
+
+    @property
+    def stream_results(self) -> bool:
+        return self._stream_results
+
+    @property
+    def scheduler(self) -> Optional[QueryScheduler]:
+        return self._scheduler
+
     @property
     def default_query(self):
         default = {
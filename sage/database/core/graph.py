@@ -2,10 +2,12 @@
 # Author: Thomas MINIER - MIT License 2017-2020
 from datetime import datetime
 from math import inf
-from typing import List, Optional, Tuple
+from typing import Any, Dict, List, Optional, Tuple
 
 from sage.database.db_connector import DatabaseConnector
 from sage.database.db_iterator import DBIterator
+from sage.database.term_dictionary import TermDictionary
+from sage.query_engine.sage_engine import DEFAULT_BATCH_SIZE
 
 
 class Graph(object):
@@ -19,9 +21,11 @@ class Graph(object):
       * quantum: Time quantum associated with this graph.
       * max_results: Maximum number of results per query when executing a query with this graph.
       * default_queries: List of queries that can be executed with this graph.
+      * batch_size: Maximum number of solution mappings moved through a pipeline of iterators at once.
+      * late_materialization: True to evaluate queries on the identifiers of the RDF terms, when the connector has a term dictionary (see `DatabaseConnector#term_dictionary`), False otherwise.
     """
 
-    def __init__(self, uri: str, name: str, description: str, connector: DatabaseConnector, quantum=75, max_results=inf, default_queries: List[dict] = list()):
+    def __init__(self, uri: str, name: str, description: str, connector: DatabaseConnector, quantum=75, max_results=inf, default_queries: List[dict] = list(), batch_size=DEFAULT_BATCH_SIZE, late_materialization: bool = False):
         super(Graph, self).__init__()
         self._uri = uri
         self._name = name
@@ -29,7 +33,9 @@ class Graph(object):
         self._connector = connector
         self._quantum = quantum
         self._max_results = max_results
+        self._batch_size = batch_size
         self._example_queries = default_queries
+        self._late_materialization = late_materialization and connector.term_dictionary is not None
 
     @property
     def uri(self) -> str:
@@ -51,10 +57,39 @@ class Graph(object):
     def max_results(self) -> float:
         return self._max_results
 
+    @property
+    def batch_size(self) -> int:
+        return self._batch_size
+
     @property
     def nb_triples(self) -> int:
         return self._connector.nb_triples
 
+    @property
+    def native_search_many(self) -> bool:
+        return self._connector.native_search_many
+
+    @property
+    def blocking_io(self) -> bool:
+        return self._connector.blocking_io
+
+    @property
+    def is_immutable(self) -> bool:
+        return self._connector.is_immutable
+
+    @property
+    def pool_stats(self) -> Optional[Dict[str, float]]:
+        return self._connector.pool_stats
+
+    @property
+    def term_dictionary(self) -> Optional[TermDictionary]:
+        return self._connector.term_dictionary
+
+    @property
+    def late_materialization(self) -> bool:
+        """Return True if queries are evaluated on the identifiers of the RDF terms (see `sage.database.term_dictionary`), False otherwise"""
+        return self._late_materialization
+
     @property
     def example_queries(self) -> List[dict]:
         return self._example_queries
@@ -63,7 +98,7 @@ class Graph(object):
         """Get the underlying DatabaseConnector for this dataset."""
         return self._connector
 
-    def search(self, subject: str, predicate: str, obj: str, last_read: Optional[str] = None, as_of: Optional[datetime] = None) -> Tuple[DBIterator, int]:
+    def search(self, subject: str, predicate: str, obj: str, last_read: Optional[str] = None, as_of: Optional[datetime] = None, filters: Optional[List[Tuple[str, str, str]]] = None) -> Tuple[DBIterator, int]:
         """Get an iterator over all RDF triples matching a triple pattern.
 
         Args:
@@ -72,6 +107,7 @@ class Graph(object):
           * object: Object of the triple pattern.
           * last_read: A RDF triple ID. When set, the search is resumed for this RDF triple.
           * as_of: A version timestamp. When set, perform all reads against a consistent snapshot represented by this timestamp.
+          * filters: Constraints (`position`, `operator`, `value`) on the RDF triples, that the database connector may use to skip RDF triples.
 
         Returns:
           A tuple (`iterator`, `cardinality`), where `iterator` is a Python iterator over RDF triples matching the given triples pattern, and `cardinality` is the estimated cardinality of the triple pattern.
@@ -82,8 +118,31 @@ class Graph(object):
           >>> for s, p, o in iterator:
           >>>   print(f"RDF Triple {s} {p} {o}")
         """
+        if filters is not None and len(filters) > 0:
+            return self._connector.search(subject, predicate, obj, last_read=last_read, as_of=as_of, filters=filters)
+        # custom connectors may not support filters
         return self._connector.search(subject, predicate, obj, last_read=last_read, as_of=as_of)
 
+    def search_ids(self, subject: Any, predicate: Any, obj: Any, last_read: Optional[str] = None, as_of: Optional[datetime] = None, filters: Optional[List[Tuple[str, str, str]]] = None) -> Tuple[DBIterator, int]:
+        """Get an iterator over all RDF triples matching a triple pattern, where RDF triples are made of `EncodedTerm`.
+
+        See `DatabaseConnector#search_ids` for the arguments.
+        """
+        return self._connector.search_ids(subject, predicate, obj, last_read=last_read, as_of=as_of, filters=filters)
+
+    def search_many(self, patterns: List[Tuple[str, str, str]], as_of: Optional[datetime] = None, limit: Optional[int] = None) -> List[Optional[Tuple[DBIterator, int]]]:
+        """Get iterators over all RDF triples matching several triple patterns.
+
+        Args:
+          * patterns: List of triples patterns (`subject`, `predicate`, `object`) to evaluate.
+          * as_of: A version timestamp. When set, perform all reads against a consistent snapshot represented by this timestamp.
+          * limit: (Optional) Maximum number of RDF triples read in advance.
+
+        Returns:
+          A list of tuples (`iterator`, `cardinality`), one per triple pattern, in the same order as the input triple patterns, or `None` for the triple patterns not evaluated due to the limit.
+        """
+        return self._connector.search_many(patterns, as_of=as_of, limit=limit)
+
     def insert(self, subject: str, predicate: str, obj: str):
         """Insert a RDF triple into the RDF graph.
 
@@ -104,6 +163,10 @@ class Graph(object):
         """
         self._connector.delete(subject, predicate, obj)
 
+    async def start_transaction(self) -> None:
+        """Start a transaction (at the database level), used to execute a query quantum."""
+        await self._connector.async_start_transaction()
+
     def commit(self) -> None:
         """Commit any ongoing transaction (at the database level)."""
         self._connector.commit_transaction()
@@ -8,8 +8,11 @@ from yaml import FullLoader, load
 
 from sage.database.core.dataset import Dataset
 from sage.database.core.graph import Graph
-from sage.database.import_manager import builtin_backends, import_backend
-from sage.database.statefull.hashmap_manager import HashMapManager
+from sage.database.import_manager import builtin_backends, builtin_statefull_managers, import_backend
+from sage.http_server.page_cache import PageCache
+from sage.http_server.query_scheduler import QueryScheduler
+from sage.query_engine.optimizer.plan_cache import PlanCache
+from sage.query_engine.sage_engine import DEFAULT_BATCH_SIZE
 
 
 def load_config(config_file: str) -> Dataset:
@@ -52,9 +55,32 @@ def load_config(config_file: str) -> Dataset:
     # if statefull, load the saved plan storage backend to use
     statefull_manager = None
     if not is_stateless:
-        # TODO allow use of custom backend for saved plans
-        # same kind of usage than custom DB backends
-        statefull_manager = HashMapManager()
+        plans_config = config['saved_plans'] if 'saved_plans' in config else {'backend': 'memory'}
+        plans_backend = plans_config['backend'] if 'backend' in plans_config else 'memory'
+        managers = builtin_statefull_managers()
+        # custom storage for saved plans, declared like custom backends
+        if 'path' in plans_config and 'manager' in plans_config:
+            managers[plans_backend] = import_backend(plans_backend, plans_config['path'], plans_config['manager'], [])
+        if plans_backend not in managers:
+            raise SyntaxError(f"Unknown storage for saved plans: {plans_backend}. Expected one of {list(managers.keys())}")
+        statefull_manager = managers[plans_backend](plans_config)
+
+    # load the cache of query execution plans (enabled by default)
+    plan_cache = None
+    if 'plan_cache' not in config:
+        plan_cache = PlanCache()
+    elif config['plan_cache'] is not False:
+        plan_cache = PlanCache.from_config(config['plan_cache'])
+
+    # load the cache of pages of query results (disabled by default)
+    page_cache = None
+    if 'page_cache' in config and config['page_cache'] is not False:
+        page_cache = PageCache.from_config(config['page_cache'])
+
+    # load the scheduler of time quanta (disabled by default)
+    scheduler = None
+    if 'scheduler' in config and config['scheduler'] is not False:
+        scheduler = QueryScheduler.from_config(config['scheduler'])
 
     # get default time quantum & maximum number of results per page
     if 'quota' in config:
@@ -70,6 +96,13 @@ def load_config(config_file: str) -> Dataset:
     else:
         logging.warning("You are using SaGe without limitations on the number of results sent per page. This is fine, but be carefull as very large page of results can have unexpected serialization time.")
         max_results = inf
+    batch_size = config['batch_size'] if 'batch_size' in config else DEFAULT_BATCH_SIZE
+    # number of worker processes used to execute queries (none by default)
+    workers = config['workers'] if 'workers' in config else 0
+    # evaluate queries on the identifiers of the RDF terms, for the backends with a dictionary (disabled by default)
+    late_materialization = config['late_materialization'] if 'late_materialization' in config else False
+    # send query results while queries are executed (disabled by default)
+    stream_results = config['stream_results'] if 'stream_results' in config else False
 
     # build all RDF graphs found in the configuration file
     graphs = dict()
@@ -84,7 +117,9 @@ def load_config(config_file: str) -> Dataset:
         g_description = g_config["description"] if "description" in g_config else f"Unnamed RDF graph with id {g_name}"
         g_quantum = g_config["quota"] if "quota" in g_config else quantum
         g_max_results = g_config["max_results"] if "max_results" in g_config else max_results
+        g_batch_size = g_config["batch_size"] if "batch_size" in g_config else batch_size
         g_queries = g_config["queries"] if "queries" in g_config else list()
+        g_late_materialization = g_config["late_materialization"] if "late_materialization" in g_config else late_materialization
 
         # load the graph connector using available backends
         if "backend" in g_config and g_config["backend"] in backends:
@@ -94,7 +129,9 @@ def load_config(config_file: str) -> Dataset:
             continue
 
         # build the graph and register it using its URI
-        graphs[g_uri] = Graph(g_uri, g_name, g_description, g_connector, quantum=g_quantum, max_results=g_max_results, default_queries=g_queries)
+        graphs[g_uri] = Graph(g_uri, g_name, g_description, g_connector, quantum=g_quantum, max_results=g_max_results, batch_size=g_batch_size, default_queries=g_queries, late_materialization=g_late_materialization)
+        if graphs[g_uri].late_materialization and g_connector.native_search_many:
+            logging.warning(f"Late materialization is enabled for the RDF Graph {g_name}: its index loop joins will not be evaluated using search_many, which reads RDF terms.")
         logging.info(f"RDF Graph '{g_name}' (backend: {g_config['backend']}) successfully loaded")
 
-    return Dataset(dataset_name, dataset_description, graphs, public_url=public_url, default_query=default_query, analytics=analytics, stateless=is_stateless, statefull_manager=statefull_manager)
+    return Dataset(dataset_name, dataset_description, graphs, public_url=public_url, default_query=default_query, analytics=analytics, stateless=is_stateless, statefull_manager=statefull_manager, plan_cache=plan_cache, workers=workers, stream_results=stream_results, page_cache=page_cache, scheduler=scheduler)
@@ -2,9 +2,10 @@
 # Author: Thomas MINIER - MIT License 2017-2020
 from abc import ABC, abstractmethod
 from datetime import datetime
-from typing import Optional, Tuple
+from typing import Any, Dict, List, Optional, Tuple
 
 from sage.database.db_iterator import DBIterator
+from sage.database.term_dictionary import TermDictionary
 
 
 class DatabaseConnector(ABC):
@@ -32,7 +33,7 @@ class DatabaseConnector(ABC):
         self.close()
 
     @abstractmethod
-    def search(self, subject: str, predicate: str, obj: str, last_read: Optional[str] = None, as_of: Optional[datetime] = None) -> Tuple[DBIterator, int]:
+    def search(self, subject: str, predicate: str, obj: str, last_read: Optional[str] = None, as_of: Optional[datetime] = None, filters: Optional[List[Tuple[str, str, str]]] = None) -> Tuple[DBIterator, int]:
         """Get an iterator over all RDF triples matching a triple pattern.
 
         Args:
@@ -41,6 +42,7 @@ class DatabaseConnector(ABC):
           * object: Object of the triple pattern.
           * last_read: A RDF triple ID. When set, the search is resumed for this RDF triple.
           * as_of: A version timestamp. When set, perform all reads against a consistent snapshot represented by this timestamp.
+          * filters: Constraints (`position`, `operator`, `value`) on the RDF triples, pushed down from the FILTER clauses of the query. Connectors may use them to skip RDF triples that do not satisfy them, or ignore them, as the query engine always checks the FILTER clauses. See `sage.query_engine.iterators.filter_compiler.get_term_constraints` for the supported operators.
 
         Returns:
           A tuple (`iterator`, `cardinality`), where `iterator` is a Python iterator over RDF triples matching the given triples pattern, and `cardinality` is the estimated cardinality of the triple pattern.
@@ -53,6 +55,50 @@ class DatabaseConnector(ABC):
         """
         pass
 
+    def search_many(self, patterns: List[Tuple[str, str, str]], as_of: Optional[datetime] = None, limit: Optional[int] = None) -> List[Optional[Tuple[DBIterator, int]]]:
+        """Get iterators over all RDF triples matching several triple patterns, e.g., to probe the inner relation of a join by blocks.
+
+        If not overrided, this method evaluates each triple pattern using `search`.
+        Connectors that can evaluate all triple patterns using a single request should override it,
+        and set `native_search_many` to True. As their RDF triples are read in advance, they should read at most
+        `limit` RDF triples, and return `None` for the triple patterns they could not evaluate within this limit.
+
+        Args:
+          * patterns: List of triples patterns (`subject`, `predicate`, `object`) to evaluate.
+          * as_of: A version timestamp. When set, perform all reads against a consistent snapshot represented by this timestamp.
+          * limit: (Optional) Maximum number of RDF triples read in advance.
+
+        Returns:
+          A list of tuples (`iterator`, `cardinality`), one per triple pattern, in the same order as the input triple patterns, or `None` for the triple patterns not evaluated due to the limit.
+
+        Example:
+          >>> patterns = [('http://example.org#Ann', 'http://xmlns.com/foaf/0.1/name', '?name'), ('http://example.org#Bob', 'http://xmlns.com/foaf/0.1/name', '?name')]
+          >>> for iterator, cardinality in connector.search_many(patterns):
+          >>>   print(f"The triple pattern matches {cardinality} RDF triples")
+        """
+        return [self.search(subject, predicate, obj, as_of=as_of) for subject, predicate, obj in patterns]
+
+    def search_ids(self, subject: Any, predicate: Any, obj: Any, last_read: Optional[str] = None, as_of: Optional[datetime] = None, filters: Optional[List[Tuple[str, str, str]]] = None) -> Tuple[DBIterator, int]:
+        """Get an iterator over all RDF triples matching a triple pattern, where RDF triples are made of `EncodedTerm`.
+
+        Only connectors with a `term_dictionary` support this method. The terms of the triple pattern are either SPARQL variables,
+        RDF terms or `EncodedTerm`, and the iterator returned must use the same `last_read` IDs as the iterator returned by `search`.
+
+        Args:
+          * subject: Subject of the triple pattern.
+          * predicate: Predicate of the triple pattern.
+          * object: Object of the triple pattern.
+          * last_read: A RDF triple ID. When set, the search is resumed for this RDF triple.
+          * as_of: A version timestamp. When set, perform all reads against a consistent snapshot represented by this timestamp.
+          * filters: Constraints (`position`, `operator`, `value`) on the RDF triples, as in `search`.
+
+        Returns:
+          A tuple (`iterator`, `cardinality`), where `iterator` is a Python iterator over RDF triples matching the given triples pattern, and `cardinality` is the estimated cardinality of the triple pattern.
+
+        Throws: `NotImplementedError` if the connector has no term dictionary.
+        """
+        raise NotImplementedError("This database connector does not support searching for RDF triples using identifiers")
+
     @abstractmethod
     def from_config(config: dict):
         """Build a DatabaseConnector from a dictionnary"""
@@ -98,6 +144,14 @@ class DatabaseConnector(ABC):
         """Start a transaction (if supported by this type of connector)"""
         pass
 
+    async def async_start_transaction(self) -> None:
+        """Start a transaction from a coroutine, e.g., the execution of a query quantum.
+
+        If not overrided, this method calls `start_transaction`. Connectors that may wait for a database connection
+        should override it, so the event loop is not blocked while waiting.
+        """
+        self.start_transaction()
+
     def commit_transaction(self) -> None:
         """Commit any ongoing transaction (if supported by this type of connector)"""
         pass
@@ -119,6 +173,42 @@ class DatabaseConnector(ABC):
         """Destructor"""
         self.close()
 
+    @property
+    def native_search_many(self) -> bool:
+        """Return True if the connector evaluates `search_many` using a single request, False otherwise"""
+        return False
+
+    @property
+    def blocking_io(self) -> bool:
+        """Return True if the connector and its iterators perform blocking network I/O, False otherwise.
+
+        In this case, the query engine opens and refills the iterators of the connector in a thread pool,
+        so a slow query does not block the event loop shared by all concurrent queries. The iterators must then
+        implement `DBIterator#must_fetch`.
+        """
+        return False
+
+    @property
+    def is_immutable(self) -> bool:
+        """Return True if the RDF triples of the database never change, e.g., for read-only files, False otherwise.
+
+        In this case, pages of query results computed over the database can be cached (see `sage.http_server.page_cache.PageCache`).
+        """
+        return False
+
+    @property
+    def pool_stats(self) -> Optional[Dict[str, float]]:
+        """Get statistics about the pool of database connections used by the connector, or None if it does not use one"""
+        return None
+
+    @property
+    def term_dictionary(self) -> Optional[TermDictionary]:
+        """Get the dictionary which maps RDF terms to the identifiers used by the database, or None if it does not use one.
+
+        Connectors with a term dictionary must implement `search_ids`, so queries can be evaluated on identifiers.
+        """
+        return None
+
     @property
     def nb_triples(self) -> int:
         """Get the number of RDF triples in the database"""
@@ -1,7 +1,11 @@
 # db_iterator.py
 # Author: Thomas MINIER - MIT License 2017-2020
 from abc import ABC, abstractmethod
-from typing import Dict, Tuple
+from time import time
+from typing import Dict, List, Optional, Tuple
+
+# Default size of the first batch of RDF triples fetched by a SQL-backed DBIterator
+DEFAULT_INITIAL_FETCH_SIZE = 8
 
 
 class DBIterator(ABC):
@@ -47,6 +51,68 @@ class DBIterator(ABC):
         """Return True if there is still results to read, and False otherwise"""
         pass
 
+    def must_fetch(self) -> bool:
+        """Return True if the next call to `has_next` fetches RDF triples from the database, and False otherwise"""
+        return False
+
+    def limit_fetch(self, nb_triples: int, deadline: Optional[float] = None) -> None:
+        """Give a hint about how many RDF triples should be fetched from the database by the next call to `has_next`.
+
+        Args:
+          * nb_triples: Number of RDF triples needed by the query engine.
+          * deadline: Time (as given by `time.time()`) at which the query engine stops reading RDF triples, e.g., the end of the quantum.
+        """
+        pass
+
+
+class FetchSizePolicy(object):
+    """An adaptive policy for the number of RDF triples fetched per SQL query by a DBIterator.
+
+    The first batch is small, as scans used as the inner relation of a join often match a few RDF triples.
+    The size of the batches then grows geometrically while the iterator is drained, up to a maximum size.
+    Each batch is also capped by the hints given with `DBIterator#limit_fetch`: the number of triples the query engine
+    still needs, and the number of triples that can be fetched before the deadline, estimated using the observed fetch rate.
+
+    Args:
+      * initial_size: Size of the first batch.
+      * max_size: Maximum size of a batch.
+      * growth: Factor applied to the size of the batches after each fetch.
+    """
+
+    def __init__(self, initial_size: int = DEFAULT_INITIAL_FETCH_SIZE, max_size: int = 500, growth: float = 2):
+        super(FetchSizePolicy, self).__init__()
+        self._size = max(1, min(initial_size, max_size))
+        self._max_size = max_size
+        self._growth = growth
+        self._nb_triples = None
+        self._deadline = None
+        # number of RDF triples fetched per second
+        self._rate = None
+
+    def limit(self, nb_triples: int, deadline: Optional[float] = None) -> None:
+        """Cap the size of the next batches, see `DBIterator#limit_fetch`"""
+        self._nb_triples = nb_triples
+        self._deadline = deadline
+
+    def size(self) -> int:
+        """Get the size of the next batch"""
+        size = self._size
+        if self._nb_triples is not None:
+            size = min(size, self._nb_triples)
+        if self._deadline is not None and self._rate is not None:
+            size = min(size, (self._deadline - time()) * self._rate)
+        return max(1, int(size))
+
+    def fetch(self, cursor) -> list:
+        """Fetch the next batch of rows from a database cursor"""
+        start = time()
+        rows = cursor.fetchmany(size=self.size())
+        elapsed = time() - start
+        if len(rows) > 0 and elapsed > 0:
+            self._rate = len(rows) / elapsed
+        self._size = min(self._max_size, int(self._size * self._growth))
+        return rows
+
 
 class EmptyIterator(DBIterator):
     """An iterator that yields nothing and completes immediatly"""
@@ -62,3 +128,37 @@ class EmptyIterator(DBIterator):
     def has_next(self) -> bool:
         """Return True if there is still results to read, and False otherwise"""
         return False
+
+
+class ListIterator(DBIterator):
+    """A DBIterator that yields RDF triples already fetched from the database, e.g., by a call to DBConnector#search_many.
+
+    Args:
+      * pattern: Triple pattern scanned.
+      * rows: List of tuples (`id`, `triple`), where `id` is the index ID used to resume the scan from `triple`.
+      * end_id: Index ID returned once all RDF triples have been read.
+    """
+
+    def __init__(self, pattern: Dict[str, str], rows: List[Tuple[str, Tuple[str, str, str]]], end_id: str = ''):
+        super(ListIterator, self).__init__(pattern)
+        self._rows = rows
+        self._end_id = end_id
+        self._index = 0
+
+    def last_read(self) -> str:
+        """Return the index ID of the last element read"""
+        if not self.has_next():
+            return self._end_id
+        return self._rows[self._index][0]
+
+    def next(self) -> Optional[Tuple[str, str, str]]:
+        """Return the next RDF triple or None if there are no more triples to scan"""
+        if not self.has_next():
+            return None
+        triple = self._rows[self._index][1]
+        self._index += 1
+        return triple
+
+    def has_next(self) -> bool:
+        """Return True if there is still results to read, and False otherwise"""
+        return self._index < len(self._rows)
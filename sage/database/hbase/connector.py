@@ -2,9 +2,10 @@ import happybase
 
 from os import getpid
 from datetime import datetime
-from typing import Optional, Tuple
+from typing import List, Optional, Tuple
 
 from sage.database.db_connector import DatabaseConnector
+from sage.database.db_iterator import DBIterator, ListIterator
 from sage.database.hbase.iterator import HBaseIterator
 from sage.database.hbase.utils import build_row_key
 from sage.database.estimators import pattern_shape_estimate
@@ -103,7 +104,7 @@ class HBaseConnector(DatabaseConnector):
         except:
             self._connection = happybase.Connection(self._thrift_host, protocol="compact", transport="framed", port=self._thrift_port, table_prefix=self._graph_name)
 
-    def search(self, subject: str, predicate: str, obj: str, last_read: Optional[str] = None, as_of: Optional[datetime] = None) -> Tuple[HBaseIterator, int]:
+    def search(self, subject: str, predicate: str, obj: str, last_read: Optional[str] = None, as_of: Optional[datetime] = None, filters: Optional[List[Tuple[str, str, str]]] = None) -> Tuple[HBaseIterator, int]:
         """Get an iterator over all RDF triples matching a triple pattern.
 
             Args:
@@ -112,6 +113,7 @@ class HBaseConnector(DatabaseConnector):
                 * object ``string`` - Object of the triple pattern
                 * last_read ``string=None`` ``optional`` -  OFFSET ID used to resume scan
                 * as_of: A version timestamp. When set, perform all reads against a consistent snapshot represented by this timestamp.
+                * filters: Constraints on the RDF triples, which are ignored by this connector.
 
             Returns:
                 A tuple (`iterator`, `cardinality`), where `iterator` is a Python iterator over RDF triples matching the given triples pattern, and `cardinality` is the estimated cardinality of the triple pattern
@@ -132,6 +134,50 @@ class HBaseConnector(DatabaseConnector):
         card = pattern_shape_estimate(subject, predicate, obj) if iterator.has_next() else 0
         return iterator, card
 
+    def search_many(self, patterns: List[Tuple[str, str, str]], as_of: Optional[datetime] = None, limit: Optional[int] = None) -> List[Optional[Tuple[DBIterator, int]]]:
+        """Get iterators over all RDF triples matching several triple patterns.
+
+        All scans share the same Thrift connection, and fully bound triple patterns are evaluated using a single multi-get on the SPO table.
+        The other scans are read lazily, so at most one RDF triple per triple pattern is read in advance and `limit` is ignored.
+
+            Args:
+                * patterns ``list`` - List of triples patterns (`subject`, `predicate`, `object`) to evaluate
+                * as_of: A version timestamp. When set, perform all reads against a consistent snapshot represented by this timestamp.
+                * limit: Unused, see above.
+
+            Returns:
+                A list of tuples (`iterator`, `cardinality`), one per triple pattern, in the same order as the input triple patterns
+        """
+        self.__refresh_connection()
+        results = [None] * len(patterns)
+        lookups = list()
+        for index, (subject, predicate, obj) in enumerate(patterns):
+            subject = subject if (subject is not None) and (not subject.startswith('?')) else None
+            predicate = predicate if (predicate is not None) and (not predicate.startswith('?')) else None
+            obj = obj if (obj is not None) and (not obj.startswith('?')) else None
+            pattern = {'subject': subject, 'predicate': predicate, 'object': obj}
+            if get_kind(subject, predicate, obj) == 'spo':
+                lookups.append((index, pattern, build_row_key(subject, predicate, obj)))
+            else:
+                (table, row_key) = find_triples(self._connection, subject, predicate, obj)
+                iterator = HBaseIterator(self._connection, table, row_key, pattern)
+                card = pattern_shape_estimate(subject, predicate, obj) if iterator.has_next() else 0
+                results[index] = (iterator, card)
+        # evaluate all fully bound triple patterns using a single multi-get
+        if len(lookups) > 0:
+            rows = dict(self._connection.table('spo').rows([key for index, pattern, key in lookups]))
+            for index, pattern, key in lookups:
+                triples = list()
+                if key in rows or key.encode('utf-8') in rows:
+                    triples.append((key, (pattern['subject'], pattern['predicate'], pattern['object'])))
+                # the end key is not in the database, so resuming from it yields no RDF triples
+                results[index] = (ListIterator(pattern, triples, end_id=key + '_'), len(triples))
+        return results
+
+    @property
+    def native_search_many(self) -> bool:
+        return True
+
     def insert(self, s: str, p: str, o: str) -> None:
         """Insert a RDF triple into the database"""
         self.__init__batches()
@@ -1,12 +1,15 @@
 # hdt_file_connector.py
 # Author: Thomas MINIER - MIT License 2017-2020
 import os.path
-from typing import Optional, Tuple
+from typing import Any, List, Optional, Tuple
 
 from hdt import HDTDocument
 
 from sage.database.db_connector import DatabaseConnector
+from sage.database.db_iterator import EmptyIterator
+from sage.database.hdt.dictionary import HDTDictionary
 from sage.database.hdt.iterator import HDTIterator
+from sage.database.term_dictionary import TermDictionary
 
 from datetime import datetime
 
@@ -22,8 +25,9 @@ class HDTFileConnector(DatabaseConnector):
     def __init__(self, file: str, mapped=True, indexed=True):
         super(HDTFileConnector, self).__init__()
         self._hdt = HDTDocument(file, map=mapped, indexed=indexed)
+        self._dictionary = HDTDictionary(self._hdt)
 
-    def search(self, subject: str, predicate: str, obj: str, last_read: Optional[str] = None, as_of: Optional[datetime] = None) -> Tuple[HDTIterator, int]:
+    def search(self, subject: str, predicate: str, obj: str, last_read: Optional[str] = None, as_of: Optional[datetime] = None, filters: Optional[List[Tuple[str, str, str]]] = None) -> Tuple[HDTIterator, int]:
         """Get an iterator over all RDF triples matching a triple pattern.
 
         Args:
@@ -32,6 +36,7 @@ class HDTFileConnector(DatabaseConnector):
           * object: Object of the triple pattern.
           * last_read: A RDF triple ID. When set, the search is resumed for this RDF triple.
           * as_of: A version timestamp. When set, perform all reads against a consistent snapshot represented by this timestamp.
+          * filters: Constraints (`position`, `operator`, `value`) on the RDF triples. Only equality constraints are used, to bind the terms of the triple pattern.
 
         Returns:
           A tuple (`iterator`, `cardinality`), where `iterator` is a Python iterator over RDF triples matching the given triples pattern, and `cardinality` is the estimated cardinality of the triple pattern.
@@ -39,12 +44,66 @@ class HDTFileConnector(DatabaseConnector):
         subject = subject if (subject is not None) and (not subject.startswith('?')) else ""
         predicate = predicate if (predicate is not None) and (not predicate.startswith('?')) else ""
         obj = obj if (obj is not None) and (not obj.startswith('?')) else ""
+        # bind the terms of the triple pattern constrained by equality filters
+        if filters is not None:
+            terms = {'subject': subject, 'predicate': predicate, 'object': obj}
+            for position, operator, value in filters:
+                if operator == '=' and terms[position] == "":
+                    terms[position] = value
+                elif operator == '=' and terms[position] != value:
+                    return EmptyIterator(terms), 0
+            subject, predicate, obj = terms['subject'], terms['predicate'], terms['object']
         # convert None & empty string to offset = 0
         offset = 0 if last_read is None or last_read == '' else int(float(last_read))
         pattern = {'subject': subject, 'predicate': predicate, 'object': obj}
         iterator, card = self._hdt.search_triples(subject, predicate, obj, offset=offset)
         return HDTIterator(iterator, pattern, start_offset=offset), card
 
+    def search_ids(self, subject: Any, predicate: Any, obj: Any, last_read: Optional[str] = None, as_of: Optional[datetime] = None, filters: Optional[List[Tuple[str, str, str]]] = None) -> Tuple[HDTIterator, int]:
+        """Get an iterator over all RDF triples matching a triple pattern, where RDF triples are made of `EncodedTerm`.
+
+        Args:
+          * subject: Subject of the triple pattern, as a SPARQL variable, a RDF term or an `EncodedTerm`.
+          * predicate: Predicate of the triple pattern, as a SPARQL variable, a RDF term or an `EncodedTerm`.
+          * object: Object of the triple pattern, as a SPARQL variable, a RDF term or an `EncodedTerm`.
+          * last_read: A RDF triple ID. When set, the search is resumed for this RDF triple.
+          * as_of: A version timestamp. When set, perform all reads against a consistent snapshot represented by this timestamp.
+          * filters: Constraints (`position`, `operator`, `value`) on the RDF triples. Only equality constraints are used, to bind the terms of the triple pattern.
+
+        Returns:
+          A tuple (`iterator`, `cardinality`), where `iterator` is a Python iterator over RDF triples matching the given triples pattern, and `cardinality` is the estimated cardinality of the triple pattern.
+        """
+        terms = dict()
+        for position, term in [('subject', subject), ('predicate', predicate), ('object', obj)]:
+            terms[position] = term if (term is not None) and not (isinstance(term, str) and term.startswith('?')) else None
+        # bind the terms of the triple pattern constrained by equality filters
+        if filters is not None:
+            for position, operator, value in filters:
+                if operator == '=' and terms[position] is None:
+                    terms[position] = value
+                elif operator == '=' and str(terms[position]) != value:
+                    return EmptyIterator(terms), 0
+        # 0 is the identifier of a SPARQL variable in HDT
+        identifiers = list()
+        for index, term in enumerate([terms['subject'], terms['predicate'], terms['object']]):
+            identifier = self._dictionary.convert(term, index) if term is not None else 0
+            if identifier is None:
+                return EmptyIterator(terms), 0
+            identifiers.append(identifier)
+        offset = 0 if last_read is None or last_read == '' else int(float(last_read))
+        iterator, card = self._hdt.search_triples_ids(identifiers[0], identifiers[1], identifiers[2], offset=offset)
+        return HDTIterator(iterator, terms, start_offset=offset, dictionary=self._dictionary), card
+
+    @property
+    def term_dictionary(self) -> TermDictionary:
+        """Get the dictionary of the HDT file"""
+        return self._dictionary
+
+    @property
+    def is_immutable(self) -> bool:
+        # HDT files are read-only
+        return True
+
     @property
     def nb_triples(self) -> int:
         return self._hdt.total_triples
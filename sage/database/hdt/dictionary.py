@@ -0,0 +1,82 @@
+# dictionary.py
+# Author: Thomas MINIER - MIT License 2017-2020
+from itertools import zip_longest
+from typing import Dict, List, Optional
+
+from hdt import HDTDocument, IdentifierPosition
+
+from sage.database.term_dictionary import OBJECT, PREDICATE, SUBJECT, EncodedTerm, TermDictionary
+
+HDT_POSITIONS = [IdentifierPosition.Subject, IdentifierPosition.Predicate, IdentifierPosition.Object]
+
+
+class HDTDictionary(TermDictionary):
+    """A HDTDictionary gives access to the dictionary of a HDT file.
+
+    In HDT, identifiers depend on the position of the RDF terms: RDF terms which are both subjects and objects
+    share the same identifiers in both positions (the shared section), while predicates have their own identifiers.
+
+    Argument: The HDT document.
+    """
+
+    def __init__(self, document: HDTDocument):
+        super(HDTDictionary, self).__init__()
+        self._document = document
+        self._nb_shared = document.nb_shared
+        self._nb_subjects = document.nb_subjects
+        # keys of the predicates, which are computed by looking for the predicates in the subjects and objects
+        self._predicate_keys: Dict[int, int] = dict()
+
+    def decode(self, identifier: int, position: int) -> str:
+        """Get the RDF term associated with an identifier"""
+        return self._document.convert_id(identifier, HDT_POSITIONS[position])
+
+    def decode_many(self, terms: List[EncodedTerm]) -> None:
+        """Decode several encoded RDF terms at once.
+
+        Each distinct identifier is decoded once. HDT has no batched lookup, but it converts a subject, a predicate
+        and an object in a single call, so identifiers are decoded by triples (the missing positions use the identifier 0).
+        """
+        identifiers = [dict(), dict(), dict()]
+        for term in terms:
+            identifiers[term.position][term.identifier] = None
+        for s, p, o in zip_longest(*[list(ids.keys()) for ids in identifiers], fillvalue=0):
+            values = self._document.convert_tripleid(s, p, o)
+            for position, identifier in enumerate((s, p, o)):
+                if identifier > 0:
+                    identifiers[position][identifier] = values[position]
+        for term in terms:
+            term.set_value(identifiers[term.position][term.identifier])
+
+    def locate(self, term: str, position: int) -> Optional[int]:
+        """Get the identifier of a RDF term, or None if the RDF term does not appear at this position in the HDT file"""
+        identifier = self._document.convert_term(term, HDT_POSITIONS[position])
+        return identifier if identifier > 0 else None
+
+    def key(self, identifier: int, position: int) -> int:
+        """Get a key which identifies a RDF term whatever its position.
+
+        Subjects are identified by their identifiers, and objects that are not subjects are numbered after the subjects.
+        A predicate uses the key of the same RDF term as subject or object if it exists, otherwise a negative key.
+        """
+        if position == SUBJECT:
+            return identifier
+        elif position == OBJECT:
+            return identifier if identifier <= self._nb_shared else self._nb_subjects + identifier - self._nb_shared
+        if identifier not in self._predicate_keys:
+            term = self.decode(identifier, PREDICATE)
+            subject_id, object_id = self.locate(term, SUBJECT), self.locate(term, OBJECT)
+            if subject_id is not None:
+                self._predicate_keys[identifier] = self.key(subject_id, SUBJECT)
+            elif object_id is not None:
+                self._predicate_keys[identifier] = self.key(object_id, OBJECT)
+            else:
+                self._predicate_keys[identifier] = -identifier
+        return self._predicate_keys[identifier]
+
+    def _convert(self, identifier: int, source: int, target: int) -> Optional[int]:
+        """Convert the identifier of a RDF term found at a given position into its identifier at another position"""
+        if source != PREDICATE and target != PREDICATE:
+            # only the RDF terms of the shared section are both subjects and objects
+            return identifier if identifier <= self._nb_shared else None
+        return self.locate(self.decode(identifier, source), target)
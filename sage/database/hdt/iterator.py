@@ -1,9 +1,10 @@
 # hdt_file_connector.py
 # Author: Thomas MINIER - MIT License 2017-2020
-from typing import Dict, Tuple
+from typing import Dict, Optional, Tuple
 from hdt import TripleIterator
 
 from sage.database.db_iterator import DBIterator
+from sage.database.term_dictionary import TermDictionary
 
 
 class HDTIterator(DBIterator):
@@ -13,12 +14,14 @@ class HDTIterator(DBIterator):
       * source: HDT iterator which scans for RDF triples from a HDT file.
       * pattern: Triple pattern scanned.
       * start_offset: Initial offset of the source iterator. Used to compute the `last_read` triple when preemption occurs.
+      * dictionary: Dictionary of the HDT file, when the source iterator scans for RDF triples identifiers. RDF triples are then made of `EncodedTerm`.
     """
 
-    def __init__(self, source: TripleIterator, pattern: Dict[str, str], start_offset=0):
+    def __init__(self, source: TripleIterator, pattern: Dict[str, str], start_offset=0, dictionary: Optional[TermDictionary] = None):
         super(HDTIterator, self).__init__(pattern)
         self._source = source
         self._start_offset = start_offset
+        self._dictionary = dictionary
 
     def last_read(self) -> str:
         """Return the ID of the last element read"""
@@ -27,6 +30,8 @@ class HDTIterator(DBIterator):
     def next(self) -> Tuple[str, str, str]:
         """Return the next solution mapping or None if there are no more solutions"""
         try:
+            if self._dictionary is not None:
+                return self._dictionary.encode_triple(next(self._source))
             return next(self._source)
         except StopIteration:
             return None
@@ -87,6 +87,39 @@ def builtin_backends() -> Dict[str, BackendFactory]:
     return {item['name']: import_backend(item['name'], item['path'], item['connector'], item['required']) for item in data}
 
 
+def builtin_statefull_managers() -> Dict[str, BackendFactory]:
+    """Load the built-in storages for saved plans, used in statefull mode: in-memory and SQlite.
+
+    Returns: The in-memory and SQlite storages for saved plans, registered in a dict.
+    """
+    data = [
+        # unbounded in-memory storage, local to a process
+        {
+            'name': 'hashmap',
+            'path': 'sage.database.statefull.hashmap_manager',
+            'connector': 'HashMapManager',
+            'required': []
+        },
+        # in-memory storage with LRU eviction and time-to-live, local to a process
+        {
+            'name': 'memory',
+            'path': 'sage.database.statefull.memory_manager',
+            'connector': 'MemoryManager',
+            'required': []
+        },
+        # SQlite storage with time-to-live, shared by all processes
+        {
+            'name': 'sqlite',
+            'path': 'sage.database.statefull.sqlite_manager',
+            'connector': 'SQliteManager',
+            'required': [
+                'database'
+            ]
+        }
+    ]
+    return {item['name']: import_backend(item['name'], item['path'], item['connector'], item['required']) for item in data}
+
+
 def import_backend(name: str, module_path: str, class_name: str, required_params: List[str]) -> BackendFactory:
     """Load a new database backend, defined by the user, adn get a factory function to build it.
 
@@ -4,6 +4,7 @@ from math import ceil
 from typing import Dict, List, Optional, Tuple
 
 from sage.database.db_connector import DatabaseConnector
+from sage.database.db_iterator import DEFAULT_INITIAL_FETCH_SIZE
 from sage.database.postgres_backends.transaction_manager import TransactionManager
 
 
@@ -17,14 +18,19 @@ class PostgresConnector(DatabaseConnector):
       * password: password used to authenticate.
       * host: database host address (defaults to UNIX socket if not provided).
       * port: connection port number (defaults to 5432 if not provided).
-      * fetch_size: The number of SQL rows/RDF triples to fetch per batch (defaults to 500).
+      * fetch_size: The maximum number of SQL rows/RDF triples to fetch per batch (defaults to 500).
+      * initial_fetch_size: The number of SQL rows/RDF triples fetched by the first batch of a scan (defaults to 8).
+      * min_pool_size: Number of database connections kept open by each process (defaults to 1).
+      * max_pool_size: Maximum number of database connections opened by each process (defaults to 10).
+      * pool_timeout: Maximum time to wait for a database connection, in seconds (defaults to 30).
     """
 
-    def __init__(self, table_name: str, dbname: str, user: str, password: str, host: str = '', port: int = 5432, fetch_size: int = 500):
+    def __init__(self, table_name: str, dbname: str, user: str, password: str, host: str = '', port: int = 5432, fetch_size: int = 500, initial_fetch_size: int = DEFAULT_INITIAL_FETCH_SIZE, min_pool_size: int = 1, max_pool_size: int = 10, pool_timeout: float = 30):
         super(PostgresConnector, self).__init__()
         self._table_name = table_name
-        self._manager = TransactionManager(dbname, user, password, host=host, port=port)
+        self._manager = TransactionManager(dbname, user, password, host=host, port=port, min_pool_size=min_pool_size, max_pool_size=max_pool_size, pool_timeout=pool_timeout)
         self._fetch_size = fetch_size
+        self._initial_fetch_size = initial_fetch_size
         self._warmup = True
 
         # Data used for cardinality estimation.
@@ -125,6 +131,10 @@ class PostgresConnector(DatabaseConnector):
         """Start a PostgreSQL transaction"""
         self._manager.start_transaction()
 
+    async def async_start_transaction(self) -> None:
+        """Start a PostgreSQL transaction, waiting for a connection of the pool without blocking the event loop"""
+        await self._manager.async_start_transaction()
+
     def commit_transaction(self) -> None:
         """Commit any ongoing transaction"""
         self._manager.commit()
@@ -133,6 +143,15 @@ class PostgresConnector(DatabaseConnector):
         """Abort any ongoing transaction"""
         self._manager.abort()
 
+    @property
+    def blocking_io(self) -> bool:
+        # psycopg2 queries block until the database answers
+        return True
+
+    @property
+    def pool_stats(self) -> Optional[Dict[str, float]]:
+        return self._manager.stats()
+
     def _estimate_cardinality(self, subject, predicate, obj) -> int:
         """Estimate the cardinality of a triple pattern using PostgreSQL histograms.
 
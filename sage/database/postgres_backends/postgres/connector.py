@@ -8,11 +8,12 @@ from typing import Optional, List, Dict, Tuple
 from uuid import uuid4
 from time import time
 
-from sage.database.db_iterator import EmptyIterator
+from sage.database.db_iterator import DEFAULT_INITIAL_FETCH_SIZE, DBIterator, EmptyIterator
 from sage.database.postgres_backends.connector import PostgresConnector
 from sage.database.postgres_backends.postgres.iterator import PostgresIterator
 from sage.database.postgres_backends.postgres.queries import get_delete_query, get_insert_query
-from sage.database.postgres_backends.postgres.queries import get_start_query, get_resume_query
+from sage.database.postgres_backends.postgres.queries import get_start_query, get_resume_query, get_search_many_query
+from sage.database.utils import add_sql_filters, search_many_by_kind
 
 coloredlogs.install(level='INFO', fmt='%(asctime)s - %(levelname)s %(message)s')
 logger = logging.getLogger(__name__)
@@ -28,13 +29,17 @@ class DefaultPostgresConnector(PostgresConnector):
       * password: password used to authenticate.
       * host: database host address (defaults to UNIX socket if not provided).
       * port: connection port number (defaults to 5432 if not provided).
-      * fetch_size: The number of SQL rows/RDF triples to fetch per batch (defaults to 500).
+      * fetch_size: The maximum number of SQL rows/RDF triples to fetch per batch (defaults to 500).
+      * initial_fetch_size: The number of SQL rows/RDF triples fetched by the first batch of a scan.
+      * min_pool_size: Number of database connections kept open by each process.
+      * max_pool_size: Maximum number of database connections opened by each process.
+      * pool_timeout: Maximum time to wait for a database connection, in seconds.
     """
 
-    def __init__(self, table_name: str, dbname: str, user: str, password: str, host: str = '', port: int = 5432, fetch_size: int = 500):
-        super(DefaultPostgresConnector, self).__init__(table_name, dbname, user, password, host, port, fetch_size)
+    def __init__(self, table_name: str, dbname: str, user: str, password: str, host: str = '', port: int = 5432, fetch_size: int = 500, initial_fetch_size: int = DEFAULT_INITIAL_FETCH_SIZE, min_pool_size: int = 1, max_pool_size: int = 10, pool_timeout: float = 30):
+        super(DefaultPostgresConnector, self).__init__(table_name, dbname, user, password, host, port, fetch_size, initial_fetch_size, min_pool_size, max_pool_size, pool_timeout)
 
-    def search(self, subject: str, predicate: str, obj: str, last_read: Optional[str] = None, as_of: Optional[datetime] = None) -> Tuple[PostgresIterator, int]:
+    def search(self, subject: str, predicate: str, obj: str, last_read: Optional[str] = None, as_of: Optional[datetime] = None, filters: Optional[List[Tuple[str, str, str]]] = None) -> Tuple[PostgresIterator, int]:
         """Get an iterator over all RDF triples matching a triple pattern.
 
         Args:
@@ -43,6 +48,7 @@ class DefaultPostgresConnector(PostgresConnector):
           * object: Object of the triple pattern.
           * last_read: A RDF triple ID. When set, the search is resumed for this RDF triple.
           * as_of: A version timestamp. When set, perform all reads against a consistent snapshot represented by this timestamp.
+          * filters: Constraints (`position`, `operator`, `value`) on the RDF triples, evaluated in the WHERE clause of the SQL query.
 
         Returns:
           A tuple (`iterator`, `cardinality`), where `iterator` is a Python iterator over RDF triples matching the given triples pattern, and `cardinality` is the estimated cardinality of the triple pattern.
@@ -73,16 +79,55 @@ class DefaultPostgresConnector(PostgresConnector):
             t = (last_read["s"], last_read["p"], last_read["o"])
             start_query, start_params = get_resume_query(subject, predicate, obj, t, self._table_name)
 
+        # evaluate the constraints pushed down from FILTER clauses in the SQL query
+        if start_query is not None:
+            start_query, start_params = add_sql_filters(start_query, start_params, filters, placeholder='%s', hashed_objects=True)
+
         # create the iterator to yield the matching RDF triples
-        iterator = PostgresIterator(cursor, self._manager.get_connection(), start_query, start_params, pattern, fetch_size=self._fetch_size)
-        card = self._estimate_cardinality(subject, predicate, obj) if iterator.has_next() else 0
+        iterator = PostgresIterator(cursor, self._manager.get_connection(), start_query, start_params, pattern, fetch_size=self._fetch_size, initial_fetch_size=self._initial_fetch_size)
+        if last_read is not None:
+            # a resumed scan starts with the RDF triple identified by last_read, so it cannot be empty,
+            # and its SQL query is not executed until the scan is read
+            card = self._estimate_cardinality(subject, predicate, obj)
+        else:
+            card = self._estimate_cardinality(subject, predicate, obj) if iterator.has_next() else 0
         return iterator, card
 
+    def search_many(self, patterns: List[Tuple[str, str, str]], as_of: Optional[datetime] = None, limit: Optional[int] = None) -> List[Optional[Tuple[DBIterator, int]]]:
+        """Get iterators over all RDF triples matching several triple patterns.
+
+        Triple patterns of the same kind are evaluated using a single SQL query (see `sage.database.utils.search_many_by_kind`),
+        which selects all rows matching the terms bound in the triple patterns. Rows are read using a server-side cursor.
+
+        Args:
+          * patterns: List of triples patterns (`subject`, `predicate`, `object`) to evaluate.
+          * as_of: A version timestamp. When set, perform all reads against a consistent snapshot represented by this timestamp.
+          * limit: (Optional) Maximum number of RDF triples read.
+
+        Returns:
+          A list of tuples (`iterator`, `cardinality`), one per triple pattern, in the same order as the input triple patterns, or `None` for the triple patterns not evaluated due to the limit.
+        """
+        # do warmup if necessary
+        self.open()
+
+        def execute(kind, bound_terms):
+            query, params = get_search_many_query(kind, bound_terms, self._table_name)
+            # a named cursor fetches rows by batches, instead of loading the whole result set
+            cursor = self._manager.get_connection().cursor(str(uuid4()))
+            cursor.execute(query, params)
+            return cursor
+
+        return search_many_by_kind(patterns, lambda s, p, o: self.search(s, p, o, as_of=as_of), execute, limit=limit, fetch_size=self._fetch_size)
+
+    @property
+    def native_search_many(self) -> bool:
+        return True
+
     def from_config(config: dict) -> PostgresConnector:
         """Build a DefaultPostgresConnector from a configuration object.
 
         The configuration object must contains the following fields: 'dbname', 'name', 'user' and 'password'.
-        Optional fields are: 'host', 'port' and 'fetch_size'.
+        Optional fields are: 'host', 'port', 'fetch_size', 'initial_fetch_size', 'min_pool_size', 'max_pool_size' and 'pool_timeout'.
         """
         if 'dbname' not in config or 'name' not in config or 'user' not in config or 'password' not in config:
             raise SyntaxError('A valid configuration for a PostgreSQL connector must contains the dbname, user and password fields')
@@ -90,8 +135,12 @@ class DefaultPostgresConnector(PostgresConnector):
         host = config['host'] if 'host' in config else ''
         port = config['port'] if 'port' in config else 5432
         fetch_size = config['fetch_size'] if 'fetch_size' in config else 500
+        initial_fetch_size = config['initial_fetch_size'] if 'initial_fetch_size' in config else DEFAULT_INITIAL_FETCH_SIZE
+        min_pool_size = config['min_pool_size'] if 'min_pool_size' in config else 1
+        max_pool_size = config['max_pool_size'] if 'max_pool_size' in config else 10
+        pool_timeout = config['pool_timeout'] if 'pool_timeout' in config else 30
 
-        return DefaultPostgresConnector(config['name'], config['dbname'], config['user'], config['password'], host=host, port=port, fetch_size=fetch_size)
+        return DefaultPostgresConnector(config['name'], config['dbname'], config['user'], config['password'], host=host, port=port, fetch_size=fetch_size, initial_fetch_size=initial_fetch_size, min_pool_size=min_pool_size, max_pool_size=max_pool_size, pool_timeout=pool_timeout)
 
     def insert(self, subject: str, predicate: str, obj: str) -> None:
         """Insert a RDF triple into the RDF graph.
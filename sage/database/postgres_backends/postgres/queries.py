@@ -60,6 +60,47 @@ def get_start_query(subj: str, pred: str, obj: str, table_name: str) -> Tuple[st
         raise Exception(f"Unkown pattern type: {kind}")
 
 
+def get_search_many_query(kind: str, bound_terms: List[Tuple[str, ...]], table_name: str) -> Tuple[str, List[str]]:
+    """Get a prepared SQL query which scans for several triple patterns of the same kind at once.
+
+    Rows are sorted in the same order as a single index scan, so they can be used to resume it.
+
+    Args:
+      * kind: Kind of the triple patterns, e.g., '?po'.
+      * bound_terms: Distinct tuples of terms bound in the triple patterns, in (subject, predicate, object) order.
+      * table_name: Name of the SQL table to scan for RDF triples.
+
+    Returns:
+      A tuple with the prepared SQL query and its parameters.
+    """
+    columns = [column for column, position in zip(['subject', 'predicate', 'object'], kind) if position != '?']
+    if kind in ['spo', 's??', 'sp?']:
+        order_by = "subject, predicate, md5(object)"
+    elif kind in ['?p?', '?po']:
+        order_by = "predicate, md5(object), subject"
+    elif kind in ['s?o', '??o']:
+        order_by = "md5(object), subject, predicate"
+    else:
+        raise Exception(f"Unkown pattern type: {kind}")
+    query = f"SELECT subject, predicate, object FROM {table_name} "
+    if len(columns) == 1:
+        # a single column is bound: use an array of values
+        if columns[0] == 'object':
+            query += "WHERE md5(object) = ANY(ARRAY(SELECT md5(term) FROM unnest(%s::text[]) AS term)) "
+        else:
+            query += f"WHERE {columns[0]} = ANY(%s) "
+        params = [[terms[0] for terms in bound_terms]]
+    else:
+        # several columns are bound: use a list of row values
+        keys = ['md5(object)' if column == 'object' else column for column in columns]
+        values = ['md5(%s)' if column == 'object' else '%s' for column in columns]
+        row_values = ', '.join(['(' + ', '.join(values) + ')'] * len(bound_terms))
+        query += f"WHERE ({', '.join(keys)}) IN (VALUES {row_values}) "
+        params = [term for terms in bound_terms for term in terms]
+    query += f"ORDER BY {order_by}"
+    return query, params
+
+
 def get_resume_query(subj: str, pred: str, obj: str, last_read: Tuple[str, str, str], table_name: str, symbol: str = ">=") -> Tuple[str, str]:
     """Get a prepared SQL query which resumes scanning for a triple pattern.
 
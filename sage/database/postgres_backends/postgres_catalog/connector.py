@@ -5,15 +5,17 @@ import coloredlogs
 from datetime import datetime
 from math import ceil
 from uuid import uuid4
-from typing import Optional, Dict, Tuple
+from typing import Any, Callable, Optional, Dict, List, Tuple
 from psycopg2.extras import execute_values
 
-from sage.database.db_iterator import EmptyIterator
+from sage.database.db_iterator import DEFAULT_INITIAL_FETCH_SIZE, EmptyIterator
 from sage.database.postgres_backends.connector import PostgresConnector
 from sage.database.postgres_backends.postgres_catalog.iterator import PostgresIterator
 from sage.database.postgres_backends.postgres_catalog.queries import get_delete_query, get_insert_query, get_catalog_insert_many_query
 from sage.database.postgres_backends.postgres_catalog.queries import get_start_query, get_resume_query
-from sage.database.postgres_backends.postgres_catalog.queries import get_extract_query, get_locate_query
+from sage.database.postgres_backends.postgres_catalog.queries import get_extract_query, get_locate_query, get_locate_many_query, get_extract_many_query
+from sage.database.term_cache import CatalogDictionary, TermCache
+from sage.database.term_dictionary import EncodedTerm, TermDictionary
 
 coloredlogs.install(level='INFO', fmt='%(asctime)s - %(levelname)s %(message)s')
 logger = logging.getLogger(__name__)
@@ -29,11 +31,44 @@ class CatalogPostgresConnector(PostgresConnector):
       * password: password used to authenticate.
       * host: database host address (defaults to UNIX socket if not provided).
       * port: connection port number (defaults to 5432 if not provided).
-      * fetch_size: The number of SQL rows/RDF triples to fetch per batch (defaults to 500).
+      * fetch_size: The maximum number of SQL rows/RDF triples to fetch per batch (defaults to 500).
+      * initial_fetch_size: The number of SQL rows/RDF triples fetched by the first batch of a scan.
+      * min_pool_size: Number of database connections kept open by each process.
+      * max_pool_size: Maximum number of database connections opened by each process.
+      * pool_timeout: Maximum time to wait for a database connection, in seconds.
+      * term_cache_size: Maximum number of RDF terms kept in the cache of the catalog.
     """
 
-    def __init__(self, table_name: str, dbname: str, user: str, password: str, host: str = '', port: int = 5432, fetch_size: int = 500):
-        super(CatalogPostgresConnector, self).__init__(table_name, dbname, user, password, host, port, fetch_size)
+    def __init__(self, table_name: str, dbname: str, user: str, password: str, host: str = '', port: int = 5432, fetch_size: int = 500, initial_fetch_size: int = DEFAULT_INITIAL_FETCH_SIZE, min_pool_size: int = 1, max_pool_size: int = 10, pool_timeout: float = 30, term_cache_size: int = 100000):
+        super(CatalogPostgresConnector, self).__init__(table_name, dbname, user, password, host, port, fetch_size, initial_fetch_size, min_pool_size, max_pool_size, pool_timeout)
+        self._term_cache = TermCache(max_size=term_cache_size)
+        self._dictionary = CatalogDictionary(self._term_cache, self.__locate, self.__extract)
+
+    @property
+    def term_cache(self) -> TermCache:
+        """Get the cache of the catalog, shared by all the scans of this connector"""
+        return self._term_cache
+
+    @property
+    def term_dictionary(self) -> TermDictionary:
+        """Get the dictionary of the catalog"""
+        return self._dictionary
+
+    def __locate(self, terms: List[str]) -> Dict[str, int]:
+        with self._manager.get_connection().cursor() as cursor:
+            cursor.execute(get_locate_many_query(), (terms,))
+            return dict(cursor.fetchall())
+
+    def __extract(self, identifiers: List[int]) -> Dict[int, str]:
+        with self._manager.get_connection().cursor() as cursor:
+            cursor.execute(get_extract_many_query(), (identifiers,))
+            return dict(cursor.fetchall())
+
+    def __decode(self, triples: List[Tuple[int, int, int]]) -> List[Tuple[str, str, str]]:
+        return self._term_cache.decode_triples(triples, self.__extract)
+
+    def __encode(self, triples: List[Tuple[int, int, int]]) -> List[Tuple[EncodedTerm, EncodedTerm, EncodedTerm]]:
+        return [self._dictionary.encode_triple(triple) for triple in triples]
 
     def _fetch_histograms(self, cursor, table_name: str, attribute_name: str) -> Tuple[int, int, Dict[str, float], int]:
         """Download PostgreSQL histograms from a given table and attribute when using a catalog schema.
@@ -66,7 +101,7 @@ class CatalogPostgresConnector(PostgresConnector):
             cpt += 1
         return (null_frac, n_distinct, selectivities, sum(most_common_freqs))
 
-    def search(self, subject: str, predicate: str, obj: str, last_read: Optional[str] = None, as_of: Optional[datetime] = None) -> Tuple[PostgresIterator, int]:
+    def search(self, subject: str, predicate: str, obj: str, last_read: Optional[str] = None, as_of: Optional[datetime] = None, filters: Optional[List[Tuple[str, str, str]]] = None) -> Tuple[PostgresIterator, int]:
         """Get an iterator over all RDF triples matching a triple pattern.
 
         Args:
@@ -75,17 +110,29 @@ class CatalogPostgresConnector(PostgresConnector):
           * object: Object of the triple pattern.
           * last_read: A RDF triple ID. When set, the search is resumed for this RDF triple.
           * as_of: A version timestamp. When set, perform all reads against a consistent snapshot represented by this timestamp.
+          * filters: Constraints on the RDF triples, which are ignored by this connector.
 
         Returns:
           A tuple (`iterator`, `cardinality`), where `iterator` is a Python iterator over RDF triples matching the given triples pattern, and `cardinality` is the estimated cardinality of the triple pattern.
         """
+        return self.__search(subject, predicate, obj, last_read, self.__decode)
+
+    def search_ids(self, subject: Any, predicate: Any, obj: Any, last_read: Optional[str] = None, as_of: Optional[datetime] = None, filters: Optional[List[Tuple[str, str, str]]] = None) -> Tuple[PostgresIterator, int]:
+        """Get an iterator over all RDF triples matching a triple pattern, where RDF triples are made of `EncodedTerm`.
+
+        The terms of the triple pattern can be SPARQL variables, RDF terms or `EncodedTerm`. See `search` for the other arguments.
+        """
+        return self.__search(subject, predicate, obj, last_read, self.__encode)
+
+    def __search(self, subject: Any, predicate: Any, obj: Any, last_read: Optional[str], decode: Callable[[List[Tuple[int, int, int]]], List[tuple]]) -> Tuple[PostgresIterator, int]:
+        """Get an iterator over all RDF triples matching a triple pattern, where RDF triples read as identifiers are converted using a decoding function"""
         # do warmup if necessary
         self.open()
 
         # format triple patterns for the PostgreSQL API
-        subject = subject if (subject is not None) and (not subject.startswith('?')) else None
-        predicate = predicate if (predicate is not None) and (not predicate.startswith('?')) else None
-        obj = obj if (obj is not None) and (not obj.startswith('?')) else None
+        subject = subject if (subject is not None) and not (isinstance(subject, str) and subject.startswith('?')) else None
+        predicate = predicate if (predicate is not None) and not (isinstance(predicate, str) and predicate.startswith('?')) else None
+        obj = obj if (obj is not None) and not (isinstance(obj, str) and obj.startswith('?')) else None
         pattern = {'subject': subject, 'predicate': predicate, 'object': obj}
 
         # dedicated cursor used to scan this triple pattern
@@ -105,16 +152,25 @@ class CatalogPostgresConnector(PostgresConnector):
             t = (last_read["s"], last_read["p"], last_read["o"])
             start_query, start_params = get_resume_query(subject, predicate, obj, t, self._table_name)
 
+        if start_params is not None:
+            # unknown RDF terms are mapped to an identifier that matches no RDF triple
+            start_params = self._dictionary.get_identifiers(start_params)
+
         # create the iterator to yield the matching RDF triples
-        iterator = PostgresIterator(cursor, self._manager.get_connection(), start_query, start_params, pattern, fetch_size=self._fetch_size)
-        card = self._estimate_cardinality(subject, predicate, obj) if iterator.has_next() else 0
+        iterator = PostgresIterator(cursor, self._manager.get_connection(), start_query, start_params, pattern, decode, fetch_size=self._fetch_size, initial_fetch_size=self._initial_fetch_size)
+        if last_read is not None:
+            # a resumed scan starts with the RDF triple identified by last_read, so it cannot be empty,
+            # and its SQL query is not executed until the scan is read
+            card = self._estimate_cardinality(subject, predicate, obj)
+        else:
+            card = self._estimate_cardinality(subject, predicate, obj) if iterator.has_next() else 0
         return iterator, card
 
     def from_config(config: dict) -> PostgresConnector:
         """Build a CatalogPostgresConnector from a configuration object.
 
         The configuration object must contains the following fields: 'dbname', 'name', 'user' and 'password'.
-        Optional fields are: 'host', 'port' and 'fetch_size'.
+        Optional fields are: 'host', 'port', 'fetch_size', 'initial_fetch_size', 'min_pool_size', 'max_pool_size', 'pool_timeout' and 'term_cache_size'.
         """
         if 'dbname' not in config or 'name' not in config or 'user' not in config or 'password' not in config:
             raise SyntaxError('A valid configuration for a PostgreSQL connector must contains the dbname, user and password fields')
@@ -122,8 +178,13 @@ class CatalogPostgresConnector(PostgresConnector):
         host = config['host'] if 'host' in config else ''
         port = config['port'] if 'port' in config else 5432
         fetch_size = config['fetch_size'] if 'fetch_size' in config else 500
+        initial_fetch_size = config['initial_fetch_size'] if 'initial_fetch_size' in config else DEFAULT_INITIAL_FETCH_SIZE
+        min_pool_size = config['min_pool_size'] if 'min_pool_size' in config else 1
+        max_pool_size = config['max_pool_size'] if 'max_pool_size' in config else 10
+        pool_timeout = config['pool_timeout'] if 'pool_timeout' in config else 30
+        term_cache_size = config['term_cache_size'] if 'term_cache_size' in config else 100000
 
-        return CatalogPostgresConnector(config['name'], config['dbname'], config['user'], config['password'], host=host, port=port, fetch_size=fetch_size)
+        return CatalogPostgresConnector(config['name'], config['dbname'], config['user'], config['password'], host=host, port=port, fetch_size=fetch_size, initial_fetch_size=initial_fetch_size, min_pool_size=min_pool_size, max_pool_size=max_pool_size, pool_timeout=pool_timeout, term_cache_size=term_cache_size)
 
     def insert(self, subject: str, predicate: str, obj: str) -> None:
         """Insert a RDF triple into the RDF graph.
@@ -7,15 +7,12 @@ def get_start_query(subj, pred, obj, table_name):
         and the parameters used to execute it.
     """
     kind = get_kind(subj, pred, obj)
-    query = f"""SELECT cs.value, cp.value, co.value
-                FROM {table_name}
-                INNER JOIN catalog AS cs ON subject = cs.id
-                INNER JOIN catalog AS cp ON predicate = cp.id
-                INNER JOIN catalog AS co ON object = co.id """
+    query = f"""SELECT subject, predicate, object
+                FROM {table_name} """
     if kind == 'spo':
-        query += f"""WHERE subject = ({get_locate_query()})
-                     AND predicate = ({get_locate_query()})
-                     AND object = ({get_locate_query()})
+        query += f"""WHERE subject = %s
+                     AND predicate = %s
+                     AND object = %s
                      ORDER BY subject, predicate, object"""
         return query, (subj, pred, obj)
     elif kind == '???':
@@ -24,30 +21,30 @@ def get_start_query(subj, pred, obj, table_name):
         # query += "ORDER BY object, subject, predicate"
         return query, None
     elif kind == 's??':
-        query += f"""WHERE subject = ({get_locate_query()})
+        query += f"""WHERE subject = %s
                      ORDER BY subject, predicate, object"""
         return query, [subj]
     elif kind == 'sp?':
-        query += f"""WHERE subject = ({get_locate_query()})
-                     AND predicate = ({get_locate_query()})
+        query += f"""WHERE subject = %s
+                     AND predicate = %s
                      ORDER BY subject, predicate, object"""
         return query, (subj, pred)
     elif kind == '?p?':
-        query += f"""WHERE predicate = ({get_locate_query()})
+        query += f"""WHERE predicate = %s
                      ORDER BY predicate, object, subject"""
         return query, [pred]
     elif kind == '?po':
-        query += f"""WHERE predicate = ({get_locate_query()})
-                     AND object = ({get_locate_query()})
+        query += f"""WHERE predicate = %s
+                     AND object = %s
                      ORDER BY predicate, object, subject"""
         return query, (pred, obj)
     elif kind == 's?o':
-        query += f"""WHERE object = ({get_locate_query()})
-                     AND subject = ({get_locate_query()})
+        query += f"""WHERE object = %s
+                     AND subject = %s
                      ORDER BY object, subject, predicate"""
         return query, (obj, subj)
     elif kind == '??o':
-        query += f"""WHERE object = ({get_locate_query()})
+        query += f"""WHERE object = %s
                      ORDER BY object, subject, predicate"""
         return query, [obj]
     else:
@@ -61,54 +58,51 @@ def get_resume_query(subj, pred, obj, last_read, table_name, symbol=">="):
     """
     last_s, last_p, last_o = last_read
     kind = get_kind(subj, pred, obj)
-    query = f"""SELECT cs.value, cp.value, co.value
-                FROM {table_name}
-                INNER JOIN catalog AS cs ON subject = cs.id
-                INNER JOIN catalog AS cp ON predicate = cp.id
-                INNER JOIN catalog AS co ON object = co.id """
+    query = f"""SELECT subject, predicate, object
+                FROM {table_name} """
     if kind == 'spo':
         return None, None
     elif kind == '???':
-        query += f"""WHERE (subject, predicate, object) {symbol} (({get_locate_query()}), ({get_locate_query()}), ({get_locate_query()}))
+        query += f"""WHERE (subject, predicate, object) {symbol} (%s, %s, %s)
                      ORDER BY subject, predicate, object"""
-        # query += f"""WHERE (predicate, object, subject) {symbol} (({get_locate_query()}), ({get_locate_query()}), ({get_locate_query()}))
+        # query += f"""WHERE (predicate, object, subject) {symbol} (%s, %s, %s)
         #              ORDER BY predicate, object, subject"""
-        # query += f"""WHERE (object, subject, predicate) {symbol} (({get_locate_query()}), ({get_locate_query()}), ({get_locate_query()}))
+        # query += f"""WHERE (object, subject, predicate) {symbol} (%s, %s, %s)
         #              ORDER BY object, subject, predicate"""
         return query, (last_s, last_p, last_o)
         # return query, (last_p, last_o, last_s)
         # return query, (last_o, last_s, last_p)
     elif kind == 's??':
-        query += f"""WHERE subject = ({get_locate_query()})
-                     AND (predicate, object) {symbol} (({get_locate_query()}), ({get_locate_query()}))
+        query += f"""WHERE subject = %s
+                     AND (predicate, object) {symbol} (%s, %s)
                      ORDER BY subject, predicate, object"""
         return query, (last_s, last_p, last_o)
     elif kind == 'sp?':
-        query += f"""WHERE subject = ({get_locate_query()})
-                     AND predicate = ({get_locate_query()})
-                     AND (object) {symbol} ({get_locate_query()})
+        query += f"""WHERE subject = %s
+                     AND predicate = %s
+                     AND (object) {symbol} %s
                      ORDER BY subject, predicate, object"""
         return query, (last_s, last_p, last_o)
     elif kind == '?p?':
-        query += f"""WHERE predicate = ({get_locate_query()})
-                     AND (object, subject) {symbol} (({get_locate_query()}), ({get_locate_query()}))
+        query += f"""WHERE predicate = %s
+                     AND (object, subject) {symbol} (%s, %s)
                      ORDER BY predicate, object, subject"""
         return query, (last_p, last_o, last_s)
     elif kind == '?po':
-        query += f"""WHERE predicate = ({get_locate_query()})
-                     AND object = ({get_locate_query()})
-                     AND (subject) {symbol} ({get_locate_query()})
+        query += f"""WHERE predicate = %s
+                     AND object = %s
+                     AND (subject) {symbol} %s
                      ORDER BY predicate, object, subject"""
         return query, (last_p, last_o, last_s)
     elif kind == 's?o':
-        query += f"""WHERE object = ({get_locate_query()})
-                     AND subject = ({get_locate_query()})
-                     AND (predicate) {symbol} ({get_locate_query()})
+        query += f"""WHERE object = %s
+                     AND subject = %s
+                     AND (predicate) {symbol} %s
                      ORDER BY object, subject, predicate"""
         return query, (last_o, last_s, last_p)
     elif kind == '??o':
-        query += f"""WHERE object = ({get_locate_query()})
-                     AND (subject, predicate) {symbol} (({get_locate_query()}), ({get_locate_query()}))
+        query += f"""WHERE object = %s
+                     AND (subject, predicate) {symbol} (%s, %s)
                      ORDER BY object, subject, predicate"""
         return query, (last_o, last_s, last_p)
     else:
@@ -123,6 +117,16 @@ def get_extract_query():
     return "SELECT value FROM catalog WHERE id = %s"
 
 
+def get_locate_many_query():
+    """Build a SQL query to find the identifiers of a list of RDF terms, given as an array"""
+    return "SELECT value, id FROM catalog WHERE md5(value) IN (SELECT md5(term) FROM unnest(%s::text[]) AS term)"
+
+
+def get_extract_many_query():
+    """Build a SQL query to find the RDF terms of a list of identifiers, given as an array"""
+    return "SELECT id, value FROM catalog WHERE id = ANY(%s)"
+
+
 def get_insert_query(table_name):
     """Build a SQL query to insert a RDF triple into a PostgreSQL dataset"""
     return f"INSERT INTO {table_name} (subject,predicate,object) VALUES (%s,%s,%s) ON CONFLICT (subject,predicate,object) DO NOTHING"
@@ -6,7 +6,7 @@ from datetime import datetime
 from typing import Optional, List, Dict, Tuple
 from uuid import uuid4
 
-from sage.database.db_iterator import EmptyIterator
+from sage.database.db_iterator import DEFAULT_INITIAL_FETCH_SIZE, EmptyIterator
 from sage.database.postgres_backends.connector import PostgresConnector
 from sage.database.postgres_backends.postgres_mvcc.iterator import PostgresIterator
 from sage.database.postgres_backends.postgres_mvcc.queries import get_delete_query, get_insert_query
@@ -33,13 +33,17 @@ class MVCCPostgresConnector(PostgresConnector):
       * password: password used to authenticate.
       * host: database host address (default to UNIX socket if not provided).
       * port: connection port number (default to 5432 if not provided).
-      * fetch_size: The number of SQL rows/RDF triples to fetch per batch.
+      * fetch_size: The maximum number of SQL rows/RDF triples to fetch per batch.
+      * initial_fetch_size: The number of SQL rows/RDF triples fetched by the first batch of a scan.
+      * min_pool_size: Number of database connections kept open by each process.
+      * max_pool_size: Maximum number of database connections opened by each process.
+      * pool_timeout: Maximum time to wait for a database connection, in seconds.
     """
 
-    def __init__(self, table_name: str, dbname: str, user: str, password: str, host: str = '', port: int = 5432, fetch_size: int = 500):
-        super(MVCCPostgresConnector, self).__init__(table_name, dbname, user, password, host, port, fetch_size)
+    def __init__(self, table_name: str, dbname: str, user: str, password: str, host: str = '', port: int = 5432, fetch_size: int = 500, initial_fetch_size: int = DEFAULT_INITIAL_FETCH_SIZE, min_pool_size: int = 1, max_pool_size: int = 10, pool_timeout: float = 30):
+        super(MVCCPostgresConnector, self).__init__(table_name, dbname, user, password, host, port, fetch_size, initial_fetch_size, min_pool_size, max_pool_size, pool_timeout)
 
-    def search(self, subject: str, predicate: str, obj: str, last_read: Optional[str] = None, as_of: Optional[datetime] = None) -> Tuple[PostgresIterator, int]:
+    def search(self, subject: str, predicate: str, obj: str, last_read: Optional[str] = None, as_of: Optional[datetime] = None, filters: Optional[List[Tuple[str, str, str]]] = None) -> Tuple[PostgresIterator, int]:
         """Get an iterator over all RDF triples matching a triple pattern.
 
         Args:
@@ -48,6 +52,7 @@ class MVCCPostgresConnector(PostgresConnector):
           * object: Object of the triple pattern.
           * last_read: A RDF triple ID. When set, the search is resumed for this RDF triple.
           * as_of: A version timestamp. When set, perform all reads against a consistent snapshot represented by this timestamp.
+          * filters: Constraints on the RDF triples, which are ignored by this connector.
 
         Returns:
           A tuple (`iterator`, `cardinality`), where `iterator` is a Python iterator over RDF triples matching the given triples pattern, and `cardinality` is the estimated cardinality of the triple pattern.
@@ -93,15 +98,20 @@ class MVCCPostgresConnector(PostgresConnector):
             start_query, start_params = get_resume_query(subject, predicate, obj, last_triple, self._table_name)
 
         # create the iterator to yield the matching RDF triples
-        iterator = PostgresIterator(cursor, timestamp, start_query, start_params, self._table_name, pattern, fetch_size=self._fetch_size)
-        card = self._estimate_cardinality(subject, predicate, obj) if iterator.has_next() else 0
+        iterator = PostgresIterator(cursor, timestamp, start_query, start_params, self._table_name, pattern, fetch_size=self._fetch_size, initial_fetch_size=self._initial_fetch_size)
+        if last_read is not None:
+            # a resumed scan starts with the RDF triple identified by last_read, so it cannot be empty,
+            # and its SQL query is not executed until the scan is read
+            card = self._estimate_cardinality(subject, predicate, obj)
+        else:
+            card = self._estimate_cardinality(subject, predicate, obj) if iterator.has_next() else 0
         return iterator, card
 
     def from_config(config: dict) -> PostgresConnector:
         """Build a MVCCPostgresConnector from a configuration object.
 
         The configuration object must contains the following fields: 'dbname', 'name', 'user' and 'password'.
-        Optional fields are: 'host', 'port' and 'fetch_size'.
+        Optional fields are: 'host', 'port', 'fetch_size', 'initial_fetch_size', 'min_pool_size', 'max_pool_size' and 'pool_timeout'.
         """
         if 'dbname' not in config or 'name' not in config or 'user' not in config or 'password' not in config:
             raise SyntaxError('A valid configuration for a MVCC-PostgreSQL connector must contains the dbname, name, user and password fields')
@@ -109,8 +119,12 @@ class MVCCPostgresConnector(PostgresConnector):
         host = config['host'] if 'host' in config else ''
         port = config['port'] if 'port' in config else 5432
         fetch_size = config['fetch_size'] if 'fetch_size' in config else 500
+        initial_fetch_size = config['initial_fetch_size'] if 'initial_fetch_size' in config else DEFAULT_INITIAL_FETCH_SIZE
+        min_pool_size = config['min_pool_size'] if 'min_pool_size' in config else 1
+        max_pool_size = config['max_pool_size'] if 'max_pool_size' in config else 10
+        pool_timeout = config['pool_timeout'] if 'pool_timeout' in config else 30
 
-        return MVCCPostgresConnector(config['name'], config['dbname'], config['user'], config['password'], host=host, port=port, fetch_size=fetch_size)
+        return MVCCPostgresConnector(config['name'], config['dbname'], config['user'], config['password'], host=host, port=port, fetch_size=fetch_size, initial_fetch_size=initial_fetch_size, min_pool_size=min_pool_size, max_pool_size=max_pool_size, pool_timeout=pool_timeout)
 
     def insert(self, subject: str, predicate: str, obj: str) -> None:
         """Insert a RDF triple into the RDF graph.
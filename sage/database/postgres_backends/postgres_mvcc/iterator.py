@@ -3,7 +3,7 @@ import json
 from datetime import datetime
 from typing import Optional, List, Dict, Tuple
 
-from sage.database.db_iterator import DBIterator
+from sage.database.db_iterator import DEFAULT_INITIAL_FETCH_SIZE, DBIterator, FetchSizePolicy
 
 class PostgresIterator(DBIterator):
     """A PostgresIterator fetches RDF triples from a versionned PostgreSQL table using batch queries and lazy loading.
@@ -15,18 +15,22 @@ class PostgresIterator(DBIterator):
       * start_params: SQL params to apply to the prepared SQL query.
       * table_name: Name of the SQL table to scan.
       * pattern: Triple pattern scanned.
-      * fetch_size: The number of SQL rows/RDF triples to fetch per batch.
+      * fetch_size: The maximum number of SQL rows/RDF triples to fetch per batch.
+      * initial_fetch_size: The number of SQL rows/RDF triples fetched by the first batch. The size of the next batches grows geometrically, up to `fetch_size`.
     """
 
-    def __init__(self, cursor, start_time: datetime, start_query: str, start_params: List[str], table_name: str, pattern: Dict[str, str], fetch_size: int = 500):
+    def __init__(self, cursor, start_time: datetime, start_query: str, start_params: List[str], table_name: str, pattern: Dict[str, str], fetch_size: int = 500, initial_fetch_size: int = DEFAULT_INITIAL_FETCH_SIZE):
         super(PostgresIterator, self).__init__(pattern)
         self._cursor = cursor
         self._start_time = start_time
         self._current_query = start_query
         self._table_name = table_name
-        self._fetch_size = fetch_size
-        self._cursor.execute(self._current_query, start_params)
-        self._last_reads = self._cursor.fetchmany(size=1)
+        self._fetch_policy = FetchSizePolicy(initial_size=initial_fetch_size, max_size=fetch_size)
+        self._start_params = start_params
+        # the query is only executed when the iterator is read for the first time
+        self._last_reads = None
+        # True once the cursor has returned all its rows
+        self._exhausted = False
 
     def __del__(self) -> None:
         """Destructor"""
@@ -65,8 +69,21 @@ class PostgresIterator(DBIterator):
         # to find a matching RDF triple
         return None
 
+    def must_fetch(self) -> bool:
+        """Return True if the next call to `has_next` fetches RDF triples from the database, and False otherwise"""
+        return self._last_reads is None or (len(self._last_reads) == 0 and not self._exhausted)
+
+    def limit_fetch(self, nb_triples: int, deadline: Optional[float] = None) -> None:
+        """Give a hint about how many RDF triples should be fetched from the database by the next call to `has_next`"""
+        self._fetch_policy.limit(nb_triples, deadline=deadline)
+
     def has_next(self) -> bool:
         """Return True if there is still results to read, and False otherwise"""
-        if len(self._last_reads) == 0:
-            self._last_reads = self._cursor.fetchmany(size=self._fetch_size)
+        if self._last_reads is None:
+            self._cursor.execute(self._current_query, self._start_params)
+            self._last_reads = self._fetch_policy.fetch(self._cursor)
+            self._exhausted = len(self._last_reads) == 0
+        if len(self._last_reads) == 0 and not self._exhausted:
+            self._last_reads = self._fetch_policy.fetch(self._cursor)
+            self._exhausted = len(self._last_reads) == 0
         return len(self._last_reads) > 0
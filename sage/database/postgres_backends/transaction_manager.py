@@ -1,97 +1,376 @@
 # transaction_manager.py
 # Author: Thomas MINIER - MIT License 2017-2020
+from asyncio import CancelledError, Future, get_running_loop, shield, wait
+from collections import deque
+from contextvars import ContextVar
 from os import getpid
+from threading import Condition
+from time import time
+from typing import Any, Callable, Dict, Optional, Tuple
 
 import psycopg2
 from psycopg2.extensions import ISOLATION_LEVEL_SERIALIZABLE
 
+# Connections that stayed idle in the pool for longer than this delay (in seconds) are checked before being used again
+HEALTH_CHECK_INTERVAL = 30
+
+
+class PoolTimeout(Exception):
+    """Raised when no connection could be checked out from a pool before the timeout"""
+    pass
+
+
+class ConnectionPool:
+    """A pool of connections to a PostgreSQL database, shared by the threads and the event loop of a process.
+
+    Connections can be checked out by threads, using `acquire`, or by coroutines, using `async_acquire`,
+    which waits for a connection to be released without blocking the event loop, and opens or checks connections in a thread pool.
+
+    Args:
+      * connect: Function used to open a new connection.
+      * min_size: Number of connections opened when the pool is created, and kept open.
+      * max_size: Maximum number of connections opened at the same time.
+      * timeout: Maximum time to wait for a connection, in seconds.
+    """
+
+    def __init__(self, connect: Callable, min_size: int = 1, max_size: int = 10, timeout: float = 30):
+        super(ConnectionPool, self).__init__()
+        self._connect = connect
+        self._min_size = min_size
+        self._max_size = max(min_size, max_size)
+        self._timeout = timeout
+        # idle connections: (connection, timestamp of the last release)
+        self._idle = deque()
+        self._size = 0
+        self._condition = Condition()
+        # coroutines waiting for a connection: (event loop, future)
+        self._waiters = list()
+        # metrics
+        self._nb_checkouts = 0
+        self._nb_waits = 0
+        self._nb_timeouts = 0
+        self._total_wait_time = 0
+        self._max_wait_time = 0
+        for _ in range(min_size):
+            self._idle.append((self._connect(), time()))
+            self._size += 1
+
+    def _notify(self) -> None:
+        """Wake up the threads and the coroutines waiting for a connection (the lock must be held)"""
+        self._condition.notify()
+        for loop, waiter in self._waiters:
+            loop.call_soon_threadsafe(_wake_up, waiter)
+        self._waiters = list()
+
+    def _free_slot(self) -> None:
+        """Forget a connection which has been closed, or could not be opened"""
+        with self._condition:
+            self._size -= 1
+            self._notify()
+
+    def _discard(self, connection) -> None:
+        try:
+            connection.close()
+        except psycopg2.Error:
+            pass
+        self._free_slot()
+
+    def _is_healthy(self, connection, last_release: float) -> bool:
+        """Return True if a connection taken from the pool can be used"""
+        if connection.closed:
+            return False
+        if time() - last_release < HEALTH_CHECK_INTERVAL:
+            return True
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute('SELECT 1')
+            connection.rollback()
+            return True
+        except psycopg2.Error:
+            return False
+
+    def _reserve(self) -> Optional[Tuple[Any, float]]:
+        """Reserve a connection (the lock must be held).
+
+        Returns: The most recently released idle connection, as a tuple (`connection`, `last_release`), a tuple (`None`, `None`) if a new connection can be opened, or `None` if all connections are in use.
+        """
+        if len(self._idle) > 0:
+            return self._idle.pop()
+        if self._size < self._max_size:
+            self._size += 1
+            return (None, None)
+        return None
+
+    def _needs_io(self, reserved: Tuple[Any, float]) -> bool:
+        """Return True if checking out a reserved connection performs blocking I/O, i.e., opens or checks the connection"""
+        connection, last_release = reserved
+        return connection is None or time() - last_release >= HEALTH_CHECK_INTERVAL
+
+    def _checkout(self, reserved: Tuple[Any, float]):
+        """Open a reserved connection, or check the health of a reserved idle connection.
+
+        Returns: The connection, or `None` if the idle connection was not healthy, and has been discarded.
+        """
+        connection, last_release = reserved
+        if connection is None:
+            try:
+                return self._connect()
+            except Exception as err:
+                self._free_slot()
+                raise err
+        if self._is_healthy(connection, last_release):
+            return connection
+        self._discard(connection)
+        return None
+
+    def _timeout_error(self, start: float) -> PoolTimeout:
+        self._nb_timeouts += 1
+        self._record_wait(time() - start)
+        return PoolTimeout(f'No PostgreSQL connection available after {self._timeout}s ({self._max_size} connections in use)')
+
+    def _checked_out(self, start: float, waited: bool) -> None:
+        with self._condition:
+            self._nb_checkouts += 1
+            if waited:
+                self._record_wait(time() - start)
+
+    def acquire(self):
+        """Check out a connection from the pool, waiting for a connection to be released if all of them are in use.
+
+        This method blocks the calling thread: coroutines must use `async_acquire` instead.
+
+        Throws: `PoolTimeout` if no connection was released before the timeout.
+        """
+        start = time()
+        waited = False
+        while True:
+            with self._condition:
+                reserved = self._reserve()
+                while reserved is None:
+                    remaining = self._timeout - (time() - start)
+                    if remaining <= 0:
+                        raise self._timeout_error(start)
+                    waited = True
+                    self._condition.wait(remaining)
+                    reserved = self._reserve()
+            connection = self._checkout(reserved)
+            if connection is not None:
+                self._checked_out(start, waited)
+                return connection
+
+    async def async_acquire(self):
+        """Check out a connection from the pool, like `acquire`, without blocking the event loop.
+
+        While all connections are in use, the coroutine is suspended until a connection is released,
+        and connections are opened or checked in a thread pool.
+
+        Throws: `PoolTimeout` if no connection was released before the timeout.
+        """
+        loop = get_running_loop()
+        start = time()
+        waited = False
+        while True:
+            with self._condition:
+                reserved = self._reserve()
+                if reserved is None:
+                    remaining = self._timeout - (time() - start)
+                    if remaining <= 0:
+                        raise self._timeout_error(start)
+                    waiter = loop.create_future()
+                    self._waiters.append((loop, waiter))
+            if reserved is None:
+                waited = True
+                try:
+                    await wait([waiter], timeout=remaining)
+                finally:
+                    with self._condition:
+                        if (loop, waiter) in self._waiters:
+                            self._waiters.remove((loop, waiter))
+                continue
+            if not self._needs_io(reserved):
+                connection = reserved[0]
+            else:
+                checkout = loop.run_in_executor(None, self._checkout, reserved)
+                try:
+                    connection = await shield(checkout)
+                except CancelledError as err:
+                    # the connection is returned to the pool once opened, as nobody will use it
+                    checkout.add_done_callback(self._release_checkout)
+                    raise err
+            if connection is not None:
+                self._checked_out(start, waited)
+                return connection
+
+    def _release_checkout(self, checkout: Future) -> None:
+        """Return to the pool a connection whose checkout has been cancelled"""
+        if not checkout.cancelled() and checkout.exception() is None and checkout.result() is not None:
+            self.release(checkout.result())
+
+    def _record_wait(self, wait_time: float) -> None:
+        self._nb_waits += 1
+        self._total_wait_time += wait_time
+        self._max_wait_time = max(self._max_wait_time, wait_time)
+
+    def release(self, connection) -> None:
+        """Return a connection to the pool"""
+        with self._condition:
+            if connection.closed:
+                self._size -= 1
+            else:
+                self._idle.append((connection, time()))
+            self._notify()
+
+    def close(self) -> None:
+        """Close all idle connections"""
+        with self._condition:
+            while len(self._idle) > 0:
+                self._discard(self._idle.pop()[0])
+
+    def stats(self) -> Dict[str, float]:
+        """Get statistics about the usage of the pool, with waiting times in milliseconds"""
+        with self._condition:
+            return {
+                "size": self._size,
+                "idle": len(self._idle),
+                "checkouts": self._nb_checkouts,
+                "waits": self._nb_waits,
+                "timeouts": self._nb_timeouts,
+                "total_wait_time": self._total_wait_time * 1000,
+                "max_wait_time": self._max_wait_time * 1000
+            }
+
+
+def _wake_up(waiter: Future) -> None:
+    """Wake up a coroutine waiting for a connection, unless it has stopped waiting"""
+    if not waiter.done():
+        waiter.set_result(None)
+
 
 class TransactionManager:
     """A TransactionManager handles transactions for a (MVCC-)PostgreSQL connector.
 
+    Each process uses its own pool of connections. A connection is checked out from the pool by the first access
+    to the database made during a query quantum, and returned to the pool when the quantum's transaction is committed
+    or aborted, so concurrent queries executed by the same process do not share a connection.
+    The connection checked out is tracked using a context variable, so it follows the asyncio task executing the quantum.
+
     Args:
       * dbname: the database name.
       * user: user name used to authenticate.
       * password: password used to authenticate.
       * host: database host address (defaults to UNIX socket if not provided).
       * port: connection port number (defaults to 5432 if not provided).
+      * min_pool_size: Number of connections kept open by each process.
+      * max_pool_size: Maximum number of connections opened by each process.
+      * pool_timeout: Maximum time to wait for a connection, in seconds.
     """
 
-    def __init__(self, dbname: str, user: str, password: str, host: str = '', port: int = 5432):
+    def __init__(self, dbname: str, user: str, password: str, host: str = '', port: int = 5432, min_pool_size: int = 1, max_pool_size: int = 10, pool_timeout: float = 30):
         super(TransactionManager, self).__init__()
         self._dbname = dbname
         self._user = user
         self._password = password
         self._host = host
         self._port = port
-        self._connections = dict()
-        self._transactions = dict()
+        self._min_pool_size = min_pool_size
+        self._max_pool_size = max_pool_size
+        self._pool_timeout = pool_timeout
+        self._pools = dict()
+        # session of the current quantum: {'pid', 'connection', 'transaction'}
+        self._session = ContextVar(f'postgres_session_{id(self)}', default=None)
+
+    def _connect(self):
+        connection = psycopg2.connect(dbname=self._dbname, user=self._user, password=self._password, host=self._host, port=self._port)
+        # disable autocommit & set isolation level
+        connection.autocommit = False
+        connection.isolation_level = ISOLATION_LEVEL_SERIALIZABLE
+        return connection
+
+    def _get_session(self) -> dict:
+        """Get the session of the current quantum, and check out a connection for it if needed"""
+        pid = getpid()
+        session = self._session.get()
+        if session is None or session['pid'] != pid:
+            self.open_connection()
+            session = {'pid': pid, 'connection': self._pools[pid].acquire(), 'transaction': None}
+            self._session.set(session)
+        return session
+
+    def _end_session(self, commit: bool) -> bool:
+        """Commit or rollback the transaction of the current quantum, and return its connection to the pool"""
+        session = self._session.get()
+        if session is None or session['pid'] != getpid():
+            return False
+        self._session.set(None)
+        connection = session['connection']
+        try:
+            if commit:
+                connection.commit()
+            else:
+                connection.rollback()
+        finally:
+            if session['transaction'] is not None:
+                session['transaction'].close()
+            self._pools[session['pid']].release(connection)
+        return session['transaction'] is not None
 
     def is_open(self) -> bool:
-        """Returns True if the current process has an open connection to the DB"""
+        """Returns True if the current process has an open pool of connections to the DB"""
         pid = getpid()
-        return pid in self._connections
+        return pid in self._pools
 
     def get_connection(self):
-        """Get the connection of the current processs"""
-        pid = getpid()
-        return self._connections[pid]
+        """Get the connection used by the current quantum"""
+        return self._get_session()['connection']
 
     def open_connection(self) -> None:
-        """Open a new connection for the given process"""
+        """Open the pool of connections of the current process"""
         pid = getpid()
-        if pid not in self._connections:
-            self._connections[pid] = psycopg2.connect(dbname=self._dbname, user=self._user, password=self._password, host=self._host, port=self._port)
-            # disable autocommit & set isolation level
-            self._connections[pid].autocommit = False
-            self._connections[pid].isolation_level = ISOLATION_LEVEL_SERIALIZABLE
+        if pid not in self._pools:
+            self._pools[pid] = ConnectionPool(self._connect, min_size=self._min_pool_size, max_size=self._max_pool_size, timeout=self._pool_timeout)
 
     def close_connection(self) -> None:
-        """Close the connection for a given processs"""
+        """Close the pool of connections of the current process"""
         pid = getpid()
-        if pid in self._connections:
-            self._connections[pid].rollback()
-            if pid in self._transactions:
-                self._transactions[pid].close()
-                del self._transactions[pid]
-            self._connections[pid].close()
-            del self._connections[pid]
+        self._end_session(False)
+        if pid in self._pools:
+            self._pools[pid].close()
+            del self._pools[pid]
 
     def close_all(self) -> None:
         """Close all connections & rollback any ongoing transactions"""
-        for pid, connection in self._connections.items():
-            connection.rollback()
-            if pid in self._transactions:
-                self._transactions[pid].close()
-                del self._transactions[pid]
-            connection.close()
-        self._connections = dict()
+        self._end_session(False)
+        for pool in self._pools.values():
+            pool.close()
+        self._pools = dict()
+
+    async def async_start_transaction(self):
+        """Starts a new transaction, like `start_transaction`, without blocking the event loop while a connection is checked out"""
+        pid = getpid()
+        session = self._session.get()
+        if session is None or session['pid'] != pid:
+            if pid not in self._pools:
+                # the pool opens its first connections when it is created
+                await get_running_loop().run_in_executor(None, self.open_connection)
+            self._session.set({'pid': pid, 'connection': await self._pools[pid].async_acquire(), 'transaction': None})
+        return self.start_transaction()
 
     def start_transaction(self):
         """Starts a new transaction"""
-        pid = getpid()
-        if pid not in self._connections:
-            self.open_connection()
-        if pid not in self._transactions:
-            self._transactions[pid] = self._connections[pid].cursor()
-        return self._transactions[pid]
+        session = self._get_session()
+        if session['transaction'] is None:
+            session['transaction'] = session['connection'].cursor()
+        return session['transaction']
 
     def commit(self) -> bool:
         """Commit an ongoing transaction"""
-        pid = getpid()
-        if pid in self._transactions:
-            self._connections[pid].commit()
-            self._transactions[pid].close()
-            del self._transactions[pid]
-            return True
-        return False
+        return self._end_session(True)
 
     def abort(self) -> bool:
         """Abort an ongoing transaction"""
+        return self._end_session(False)
+
+    def stats(self) -> Optional[Dict[str, float]]:
+        """Get statistics about the pool of connections of the current process"""
         pid = getpid()
-        if pid in self._transactions:
-            self._connections[pid].rollback()
-            self._transactions[pid].close()
-            del self._transactions[pid]
-            return True
-        return False
+        return self._pools[pid].stats() if pid in self._pools else None
@@ -10,7 +10,7 @@ from functools import reduce
 from typing import Dict, List, Optional, Tuple
 
 from sage.database.db_connector import DatabaseConnector
-from sage.database.db_iterator import DBIterator, EmptyIterator
+from sage.database.db_iterator import DEFAULT_INITIAL_FETCH_SIZE, DBIterator, EmptyIterator
 from sage.database.sqlite_backends.transaction_manager import TransactionManager
 from sage.database.utils import get_kind
 
@@ -21,14 +21,16 @@ class SQliteConnector(DatabaseConnector):
         Constructor arguments:
             - table_name `str`: Name of the SQL table containing RDF data.
             - database `str`: the name of the sqlite database file.
-            - fetch_size `int`: how many RDF triples are fetched per SQL query (default to 500)
+            - fetch_size `int`: maximum number of RDF triples fetched per SQL query (default to 500)
+            - initial_fetch_size `int`: how many RDF triples are fetched by the first SQL query of a scan (default to 8)
     """
 
-    def __init__(self, table_name: str, database: str, fetch_size: int = 500):
+    def __init__(self, table_name: str, database: str, fetch_size: int = 500, initial_fetch_size: int = DEFAULT_INITIAL_FETCH_SIZE):
         super(SQliteConnector, self).__init__()
         self._table_name = table_name
         self._manager = TransactionManager(database)
         self._fetch_size = fetch_size
+        self._initial_fetch_size = initial_fetch_size
         self._warmup = True
 
         # Data used for cardinality estimation.
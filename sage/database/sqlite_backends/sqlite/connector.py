@@ -8,12 +8,12 @@ from datetime import datetime
 from functools import reduce
 from typing import Optional, List, Dict, Tuple
 
-from sage.database.utils import get_kind
+from sage.database.utils import add_sql_filters, search_many_by_kind
 from sage.database.db_connector import DatabaseConnector
-from sage.database.db_iterator import EmptyIterator
+from sage.database.db_iterator import DEFAULT_INITIAL_FETCH_SIZE, DBIterator, EmptyIterator
 from sage.database.sqlite_backends.connector import SQliteConnector
 from sage.database.sqlite_backends.sqlite.iterator import SQliteIterator
-from sage.database.sqlite_backends.sqlite.queries import get_start_query, get_resume_query
+from sage.database.sqlite_backends.sqlite.queries import MAX_SEARCH_MANY_PARAMETERS, get_start_query, get_resume_query, get_search_many_query
 from sage.database.sqlite_backends.sqlite.queries import get_insert_query, get_delete_query
 
 coloredlogs.install(level='INFO', fmt='%(asctime)s - %(levelname)s %(message)s')
@@ -26,13 +26,14 @@ class DefaultSQliteConnector(SQliteConnector):
         Constructor arguments:
             - table_name `str`: Name of the SQL table containing RDF data.
             - database `str`: the name of the sqlite database file.
-            - fetch_size `int`: how many RDF triples are fetched per SQL query (default to 500)
+            - fetch_size `int`: maximum number of RDF triples fetched per SQL query (default to 500)
+            - initial_fetch_size `int`: how many RDF triples are fetched by the first SQL query of a scan (default to 8)
     """
 
-    def __init__(self, table_name: str, database: str, fetch_size: int = 500):
-        super(DefaultSQliteConnector, self).__init__(table_name, database, fetch_size)
+    def __init__(self, table_name: str, database: str, fetch_size: int = 500, initial_fetch_size: int = DEFAULT_INITIAL_FETCH_SIZE):
+        super(DefaultSQliteConnector, self).__init__(table_name, database, fetch_size, initial_fetch_size)
 
-    def search(self, subject: str, predicate: str, obj: str, last_read: Optional[str] = None, as_of: Optional[datetime] = None) -> Tuple[SQliteIterator, int]:
+    def search(self, subject: str, predicate: str, obj: str, last_read: Optional[str] = None, as_of: Optional[datetime] = None, filters: Optional[List[Tuple[str, str, str]]] = None) -> Tuple[SQliteIterator, int]:
         """
             Get an iterator over all RDF triples matching a triple pattern.
             Args:
@@ -41,6 +42,7 @@ class DefaultSQliteConnector(SQliteConnector):
                 - obj ``string`` - Object of the triple pattern
                 - last_read ``string=None`` ``optional`` -  OFFSET ID used to resume scan
                 - as_of ``datetime=None`` ``optional`` - Perform all reads against a consistent snapshot represented by a timestamp.
+                - filters ``list=None`` ``optional`` - Constraints (`position`, `operator`, `value`) on the RDF triples, evaluated in the WHERE clause of the SQL query.
             Returns:
                 A tuple (`iterator`, `cardinality`), where `iterator` is a Python iterator over RDF triples matching the given triples pattern, and `cardinality` is the estimated cardinality of the triple pattern
         """
@@ -70,16 +72,53 @@ class DefaultSQliteConnector(SQliteConnector):
             t = (last_read["s"], last_read["p"], last_read["o"])
             start_query, start_params = get_resume_query(subject, predicate, obj, t, self._table_name)
 
+        # evaluate the constraints pushed down from FILTER clauses in the SQL query
+        if start_query is not None:
+            start_query, start_params = add_sql_filters(start_query, start_params, filters)
+
         # create the iterator to yield the matching RDF triples
         iterator = SQliteIterator(
             cursor, self._manager.get_connection(),
             start_query, start_params,
             self._table_name,
             pattern,
-            fetch_size=self._fetch_size)
-        card = self._estimate_cardinality(subject, predicate, obj) if iterator.has_next() else 0
+            fetch_size=self._fetch_size,
+            initial_fetch_size=self._initial_fetch_size)
+        if last_read is not None:
+            # a resumed scan starts with the RDF triple identified by last_read, so it cannot be empty,
+            # and its SQL query is not executed until the scan is read
+            card = self._estimate_cardinality(subject, predicate, obj)
+        else:
+            card = self._estimate_cardinality(subject, predicate, obj) if iterator.has_next() else 0
         return iterator, card
 
+    def search_many(self, patterns: List[Tuple[str, str, str]], as_of: Optional[datetime] = None, limit: Optional[int] = None) -> List[Optional[Tuple[DBIterator, int]]]:
+        """
+            Get iterators over all RDF triples matching several triple patterns.
+            Triple patterns of the same kind are evaluated using a single SQL query (see `sage.database.utils.search_many_by_kind`),
+            which joins the table with the terms bound in the triple patterns.
+            Args:
+                - patterns ``list`` - List of triples patterns (`subject`, `predicate`, `object`) to evaluate
+                - as_of ``datetime=None`` ``optional`` - Perform all reads against a consistent snapshot represented by a timestamp.
+                - limit ``int=None`` ``optional`` - Maximum number of RDF triples read.
+            Returns:
+                A list of tuples (`iterator`, `cardinality`), one per triple pattern, in the same order as the input triple patterns, or `None` for the triple patterns not evaluated due to the limit
+        """
+        # do warmup if necessary
+        self.open()
+
+        def execute(kind, bound_terms):
+            query, params = get_search_many_query(kind, bound_terms, self._table_name)
+            cursor = self._manager.get_connection().cursor()
+            cursor.execute(query, params)
+            return cursor
+
+        return search_many_by_kind(patterns, lambda s, p, o: self.search(s, p, o, as_of=as_of), execute, limit=limit, max_probes=MAX_SEARCH_MANY_PARAMETERS, fetch_size=self._fetch_size)
+
+    @property
+    def native_search_many(self) -> bool:
+        return True
+
     def from_config(config: dict) -> SQliteConnector:
         """Build a SQliteConnector from a configuration object"""
         if 'database' not in config:
@@ -89,8 +128,9 @@ class DefaultSQliteConnector(SQliteConnector):
         table_name = config['name']
         database = config['database']
         fetch_size = config['fetch_size'] if 'fetch_size' in config else 500
+        initial_fetch_size = config['initial_fetch_size'] if 'initial_fetch_size' in config else DEFAULT_INITIAL_FETCH_SIZE
 
-        return DefaultSQliteConnector(table_name, database, fetch_size=fetch_size)
+        return DefaultSQliteConnector(table_name, database, fetch_size=fetch_size, initial_fetch_size=initial_fetch_size)
 
     def insert(self, subject: str, predicate: str, obj: str) -> None:
         """
@@ -2,20 +2,21 @@ import json
 
 from typing import Optional, List, Dict, Tuple
 
-from sage.database.db_iterator import DBIterator
+from sage.database.db_iterator import DEFAULT_INITIAL_FETCH_SIZE, DBIterator, FetchSizePolicy
 
 class SQliteIterator(DBIterator):
     """A SQliteIterator implements a DBIterator for a triple pattern evaluated using a SQlite database file"""
 
-    def __init__(self, cursor, connection, start_query: str, start_params: List[str], table_name: str, pattern: Dict[str, str], fetch_size: int = 500):
+    def __init__(self, cursor, connection, start_query: str, start_params: List[str], table_name: str, pattern: Dict[str, str], fetch_size: int = 500, initial_fetch_size: int = DEFAULT_INITIAL_FETCH_SIZE):
         super(SQliteIterator, self).__init__(pattern)
         self._cursor = cursor
         self._connection = connection
         self._current_query = start_query
         self._table_name = table_name
-        self._fetch_size = fetch_size
-        self._cursor.execute(self._current_query, start_params)
-        self._last_reads = self._cursor.fetchmany(size=1)
+        self._fetch_policy = FetchSizePolicy(initial_size=initial_fetch_size, max_size=fetch_size)
+        self._start_params = start_params
+        # the query is only executed when the iterator is read for the first time
+        self._last_reads = None
 
     def __del__(self) -> None:
         """Destructor (close the database cursor)"""
@@ -38,8 +39,15 @@ class SQliteIterator(DBIterator):
             return None
         return self._last_reads.pop(0)
 
+    def limit_fetch(self, nb_triples: int, deadline: Optional[float] = None) -> None:
+        """Give a hint about how many RDF triples should be fetched from the database by the next call to `has_next`"""
+        self._fetch_policy.limit(nb_triples, deadline=deadline)
+
     def has_next(self) -> bool:
         """Return True if there is still results to read, and False otherwise"""
+        if self._last_reads is None:
+            self._cursor.execute(self._current_query, self._start_params)
+            self._last_reads = self._fetch_policy.fetch(self._cursor)
         if len(self._last_reads) == 0:
-            self._last_reads = self._cursor.fetchmany(size=self._fetch_size)
+            self._last_reads = self._fetch_policy.fetch(self._cursor)
         return len(self._last_reads) > 0
@@ -1,5 +1,9 @@
 from sage.database.utils import get_kind
 
+# Maximum number of parameters bound in a single search_many query, i.e., 3 parameters per triple pattern
+# for blocks of 100 triple patterns. Old builds of SQLite bind at most 999 parameters per statement.
+MAX_SEARCH_MANY_PARAMETERS = 300
+
 
 def get_start_query(subj, pred, obj, table_name):
     """
@@ -29,7 +33,7 @@ def get_start_query(subj, pred, obj, table_name):
         query += "WHERE predicate = ? AND object = ? ORDER BY predicate, object, subject"
         return query, (pred, obj)
     elif kind == 's?o':
-        query += "WHERE object = ? AND subject = ? AND ORDER BY object, subject, predicate"
+        query += "WHERE object = ? AND subject = ? ORDER BY object, subject, predicate"
         return query, (obj, subj)
     elif kind == '??o':
         query += "WHERE object = ? ORDER BY object, subject, predicate"
@@ -77,6 +81,30 @@ def get_resume_query(subj, pred, obj, last_read, table_name, symbol=">="):
         raise Exception(f"Unkown pattern type: {kind}")
 
 
+def get_search_many_query(kind, bound_terms, table_name):
+    """
+        Get a prepared SQL query which scans for several triple patterns of the same kind at once,
+        by joining the table with the terms bound in the triple patterns, and the parameters used to execute it.
+        Rows are sorted in the same order as a single index scan, so they can be used to resume it.
+    """
+    columns = [column for column, position in zip(['subject', 'predicate', 'object'], kind) if position != '?']
+    if kind in ['spo', 's??', 'sp?']:
+        order_by = "subject, predicate, object"
+    elif kind in ['?p?', '?po']:
+        order_by = "predicate, object, subject"
+    elif kind in ['s?o', '??o']:
+        order_by = "object, subject, predicate"
+    else:
+        raise Exception(f"Unkown pattern type: {kind}")
+    placeholders = ', '.join(['(' + ', '.join(['?'] * len(columns)) + ')'] * len(bound_terms))
+    join_conditions = ' AND '.join([f"t.{column} = probes.{column}" for column in columns])
+    query = f"WITH probes({', '.join(columns)}) AS (VALUES {placeholders}) "
+    query += f"SELECT t.subject, t.predicate, t.object FROM probes INNER JOIN {table_name} AS t ON {join_conditions} "
+    query += f"ORDER BY {', '.join(['t.' + column for column in order_by.split(', ')])}"
+    params = [term for terms in bound_terms for term in terms]
+    return query, params
+
+
 def get_insert_query(table_name):
     """Build a SQL query to insert a RDF triple into a SQlite dataset"""
     return f"INSERT INTO {table_name} (subject,predicate,object) VALUES (?,?,?) ON CONFLICT (subject,predicate,object) DO NOTHING"
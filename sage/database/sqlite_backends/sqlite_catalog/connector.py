@@ -9,12 +9,14 @@ from functools import reduce
 
 from sage.database.utils import get_kind
 from sage.database.db_connector import DatabaseConnector
-from sage.database.db_iterator import EmptyIterator
+from sage.database.db_iterator import DEFAULT_INITIAL_FETCH_SIZE, EmptyIterator
 from sage.database.sqlite_backends.connector import SQliteConnector
 from sage.database.sqlite_backends.sqlite_catalog.iterator import SQliteIterator
 from sage.database.sqlite_backends.sqlite_catalog.queries import get_start_query, get_resume_query
 from sage.database.sqlite_backends.sqlite_catalog.queries import get_insert_query, get_delete_query, get_catalog_insert_query
-from sage.database.sqlite_backends.sqlite_catalog.queries import get_locate_query
+from sage.database.sqlite_backends.sqlite_catalog.queries import get_locate_query, get_locate_many_query, get_extract_many_query
+from sage.database.term_cache import CatalogDictionary, TermCache
+from sage.database.term_dictionary import TermDictionary
 
 coloredlogs.install(level='INFO', fmt='%(asctime)s - %(levelname)s %(message)s')
 logger = logging.getLogger(__name__)
@@ -26,20 +28,41 @@ class CatalogSQliteConnector(SQliteConnector):
         Constructor arguments:
             - table_name `str`: Name of the SQL table containing RDF data.
             - database `str`: the name of the sqlite database file.
-            - fetch_size `int`: how many RDF triples are fetched per SQL query (default to 500)
+            - fetch_size `int`: maximum number of RDF triples fetched per SQL query (default to 500)
+            - initial_fetch_size `int`: how many RDF triples are fetched by the first SQL query of a scan (default to 8)
+            - term_cache_size `int`: maximum number of RDF terms kept in the cache of the catalog (default to 100000)
     """
 
-    def __init__(self, table_name, database, fetch_size=500):
-        super(CatalogSQliteConnector, self).__init__(table_name, database, fetch_size)
+    def __init__(self, table_name, database, fetch_size=500, initial_fetch_size=DEFAULT_INITIAL_FETCH_SIZE, term_cache_size=100000):
+        super(CatalogSQliteConnector, self).__init__(table_name, database, fetch_size, initial_fetch_size)
+        self._term_cache = TermCache(max_size=term_cache_size)
+        self._dictionary = CatalogDictionary(self._term_cache, self.__locate, self.__extract)
 
-    def __get_identifiers(self, cursor, terms):
-        identified_terms = list()
-        for term in terms:
-            result = cursor.execute(get_locate_query(), [term]).fetchone()
-            identified_terms.append(-1 if result is None else result[0])
-        return identified_terms
+    @property
+    def term_cache(self) -> TermCache:
+        """Get the cache of the catalog, shared by all the scans of this connector"""
+        return self._term_cache
 
-    def search(self, subject, predicate, obj, last_read=None, as_of=None):
+    @property
+    def term_dictionary(self) -> TermDictionary:
+        """Get the dictionary of the catalog"""
+        return self._dictionary
+
+    def __locate(self, terms):
+        connection = self._manager.get_connection()
+        return dict(connection.execute(get_locate_many_query(len(terms)), terms).fetchall())
+
+    def __extract(self, identifiers):
+        connection = self._manager.get_connection()
+        return dict(connection.execute(get_extract_many_query(len(identifiers)), identifiers).fetchall())
+
+    def __decode(self, triples):
+        return self._term_cache.decode_triples(triples, self.__extract)
+
+    def __encode(self, triples):
+        return [self._dictionary.encode_triple(triple) for triple in triples]
+
+    def search(self, subject, predicate, obj, last_read=None, as_of=None, filters=None):
         """
             Get an iterator over all RDF triples matching a triple pattern.
             Args:
@@ -48,15 +71,28 @@ class CatalogSQliteConnector(SQliteConnector):
                 - obj ``string`` - Object of the triple pattern
                 - last_read ``string=None`` ``optional`` -  OFFSET ID used to resume scan
                 - as_of ``datetime=None`` ``optional`` - Perform all reads against a consistent snapshot represented by a timestamp.
+                - filters ``list=None`` ``optional`` - Constraints on the RDF triples, which are ignored by this connector.
             Returns:
                 A tuple (`iterator`, `cardinality`), where `iterator` is a Python iterator over RDF triples matching the given triples pattern, and `cardinality` is the estimated cardinality of the triple pattern
         """
+        return self.__search(subject, predicate, obj, last_read, self.__decode)
+
+    def search_ids(self, subject, predicate, obj, last_read=None, as_of=None, filters=None):
+        """
+            Get an iterator over all RDF triples matching a triple pattern, where RDF triples are made of `EncodedTerm`.
+            The terms of the triple pattern can be SPARQL variables, RDF terms or `EncodedTerm`.
+            See `search` for the other arguments.
+        """
+        return self.__search(subject, predicate, obj, last_read, self.__encode)
+
+    def __search(self, subject, predicate, obj, last_read, decode):
+        """Get an iterator over all RDF triples matching a triple pattern, where RDF triples read as identifiers are converted using a decoding function"""
         # do warmup if necessary
         self.open()
 
-        subject = subject if (subject is not None) and (not subject.startswith('?')) else None
-        predicate = predicate if (predicate is not None) and (not predicate.startswith('?')) else None
-        obj = obj if (obj is not None) and (not obj.startswith('?')) else None
+        subject = subject if (subject is not None) and not (isinstance(subject, str) and subject.startswith('?')) else None
+        predicate = predicate if (predicate is not None) and not (isinstance(predicate, str) and predicate.startswith('?')) else None
+        obj = obj if (obj is not None) and not (isinstance(obj, str) and obj.startswith('?')) else None
         pattern = {'subject': subject, 'predicate': predicate, 'object': obj}
 
         # dedicated cursor used to scan this triple pattern
@@ -76,7 +112,8 @@ class CatalogSQliteConnector(SQliteConnector):
             t = (last_read["s"], last_read["p"], last_read["o"])
             start_query, start_params = get_resume_query(subject, predicate, obj, t, self._table_name)
 
-        start_params = self.__get_identifiers(cursor, start_params)
+        # unknown RDF terms are mapped to an identifier that matches no RDF triple
+        start_params = self._dictionary.get_identifiers(start_params)
 
         # create the iterator to yield the matching RDF triples
         iterator = SQliteIterator(
@@ -84,8 +121,15 @@ class CatalogSQliteConnector(SQliteConnector):
             start_query, start_params,
             self._table_name,
             pattern,
-            fetch_size=self._fetch_size)
-        card = self._estimate_cardinality(subject, predicate, obj) if iterator.has_next() else 0
+            decode,
+            fetch_size=self._fetch_size,
+            initial_fetch_size=self._initial_fetch_size)
+        if last_read is not None:
+            # a resumed scan starts with the RDF triple identified by last_read, so it cannot be empty,
+            # and its SQL query is not executed until the scan is read
+            card = self._estimate_cardinality(subject, predicate, obj)
+        else:
+            card = self._estimate_cardinality(subject, predicate, obj) if iterator.has_next() else 0
         return iterator, card
 
     def from_config(config: dict) -> SQliteConnector:
@@ -97,8 +141,10 @@ class CatalogSQliteConnector(SQliteConnector):
         table_name = config['name']
         database = config['database']
         fetch_size = config['fetch_size'] if 'fetch_size' in config else 500
+        initial_fetch_size = config['initial_fetch_size'] if 'initial_fetch_size' in config else DEFAULT_INITIAL_FETCH_SIZE
+        term_cache_size = config['term_cache_size'] if 'term_cache_size' in config else 100000
 
-        return CatalogSQliteConnector(table_name, database, fetch_size=fetch_size)
+        return CatalogSQliteConnector(table_name, database, fetch_size=fetch_size, initial_fetch_size=initial_fetch_size, term_cache_size=term_cache_size)
 
     def insert(self, subject: str, predicate: str, obj: str) -> None:
         """
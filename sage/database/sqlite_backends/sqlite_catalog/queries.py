@@ -6,11 +6,8 @@ def get_start_query(subj, pred, obj, table_name):
         and the parameters used to execute it.
     """
     kind = get_kind(subj, pred, obj)
-    query = f"""SELECT cs.value, cp.value, co.value
-                FROM {table_name}
-                INNER JOIN catalog AS cs ON subject = cs.id
-                INNER JOIN catalog AS cp ON predicate = cp.id
-                INNER JOIN catalog AS co ON object = co.id """
+    query = f"""SELECT subject, predicate, object
+                FROM {table_name} """
     if kind == 'spo':
         query += f"""WHERE subject = ?
                      AND predicate = ?
@@ -60,11 +57,8 @@ def get_resume_query(subj, pred, obj, last_read, table_name, symbol=">="):
     """
     last_s, last_p, last_o = last_read
     kind = get_kind(subj, pred, obj)
-    query = f"""SELECT cs.value, cp.value, co.value
-                FROM {table_name}
-                INNER JOIN catalog AS cs ON subject = cs.id
-                INNER JOIN catalog AS cp ON predicate = cp.id
-                INNER JOIN catalog AS co ON object = co.id """
+    query = f"""SELECT subject, predicate, object
+                FROM {table_name} """
     if kind == 'spo':
         return None, []
     elif kind == '???':
@@ -231,6 +225,16 @@ def get_locate_query():
     return "SELECT id FROM catalog WHERE value = ?"
 
 
+def get_locate_many_query(nb_terms):
+    """Build a SQL query to find the identifiers of a list of RDF terms"""
+    return f"SELECT value, id FROM catalog WHERE value IN ({','.join(['?'] * nb_terms)})"
+
+
+def get_extract_many_query(nb_ids):
+    """Build a SQL query to find the RDF terms of a list of identifiers"""
+    return f"SELECT id, value FROM catalog WHERE id IN ({','.join(['?'] * nb_ids)})"
+
+
 def get_insert_query(table_name):
     """Build a SQL query to insert a RDF triple into a SQlite dataset"""
     return f"INSERT INTO {table_name} (subject,predicate,object) VALUES (?,?,?) ON CONFLICT (subject,predicate,object) DO NOTHING"
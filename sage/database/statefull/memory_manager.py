@@ -0,0 +1,102 @@
+# memory_manager.py
+# Author: Thomas MINIER - MIT License 2017-2020
+from collections import OrderedDict
+from math import inf
+from threading import Lock
+from time import time
+from typing import Dict
+
+from sage.database.statefull.statefull_manager import StatefullManager
+
+
+class MemoryManager(StatefullManager):
+    """A MemoryManager stores saved plans in main memory, with a bounded size and a time-to-live.
+
+    Saved plans are evicted in least recently used order when the total size of the saved plans exceeds the budget,
+    and they expire when they have not been saved or retrieved for longer than the time-to-live, i.e., when their query has been abandoned.
+
+    Args:
+      * max_size: Maximum total size of the saved plans, in bytes.
+      * ttl: Time-to-live of a saved plan, in seconds.
+    """
+
+    def __init__(self, max_size: float = 256 * 1024 * 1024, ttl: float = 3600):
+        super(MemoryManager, self).__init__()
+        # saved plans, ordered by last access: (plan, timestamp of the last access)
+        self._plans = OrderedDict()
+        self._max_size = max_size
+        self._ttl = ttl
+        self._size = 0
+        # the manager can be shared by the threads of the gRPC server
+        self._lock = Lock()
+
+    def __len__(self) -> int:
+        return len(self._plans)
+
+    @property
+    def size(self) -> int:
+        """Get the total size of the saved plans, in bytes"""
+        return self._size
+
+    def _remove(self, plan_id: str) -> None:
+        plan, _ = self._plans.pop(plan_id)
+        self._size -= len(plan_id) + len(plan)
+
+    def _evict_expired(self) -> None:
+        """Evict all expired plans, which are the least recently used ones"""
+        limit = time() - self._ttl
+        while len(self._plans) > 0:
+            plan_id, (_, timestamp) = next(iter(self._plans.items()))
+            if timestamp >= limit:
+                break
+            self._remove(plan_id)
+
+    def get_plan(self, plan_id: str) -> str:
+        """Get a saved plan by ID.
+
+        Argument: ID of the saved plan to retrieve.
+
+        Returns: The saved plan corresponding to the input ID.
+
+        Throws: `KeyError` if the saved plan does not exist or has expired.
+        """
+        with self._lock:
+            self._evict_expired()
+            plan, _ = self._plans[plan_id]
+            self._plans[plan_id] = (plan, time())
+            self._plans.move_to_end(plan_id)
+            return plan
+
+    def save_plan(self, id: str, plan: str) -> None:
+        """Store a saved plan by ID.
+
+        Args:
+          * id: Unique ID associated with the saved plan.
+          * plan: Plan to save.
+        """
+        with self._lock:
+            if id in self._plans:
+                self._remove(id)
+            self._plans[id] = (plan, time())
+            self._size += len(id) + len(plan)
+            self._evict_expired()
+            # evict the least recently used plans, but always keep the plan just saved
+            while self._size > self._max_size and len(self._plans) > 1:
+                self._remove(next(iter(self._plans)))
+
+    def delete_plan(self, plan_id: str) -> None:
+        """Delete a saved plan by ID.
+
+        Argument: ID of the saved plan to delete.
+        """
+        with self._lock:
+            if plan_id in self._plans:
+                self._remove(plan_id)
+
+    def from_config(config: Dict[str, str]):
+        """Build a MemoryManager from a config dictionnary"""
+        max_size = config['max_size'] if 'max_size' in config else 256 * 1024 * 1024
+        ttl = 3600
+        if 'ttl' in config:
+            ttl = inf if config['ttl'] == 'inf' else config['ttl']
+        return MemoryManager(max_size=max_size, ttl=ttl)
@@ -0,0 +1,109 @@
+# sqlite_manager.py
+# Author: Thomas MINIER - MIT License 2017-2020
+import sqlite3
+from math import inf
+from os import getpid
+from threading import Lock
+from time import time
+from typing import Dict
+
+from sage.database.statefull.statefull_manager import StatefullManager
+
+
+class SQliteManager(StatefullManager):
+    """A SQliteManager stores saved plans in a SQlite database file, with a time-to-live.
+
+    As the saved plans are stored on disk, they are shared by all the processes of the server (e.g., Gunicorn workers),
+    so a query can be resumed by any of them. Plans that have not been saved or retrieved for longer than the time-to-live
+    are deleted, as their queries have been abandoned.
+
+    Args:
+      * database: Path to the SQlite database file.
+      * ttl: Time-to-live of a saved plan, in seconds.
+      * table_name: Name of the SQL table used to store saved plans.
+    """
+
+    def __init__(self, database: str, ttl: float = 3600, table_name: str = 'sage_saved_plans'):
+        super(SQliteManager, self).__init__()
+        self._database = database
+        self._ttl = ttl
+        self._table_name = table_name
+        self._connection = None
+        # ID of the process which opened the connection, as a connection cannot be used by a forked process
+        self._pid = None
+        self._last_purge = 0
+        # the manager can be shared by the threads of the gRPC server
+        self._lock = Lock()
+
+    def open(self) -> None:
+        """Open the connection to the SQlite database, and create the table of saved plans if needed"""
+        if self._connection is not None and self._pid == getpid():
+            return
+        self._connection = sqlite3.connect(self._database, timeout=30, isolation_level=None, check_same_thread=False)
+        self._pid = getpid()
+        # the Write-Ahead Log allows concurrent reads and writes by several processes
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute(f"CREATE TABLE IF NOT EXISTS {self._table_name} (id TEXT PRIMARY KEY, plan TEXT NOT NULL, timestamp REAL NOT NULL)")
+        self._connection.execute(f"CREATE INDEX IF NOT EXISTS {self._table_name}_timestamp ON {self._table_name} (timestamp)")
+
+    def close(self) -> None:
+        """Close the connection to the SQlite database"""
+        if self._connection is not None and self._pid == getpid():
+            self._connection.close()
+        self._connection = None
+
+    def _purge(self) -> None:
+        """Delete expired plans, at most once per minute"""
+        now = time()
+        if self._ttl != inf and now - self._last_purge >= 60:
+            self._connection.execute(f"DELETE FROM {self._table_name} WHERE timestamp < ?", (now - self._ttl,))
+            self._last_purge = now
+
+    def get_plan(self, plan_id: str) -> str:
+        """Get a saved plan by ID.
+
+        Argument: ID of the saved plan to retrieve.
+
+        Returns: The saved plan corresponding to the input ID.
+
+        Throws: `KeyError` if the saved plan does not exist or has expired.
+        """
+        with self._lock:
+            self.open()
+            now = time()
+            row = self._connection.execute(f"SELECT plan, timestamp FROM {self._table_name} WHERE id = ?", (plan_id,)).fetchone()
+            if row is None or row[1] < now - self._ttl:
+                raise KeyError(plan_id)
+            self._connection.execute(f"UPDATE {self._table_name} SET timestamp = ? WHERE id = ?", (now, plan_id))
+            return row[0]
+
+    def save_plan(self, id: str, plan: str) -> None:
+        """Store a saved plan by ID.
+
+        Args:
+          * id: Unique ID associated with the saved plan.
+          * plan: Plan to save.
+        """
+        with self._lock:
+            self.open()
+            self._connection.execute(f"INSERT OR REPLACE INTO {self._table_name} (id, plan, timestamp) VALUES (?, ?, ?)", (id, plan, time()))
+            self._purge()
+
+    def delete_plan(self, plan_id: str) -> None:
+        """Delete a saved plan by ID.
+
+        Argument: ID of the saved plan to delete.
+        """
+        with self._lock:
+            self.open()
+            self._connection.execute(f"DELETE FROM {self._table_name} WHERE id = ?", (plan_id,))
+
+    def from_config(config: Dict[str, str]):
+        """Build a SQliteManager from a config dictionnary"""
+        if 'database' not in config:
+            raise SyntaxError('The SQlite saved plans storage requires a "database" parameter, with the path to the database file')
+        ttl = 3600
+        if 'ttl' in config:
+            ttl = inf if config['ttl'] == 'inf' else config['ttl']
+        table_name = config['table_name'] if 'table_name' in config else 'sage_saved_plans'
+        return SQliteManager(config['database'], ttl=ttl, table_name=table_name)
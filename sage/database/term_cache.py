@@ -0,0 +1,161 @@
+# term_cache.py
+# Author: Thomas MINIER - MIT License 2017-2020
+from collections import OrderedDict
+from threading import Lock
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from sage.database.term_dictionary import EncodedTerm, TermDictionary
+
+# Maximum number of terms or identifiers given to a single call to a lookup function,
+# as SQlite limits the number of parameters of a SQL query
+LOOKUP_BATCH_SIZE = 500
+
+
+class TermCache(object):
+    """A bounded LRU cache of the dictionary (RDF term <-> integer identifier) of a catalog-based backend.
+
+    The cache is shared by all the queries executed by a database connector. Terms and identifiers that are not
+    in the cache are looked up in the database using a single SQL query per batch, so a RDF term is not located
+    once per triple pattern evaluated, and triples can be read as integer identifiers and decoded afterwards,
+    without joining the triples table with the catalog table.
+
+    Args:
+      * max_size: Maximum number of (term, identifier) pairs stored in the cache.
+    """
+
+    def __init__(self, max_size: int = 100000):
+        super(TermCache, self).__init__()
+        self._max_size = max_size
+        # RDF term -> identifier, ordered by last access
+        self._ids = OrderedDict()
+        # identifier -> RDF term, for the same entries
+        self._terms = dict()
+        self._hits = 0
+        self._misses = 0
+        # the cache can be shared by the threads of the gRPC server
+        self._lock = Lock()
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def _touch_term(self, term: str) -> int:
+        self._ids.move_to_end(term)
+        return self._ids[term]
+
+    def _touch_identifier(self, identifier: int) -> str:
+        term = self._terms[identifier]
+        self._ids.move_to_end(term)
+        return term
+
+    def _store(self, term: str, identifier: int) -> None:
+        self._ids[term] = identifier
+        self._terms[identifier] = term
+        self._ids.move_to_end(term)
+        # evict the least recently used entries
+        while len(self._ids) > self._max_size:
+            _, evicted = self._ids.popitem(last=False)
+            del self._terms[evicted]
+
+    def _lookup(self, keys: Iterable, cache: Dict, touch: Callable, fetch: Callable[[List], Dict], store: Callable) -> Dict:
+        """Look up keys in one direction of the cache, and fetch the missing ones using a lookup function"""
+        results = dict()
+        missing = list()
+        with self._lock:
+            for key in keys:
+                if key in results:
+                    continue
+                if key in cache:
+                    results[key] = touch(key)
+                    self._hits += 1
+                else:
+                    missing.append(key)
+                    results[key] = None
+            self._misses += len(missing)
+        for index in range(0, len(missing), LOOKUP_BATCH_SIZE):
+            fetched = fetch(missing[index:index + LOOKUP_BATCH_SIZE])
+            with self._lock:
+                for key, value in fetched.items():
+                    results[key] = value
+                    store(key, value)
+        return {key: value for key, value in results.items() if value is not None}
+
+    def get_ids(self, terms: Iterable[str], locate: Callable[[List[str]], Dict[str, int]]) -> Dict[str, int]:
+        """Get the identifiers of RDF terms.
+
+        Args:
+          * terms: RDF terms to look up.
+          * locate: Function which finds the identifiers of a list of RDF terms in the database, as a dict term -> identifier.
+
+        Returns: The identifiers of the RDF terms found in the database, as a dict term -> identifier.
+        """
+        return self._lookup(terms, self._ids, self._touch_term, locate, lambda term, identifier: self._store(term, identifier))
+
+    def get_terms(self, identifiers: Iterable[int], extract: Callable[[List[int]], Dict[int, str]]) -> Dict[int, str]:
+        """Get the RDF terms of identifiers.
+
+        Args:
+          * identifiers: Identifiers to look up.
+          * extract: Function which finds the RDF terms of a list of identifiers in the database, as a dict identifier -> term.
+
+        Returns: The RDF terms of the identifiers found in the database, as a dict identifier -> term.
+        """
+        return self._lookup(identifiers, self._terms, self._touch_identifier, extract, lambda identifier, term: self._store(term, identifier))
+
+    def stats(self) -> Dict[str, int]:
+        """Get statistics about the cache usage"""
+        with self._lock:
+            return {"size": len(self._ids), "hits": self._hits, "misses": self._misses}
+
+    def decode_triples(self, triples: List[Tuple[int, int, int]], extract: Callable[[List[int]], Dict[int, str]]) -> List[Tuple[str, str, str]]:
+        """Decode a batch of RDF triples read as identifiers into RDF triples made of RDF terms.
+
+        Args:
+          * triples: RDF triples made of identifiers.
+          * extract: Function which finds the RDF terms of a list of identifiers in the database, as a dict identifier -> term.
+
+        Returns: The decoded RDF triples.
+        """
+        terms = self.get_terms((identifier for triple in triples for identifier in triple), extract)
+        return [(terms[s], terms[p], terms[o]) for s, p, o in triples]
+
+
+class CatalogDictionary(TermDictionary):
+    """A CatalogDictionary gives access to the catalog table of a catalog-based backend, through its cache.
+
+    Identifiers of the catalog do not depend on the position of the RDF terms.
+
+    Args:
+      * cache: Cache of the catalog.
+      * locate: Function which finds the identifiers of a list of RDF terms in the database, as a dict term -> identifier.
+      * extract: Function which finds the RDF terms of a list of identifiers in the database, as a dict identifier -> term.
+    """
+
+    def __init__(self, cache: TermCache, locate: Callable[[List[str]], Dict[str, int]], extract: Callable[[List[int]], Dict[int, str]]):
+        super(CatalogDictionary, self).__init__()
+        self._cache = cache
+        self._locate = locate
+        self._extract = extract
+
+    def decode(self, identifier: int, position: int) -> str:
+        """Get the RDF term associated with an identifier"""
+        return self._cache.get_terms([identifier], self._extract)[identifier]
+
+    def decode_many(self, terms: List[EncodedTerm]) -> None:
+        """Decode several encoded RDF terms, using a single SQL query for the identifiers missing from the cache"""
+        values = self._cache.get_terms([term.identifier for term in terms], self._extract)
+        for term in terms:
+            term.set_value(values[term.identifier])
+
+    def locate(self, term: str, position: int) -> Optional[int]:
+        """Get the identifier of a RDF term, or None if the RDF term is not in the catalog"""
+        identifiers = self._cache.get_ids([term], self._locate)
+        return identifiers[term] if term in identifiers else None
+
+    def get_identifiers(self, terms: List) -> List[int]:
+        """Get the identifiers of RDF terms, encoded or not, using a single SQL query for the RDF terms missing from the cache.
+
+        Unknown RDF terms are mapped to an identifier that matches no RDF triple (-1).
+        """
+        encoded = {index: term.identifier for index, term in enumerate(terms) if isinstance(term, EncodedTerm) and term.dictionary is self}
+        identifiers = self._cache.get_ids([str(term) for index, term in enumerate(terms) if index not in encoded], self._locate)
+        return [encoded[index] if index in encoded else identifiers.get(str(term), -1) for index, term in enumerate(terms)]
@@ -0,0 +1,199 @@
+# term_dictionary.py
+# Author: Thomas MINIER - MIT License 2017-2020
+from typing import Any, Dict, Iterable, List, Optional
+
+# Positions of a RDF term in a RDF triple
+SUBJECT = 0
+PREDICATE = 1
+OBJECT = 2
+
+
+class TermDictionary(object):
+    """A TermDictionary maps the RDF terms stored in a database to the integer identifiers used internally by the database.
+
+    Databases with such a dictionary (HDT files, catalog-based SQL schemas) can evaluate triple patterns
+    on identifiers, so the query engine moves `EncodedTerm` instead of RDF terms through a pipeline of iterators,
+    and only decodes them when the solution mappings are sent to the client (late materialization).
+
+    Identifiers may depend on the position of the RDF term in a RDF triple, like in HDT.
+    """
+
+    def decode(self, identifier: int, position: int) -> str:
+        """Get the RDF term associated with an identifier.
+
+        Args:
+          * identifier: Identifier of the RDF term.
+          * position: Position of the RDF term (`SUBJECT`, `PREDICATE` or `OBJECT`).
+
+        Returns: The RDF term associated with the identifier.
+        """
+        raise NotImplementedError()
+
+    def decode_many(self, terms: List['EncodedTerm']) -> None:
+        """Decode several encoded RDF terms at once.
+
+        If not overrided, this method decodes each term using `decode`.
+        Dictionaries that can decode several identifiers using a single request should override it,
+        and store the decoded RDF terms using `EncodedTerm#set_value`.
+
+        Argument: Encoded RDF terms to decode, which all belong to this dictionary.
+        """
+        for term in terms:
+            term.set_value(self.decode(term.identifier, term.position))
+
+    def locate(self, term: str, position: int) -> Optional[int]:
+        """Get the identifier of a RDF term.
+
+        Args:
+          * term: RDF term to look up.
+          * position: Position of the RDF term (`SUBJECT`, `PREDICATE` or `OBJECT`).
+
+        Returns: The identifier of the RDF term, or None if the RDF term does not appear at this position in the database.
+        """
+        raise NotImplementedError()
+
+    def key(self, identifier: int, position: int) -> int:
+        """Get a key which identifies a RDF term whatever its position: two encoded RDF terms are equal iff their keys are equal.
+
+        If not overrided, this method returns the identifier, i.e., the dictionary does not depend on positions.
+        """
+        return identifier
+
+    def key_of(self, term: Any) -> Any:
+        """Get the key of a RDF term, encoded or not, so it can be compared with the `EncodedTerm` of this dictionary in a hash table.
+
+        Argument: A RDF term or an `EncodedTerm`.
+
+        Returns: The key of the RDF term in this dictionary, or the RDF term itself if it does not appear in the database.
+        """
+        if isinstance(term, EncodedTerm) and term.dictionary is self:
+            return term.key
+        term = str(term)
+        for position in [SUBJECT, OBJECT, PREDICATE]:
+            identifier = self.locate(term, position)
+            if identifier is not None:
+                return self.key(identifier, position)
+        return term
+
+    def _convert(self, identifier: int, source: int, target: int) -> Optional[int]:
+        """Convert the identifier of a RDF term found at a given position into its identifier at another position"""
+        return identifier
+
+    def convert(self, term: Any, position: int) -> Optional[int]:
+        """Get the identifier of a RDF term, encoded or not, at a given position.
+
+        Args:
+          * term: A RDF term or an `EncodedTerm`.
+          * position: Position of the RDF term (`SUBJECT`, `PREDICATE` or `OBJECT`).
+
+        Returns: The identifier of the RDF term, or None if the RDF term does not appear at this position in the database.
+        """
+        if isinstance(term, EncodedTerm) and term.dictionary is self:
+            if term.position == position:
+                return term.identifier
+            return self._convert(term.identifier, term.position, position)
+        return self.locate(str(term), position)
+
+    def encode_triple(self, triple: Iterable[int]) -> tuple:
+        """Build a RDF triple of `EncodedTerm` from a RDF triple of identifiers"""
+        s, p, o = triple
+        return (EncodedTerm(self, s, SUBJECT), EncodedTerm(self, p, PREDICATE), EncodedTerm(self, o, OBJECT))
+
+
+class EncodedTerm(object):
+    """A RDF term represented by its identifier in a `TermDictionary`.
+
+    The RDF term is only decoded when its value is required, e.g., to evaluate a FILTER or to send query results.
+    Two encoded RDF terms from the same dictionary are compared using their keys (see `TermDictionary#key`),
+    and an encoded RDF term is equal to the RDF term it encodes. Its hash is the hash of its key, so it is never decoded
+    to be hashed: hash tables must not mix the encoded RDF terms of a dictionary with RDF terms, or with the encoded RDF terms
+    of another dictionary. Such terms are converted at the boundary using `TermDictionary#key_of`.
+
+    Args:
+      * dictionary: Dictionary of the RDF term.
+      * identifier: Identifier of the RDF term.
+      * position: Position of the RDF term (`SUBJECT`, `PREDICATE` or `OBJECT`) in the RDF triple where it was read.
+    """
+
+    __slots__ = ('dictionary', 'identifier', 'position', '_key', '_value')
+
+    def __init__(self, dictionary: TermDictionary, identifier: int, position: int):
+        self.dictionary = dictionary
+        self.identifier = identifier
+        self.position = position
+        self._key = None
+        self._value = None
+
+    @property
+    def key(self) -> int:
+        if self._key is None:
+            self._key = self.dictionary.key(self.identifier, self.position)
+        return self._key
+
+    @property
+    def value(self) -> str:
+        """Get the RDF term encoded"""
+        if self._value is None:
+            self._value = self.dictionary.decode(self.identifier, self.position)
+        return self._value
+
+    def set_value(self, value: str) -> None:
+        self._value = value
+
+    def __str__(self) -> str:
+        return self.value
+
+    def __repr__(self) -> str:
+        return f"<EncodedTerm {self.identifier} at position {self.position}>"
+
+    def __eq__(self, other: Any) -> bool:
+        if isinstance(other, EncodedTerm):
+            if other.dictionary is self.dictionary:
+                return self.key == other.key
+            return self.value == other.value
+        elif isinstance(other, str):
+            return self.value == other
+        return NotImplemented
+
+    def __hash__(self) -> int:
+        return hash(self.key)
+
+
+def decode_terms(terms: Iterable[Any]) -> None:
+    """Decode several RDF terms at once, so their values are available without further requests to the database.
+
+    The RDF terms of each dictionary are decoded using a single call to `TermDictionary#decode_many`.
+
+    Argument: RDF terms, encoded or not.
+    """
+    pending = dict()
+    for term in terms:
+        if type(term) is EncodedTerm and term._value is None:
+            if term.dictionary not in pending:
+                pending[term.dictionary] = list()
+            pending[term.dictionary].append(term)
+    for dictionary, encoded_terms in pending.items():
+        dictionary.decode_many(encoded_terms)
+
+
+def decode_term(term: Any) -> Any:
+    """Get the RDF term encoded by an `EncodedTerm`, or return the input value if it is not encoded"""
+    return term.value if type(term) is EncodedTerm else term
+
+
+def decode_mappings(batch: List[Dict[str, Any]]) -> List[Dict[str, str]]:
+    """Decode the RDF terms of a batch of solution mappings.
+
+    The RDF terms of each dictionary are decoded at once, using `TermDictionary#decode_many`.
+
+    Solution mappings that can transform their values (see `SolutionMappings#map_values`) keep their representation,
+    other solution mappings are decoded into dicts.
+
+    Argument: A list of solution mappings, whose values may be `EncodedTerm`.
+
+    Returns: The solution mappings with RDF terms as values.
+    """
+    if all(type(value) is not EncodedTerm for mappings in batch for value in mappings.values()):
+        return batch
+    decode_terms(value for mappings in batch for value in mappings.values())
+    return [mappings.map_values(decode_term) if hasattr(mappings, 'map_values') else {variable: decode_term(value) for variable, value in mappings.items()} for mappings in batch]
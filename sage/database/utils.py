@@ -1,6 +1,9 @@
 # utils.py
 # Author: Thomas MINIER - MIT License 2017-2020
-from typing import Optional
+import json
+from typing import Callable, List, Optional, Tuple
+
+from sage.database.db_iterator import DBIterator, ListIterator
 
 
 def is_var(term) -> bool:
@@ -10,7 +13,8 @@ def is_var(term) -> bool:
 
     Returns: True if the RDF term is a SPARQL variable, False otherwise.
     """
-    return term is None or term.startswith("?")
+    # RDF terms encoded by the database are never SPARQL variables
+    return term is None or (isinstance(term, str) and term.startswith("?"))
 
 
 def get_kind(subj, pred, obj):
@@ -48,3 +52,135 @@ def get_kind(subj, pred, obj):
         return '??o'
     else:
         return 'spo'
+
+
+def escape_like(value: str) -> str:
+    """Escape the special characters of a SQL LIKE pattern, using backslashes."""
+    return value.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+
+
+def add_sql_filters(query: str, params: Optional[List[str]], filters: Optional[List[Tuple[str, str, str]]], placeholder: str = '?', hashed_objects: bool = False) -> Tuple[str, List[str]]:
+    """Add the constraints of a triple pattern scan to the SQL query used to evaluate it.
+
+    Conditions are inserted before the ORDER BY clause of the query, and their parameters are appended to the query parameters.
+
+    Args:
+      * query: SQL query that scans for RDF triples.
+      * params: Parameters of the SQL query.
+      * filters: Constraints (`position`, `operator`, `value`) on the RDF triples, as given to `DatabaseConnector.search`.
+      * placeholder: Placeholder used for parameters in SQL queries.
+      * hashed_objects: True if RDF objects are indexed using their md5 hash, False otherwise.
+
+    Returns:
+      A tuple with the SQL query and its parameters.
+    """
+    params = list(params) if params is not None else list()
+    if filters is None or len(filters) == 0:
+        return query, params
+    conditions = list()
+    for position, operator, value in filters:
+        if operator == '=':
+            if position == 'object' and hashed_objects:
+                conditions.append(f"md5({position}) = md5({placeholder})")
+            else:
+                conditions.append(f"{position} = {placeholder}")
+            params.append(value)
+        elif operator == 'prefix':
+            conditions.append(f"{position} LIKE {placeholder} ESCAPE '\\'")
+            params.append(escape_like(value) + '%')
+        elif operator == 'lang':
+            conditions.append(f"{position} LIKE {placeholder} ESCAPE '\\'")
+            params.append('%"@' + escape_like(value))
+    if len(conditions) == 0:
+        return query, params
+    index = query.rfind('ORDER BY')
+    index = index if index >= 0 else len(query)
+    keyword = 'AND' if 'WHERE' in query[:index] else 'WHERE'
+    query = f"{query[:index]} {keyword} {' AND '.join(conditions)} {query[index:]}"
+    return query, params
+
+
+def search_many_by_kind(patterns: List[Tuple[str, str, str]], search: Callable, execute: Callable, limit: Optional[int] = None, max_probes: Optional[int] = None, fetch_size: int = 500) -> List[Optional[Tuple[DBIterator, int]]]:
+    """Evaluate several triple patterns using one SQL query per kind of triple pattern, as done by `DatabaseConnector#search_many`.
+
+    The SQL query of a kind selects the rows matching the terms bound in all the triple patterns of this kind, sorted
+    in index order, so the rows of the same bound terms are contiguous. Rows are fetched by batches of `fetch_size`,
+    and at most `limit` rows are read: a triple pattern whose rows were not all read is not evaluated.
+
+    Args:
+      * patterns: List of triples patterns (`subject`, `predicate`, `object`) to evaluate.
+      * search: Function (`subject`, `predicate`, `object`) -> (`iterator`, `cardinality`) used to evaluate the triple patterns without bound terms.
+      * execute: Function (`kind`, `bound_terms`) -> `cursor` which executes the SQL query of a kind for a list of distinct tuples of bound terms, in (subject, predicate, object) order.
+      * limit: (Optional) Maximum number of rows read.
+      * max_probes: (Optional) Maximum number of tuples of bound terms per SQL query.
+      * fetch_size: Number of rows fetched per batch.
+
+    Returns:
+      A list of tuples (`iterator`, `cardinality`), one per triple pattern, in the same order as the input triple patterns,
+      where the triple patterns which were not evaluated, due to the limit, are `None`.
+    """
+    results = [None] * len(patterns)
+    # group triple patterns by kind
+    groups = dict()
+    for index, (subject, predicate, obj) in enumerate(patterns):
+        kind = get_kind(subject, predicate, obj)
+        if kind == '???':
+            results[index] = search(subject, predicate, obj)
+        else:
+            if kind not in groups:
+                groups[kind] = list()
+            groups[kind].append(index)
+
+    # rows of each (kind, bound terms), and the (kind, bound terms) whose rows have all been read
+    rows = dict()
+    complete = set()
+    nb_rows = 0
+    stopped = False
+    for kind, indexes in groups.items():
+        positions = [position for position, term in enumerate(kind) if term != '?']
+        bound_terms = list(dict.fromkeys([tuple(patterns[index][position] for position in positions) for index in indexes]))
+        chunk_size = max(1, max_probes // len(positions)) if max_probes is not None else len(bound_terms)
+        for start in range(0, len(bound_terms), chunk_size):
+            if stopped:
+                break
+            chunk = bound_terms[start:start + chunk_size]
+            cursor = execute(kind, chunk)
+            current = None
+            try:
+                batch = cursor.fetchmany(fetch_size)
+                while len(batch) > 0 and not stopped:
+                    for triple in batch:
+                        key = (kind, tuple(triple[position] for position in positions))
+                        # rows are sorted by bound terms, so the rows of the previous bound terms have all been read
+                        if key != current:
+                            complete.add(current)
+                            current = key
+                        if limit is not None and nb_rows >= limit:
+                            stopped = True
+                            break
+                        if key not in rows:
+                            rows[key] = list()
+                        rows[key].append((json.dumps({'s': triple[0], 'p': triple[1], 'o': triple[2]}, separators=(',', ':')), tuple(triple)))
+                        nb_rows += 1
+                    if not stopped:
+                        batch = cursor.fetchmany(fetch_size)
+            finally:
+                cursor.close()
+            if not stopped:
+                # all rows of the chunk have been read, including the bound terms without matching rows
+                complete.update((kind, terms) for terms in chunk)
+
+    for kind, indexes in groups.items():
+        positions = [position for position, term in enumerate(kind) if term != '?']
+        for index in indexes:
+            key = (kind, tuple(patterns[index][position] for position in positions))
+            if key in complete:
+                subject, predicate, obj = patterns[index]
+                pattern = {
+                    'subject': None if is_var(subject) else subject,
+                    'predicate': None if is_var(predicate) else predicate,
+                    'object': None if is_var(obj) else obj
+                }
+                triples = rows[key] if key in rows else list()
+                results[index] = (ListIterator(pattern, triples), len(triples))
+    return results
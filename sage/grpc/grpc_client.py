@@ -5,7 +5,16 @@ from typing import Dict, Iterable, Optional
 import grpc
 
 from sage.grpc import service_pb2_grpc
-from sage.grpc.service_pb2 import SageQuery
+from sage.grpc.service_pb2 import BindingSet, SageQuery
+
+
+def read_bindings(bindings: Iterable[BindingSet]) -> Iterable[Dict[str, str]]:
+  """Convert a set of protobuf-based bindings into solution mappings in dict format"""
+  for binding in bindings:
+    results = dict()
+    for mu in binding.values:
+      results[mu.variable] = mu.value
+    yield results
 
 
 class SageClient(object):
@@ -71,8 +80,35 @@ class SageClient(object):
       next_link = response.next_link
       grpc_query = SageQuery(query = sparql_query, default_graph_uri = default_graph_uri, next_link = next_link)
       # yield solution mappings in dict format
-      for binding in response.bindings:
-        results = dict()
-        for mu in binding.values:
-          results[mu.variable] = mu.value
-        yield results
+      yield from read_bindings(response.bindings)
+
+  def query_stream(self, sparql_query: str, default_graph_uri: str, auto_continue: bool = True) -> Iterable[Dict[str, str]]:
+    """
+      Execute a SPARQL query using a SaGe gRPC-server, and receive its solutions as soon as they are produced by the server.
+
+      With auto-continuation, the server resumes the query by itself after each time quantum, so a single call
+      streams all solutions of the query. Otherwise, the client resumes the query using a next link after each time quantum.
+
+      Args:
+        * sparql_query: SPARQL query to execute.
+        * default_graph_uri: URI of the default RDF Graph to query.
+        * auto_continue: True if the server should resume the query until it completes, False otherwise.
+
+      Yields:
+        Set of solution mappings
+
+      Example:
+        >>> sparql_query = "SELECT * WHERE { ?s ?p ?o }"
+        >>> for bindings in client.query_stream(sparql_query, "http://example.org#DBpedia")
+        >>>   print(bindings)
+    """
+    client = service_pb2_grpc.SageSPARQLStub(self._channel)
+    grpc_query = SageQuery(query = sparql_query, default_graph_uri = default_graph_uri, auto_continue = auto_continue)
+    is_done = False
+    while not is_done:
+      # the stream ends with a response that holds the state of the query
+      for response in client.QueryStream(grpc_query):
+        yield from read_bindings(response.bindings)
+        is_done = response.is_done
+        next_link = response.next_link
+      grpc_query = SageQuery(query = sparql_query, default_graph_uri = default_graph_uri, next_link = next_link, auto_continue = auto_continue)
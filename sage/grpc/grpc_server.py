@@ -1,122 +1,152 @@
 # grpc_server.py
 # Author: Thomas MINIER - MIT License 2017-2020
 import logging
-from asyncio import run
-from concurrent.futures import ThreadPoolExecutor
 from time import time
-from typing import Dict, List, Iterable
-from uuid import uuid4
+from typing import Dict, List, Iterable, Optional, Tuple
 
 import grpc
 
 from sage.database.core.dataset import Dataset
-from sage.database.core.graph import Graph
 from sage.database.core.yaml_config import load_config
 from sage.grpc import service_pb2_grpc
 from sage.grpc.service_pb2 import Binding, BindingSet, SageQuery, SageResponse
-from sage.http_server.utils import decode_saved_plan, encode_saved_plan
-from sage.query_engine.iterators.loader import load
-from sage.query_engine.optimizer.query_parser import parse_query
-from sage.query_engine.sage_engine import SageEngine
+from sage.http_server.executor import QuantumResults, QueryProcessPool, execute_quantum, get_saved_plan, save_plan
+from sage.http_server.query_scheduler import SchedulerSaturated
+from sage.http_server.utils import InvalidSavedPlan
+from sage.query_engine.iterators.mappings import to_dict
+from sage.query_engine.sage_engine import ResultsCallback
 
 
 def create_bindings(bindings: List[Dict[str, str]]) -> Iterable[BindingSet]:
-  """Create an iterator that converts a set of dict-based bindings to a set of protobuf-based bindings.
+  """Create an iterator that converts a set of solution bindings to a set of protobuf-based bindings.
 
-  Argument: List of solutions bindings, encoded as dictionaries.
+  Argument: List of solutions bindings, encoded as dictionaries or `SolutionMappings`.
 
   Yields: Set of solutions bindings, encoded in a Protobuf format.
   """
   for binding in bindings:
     binding_set = BindingSet()
-    for variable, value in binding.items():
+    for variable, value in to_dict(binding).items():
       binding_set.values.append(Binding(variable = variable, value = value))
     yield binding_set
 
 
 class SageQueryService(service_pb2_grpc.SageSPARQLServicer):
-  """A SageQueryService implements a gRPC service that evaluates SPARQL queries using Web preemption
+  """A SageQueryService implements a gRPC service that evaluates SPARQL queries using Web preemption.
 
-  Argument: RDF dataset hosted by the gRPC server.
+  Queries are executed by the event loop of the gRPC server, or by a pool of worker processes to offload CPU-bound work.
+  The `QueryStream` RPC streams solutions as they are produced during a time quantum, and can resume the query
+  by itself after each quantum (auto-continuation), so the client does not need to send the next links.
+  When the dataset has a scheduler (see `sage.http_server.query_scheduler.QueryScheduler`), each time quantum waits for its turn.
+
+  Args:
+    * dataset: RDF dataset hosted by the gRPC server.
+    * pool: (Optional) Pool of worker processes used to execute the queries.
   """
 
-  def __init__(self, dataset: Dataset):
+  def __init__(self, dataset: Dataset, pool: Optional[QueryProcessPool] = None):
     super(SageQueryService).__init__()
     self._dataset = dataset
-    self._engine = SageEngine()
+    self._pool = pool
+
+  async def _resume(self, request: SageQuery, context: grpc.aio.ServicerContext) -> Tuple[Optional[str], Optional[str]]:
+    """Check the RDF graph of a query, and get the saved plan to resume its execution, if any.
+
+    Returns: A tuple (`next_link`, `saved_plan`), where both are `None` if the query execution starts from the beginning.
+    """
+    graph_name = request.default_graph_uri
+    next_link = request.next_link if len(request.next_link) > 0 else None
+    if not self._dataset.has_graph(graph_name):
+      await context.abort(grpc.StatusCode.NOT_FOUND, f"RDF Graph {graph_name} not found on the server.")
+
+    # decode next_link: saved plans are only stored by the server process
+    saved_plan = None
+    if next_link is not None:
+      try:
+        saved_plan = get_saved_plan(next_link, self._dataset)
+      except KeyError:
+        await context.abort(grpc.StatusCode.NOT_FOUND, f"The saved plan {next_link} does not exist or has expired. Please restart the execution of the query.")
+    return next_link, saved_plan
+
+  async def _execute(self, request: SageQuery, saved_plan: Optional[str], context: grpc.aio.ServicerContext, on_results: Optional[ResultsCallback] = None) -> QuantumResults:
+    """Execute a query during a time quantum, once it has been scheduled by the scheduler of the dataset, if any.
+
+    The RPC is aborted with the RESOURCE_EXHAUSTED status, and a `retry-after` trailing metadata, if the scheduler cannot accept another time quantum.
+    """
+    scheduler = self._dataset.scheduler
+    if scheduler is None:
+      return await self._execute_quantum(request, saved_plan, context, on_results=on_results)
+    try:
+      await scheduler.acquire(context.peer(), request.default_graph_uri)
+    except SchedulerSaturated as err:
+      await context.abort(grpc.StatusCode.RESOURCE_EXHAUSTED, str(err), trailing_metadata=(("retry-after", str(err.retry_after)),))
+    start = time()
+    try:
+      return await self._execute_quantum(request, saved_plan, context, on_results=on_results)
+    finally:
+      scheduler.release(request.default_graph_uri, time() - start)
 
-  def Query(self, request: SageQuery, context: grpc.ServicerContext) -> SageResponse:
-    graph: Graph = None
+  async def _execute_quantum(self, request: SageQuery, saved_plan: Optional[str], context: grpc.aio.ServicerContext, on_results: Optional[ResultsCallback] = None) -> QuantumResults:
+    """Execute a query during a time quantum, and abort the RPC if query execution fails (see `execute_quantum`)"""
     try:
-      query = request.query
-      graph_name = request.default_graph_uri
-      next_link = request.next_link if len(request.next_link) > 0 else None
-      if not self._dataset.has_graph(graph_name):
-        context.abort(code=404, details=f"RDF Graph {graph_name} not found on the server.")
-      graph = self._dataset.get_graph(graph_name)
-
-      # query execution context
-      query_exec_context = dict()
-      query_exec_context['quantum'] = graph.quota
-      query_exec_context['max_results'] = graph.max_results
-
-      # decode next_link or build query execution plan
-      cardinalities = dict()
-      start = time()
-      if next_link is not None:
-        if self._dataset.is_stateless:
-            saved_plan = next_link
-        else:
-            saved_plan = self._dataset.statefull_manager.get_plan(next_link)
-        plan = load(decode_saved_plan(saved_plan), self._dataset, query_exec_context)
+      if self._pool is not None:
+        results = await self._pool.execute(request.query, request.default_graph_uri, saved_plan)
+        # worker processes cannot stream their results, so they are sent once the quantum is over
+        if on_results is not None and len(results[0]) > 0:
+          await on_results(results[0])
       else:
-        plan, cardinalities = parse_query(query, self._dataset, graph_name, query_exec_context)
-      loading_time = (time() - start) * 1000
+        results = await execute_quantum(request.query, request.default_graph_uri, saved_plan, self._dataset, on_results=on_results)
+    except InvalidSavedPlan as err:
+      await context.abort(grpc.StatusCode.INVALID_ARGUMENT, str(err))
+    except Exception as err:
+      await context.abort(grpc.StatusCode.INTERNAL, f"A server-side error has occurred: {str(err)}")
+    abort_reason = results[3]
+    if abort_reason is not None:
+      await context.abort(grpc.StatusCode.ABORTED, f"The SPARQL query has been aborted for the following reason: '{abort_reason}'")
+    return results
 
-      # execute query
-      engine = SageEngine()
-      bindings, saved_plan, is_done, abort_reason = run(engine.execute(plan, query_exec_context))
+  async def Query(self, request: SageQuery, context: grpc.aio.ServicerContext) -> SageResponse:
+    next_link, saved_plan = await self._resume(request, context)
+
+    # execute query during a time quantum
+    bindings, saved_plan, is_done, _, _ = await self._execute(request, saved_plan, context)
+
+    # create response
+    next_page = save_plan(saved_plan, is_done, next_link, self._dataset)
+    response = SageResponse(is_done = is_done, next_link = next_page)
+    response.bindings.extend(create_bindings(bindings))
+    return response
+
+  async def QueryStream(self, request: SageQuery, context: grpc.aio.ServicerContext) -> None:
+    next_link, saved_plan = await self._resume(request, context)
+
+    async def send_bindings(bindings: List[Dict[str, str]]) -> None:
+      response = SageResponse()
+      response.bindings.extend(create_bindings(bindings))
+      await context.write(response)
+
+    # stream each batch of solutions as soon as the engine produces it
+    is_done = False
+    while not is_done:
+      _, saved_plan, is_done, _, _ = await self._execute(request, saved_plan, context, on_results=send_bindings)
+      # without auto-continuation, the client resumes the query using the next link
+      if not request.auto_continue:
+        break
+
+    # end the stream with the state of the query
+    next_page = save_plan(saved_plan, is_done, next_link, self._dataset)
+    await context.write(SageResponse(is_done = is_done, next_link = next_page))
 
-      # commit or abort (if necessary)
-      if abort_reason is not None:
-        graph.abort()
-        context.abort(code=500, details=f"The SPARQL query has been aborted for the following reason: '{abort_reason}'")
-      else:
-        graph.commit()
-
-      # encode saved plan if query execution is not done yet and there was no abort
-      start = time()
-      next_page = None
-      if (not is_done) and abort_reason is None:
-        next_page = encode_saved_plan(saved_plan)
-        if not self._dataset.is_stateless:
-          # generate the plan ID if this is the first time we execute this plan
-          plan_id = next_link if next_link is not None else str(uuid4())
-          self._dataset.statefull_manager.save_plan(plan_id, next_page)
-          next_page = plan_id
-      elif is_done and (not self._dataset.is_stateless) and next_link is not None:
-        # delete the saved plan, as it will not be reloaded anymore
-        self._dataset.statefull_manager.delete_plan(next_link)
-      exportTime = (time() - start) * 1000
-
-      # create response
-      response = SageResponse(is_done = is_done, next_link = next_page)
-      for binding in create_bindings(bindings):
-        response.bindings.append(binding)
-      return response
-    except Exception as err:
-      if graph is not None:
-        graph.abort()
-      context.abort(code=500, details=f"A server-side error has occurred: {str(err)}")
 
+def get_server(config_file: str, port=8000, workers: Optional[int] = None) -> grpc.aio.Server:
+  """Create a SaGe SPARQL query server powered by gRPC (using its asyncio API).
 
-def get_server(config_file: str, port=8000, workers=10) -> grpc.Server:
-  """Create a SaGe SPARQL query server powered by gRPC.
+  The server must be started and stopped from a running event loop.
 
   Args:
     * config_file: Path to the SaGe configuration file, in YAML format.
     * port: Host port to run the gRPC server.
-    * workers: Number of thread workers used by the gRPC server.
+    * workers: Number of worker processes used to execute queries, or 0 to execute them in the event loop of the server. Defaults to the `workers` option of the configuration file.
 
   Returns:
     A SaGe gRPC server built from the input configuration file.
@@ -124,9 +154,11 @@ def get_server(config_file: str, port=8000, workers=10) -> grpc.Server:
   logging.basicConfig()
 
   dataset = load_config(config_file)
-  service = SageQueryService(dataset)
+  nb_workers = workers if workers is not None else dataset.workers
+  pool = QueryProcessPool(config_file, nb_workers) if nb_workers > 0 else None
+  service = SageQueryService(dataset, pool=pool)
 
-  server = grpc.server(ThreadPoolExecutor(max_workers=10))
+  server = grpc.aio.server()
   service_pb2_grpc.add_SageSPARQLServicer_to_server(service, server)
 
   server.add_insecure_port(f'[::]:{port}')
@@ -20,7 +20,7 @@ DESCRIPTOR = _descriptor.FileDescriptor(
   package='sage',
   syntax='proto3',
   serialized_options=_b('\n\026fr.univnantes.gdd.sageB\nSageSPARQLP\001\242\002\003HLW'),
-  serialized_pb=_b('\n\rservice.proto\x12\x04sage\"H\n\tSageQuery\x12\r\n\x05query\x18\x01 \x01(\t\x12\x19\n\x11\x64\x65\x66\x61ult_graph_uri\x18\x02 \x01(\t\x12\x11\n\tnext_link\x18\x03 \x01(\t\"*\n\x07\x42inding\x12\x10\n\x08variable\x18\x01 \x01(\t\x12\r\n\x05value\x18\x02 \x01(\t\"+\n\nBindingSet\x12\x1d\n\x06values\x18\x01 \x03(\x0b\x32\r.sage.Binding\"V\n\x0cSageResponse\x12\"\n\x08\x62indings\x18\x01 \x03(\x0b\x32\x10.sage.BindingSet\x12\x0f\n\x07is_done\x18\x02 \x01(\x08\x12\x11\n\tnext_link\x18\x03 \x01(\t2<\n\nSageSPARQL\x12.\n\x05Query\x12\x0f.sage.SageQuery\x1a\x12.sage.SageResponse\"\x00\x42,\n\x16\x66r.univnantes.gdd.sageB\nSageSPARQLP\x01\xa2\x02\x03HLWb\x06proto3')
+  serialized_pb=_b('\n\rservice.proto\x12\x04sage\"_\n\tSageQuery\x12\r\n\x05query\x18\x01 \x01(\t\x12\x19\n\x11\x64\x65\x66\x61ult_graph_uri\x18\x02 \x01(\t\x12\x11\n\tnext_link\x18\x03 \x01(\t\x12\x15\n\rauto_continue\x18\x04 \x01(\x08\"*\n\x07\x42inding\x12\x10\n\x08variable\x18\x01 \x01(\t\x12\r\n\x05value\x18\x02 \x01(\t\"+\n\nBindingSet\x12\x1d\n\x06values\x18\x01 \x03(\x0b\x32\r.sage.Binding\"V\n\x0cSageResponse\x12\"\n\x08\x62indings\x18\x01 \x03(\x0b\x32\x10.sage.BindingSet\x12\x0f\n\x07is_done\x18\x02 \x01(\x08\x12\x11\n\tnext_link\x18\x03 \x01(\t2t\n\nSageSPARQL\x12.\n\x05Query\x12\x0f.sage.SageQuery\x1a\x12.sage.SageResponse\"\x00\x12\x36\n\x0bQueryStream\x12\x0f.sage.SageQuery\x1a\x12.sage.SageResponse\"\x00\x30\x01\x42,\n\x16\x66r.univnantes.gdd.sageB\nSageSPARQLP\x01\xa2\x02\x03HLWb\x06proto3')
 )
 
 
@@ -54,6 +54,13 @@ _SAGEQUERY = _descriptor.Descriptor(
       message_type=None, enum_type=None, containing_type=None,
       is_extension=False, extension_scope=None,
       serialized_options=None, file=DESCRIPTOR),
+    _descriptor.FieldDescriptor(
+      name='auto_continue', full_name='sage.SageQuery.auto_continue', index=3,
+      number=4, type=8, cpp_type=7, label=1,
+      has_default_value=False, default_value=False,
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR),
   ],
   extensions=[
   ],
@@ -67,7 +74,7 @@ _SAGEQUERY = _descriptor.Descriptor(
   oneofs=[
   ],
   serialized_start=23,
-  serialized_end=95,
+  serialized_end=118,
 )
 
 
@@ -104,8 +111,8 @@ _BINDING = _descriptor.Descriptor(
   extension_ranges=[],
   oneofs=[
   ],
-  serialized_start=97,
-  serialized_end=139,
+  serialized_start=120,
+  serialized_end=162,
 )
 
 
@@ -135,8 +142,8 @@ _BINDINGSET = _descriptor.Descriptor(
   extension_ranges=[],
   oneofs=[
   ],
-  serialized_start=141,
-  serialized_end=184,
+  serialized_start=164,
+  serialized_end=207,
 )
 
 
@@ -180,8 +187,8 @@ _SAGERESPONSE = _descriptor.Descriptor(
   extension_ranges=[],
   oneofs=[
   ],
-  serialized_start=186,
-  serialized_end=272,
+  serialized_start=209,
+  serialized_end=295,
 )
 
 _BINDINGSET.fields_by_name['values'].message_type = _BINDING
@@ -229,8 +236,8 @@ _SAGESPARQL = _descriptor.ServiceDescriptor(
   file=DESCRIPTOR,
   index=0,
   serialized_options=None,
-  serialized_start=274,
-  serialized_end=334,
+  serialized_start=297,
+  serialized_end=413,
   methods=[
   _descriptor.MethodDescriptor(
     name='Query',
@@ -241,6 +248,15 @@ _SAGESPARQL = _descriptor.ServiceDescriptor(
     output_type=_SAGERESPONSE,
     serialized_options=None,
   ),
+  _descriptor.MethodDescriptor(
+    name='QueryStream',
+    full_name='sage.SageSPARQL.QueryStream',
+    index=1,
+    containing_service=None,
+    input_type=_SAGEQUERY,
+    output_type=_SAGERESPONSE,
+    serialized_options=None,
+  ),
 ])
 _sym_db.RegisterServiceDescriptor(_SAGESPARQL)
 
@@ -19,6 +19,11 @@ class SageSPARQLStub(object):
         request_serializer=service__pb2.SageQuery.SerializeToString,
         response_deserializer=service__pb2.SageResponse.FromString,
         )
+    self.QueryStream = channel.unary_stream(
+        '/sage.SageSPARQL/QueryStream',
+        request_serializer=service__pb2.SageQuery.SerializeToString,
+        response_deserializer=service__pb2.SageResponse.FromString,
+        )
 
 
 class SageSPARQLServicer(object):
@@ -32,6 +37,14 @@ class SageSPARQLServicer(object):
     context.set_details('Method not implemented!')
     raise NotImplementedError('Method not implemented!')
 
+  def QueryStream(self, request, context):
+    """Execute a SPARQL query using the Web preemption model, and stream its solutions as they are produced.
+    The stream is a sequence of SageResponse with bindings only, ended by a SageResponse with is_done and next_link set.
+    """
+    context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+    context.set_details('Method not implemented!')
+    raise NotImplementedError('Method not implemented!')
+
 
 def add_SageSPARQLServicer_to_server(servicer, server):
   rpc_method_handlers = {
@@ -40,6 +53,11 @@ def add_SageSPARQLServicer_to_server(servicer, server):
           request_deserializer=service__pb2.SageQuery.FromString,
           response_serializer=service__pb2.SageResponse.SerializeToString,
       ),
+      'QueryStream': grpc.unary_stream_rpc_method_handler(
+          servicer.QueryStream,
+          request_deserializer=service__pb2.SageQuery.FromString,
+          response_serializer=service__pb2.SageResponse.SerializeToString,
+      ),
   }
   generic_handler = grpc.method_handlers_generic_handler(
       'sage.SageSPARQL', rpc_method_handlers)
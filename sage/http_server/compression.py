@@ -0,0 +1,141 @@
+# compression.py
+# Author: Thomas MINIER - MIT License 2017-2020
+import zlib
+from typing import List, Optional
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+
+def choose_encoding(accept_encoding: str) -> Optional[str]:
+    """Choose the content encoding of an HTTP response from the Accept-Encoding header of the request.
+
+    Brotli is preferred to gzip when the client accepts both and the brotli package is installed.
+
+    Argument: Value of the Accept-Encoding header.
+
+    Returns: "br", "gzip", or `None` if the response should not be compressed.
+    """
+    available: List[str] = ["br", "gzip"] if brotli is not None else ["gzip"]
+    accepted = dict()
+    for value in accept_encoding.split(","):
+        parts = value.strip().split(";")
+        quality = 1.0
+        for parameter in parts[1:]:
+            name, _, weight = parameter.strip().partition("=")
+            if name == "q":
+                try:
+                    quality = float(weight)
+                except ValueError:
+                    quality = 0.0
+        accepted[parts[0].strip().lower()] = quality
+    candidates = [(accepted[encoding] if encoding in accepted else accepted.get("*", 0.0), encoding) for encoding in available]
+    quality, encoding = max(candidates, key=lambda candidate: candidate[0])
+    return encoding if quality > 0 else None
+
+
+class Compressor(object):
+    """Compress the body of an HTTP response, chunk by chunk.
+
+    Argument: Content encoding, "br" or "gzip".
+    """
+
+    def __init__(self, encoding: str):
+        super(Compressor, self).__init__()
+        self._encoding = encoding
+        if encoding == "br":
+            self._compressor = brotli.Compressor()
+        else:
+            # wbits=31 produces the gzip format
+            self._compressor = zlib.compressobj(6, zlib.DEFLATED, 31)
+
+    def compress(self, chunk: bytes, more_body: bool) -> bytes:
+        """Compress a chunk of the body.
+
+        Chunks of a streamed body are flushed, so the client can decode them as soon as they are received.
+
+        Args:
+          * chunk: Chunk of the body to compress.
+          * more_body: True if other chunks follow, False if this is the last chunk of the body.
+
+        Returns: The compressed chunk.
+        """
+        if self._encoding == "br":
+            if more_body:
+                return self._compressor.process(chunk) + self._compressor.flush()
+            return self._compressor.process(chunk) + self._compressor.finish()
+        if more_body:
+            return self._compressor.compress(chunk) + self._compressor.flush(zlib.Z_SYNC_FLUSH)
+        return self._compressor.compress(chunk) + self._compressor.flush()
+
+
+class CompressionMiddleware(object):
+    """An ASGI middleware that compresses HTTP responses using gzip or brotli, negotiated using the Accept-Encoding header.
+
+    Unlike the GZipMiddleware of starlette, it supports brotli (if the brotli package is installed),
+    and flushes each chunk of a streamed response, so pages of results sent while a query executes are not delayed.
+
+    Args:
+      * app: ASGI application.
+      * minimum_size: Responses smaller than this size (in bytes), sent in one chunk, are not compressed.
+    """
+
+    def __init__(self, app: ASGIApp, minimum_size: int = 500):
+        super(CompressionMiddleware, self).__init__()
+        self._app = app
+        self._minimum_size = minimum_size
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] == "http":
+            encoding = choose_encoding(Headers(scope=scope).get("Accept-Encoding", ""))
+            if encoding is not None:
+                await self._app(scope, receive, CompressedSend(send, encoding, self._minimum_size))
+                return
+        await self._app(scope, receive, send)
+
+
+class CompressedSend(object):
+    """The send callable of an HTTP response compressed by a CompressionMiddleware"""
+
+    def __init__(self, send: Send, encoding: str, minimum_size: int):
+        super(CompressedSend, self).__init__()
+        self._send = send
+        self._encoding = encoding
+        self._minimum_size = minimum_size
+        self._start_message: Optional[Message] = None
+        self._compressor: Optional[Compressor] = None
+        self._started = False
+
+    async def __call__(self, message: Message) -> None:
+        if message["type"] == "http.response.start":
+            # the headers are sent with the first chunk of the body, once we know if it is compressed
+            self._start_message = message
+            return
+        elif message["type"] != "http.response.body":
+            await self._send(message)
+            return
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+        if not self._started:
+            self._started = True
+            headers = MutableHeaders(raw=self._start_message["headers"])
+            small = len(body) < self._minimum_size and not more_body
+            if "Content-Encoding" not in headers and not small:
+                self._compressor = Compressor(self._encoding)
+                body = self._compressor.compress(body, more_body)
+                headers["Content-Encoding"] = self._encoding
+                if "accept-encoding" not in headers.get("Vary", "").lower():
+                    headers.add_vary_header("Accept-Encoding")
+                if more_body:
+                    del headers["Content-Length"]
+                else:
+                    headers["Content-Length"] = str(len(body))
+            await self._send(self._start_message)
+        elif self._compressor is not None:
+            body = self._compressor.compress(body, more_body)
+        await self._send({"type": "http.response.body", "body": body, "more_body": more_body})
@@ -0,0 +1,245 @@
+# executor.py
+# Author: Thomas MINIER - MIT License 2017-2020
+import logging
+import traceback
+from asyncio import FIRST_COMPLETED, AbstractEventLoop, CancelledError, Queue, ensure_future, get_running_loop, new_event_loop, set_event_loop, wait
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+from sys import setrecursionlimit
+from time import time
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+from uuid import uuid4
+
+from sage.database.core.dataset import Dataset
+from sage.database.core.yaml_config import load_config
+from sage.http_server.utils import decode_saved_plan, encode_saved_plan
+from sage.query_engine.iterators.loader import load
+from sage.query_engine.iterators.mappings import to_dict
+from sage.query_engine.optimizer.query_parser import parse_query
+from sage.query_engine.sage_engine import ResultsCallback, SageEngine
+
+# Results of a time quantum: (bindings, saved_plan, is_done, abort_reason, stats)
+QuantumResults = Tuple[List[Dict[str, str]], Optional[str], bool, Optional[str], dict]
+
+
+async def execute_quantum(query: str, default_graph_uri: str, saved_plan: Optional[str], dataset: Dataset, on_results: Optional[ResultsCallback] = None) -> QuantumResults:
+    """Execute a SPARQL query, or resume its execution from a saved plan, during a time quantum.
+
+    Any failure will results in a rollback/abort on the current query execution.
+
+    Args:
+      * query: SPARQL query to execute.
+      * default_graph_uri: URI of the default RDF graph to use, which must be in the dataset.
+      * saved_plan: Encoded saved plan (see `sage.http_server.utils.encode_saved_plan`). Can be `None` if query execution should starts from the beginning.
+      * dataset: RDF dataset on which the query is executed.
+      * on_results: (Optional) Coroutine called with each batch of query results, as soon as it is produced (see `SageEngine#execute`). If set, `bindings` is empty.
+
+    Returns:
+      A tuple (`bindings`, `saved_plan`, `is_done`, `abort_reason`, `stats`) where:
+      * `bindings` is a list of query results.
+      * `saved_plan` is the encoded saved plan of the query. Sets to `None` if query execution completed during the time quantum, or was aborted.
+      * `is_done` is True when the query execution has completed, False otherwise.
+      * `abort_reason` is the reason why the query was aborted, or `None` if it was not.
+      * `stats` are statistics about query execution.
+
+    Throws: Any exception that have occured during query execution.
+    """
+    graph = None
+    try:
+        graph = dataset.get_graph(default_graph_uri)
+        # the transaction of the quantum is started before the plan is built or loaded
+        await graph.start_transaction()
+
+        context = dict()
+        context['quantum'] = graph.quota
+        context['max_results'] = graph.max_results
+        context['batch_size'] = graph.batch_size
+        context['stateless'] = dataset.is_stateless
+
+        # decode the saved plan or build query execution plan
+        cardinalities = dict()
+        start = time()
+        if saved_plan is not None:
+            plan = load(decode_saved_plan(saved_plan), dataset, context)
+        else:
+            plan, cardinalities = parse_query(query, dataset, default_graph_uri, context, plan_cache=dataset.plan_cache)
+        logging.info(f'loading time: {(time() - start) * 1000}ms')
+        loading_time = (time() - start) * 1000
+
+        # execute query
+        engine = SageEngine()
+        bindings, root, is_done, abort_reason = await engine.execute(plan, context, on_results=on_results)
+
+        # commit or abort (if necessary)
+        if abort_reason is not None:
+            graph.abort()
+        else:
+            graph.commit()
+
+        start = time()
+        # encode saved plan if query execution is not done yet and there was no abort
+        next_plan = None
+        if (not is_done) and abort_reason is None:
+            next_plan = encode_saved_plan(root)
+        logging.info(f'export time: {(time() - start) * 1000}ms')
+        export_time = (time() - start) * 1000
+
+        stats = {"cardinalities": cardinalities, "import": loading_time, "export": export_time}
+        if dataset.plan_cache is not None:
+            stats["plan_cache"] = dataset.plan_cache.stats()
+        if graph.pool_stats is not None:
+            stats["pool"] = graph.pool_stats
+        return (bindings, next_plan, is_done, abort_reason, stats)
+    except (Exception, CancelledError) as err:
+        # abort all ongoing transactions, then forward the exception to the caller
+        logging.error(traceback.format_exc())
+        if graph is not None:
+            graph.abort()
+        raise err
+
+
+class QuantumStream(object):
+    """Execute a time quantum (see `execute_quantum`) and iterate over the batches of query results as soon as they are produced.
+
+    Query execution runs in a separate task, which is suspended while `max_batches` batches wait to be consumed,
+    so at most `max_batches` batches of query results are held in memory, instead of a full page of results.
+    The results of the time quantum (see `QuantumStream#results`) are available once the iteration is over.
+
+    Args:
+      * query: SPARQL query to execute.
+      * default_graph_uri: URI of the default RDF graph to use, which must be in the dataset.
+      * saved_plan: Encoded saved plan. Can be `None` if query execution should starts from the beginning.
+      * dataset: RDF dataset on which the query is executed.
+      * max_batches: Maximum number of batches of query results waiting to be consumed.
+
+    Example:
+      >>> stream = QuantumStream(query, default_graph_uri, None, dataset)
+      >>> async for batch in stream:
+      >>>   print(batch)
+      >>> bindings, saved_plan, is_done, abort_reason, stats = stream.results
+    """
+
+    def __init__(self, query: str, default_graph_uri: str, saved_plan: Optional[str], dataset: Dataset, max_batches: int = 4):
+        super(QuantumStream, self).__init__()
+        self._query = query
+        self._default_graph_uri = default_graph_uri
+        self._saved_plan = saved_plan
+        self._dataset = dataset
+        self._batches = Queue(maxsize=max_batches)
+        self._results = None
+
+    @property
+    def results(self) -> Optional[QuantumResults]:
+        """Get the results of the time quantum, or `None` if the iteration is not over"""
+        return self._results
+
+    async def __aiter__(self) -> AsyncIterator[List[Dict[str, str]]]:
+        execution = ensure_future(execute_quantum(self._query, self._default_graph_uri, self._saved_plan, self._dataset, on_results=self._batches.put))
+        try:
+            while True:
+                batch = ensure_future(self._batches.get())
+                await wait([batch, execution], return_when=FIRST_COMPLETED)
+                if batch.done():
+                    yield batch.result()
+                else:
+                    batch.cancel()
+                    break
+            # send the last batches produced by the execution task, then get its results, which forwards any execution error
+            while not self._batches.empty():
+                yield self._batches.get_nowait()
+            self._results = execution.result()
+        finally:
+            # stop query execution if the consumer stopped before the end of the quantum, e.g., the client has disconnected
+            if not execution.done():
+                execution.cancel()
+
+
+def get_saved_plan(next_link: str, dataset: Dataset) -> str:
+    """Get the encoded saved plan of a next link.
+
+    In stateless mode, the next link is the encoded saved plan. In statefull mode, it is the ID of a plan stored on the server.
+
+    Throws: `KeyError` if the saved plan does not exist or has expired.
+    """
+    if dataset.is_stateless:
+        return next_link
+    return dataset.statefull_manager.get_plan(next_link)
+
+
+def save_plan(saved_plan: Optional[str], is_done: bool, next_link: Optional[str], dataset: Dataset) -> Optional[str]:
+    """Get the next link of a query after a time quantum, and update the storage of saved plans in statefull mode.
+
+    Args:
+      * saved_plan: Encoded saved plan of the query, or `None` if query execution completed.
+      * is_done: True when the query execution has completed, False otherwise.
+      * next_link: Next link used to resume the query during the time quantum, if any.
+      * dataset: RDF dataset on which the query is executed.
+
+    Returns: The next link of the query, or `None` if query execution completed.
+    """
+    if (not is_done) and (not dataset.is_stateless):
+        # generate the plan ID if this is the first time we execute this plan
+        plan_id = next_link if next_link is not None else str(uuid4())
+        dataset.statefull_manager.save_plan(plan_id, saved_plan)
+        return plan_id
+    elif is_done and (not dataset.is_stateless) and next_link is not None:
+        # delete the saved plan, as it will not be reloaded anymore
+        dataset.statefull_manager.delete_plan(next_link)
+    return saved_plan
+
+
+# RDF dataset and event loop of a worker process, created once when the process starts
+_worker_dataset: Optional[Dataset] = None
+_worker_loop: Optional[AbstractEventLoop] = None
+
+
+def _init_worker(config_file: str) -> None:
+    """Open the RDF dataset of a worker process, and create the event loop which executes its time quanta"""
+    global _worker_dataset, _worker_loop
+    # set recursion depth (due to pyparsing issues)
+    setrecursionlimit(3000)
+    _worker_dataset = load_config(config_file)
+    # the loop, and its default thread pool used for blocking I/O, are reused by all time quanta
+    _worker_loop = new_event_loop()
+    set_event_loop(_worker_loop)
+
+
+def _execute_in_worker(query: str, default_graph_uri: str, saved_plan: Optional[str]) -> QuantumResults:
+    """Execute a time quantum in a worker process, and convert its results so they can be sent back to the server process"""
+    bindings, next_plan, is_done, abort_reason, stats = _worker_loop.run_until_complete(execute_quantum(query, default_graph_uri, saved_plan, _worker_dataset))
+    return ([to_dict(mappings) for mappings in bindings], next_plan, is_done, abort_reason, stats)
+
+
+class QueryProcessPool(object):
+    """A pool of worker processes that execute SPARQL queries for the HTTP and gRPC servers.
+
+    Each worker process opens the RDF dataset once, when it starts, and executes a single time quantum at once,
+    so query execution uses several CPU cores without blocking the event loop of the server.
+    Queries and saved plans are sent to the workers as strings, in the format of the next links,
+    so the state of the server, e.g., the storage of saved plans in statefull mode, stays in the server process.
+
+    Args:
+      * config_file: SaGe configuration file, in YAML format, used by the workers to open the RDF dataset.
+      * nb_workers: Number of worker processes.
+    """
+
+    def __init__(self, config_file: str, nb_workers: int):
+        super(QueryProcessPool, self).__init__()
+        self._nb_workers = nb_workers
+        # worker processes are spawned, as forking a server process would share its database connections
+        self._executor = ProcessPoolExecutor(max_workers=nb_workers, mp_context=get_context('spawn'), initializer=_init_worker, initargs=(config_file,))
+
+    @property
+    def nb_workers(self) -> int:
+        return self._nb_workers
+
+    async def execute(self, query: str, default_graph_uri: str, saved_plan: Optional[str]) -> QuantumResults:
+        """Execute a time quantum in a worker process (see `execute_quantum`).
+
+        Throws: Any exception that have occured during query execution.
+        """
+        return await get_running_loop().run_in_executor(self._executor, _execute_in_worker, query, default_graph_uri, saved_plan)
+
+    def shutdown(self) -> None:
+        """Stop all worker processes"""
+        self._executor.shutdown(wait=True)
@@ -0,0 +1,122 @@
+# page_cache.py
+# Author: Thomas MINIER - MIT License 2017-2020
+from hashlib import blake2b
+from json import dumps
+from math import inf
+from threading import Lock
+from time import time
+from typing import Dict, List, Optional
+
+from pylru import lrucache
+
+from sage.query_engine.optimizer.plan_cache import normalize_query
+
+
+class CachedPage(object):
+    """A page of query results stored in a PageCache.
+
+    Args:
+      * bindings: Solution bindings of the page, as dicts.
+      * next_link: Next link of the page, or `None` if query execution completed during the time quantum.
+      * stats: Statistics about the query execution that produced the page.
+    """
+
+    def __init__(self, bindings: List[Dict[str, str]], next_link: Optional[str], stats: dict):
+        super(CachedPage, self).__init__()
+        self._bindings = bindings
+        self._next_link = next_link
+        self._stats = stats
+        self._timestamp = time()
+        # the same query can produce different pages, depending on when its time quantum is exhausted,
+        # so the entity tag is computed from the content of the page
+        digest = blake2b(dumps([next_link, bindings], separators=(',', ':')).encode('utf-8'), digest_size=16)
+        self._etag = f'W/"{digest.hexdigest()}"'
+
+    @property
+    def bindings(self) -> List[Dict[str, str]]:
+        return self._bindings
+
+    @property
+    def next_link(self) -> Optional[str]:
+        return self._next_link
+
+    @property
+    def stats(self) -> dict:
+        return self._stats
+
+    @property
+    def etag(self) -> str:
+        """Get the (weak) entity tag of the page, shared by all its formats and encodings"""
+        return self._etag
+
+    @property
+    def timestamp(self) -> float:
+        return self._timestamp
+
+
+class PageCache(object):
+    """A LRU cache of pages of query results, keyed by normalized SPARQL query, default RDF graph and next link.
+
+    A page can only be cached when the RDF graph never changes (see `Graph#is_immutable`) and the server runs
+    in stateless mode, where a next link is the saved plan itself: the first page of a query, or the page
+    that follows a next link, is then a valid answer to all requests with the same query, graph and next link.
+
+    Args:
+      * size: Maximum number of pages stored in the cache.
+      * ttl: Time-to-live of a page in the cache, in seconds. It is also sent to HTTP caches in the `Cache-Control` header.
+    """
+
+    def __init__(self, size: int = 1000, ttl: float = 600):
+        super(PageCache, self).__init__()
+        self._pages = lrucache(size)
+        self._lock = Lock()
+        self._ttl = ttl
+        self._hits = 0
+        self._misses = 0
+
+    @property
+    def ttl(self) -> float:
+        return self._ttl
+
+    def get(self, query: str, default_graph: str, next_link: Optional[str]) -> Optional[CachedPage]:
+        """Get a page of query results from the cache.
+
+        Args:
+          * query: SPARQL query.
+          * default_graph: URI of the default RDF graph.
+          * next_link: Next link used to resume the query, or `None` for the first page.
+
+        Returns: The cached page, or None if the page is not in the cache.
+        """
+        key = (normalize_query(query), default_graph, next_link)
+        with self._lock:
+            if key in self._pages and time() - self._pages[key].timestamp < self._ttl:
+                self._hits += 1
+                return self._pages[key]
+            self._misses += 1
+            return None
+
+    def put(self, query: str, default_graph: str, next_link: Optional[str], page: CachedPage) -> None:
+        """Store a page of query results in the cache.
+
+        Args:
+          * query: SPARQL query.
+          * default_graph: URI of the default RDF graph.
+          * next_link: Next link used to resume the query, or `None` for the first page.
+          * page: Page to store.
+        """
+        key = (normalize_query(query), default_graph, next_link)
+        with self._lock:
+            self._pages[key] = page
+
+    def stats(self) -> Dict[str, int]:
+        """Get the hit/miss counters of the cache"""
+        return {"hits": self._hits, "misses": self._misses}
+
+    def from_config(config: dict):
+        """Build a PageCache from a config dictionnary"""
+        size = config['size'] if 'size' in config else 1000
+        ttl = 600
+        if 'ttl' in config:
+            ttl = inf if config['ttl'] == 'inf' else config['ttl']
+        return PageCache(size=size, ttl=ttl)
@@ -0,0 +1,195 @@
+# query_scheduler.py
+# Author: Thomas MINIER - MIT License 2017-2020
+from asyncio import CancelledError, Future, get_running_loop
+from contextlib import asynccontextmanager
+from itertools import count
+from math import ceil
+from time import time
+from typing import AsyncIterator, Dict, List, Optional
+
+
+class SchedulerSaturated(Exception):
+    """Raised when a time quantum cannot be scheduled, because the run queue of the QueryScheduler is full.
+
+    Argument: Number of seconds after which the client should retry.
+    """
+
+    def __init__(self, retry_after: int):
+        super(SchedulerSaturated, self).__init__(f"The server is saturated. Please retry in {retry_after} seconds.")
+        self.retry_after = retry_after
+
+
+class QuantumRequest(object):
+    """A time quantum waiting in the run queue of a QueryScheduler.
+
+    Args:
+      * client: Identifier of the client which executes the query.
+      * graph_uri: URI of the default RDF graph of the query.
+      * tag: Virtual start time of the quantum, used to order the run queue.
+      * order: Arrival order of the quantum, used to break ties.
+    """
+
+    def __init__(self, client: str, graph_uri: str, tag: int, order: int):
+        super(QuantumRequest, self).__init__()
+        self.client = client
+        self.graph_uri = graph_uri
+        self.tag = tag
+        self.order = order
+        self.granted: Future = get_running_loop().create_future()
+
+
+class QueryScheduler(object):
+    """A QueryScheduler controls how many time quanta are executed at once by a SaGe server.
+
+    Without admission control, the quanta of all clients compete on the event loop (or on the worker processes),
+    so a quantum can take much longer than the time quantum of its RDF graph in wall-clock time.
+    The scheduler runs at most `max_running` quanta at once, and at most `max_running_per_graph` quanta
+    over the same RDF graph. Other quanta wait in a run queue of `max_waiting` quanta, and are rejected
+    with a `SchedulerSaturated` error when this queue is full.
+
+    Waiting quanta are ordered by fair share between clients, using start-time fair queuing:
+    as all quanta have the same (bounded) cost, each quantum of a client gets the next virtual start time
+    of the client, so a client which sends many queries does not delay the quanta of the other clients.
+
+    Args:
+      * max_running: Maximum number of time quanta executed at once.
+      * max_waiting: Maximum number of time quanta waiting in the run queue.
+      * max_running_per_graph: (Optional) Maximum number of time quanta executed at once over the same RDF graph.
+      * graph_limits: (Optional) Maximum number of time quanta executed at once over some RDF graphs, indexed by graph URI, which overrides `max_running_per_graph`.
+
+    Example:
+      >>> scheduler = QueryScheduler(max_running=4, max_waiting=64)
+      >>> async with scheduler.quantum(client, graph_uri):
+      >>>   results = await execute_quantum(query, graph_uri, saved_plan, dataset)
+    """
+
+    def __init__(self, max_running: int = 4, max_waiting: int = 64, max_running_per_graph: Optional[int] = None, graph_limits: Dict[str, int] = dict()):
+        super(QueryScheduler, self).__init__()
+        self._max_running = max_running
+        self._max_waiting = max_waiting
+        self._max_running_per_graph = max_running_per_graph
+        self._graph_limits = dict(graph_limits)
+        self._running = 0
+        self._running_per_graph: Dict[str, int] = dict()
+        self._waiting: List[QuantumRequest] = list()
+        # virtual time of the scheduler, and next virtual start time of each client
+        self._virtual_time = 0
+        self._client_tags: Dict[str, int] = dict()
+        self._arrivals = count()
+        # moving average of the duration of a quantum, in seconds, used to compute the Retry-After delays
+        self._quantum_duration = 1.0
+        self._rejected = 0
+
+    @property
+    def nb_running(self) -> int:
+        return self._running
+
+    @property
+    def nb_waiting(self) -> int:
+        return len(self._waiting)
+
+    def stats(self) -> Dict[str, int]:
+        """Get the counters of the scheduler"""
+        return {"running": self._running, "waiting": len(self._waiting), "rejected": self._rejected}
+
+    def graph_limit(self, graph_uri: str) -> Optional[int]:
+        """Get the maximum number of time quanta executed at once over a RDF graph, or `None` if there is no limit"""
+        return self._graph_limits[graph_uri] if graph_uri in self._graph_limits else self._max_running_per_graph
+
+    def retry_after(self) -> int:
+        """Estimate the number of seconds before a new time quantum could be scheduled"""
+        rounds = (len(self._waiting) + 1) / self._max_running
+        return max(1, ceil(rounds * self._quantum_duration))
+
+    def _can_run(self, graph_uri: str) -> bool:
+        """Return True if a time quantum over a RDF graph can start now"""
+        limit = self.graph_limit(graph_uri)
+        running = self._running_per_graph[graph_uri] if graph_uri in self._running_per_graph else 0
+        return self._running < self._max_running and (limit is None or running < limit)
+
+    def _start(self, request: QuantumRequest) -> None:
+        """Mark a time quantum as running"""
+        self._running += 1
+        self._running_per_graph[request.graph_uri] = self._running_per_graph.get(request.graph_uri, 0) + 1
+        self._virtual_time = max(self._virtual_time, request.tag)
+        # forget the clients which are not late anymore
+        if len(self._client_tags) > self._max_waiting + self._max_running:
+            self._client_tags = {client: tag for client, tag in self._client_tags.items() if tag > self._virtual_time}
+
+    def _dispatch(self) -> None:
+        """Start the waiting time quanta, by order of virtual start time, while there are free slots"""
+        for request in sorted(self._waiting, key=lambda request: (request.tag, request.order)):
+            if self._running >= self._max_running:
+                break
+            # quanta over a saturated RDF graph do not block the quanta over other graphs
+            if self._can_run(request.graph_uri):
+                self._waiting.remove(request)
+                self._start(request)
+                request.granted.set_result(None)
+
+    async def acquire(self, client: str, graph_uri: str) -> None:
+        """Wait until a time quantum can be executed.
+
+        Args:
+          * client: Identifier of the client which executes the query, e.g., its IP address.
+          * graph_uri: URI of the default RDF graph of the query.
+
+        Throws: `SchedulerSaturated` if the run queue is full.
+        """
+        tag = max(self._virtual_time, self._client_tags[client] if client in self._client_tags else 0)
+        self._client_tags[client] = tag + 1
+        request = QuantumRequest(client, graph_uri, tag, next(self._arrivals))
+        if len(self._waiting) == 0 and self._can_run(graph_uri):
+            self._start(request)
+            return
+        if len(self._waiting) >= self._max_waiting:
+            self._client_tags[client] = tag
+            self._rejected += 1
+            raise SchedulerSaturated(self.retry_after())
+        self._waiting.append(request)
+        self._dispatch()
+        try:
+            await request.granted
+        except CancelledError as err:
+            # the client has disconnected while waiting
+            if request.granted.done() and not request.granted.cancelled():
+                self.release(graph_uri)
+            else:
+                self._waiting.remove(request)
+            raise err
+
+    def release(self, graph_uri: str, duration: Optional[float] = None) -> None:
+        """Free the slot of a time quantum once it has been executed, and start the next waiting quanta.
+
+        Args:
+          * graph_uri: URI of the default RDF graph of the query.
+          * duration: (Optional) Duration of the time quantum, in seconds.
+        """
+        self._running -= 1
+        self._running_per_graph[graph_uri] -= 1
+        if self._running_per_graph[graph_uri] == 0:
+            del self._running_per_graph[graph_uri]
+        if duration is not None:
+            self._quantum_duration = 0.8 * self._quantum_duration + 0.2 * duration
+        self._dispatch()
+
+    @asynccontextmanager
+    async def quantum(self, client: str, graph_uri: str) -> AsyncIterator[None]:
+        """Execute a time quantum once it has been scheduled (see `acquire`), and free its slot when it ends.
+
+        Throws: `SchedulerSaturated` if the run queue is full.
+        """
+        await self.acquire(client, graph_uri)
+        start = time()
+        try:
+            yield
+        finally:
+            self.release(graph_uri, time() - start)
+
+    def from_config(config: dict):
+        """Build a QueryScheduler from a config dictionnary"""
+        max_running = config['max_running'] if 'max_running' in config else 4
+        max_waiting = config['max_waiting'] if 'max_waiting' in config else 64
+        max_running_per_graph = config['max_running_per_graph'] if 'max_running_per_graph' in config else None
+        graph_limits = config['graph_limits'] if 'graph_limits' in config else dict()
+        return QueryScheduler(max_running=max_running, max_waiting=max_waiting, max_running_per_graph=max_running_per_graph, graph_limits=graph_limits)
@@ -1,8 +1,21 @@
 # responses.py
 # Author: Thomas MINIER - MIT License 2017-2020
 from json import dumps
-from typing import Dict, Iterable, List, Optional, Tuple
-from xml.etree import ElementTree
+from typing import AsyncIterable, Callable, Dict, Iterable, List, Optional, Tuple
+from xml.sax.saxutils import escape
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import pyarrow
+except ImportError:
+    pyarrow = None
+
+# Size (in bytes) of the chunks of a page of results sent in an HTTP response
+CHUNK_SIZE = 64 * 1024
 
 
 def analyze_term(value: str) -> Tuple[str, str, Optional[str], Optional[str]]:
@@ -47,6 +60,118 @@ def analyze_term(value: str) -> Tuple[str, str, Optional[str], Optional[str]]:
         return value, "uri", None, None
 
 
+def json_dumps(value) -> bytes:
+    """Serialize a value in compact JSON, using orjson if it is installed"""
+    if orjson is not None:
+        return orjson.dumps(value)
+    return dumps(value, separators=(',', ':')).encode('utf-8')
+
+
+def term_to_json(value: str) -> dict:
+    """Format a RDF term in the W3C SPARQL JSON format"""
+    value, type, extra_label, extra_value = analyze_term(value.strip())
+    json_term = {"value": value, "type": type}
+    if extra_label is not None:
+        json_term[extra_label] = extra_value
+    return json_term
+
+
+def term_to_xml(value: str) -> str:
+    """Format a RDF term in the W3C SPARQL XML format"""
+    value, type, extra_label, extra_value = analyze_term(value.strip())
+    if type == "uri":
+        return f"<uri>{escape(value)}</uri>"
+    elif extra_label is not None:
+        return f"<literal {extra_label}={escape_attribute(extra_value)}>{escape(value)}</literal>"
+    return f"<literal>{escape(value)}</literal>"
+
+
+def escape_attribute(value: str) -> str:
+    """Escape the value of a XML attribute, and quote it"""
+    return '"' + escape(value, {'"': "&quot;", "\n": "&#10;"}) + '"'
+
+
+class BindingsEncoder(object):
+    """A BindingsEncoder serializes the solution bindings of a page of results, in the non-standard JSON format,
+    the W3C SPARQL JSON format or the W3C SPARQL XML format.
+
+    A page of results often holds the same RDF terms many times, so each distinct variable and RDF term
+    is analyzed, skolemized and serialized only once per page, then copied from a cache.
+    Solution bindings are written into a byte buffer (see `BindingsEncoder#write`).
+
+    Args:
+      * format: Format of the solution bindings: "json", "w3c-json" or "w3c-xml".
+      * skol_url: URL used for the skolemization of blank nodes.
+    """
+
+    def __init__(self, format: str, skol_url: str):
+        super(BindingsEncoder, self).__init__()
+        self._format = format
+        self._skol_url = skol_url
+        self._variables: Dict[str, bytes] = dict()
+        self._terms: Dict[str, bytes] = dict()
+        self._nb_bindings = 0
+
+    @property
+    def nb_bindings(self) -> int:
+        """Get the number of solution bindings written by the encoder"""
+        return self._nb_bindings
+
+    def _encode_variable(self, variable: str) -> bytes:
+        if self._format == "json":
+            return json_dumps(variable) + b":"
+        elif self._format == "w3c-json":
+            return json_dumps(variable[1:]) + b":"
+        return f"<binding name={escape_attribute(variable[1:])}>".encode("utf-8")
+
+    def _encode_term(self, value: str) -> bytes:
+        value = skolemize_one(value, self._skol_url)
+        if self._format == "json":
+            return json_dumps(value)
+        elif self._format == "w3c-json":
+            return json_dumps(term_to_json(value))
+        return f"{term_to_xml(value)}</binding>".encode("utf-8")
+
+    def write(self, buffer: bytearray, binding: Dict[str, str]) -> None:
+        """Write a set of solution bindings at the end of a byte buffer"""
+        variables, terms = self._variables, self._terms
+        is_xml = self._format == "w3c-xml"
+        if is_xml:
+            buffer += b"<result>"
+        else:
+            buffer += b",{" if self._nb_bindings > 0 else b"{"
+        first = True
+        for variable, value in binding.items():
+            encoded_variable = variables.get(variable)
+            if encoded_variable is None:
+                encoded_variable = variables[variable] = self._encode_variable(variable)
+            encoded_term = terms.get(value)
+            if encoded_term is None:
+                encoded_term = terms[value] = self._encode_term(value)
+            if not (first or is_xml):
+                buffer += b","
+            buffer += encoded_variable
+            buffer += encoded_term
+            first = False
+        buffer += b"</result>" if is_xml else b"}"
+        self._nb_bindings += 1
+
+    def encode(self, bindings: Iterable[Dict[str, str]], buffer: bytearray) -> Iterable[bytes]:
+        """Serialize solution bindings into chunks of about `CHUNK_SIZE` bytes.
+
+        Args:
+          * bindings: An iterable which yields set of solution bindings.
+          * buffer: Byte buffer where solution bindings are written. It may start with other bytes to send, e.g., the header of a page.
+
+        Yields: Chunks of serialized solution bindings. Bytes which do not fill a chunk are left in the buffer.
+        """
+        for binding in bindings:
+            self.write(buffer, binding)
+            if len(buffer) >= CHUNK_SIZE:
+                yield bytes(buffer)
+                buffer.clear()
+
+
 def stream_json_list(iterator: Iterable[Dict[str, str]]) -> Iterable[str]:
     """A generator for streaming a list of JSON results in an HTTP response.
     
@@ -90,7 +215,7 @@ def skolemize(bindings: Iterable[Dict[str, str]], url: str) -> Iterable[Dict[str
       * url: Prefix URL used for skolemization.
 
     Yields:
-      Solution bindings, where blank nodes have been skolemized using the input URL.
+      Solution bindings, converted into dicts, where blank nodes have been skolemized using the input URL.
     """
     for b in bindings:
         r = dict()
@@ -120,19 +245,10 @@ def binding_to_json(binding: Dict[str, str]) -> dict:
 
     Returns: The input set of solution bindings, encoded in the W3C SPARQL JSON format.
     """
-    json_binding = dict()
-    for variable, value in binding.items():
-        variable = variable[1:]
-        json_binding[variable] = dict()
-        value, type, extra_label, extra_value = analyze_term(value.strip())
-        json_binding[variable]["value"] = value
-        json_binding[variable]["type"] = type
-        if extra_label is not None:
-            json_binding[variable][extra_label] = extra_value
-    return json_binding
+    return {variable[1:]: term_to_json(value) for variable, value in binding.items()}
 
 
-def w3c_json_streaming(bindings: Iterable[Dict[str, str]], next_link: Optional[str], stats: dict, skol_url: str) -> Iterable[str]:
+def w3c_json_streaming(bindings: Iterable[Dict[str, str]], next_link: Optional[str], stats: dict, skol_url: str) -> Iterable[bytes]:
     """Yield a page of SaGe results in the W3C SPARQL JSON results format, so it can be sent in an HTTP response.
     
     Args:
@@ -142,24 +258,25 @@ def w3c_json_streaming(bindings: Iterable[Dict[str, str]], next_link: Optional[s
       * skol_url: URL used for the skolemization of blank nodes.
     
     Yields:
-      A page of SaGe results in the W3C SPARQL JSON results format.
+      A page of SaGe results in the W3C SPARQL JSON results format, by chunks of bytes.
     """
-    hasNext = "true" if next_link is not None else "false"
-    vars = list(map(lambda x: x[1:], bindings[0].keys()))
+    hasNext = b"true" if next_link is not None else b"false"
+    vars = [variable[1:] for variable in bindings[0].keys()] if len(bindings) > 0 else []
     # generate headers
-    yield "{\"head\":{\"vars\":["
-    yield ",".join(map(lambda x: f"\"{x}\"", vars))
-    yield f"],\"pageSize\":{len(bindings)},\"hasNext\":{hasNext},"
+    buffer = bytearray(b"{\"head\":{\"vars\":")
+    buffer += json_dumps(vars)
+    buffer += b",\"pageSize\":%d,\"hasNext\":%s," % (len(bindings), hasNext)
     if next_link is not None:
-        yield f"\"next\":\"{next_link}\","
-    yield "\"stats\":" + dumps(stats, separators=(',', ':')) + "},\"results\":{\"bindings\":["
+        buffer += b"\"next\":" + json_dumps(next_link) + b","
+    buffer += b"\"stats\":" + json_dumps(stats) + b"},\"results\":{\"bindings\":["
     # generate results
-    b_iter = map(binding_to_json, skolemize(bindings, skol_url))
-    yield from stream_json_list(b_iter)
-    yield "]}}"
+    encoder = BindingsEncoder("w3c-json", skol_url)
+    yield from encoder.encode(bindings, buffer)
+    buffer += b"]}}"
+    yield bytes(buffer)
 
 
-def raw_json_streaming(bindings: Iterable[Dict[str, str]], next_link: Optional[str], stats: dict, skol_url: str) -> Iterable[str]:
+def raw_json_streaming(bindings: Iterable[Dict[str, str]], next_link: Optional[str], stats: dict, skol_url: str) -> Iterable[bytes]:
     """Yield a page of SaGe results in a non-standard JSON format, so it can be sent in an HTTP response.
     
     Args:
@@ -169,59 +286,56 @@ def raw_json_streaming(bindings: Iterable[Dict[str, str]], next_link: Optional[s
       * skol_url: URL used for the skolemization of blank nodes.
     
     Yields:
-      A page of SaGe results in the W3C SPARQL JSON results format.
+      A page of SaGe results in the non-standard JSON format, by chunks of bytes.
     """
-    hasNext = "true" if next_link is not None else "false"
-    yield "{\"bindings\":["
-    b_iter = skolemize(bindings, skol_url)
-    yield from stream_json_list(b_iter)
-    yield f"],\"pageSize\":{len(bindings)},\"hasNext\":{hasNext},"
-    if next_link is not None:
-        yield f"\"next\":\"{next_link}\","
-    else:
-        yield "\"next\":null,"
-    yield "\"stats\":" + dumps(stats, separators=(',', ':')) + "}"
+    buffer = bytearray(b"{\"bindings\":[")
+    encoder = BindingsEncoder("json", skol_url)
+    yield from encoder.encode(bindings, buffer)
+    buffer += raw_json_trailer(encoder.nb_bindings, next_link, stats)
+    yield bytes(buffer)
 
 
-def bindings_to_w3c_xml(bindings: Iterable[Dict[str, str]], skol_url: str) -> ElementTree.Element:
-    """Formats a set of bindings into SPARQL results in the W3C SPARQL XML format.
+def raw_json_trailer(page_size: int, next_link: Optional[str], stats: dict) -> bytes:
+    """Get the end of a page of SaGe results in the non-standard JSON format, sent after the solution bindings.
     
     Args:
-      * bindings: An iterable which yields set of solution bindings.
+      * page_size: Number of solution bindings in the page.
+      * next_link: Link to a SaGe saved plan. Use `None` if there is no one, i.e., the query execution has completed during the quantum.
+      * stats: Statistics about query execution.
+
+    Returns: The end of the page, in JSON format.
+    """
+    hasNext = b"true" if next_link is not None else b"false"
+    return b"],\"pageSize\":%d,\"hasNext\":%s,\"next\":%s,\"stats\":%s}" % (page_size, hasNext, json_dumps(next_link), json_dumps(stats))
+
+
+async def raw_json_incremental(batches: AsyncIterable[List[Dict[str, str]]], end: Callable[[], Tuple[Optional[str], dict]], skol_url: str) -> AsyncIterable[bytes]:
+    """Yield a page of SaGe results in the non-standard JSON format of `raw_json_streaming`, while the page is produced.
+
+    Solution bindings are serialized as soon as they are produced, and the next link and statistics are sent in the trailer of the page.
+
+    Args:
+      * batches: An async iterable which yields batches of solution bindings.
+      * end: Function called once all solution bindings have been sent, which returns a tuple (`next_link`, `stats`) for the trailer of the page.
       * skol_url: URL used for the skolemization of blank nodes.
+    
+    Yields:
+      A page of SaGe results in the non-standard JSON format, by chunks of bytes.
+    """
+    buffer = bytearray(b"{\"bindings\":[")
+    encoder = BindingsEncoder("json", skol_url)
+    async for batch in batches:
+        for chunk in encoder.encode(batch, buffer):
+            yield chunk
+        # send each batch as soon as it is produced
+        if len(buffer) > 0:
+            yield bytes(buffer)
+            buffer.clear()
+    next_link, stats = end()
+    yield raw_json_trailer(encoder.nb_bindings, next_link, stats)
+
 
-    Returns: The input set of solution bindings, encoded in the W3C SPARQL XML format.
-    """
-    def convert_binding(b, root):
-        result_node = ElementTree.SubElement(root, "result")
-        for variable, value in b.items():
-            v_name = variable[1:]
-            b_node = ElementTree.SubElement(result_node, "binding", name=v_name)
-            value, type, extra_label, extra_value = analyze_term(value.strip())
-            if type == "uri":
-                uri_node = ElementTree.SubElement(b_node, "uri")
-                uri_node.text = value
-            elif type == "literal":
-                literal_node = literal_node = ElementTree.SubElement(b_node, "literal")
-                literal_node.text = value
-                if extra_label is not None:
-                    literal_node.set(extra_label, extra_value)
-        return result_node
-
-    vars = list(map(lambda x: x[1:], bindings[0].keys()))
-    root = ElementTree.Element("sparql", xmlns="http://www.w3.org/2005/sparql-results#")
-    # build head
-    head = ElementTree.SubElement(root, "head")
-    for variable in vars:
-        ElementTree.SubElement(head, "variable", name=variable)
-    # build results
-    results = ElementTree.SubElement(root, "results")
-    for binding in skolemize(bindings, skol_url):
-        convert_binding(binding, results)
-    return root
-
-
-def w3c_xml(bindings: Iterable[Dict[str, str]], next_link: Optional[str], stats: dict, skol_url: str) -> Iterable[str]:
+def w3c_xml(bindings: Iterable[Dict[str, str]], next_link: Optional[str], stats: dict, skol_url: str) -> Iterable[bytes]:
     """Yield a page of SaGe results in the W3C SPARQL XML results format, so it can be sent in an HTTP response.
     
     Args:
@@ -231,14 +345,177 @@ def w3c_xml(bindings: Iterable[Dict[str, str]], next_link: Optional[str], stats:
       * skol_url: URL used for the skolemization of blank nodes.
     
     Yields:
-      A page of SaGe results in the W3C SPARQL JSON results format.
-    """
-    page = bindings_to_w3c_xml(bindings, skol_url)
-    head = page.find("head")
-    controls = ElementTree.SubElement(head, "controls")
-    hasNext_node = ElementTree.SubElement(controls, "hasNext")
-    hasNext_node.text = str(next_link is not None)
-    next_node = ElementTree.SubElement(controls, "next")
-    next_node.text = next_link
+      A page of SaGe results in the W3C SPARQL XML results format, by chunks of bytes.
+    """
+    vars = [variable[1:] for variable in bindings[0].keys()] if len(bindings) > 0 else []
+    # generate headers
+    head = ["<sparql xmlns=\"http://www.w3.org/2005/sparql-results#\"><head>"]
+    head += [f"<variable name={escape_attribute(variable)} />" for variable in vars]
+    head.append(f"<controls><hasNext>{next_link is not None}</hasNext>")
+    head.append(f"<next>{escape(next_link)}</next>" if next_link is not None else "<next />")
     # TODO include stats
-    return ElementTree.tostring(page, encoding="utf-8").decode("utf-8")
+    head.append("</controls></head><results>")
+    buffer = bytearray("".join(head).encode("utf-8"))
+    # generate results
+    encoder = BindingsEncoder("w3c-xml", skol_url)
+    yield from encoder.encode(bindings, buffer)
+    buffer += b"</results></sparql>"
+    yield bytes(buffer)
+
+
+def page_variables(bindings: Iterable[Dict[str, str]]) -> List[str]:
+    """Get the SPARQL variables bound in a page of solution bindings, in order of appearance"""
+    variables = dict()
+    for binding in bindings:
+        for variable in binding.keys():
+            variables[variable] = None
+    return list(variables)
+
+
+def term_to_csv(value: str) -> str:
+    """Format a RDF term in the W3C SPARQL CSV format, i.e., without the datatype or language of literals"""
+    value, _, _, _ = analyze_term(value.strip())
+    if "\"" in value or "," in value or "\n" in value or "\r" in value:
+        return "\"" + value.replace("\"", "\"\"") + "\""
+    return value
+
+
+def term_to_tsv(value: str) -> str:
+    """Format a RDF term in the W3C SPARQL TSV format, i.e., using the N-Triples syntax"""
+    value, type, extra_label, extra_value = analyze_term(value.strip())
+    if type == "uri":
+        return f"<{value}>"
+    value = value.replace("\\", "\\\\").replace("\"", "\\\"").replace("\t", "\\t").replace("\n", "\\n").replace("\r", "\\r")
+    if extra_label == "datatype":
+        return f"\"{value}\"^^<{extra_value}>"
+    elif extra_label is not None:
+        return f"\"{value}\"@{extra_value}"
+    return f"\"{value}\""
+
+
+def delimited_streaming(bindings: Iterable[Dict[str, str]], skol_url: str, header: Callable[[str], str], encode_term: Callable[[str], str], separator: str, newline: str) -> Iterable[bytes]:
+    """Yield a page of SaGe results in a delimited text format, one row per set of solution bindings.
+
+    Each distinct RDF term of the page is skolemized and formatted once, then copied from a cache.
+
+    Args:
+      * bindings: An iterable which yields set of solution bindings.
+      * skol_url: URL used for the skolemization of blank nodes.
+      * header: Function which formats a SPARQL variable in the header row.
+      * encode_term: Function which formats a RDF term.
+      * separator: Separator of the columns.
+      * newline: Separator of the rows.
+
+    Yields:
+      A page of SaGe results, by chunks of bytes.
+    """
+    variables = page_variables(bindings)
+    terms: Dict[str, bytes] = dict()
+    separator, newline = separator.encode("utf-8"), newline.encode("utf-8")
+    buffer = bytearray(separator.join([header(variable).encode("utf-8") for variable in variables]) + newline)
+    for binding in bindings:
+        row = list()
+        for variable in variables:
+            # unbound variables are empty fields
+            value = binding[variable] if variable in binding else None
+            if value is None:
+                row.append(b"")
+                continue
+            term = terms.get(value)
+            if term is None:
+                term = terms[value] = encode_term(skolemize_one(value, skol_url)).encode("utf-8")
+            row.append(term)
+        buffer += separator.join(row)
+        buffer += newline
+        if len(buffer) >= CHUNK_SIZE:
+            yield bytes(buffer)
+            buffer.clear()
+    yield bytes(buffer)
+
+
+def csv_streaming(bindings: Iterable[Dict[str, str]], skol_url: str) -> Iterable[bytes]:
+    """Yield a page of SaGe results in the W3C SPARQL CSV results format, so it can be sent in an HTTP response.
+
+    The next link is not part of the format, so it is sent in the headers of the HTTP response (see `delimited_headers`).
+
+    Args:
+      * bindings: An iterable which yields set of solution bindings.
+      * skol_url: URL used for the skolemization of blank nodes.
+
+    Yields:
+      A page of SaGe results in the W3C SPARQL CSV results format, by chunks of bytes.
+    """
+    return delimited_streaming(bindings, skol_url, lambda variable: variable[1:], term_to_csv, ",", "\r\n")
+
+
+def tsv_streaming(bindings: Iterable[Dict[str, str]], skol_url: str) -> Iterable[bytes]:
+    """Yield a page of SaGe results in the W3C SPARQL TSV results format, so it can be sent in an HTTP response.
+
+    The next link is not part of the format, so it is sent in the headers of the HTTP response (see `delimited_headers`).
+
+    Args:
+      * bindings: An iterable which yields set of solution bindings.
+      * skol_url: URL used for the skolemization of blank nodes.
+
+    Yields:
+      A page of SaGe results in the W3C SPARQL TSV results format, by chunks of bytes.
+    """
+    return delimited_streaming(bindings, skol_url, lambda variable: variable, term_to_tsv, "\t", "\n")
+
+
+def delimited_headers(next_link: Optional[str]) -> Dict[str, str]:
+    """Get the HTTP headers which hold the controls of a page of SaGe results in the CSV or TSV format.
+
+    Argument: Link to a SaGe saved plan. Use `None` if there is no one, i.e., the query execution has completed during the quantum.
+
+    Returns: The headers `X-Sage-Has-Next` and, if there is a next link, `X-Sage-Next`.
+    """
+    headers = {"X-Sage-Has-Next": "true" if next_link is not None else "false"}
+    if next_link is not None:
+        headers["X-Sage-Next"] = next_link
+    return headers
+
+
+def arrow_stream(bindings: List[Dict[str, str]], next_link: Optional[str], stats: dict, skol_url: str) -> bytes:
+    """Serialize a page of SaGe results as an Apache Arrow IPC stream (requires the pyarrow package).
+
+    The page is a single record batch with one column per SPARQL variable. Columns are dictionary-encoded strings,
+    with RDF terms in the format of the non-standard JSON format, and unbound variables are nulls.
+    The next link and statistics are stored in the metadata of the schema, under the keys `next`, `hasNext`, `pageSize` and `stats`.
+
+    Args:
+      * bindings: A list of solution bindings.
+      * next_link: Link to a SaGe saved plan. Use `None` if there is no one, i.e., the query execution has completed during the quantum.
+      * stats: Statistics about query execution.
+      * skol_url: URL used for the skolemization of blank nodes.
+
+    Returns: A page of SaGe results in the Apache Arrow IPC stream format.
+    """
+    variables = page_variables(bindings)
+    columns = list()
+    for variable in variables:
+        # positions of the distinct RDF terms of the column in its dictionary
+        positions: Dict[str, int] = dict()
+        indices = list()
+        for binding in bindings:
+            value = binding[variable] if variable in binding else None
+            if value is None:
+                indices.append(None)
+            else:
+                if value not in positions:
+                    positions[value] = len(positions)
+                indices.append(positions[value])
+        dictionary = pyarrow.array([skolemize_one(value, skol_url) for value in positions], type=pyarrow.string())
+        columns.append(pyarrow.DictionaryArray.from_arrays(pyarrow.array(indices, type=pyarrow.int32()), dictionary))
+    metadata = {
+        "next": next_link if next_link is not None else "",
+        "hasNext": "true" if next_link is not None else "false",
+        "pageSize": str(len(bindings)),
+        "stats": json_dumps(stats)
+    }
+    schema = pyarrow.schema([pyarrow.field(variable[1:], column.type) for variable, column in zip(variables, columns)], metadata=metadata)
+    batch = pyarrow.RecordBatch.from_arrays(columns, schema=schema)
+    sink = pyarrow.BufferOutputStream()
+    with pyarrow.ipc.new_stream(sink, schema) as writer:
+        writer.write_batch(batch)
+    return sink.getvalue().to_pybytes()
@@ -1,30 +1,36 @@
 # server.py
 # Author: Thomas MINIER - MIT License 2017-2020
 import logging
-import traceback
 import uvloop
 from asyncio import set_event_loop_policy
+from math import inf
 from os import environ
 from sys import setrecursionlimit
 from time import time
-from typing import Dict, List, Optional, Tuple
+from typing import AsyncIterator, Dict, List, Optional, Tuple
 from urllib.parse import urlunparse
-from uuid import uuid4
 
 from fastapi import FastAPI, HTTPException, Query
 from pydantic import BaseModel, Field
 from starlette.middleware.cors import CORSMiddleware
 from starlette.requests import Request
 from starlette.responses import JSONResponse, RedirectResponse, Response, StreamingResponse
+from starlette.types import Receive, Scope, Send
 
 import sage.http_server.responses as responses
 from sage.database.core.dataset import Dataset
 from sage.database.core.yaml_config import load_config
 from sage.database.descriptors import VoidDescriptor, many_void
-from sage.http_server.utils import decode_saved_plan, encode_saved_plan
-from sage.query_engine.iterators.loader import load
-from sage.query_engine.optimizer.query_parser import parse_query
-from sage.query_engine.sage_engine import SageEngine
+from sage.http_server.compression import CompressionMiddleware
+from sage.http_server.executor import QuantumResults, QuantumStream, QueryProcessPool, execute_quantum, get_saved_plan, save_plan
+from sage.http_server.page_cache import CachedPage
+from sage.http_server.query_scheduler import SchedulerSaturated
+from sage.http_server.utils import InvalidSavedPlan
+from sage.query_engine.iterators.mappings import to_dict
+
+
+# Mimetype of the Apache Arrow IPC stream format
+ARROW_MIMETYPE = "application/vnd.apache.arrow.stream"
 
 
 class SagePostQuery(BaseModel):
@@ -48,7 +54,43 @@ def choose_void_format(mimetypes):
     return "ntriples", "application/n-triples"
 
 
-async def execute_query(query: str, default_graph_uri: str, next_link: Optional[str], dataset: Dataset) -> Tuple[List[Dict[str, str]], Optional[str], Dict[str, str]]:
+def get_client(request: Request) -> str:
+    """Get the identifier of the client which sent an HTTP request, used to share the server fairly between clients"""
+    return request.client.host if request.client is not None else ""
+
+
+def resume_query(default_graph_uri: str, next_link: Optional[str], dataset: Dataset) -> Optional[str]:
+    """Check the default RDF graph of a query, and get the saved plan used to resume its execution.
+
+    Args:
+      * default_graph_uri: URI of the default RDF graph to use.
+      * next_link: URI to a saved plan. Can be `None` if query execution should starts from the beginning.
+      * dataset: RDF dataset on which the query is executed.
+
+    Returns: The encoded saved plan of the query, or `None` if query execution starts from the beginning.
+
+    Throws: `HTTPException` if the RDF graph or the saved plan does not exist.
+    """
+    if not dataset.has_graph(default_graph_uri):
+        raise HTTPException(status_code=404, detail=f"RDF Graph {default_graph_uri} not found on the server.")
+    # decode next_link: saved plans are only stored by the server process
+    saved_plan = None
+    if next_link is not None:
+        try:
+            saved_plan = get_saved_plan(next_link, dataset)
+        except KeyError:
+            raise HTTPException(status_code=404, detail=f"The saved plan {next_link} does not exist or has expired. Please restart the execution of the query.")
+    return saved_plan
+
+
+async def run_quantum(query: str, default_graph_uri: str, saved_plan: Optional[str], dataset: Dataset, pool: Optional[QueryProcessPool] = None) -> QuantumResults:
+    """Execute a time quantum, using a worker process of the pool if there is one (see `sage.http_server.executor.execute_quantum`)"""
+    if pool is not None:
+        return await pool.execute(query, default_graph_uri, saved_plan)
+    return await execute_quantum(query, default_graph_uri, saved_plan, dataset)
+
+
+async def execute_query(query: str, default_graph_uri: str, next_link: Optional[str], dataset: Dataset, pool: Optional[QueryProcessPool] = None, client: str = "") -> Tuple[List[Dict[str, str]], Optional[str], Dict[str, str]]:
     """Execute a query using the SageEngine and returns the appropriate HTTP response.
 
     Any failure will results in a rollback/abort on the current query execution.
@@ -58,6 +100,8 @@ async def execute_query(query: str, default_graph_uri: str, next_link: Optional[
       * default_graph_uri: URI of the default RDF graph to use.
       * next_link: URI to a saved plan. Can be `None` if query execution should starts from the beginning.
       * dataset: RDF dataset on which the query is executed.
+      * pool: (Optional) Pool of worker processes used to execute the query. If not set, the query is executed by the current process.
+      * client: (Optional) Identifier of the client, used by the scheduler of the dataset to share the server fairly between clients.
 
     Returns:
       A tuple (`bindings`, `next_page`, `stats`) where:
@@ -65,68 +109,150 @@ async def execute_query(query: str, default_graph_uri: str, next_link: Optional[
       * `next_page` is a link to saved query execution state. Sets to `None` if query execution completed during the time quantum.
       * `stats` are statistics about query execution.
 
+    Throws: `SchedulerSaturated` if the scheduler of the dataset cannot accept another time quantum, or any exception that have occured during query execution.
+    """
+    saved_plan = resume_query(default_graph_uri, next_link, dataset)
+
+    # execute query during a time quantum
+    if dataset.scheduler is not None:
+        async with dataset.scheduler.quantum(client, default_graph_uri):
+            bindings, saved_plan, is_done, abort_reason, stats = await run_quantum(query, default_graph_uri, saved_plan, dataset, pool=pool)
+        stats["scheduler"] = dataset.scheduler.stats()
+    else:
+        bindings, saved_plan, is_done, abort_reason, stats = await run_quantum(query, default_graph_uri, saved_plan, dataset, pool=pool)
+    if abort_reason is not None:
+        raise HTTPException(status_code=500, detail=f"The SPARQL query has been aborted for the following reason: '{abort_reason}'")
+
+    start = time()
+    next_page = save_plan(saved_plan, is_done, next_link, dataset)
+    stats["export"] += (time() - start) * 1000
+    return (bindings, next_page, stats)
+
+
+def is_cacheable(default_graph_uri: str, dataset: Dataset) -> bool:
+    """Return True if the pages of results of queries over a RDF graph can be cached (see `sage.http_server.page_cache.PageCache`)"""
+    return dataset.page_cache is not None and dataset.is_stateless and dataset.has_graph(default_graph_uri) and dataset.get_graph(default_graph_uri).is_immutable
+
+
+async def query_page(query: str, default_graph_uri: str, next_link: Optional[str], dataset: Dataset, pool: Optional[QueryProcessPool] = None, client: str = "") -> Tuple[List[Dict[str, str]], Optional[str], Dict[str, str], Optional[CachedPage]]:
+    """Get a page of query results from the page cache of the dataset, or execute the query to compute it (see `execute_query`).
+
+    Returns:
+      A tuple (`bindings`, `next_page`, `stats`, `page`) where `page` is the page stored in the cache, or `None` if the page cannot be cached.
+
     Throws: Any exception that have occured during query execution.
     """
-    graph = None
-    try:
-        if not dataset.has_graph(default_graph_uri):
-            raise HTTPException(status_code=404, detail=f"RDF Graph {default_graph_uri} not found on the server.")
-        graph = dataset.get_graph(default_graph_uri)
-
-        context = dict()
-        context['quantum'] = graph.quota
-        context['max_results'] = graph.max_results
-
-        # decode next_link or build query execution plan
-        cardinalities = dict()
+    if not is_cacheable(default_graph_uri, dataset):
+        bindings, next_page, stats = await execute_query(query, default_graph_uri, next_link, dataset, pool=pool, client=client)
+        return (bindings, next_page, stats, None)
+    page = dataset.page_cache.get(query, default_graph_uri, next_link)
+    if page is None:
+        bindings, next_page, stats = await execute_query(query, default_graph_uri, next_link, dataset, pool=pool, client=client)
+        page = CachedPage([to_dict(mappings) for mappings in bindings], next_page, stats)
+        dataset.page_cache.put(query, default_graph_uri, next_link, page)
+    stats = dict(page.stats, page_cache=dataset.page_cache.stats())
+    return (page.bindings, page.next_link, stats, page)
+
+
+def cache_headers(page: CachedPage, ttl: float) -> Dict[str, str]:
+    """Get the HTTP headers which allow HTTP caches, e.g., a CDN, to store a page of query results.
+
+    Args:
+      * page: Page of query results, stored in the page cache.
+      * ttl: Time-to-live of the page in the page cache, in seconds.
+
+    Returns: The headers `ETag`, `Cache-Control` and `Vary`.
+    """
+    max_age = int(ttl) if ttl != inf else 31536000
+    return {"ETag": page.etag, "Cache-Control": f"public, max-age={max_age}", "Vary": "Accept, Accept-Encoding"}
+
+
+def create_page_response(request: Request, mimetypes: List[str], bindings: List[Dict[str, str]], next_page: Optional[str], stats: dict, page: Optional[CachedPage], dataset: Dataset, skol_url: str) -> Response:
+    """Create an HTTP response for a page of query results (see `create_response`), with its caching headers if it is stored in the page cache.
+
+    If the client already holds the page, i.e., its ETag matches the If-None-Match header of the request, the response is a "304 Not Modified".
+
+    Args:
+      * request: HTTP request.
+      * mimetypes: mimetypes from the input HTTP request.
+      * bindings: list of query results.
+      * next_page: Link to a SaGe saved plan. Use `None` if there is no one, i.e., the query execution has completed during the quantum.
+      * stats: Statistics about query execution.
+      * page: Page of query results stored in the page cache, or `None` if the page cannot be cached.
+      * dataset: RDF dataset on which the query is executed.
+      * skol_url: URL used for the skolemization of blank nodes.
+
+    Returns:
+      An HTTP response built from the input mimetypes and the SPARQL query results.
+    """
+    if page is None:
+        return create_response(mimetypes, bindings, next_page, stats, skol_url)
+    headers = cache_headers(page, dataset.page_cache.ttl)
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None and page.etag in [etag.strip() for etag in if_none_match.split(",")]:
+        return Response(status_code=304, headers=headers)
+    response = create_response(mimetypes, bindings, next_page, stats, skol_url)
+    for name, value in headers.items():
+        response.headers[name] = value
+    return response
+
+
+class ScheduledStreamingResponse(StreamingResponse):
+    """A streaming response which frees the slot of its time quantum in the scheduler of the dataset once it has been sent.
+
+    The slot is freed when the response ends, whether the page has been fully sent, the client has disconnected or the query execution has failed.
+    """
+
+    def __init__(self, content: AsyncIterator[bytes], dataset: Dataset, default_graph_uri: str, media_type: str):
+        super(ScheduledStreamingResponse, self).__init__(content, media_type=media_type)
+        self._dataset = dataset
+        self._default_graph_uri = default_graph_uri
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
         start = time()
-        if next_link is not None:
-            if dataset.is_stateless:
-                saved_plan = next_link
-            else:
-                saved_plan = dataset.statefull_manager.get_plan(next_link)
-            plan = load(decode_saved_plan(saved_plan), dataset, context)
-        else:
-            plan, cardinalities = parse_query(query, dataset, default_graph_uri, context)
-        logging.info(f'loading time: {(time() - start) * 1000}ms')
-        loading_time = (time() - start) * 1000
-
-        # execute query
-        engine = SageEngine()
-        bindings, saved_plan, is_done, abort_reason = await engine.execute(plan, context)
-
-        # commit or abort (if necessary)
-        if abort_reason is not None:
-            graph.abort()
-            raise HTTPException(status_code=500, detail=f"The SPARQL query has been aborted for the following reason: '{abort_reason}'")
-        else:
-            graph.commit()
+        try:
+            await super(ScheduledStreamingResponse, self).__call__(scope, receive, send)
+        finally:
+            self._dataset.scheduler.release(self._default_graph_uri, time() - start)
+
 
+async def stream_query(query: str, default_graph_uri: str, next_link: Optional[str], dataset: Dataset, skol_url: str, client: str = "") -> Response:
+    """Execute a query using the SageEngine, and send its results in the HTTP response as soon as they are produced.
+
+    Results are sent in the non-standard JSON format, and the next link and statistics are sent at the end of the page.
+    As the response is sent before the end of the time quantum, a failure of the query execution results in a truncated page.
+
+    Args:
+      * query: SPARQL query to execute.
+      * default_graph_uri: URI of the default RDF graph to use.
+      * next_link: URI to a saved plan. Can be `None` if query execution should starts from the beginning.
+      * dataset: RDF dataset on which the query is executed.
+      * skol_url: URL used for the skolemization of blank nodes.
+      * client: (Optional) Identifier of the client, used by the scheduler of the dataset to share the server fairly between clients.
+
+    Returns: An HTTP response which streams the page of results.
+
+    Throws: `HTTPException` if the RDF graph or the saved plan does not exist, or `SchedulerSaturated` if the scheduler of the dataset cannot accept another time quantum.
+    """
+    saved_plan = resume_query(default_graph_uri, next_link, dataset)
+    stream = QuantumStream(query, default_graph_uri, saved_plan, dataset)
+    if dataset.scheduler is not None:
+        # the quantum is scheduled before the response is sent, and its slot is freed by the response once it ends
+        await dataset.scheduler.acquire(client, default_graph_uri)
+
+    def end_page() -> Tuple[Optional[str], dict]:
+        _, saved_plan, is_done, abort_reason, stats = stream.results
+        if abort_reason is not None:
+            raise RuntimeError(f"The SPARQL query has been aborted for the following reason: '{abort_reason}'")
         start = time()
-        # encode saved plan if query execution is not done yet and there was no abort
-        next_page = None
-        if (not is_done) and abort_reason is None:
-            next_page = encode_saved_plan(saved_plan)
-            if not dataset.is_stateless:
-                # generate the plan ID if this is the first time we execute this plan
-                plan_id = next_link if next_link is not None else str(uuid4())
-                dataset.statefull_manager.save_plan(plan_id, next_page)
-                next_page = plan_id
-        elif is_done and (not dataset.is_stateless) and next_link is not None:
-            # delete the saved plan, as it will not be reloaded anymore
-            dataset.statefull_manager.delete_plan(next_link)
-
-        logging.info(f'export time: {(time() - start) * 1000}ms')
-        exportTime = (time() - start) * 1000
-        stats = {"cardinalities": cardinalities, "import": loading_time, "export": exportTime}
-
-        return (bindings, next_page, stats)
-    except Exception as err:
-        # abort all ongoing transactions, then forward the exception to the main loop
-        logging.error(traceback.format_exc())
-        if graph is not None:
-            graph.abort()
-        raise err
+        next_page = save_plan(saved_plan, is_done, next_link, dataset)
+        stats["export"] += (time() - start) * 1000
+        return (next_page, stats)
+
+    iterator = responses.raw_json_incremental(stream, end_page, skol_url)
+    if dataset.scheduler is not None:
+        return ScheduledStreamingResponse(iterator, dataset, default_graph_uri, "application/json")
+    return StreamingResponse(iterator, media_type="application/json")
 
 
 def create_response(mimetypes: List[str], bindings: List[Dict[str, str]], next_page: Optional[str], stats: dict, skol_url: str) -> Response:
@@ -149,10 +275,18 @@ def create_response(mimetypes: List[str], bindings: List[Dict[str, str]], next_p
         iterator = responses.w3c_json_streaming(bindings, next_page, stats, skol_url)
         return StreamingResponse(iterator, media_type="application/json")
     elif "application/xml" in mimetypes or "application/sparql-results+xml" in mimetypes:
-        iterator = responses.w3c_xml(bindings, next_page, stats)
-        return Response(iterator, media_type="application/xml")
+        iterator = responses.w3c_xml(bindings, next_page, stats, skol_url)
+        return StreamingResponse(iterator, media_type="application/xml")
+    elif "text/csv" in mimetypes:
+        iterator = responses.csv_streaming(bindings, skol_url)
+        return StreamingResponse(iterator, media_type="text/csv", headers=responses.delimited_headers(next_page))
+    elif "text/tab-separated-values" in mimetypes:
+        iterator = responses.tsv_streaming(bindings, skol_url)
+        return StreamingResponse(iterator, media_type="text/tab-separated-values", headers=responses.delimited_headers(next_page))
+    elif ARROW_MIMETYPE in mimetypes and responses.pyarrow is not None:
+        return Response(responses.arrow_stream(bindings, next_page, stats, skol_url), media_type=ARROW_MIMETYPE)
     return JSONResponse({
-        "bindings": bindings,
+        "bindings": [to_dict(mappings) for mappings in bindings],
         "next": next_page,
         "stats": stats
     })
@@ -178,11 +312,28 @@ def run_app(config_file: str) -> FastAPI:
         allow_credentials=True,
         allow_methods=["*"],
         allow_headers=["*"],
+        # controls of the CSV/TSV pages and caching headers, readable by browsers
+        expose_headers=["ETag", "Retry-After", "X-Sage-Next", "X-Sage-Has-Next"],
     )
 
+    # compress responses, as negotiated using the Accept-Encoding header
+    app.add_middleware(CompressionMiddleware, minimum_size=500)
+
     # Build the RDF dataset from the configuration file
     dataset = load_config(config_file)
 
+    # queries are executed by a pool of worker processes, if configured
+    pool = None
+    if dataset.workers > 0:
+        pool = QueryProcessPool(config_file, dataset.workers)
+
+        @app.on_event("shutdown")
+        def shutdown_pool():
+            pool.shutdown()
+
+    # results are streamed while queries are executed, unless they are executed by worker processes
+    stream_results = dataset.stream_results and pool is None
+
     @app.get("/")
     async def root():
         return "The SaGe SPARQL query server is running!"
@@ -198,10 +349,17 @@ def run_app(config_file: str) -> FastAPI:
         try:
             mimetypes = request.headers['accept'].split(",")
             server_url = urlunparse(request.url.components[0:3] + (None, None, None))
-            bindings, next_page, stats = await execute_query(query, default_graph_uri, next_link, dataset)
-            return create_response(mimetypes, bindings, next_page, stats, server_url)
+            client = get_client(request)
+            if stream_results and "application/json" in mimetypes and not is_cacheable(default_graph_uri, dataset):
+                return await stream_query(query, default_graph_uri, next_link, dataset, server_url, client=client)
+            bindings, next_page, stats, page = await query_page(query, default_graph_uri, next_link, dataset, pool=pool, client=client)
+            return create_page_response(request, mimetypes, bindings, next_page, stats, page, dataset, server_url)
         except HTTPException as err:
             raise err
+        except SchedulerSaturated as err:
+            raise HTTPException(status_code=429, detail=str(err), headers={"Retry-After": str(err.retry_after)})
+        except InvalidSavedPlan as err:
+            raise HTTPException(status_code=400, detail=str(err))
         except Exception as err:
             logging.error(err)
             raise HTTPException(status_code=500, detail=str(err))
@@ -213,16 +371,23 @@ def run_app(config_file: str) -> FastAPI:
             start = time()
             mimetypes = request.headers['accept'].split(",")
             server_url = urlunparse(request.url.components[0:3] + (None, None, None))
+            client = get_client(request)
+            if stream_results and "application/json" in mimetypes and not is_cacheable(item.defaultGraph, dataset):
+                return await stream_query(item.query, item.defaultGraph, item.next, dataset, server_url, client=client)
             exec_start = time()
-            bindings, next_page, stats = await execute_query(item.query, item.defaultGraph, item.next, dataset)
+            bindings, next_page, stats, page = await query_page(item.query, item.defaultGraph, item.next, dataset, pool=pool, client=client)
             logging.info(f'query execution time: {(time() - exec_start) * 1000}ms')
             serialization_start = time()
-            response = create_response(mimetypes, bindings, next_page, stats, server_url)
+            response = create_page_response(request, mimetypes, bindings, next_page, stats, page, dataset, server_url)
             logging.info(f'serialization time: {(time() - serialization_start) * 1000}ms')
             logging.info(f'execution time: {(time() - start) * 1000}ms')
             return response
         except HTTPException as err:
             raise err
+        except SchedulerSaturated as err:
+            raise HTTPException(status_code=429, detail=str(err), headers={"Retry-After": str(err.retry_after)})
+        except InvalidSavedPlan as err:
+            raise HTTPException(status_code=400, detail=str(err))
         except Exception as err:
             logging.error(err)
             raise HTTPException(status_code=500, detail=str(err))
@@ -1,9 +1,39 @@
 # utils.py
 # Author: Thomas MINIER - MIT License 2017-2020
-from base64 import b64decode, b64encode
+import zlib
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from typing import Callable, Optional
 from urllib.parse import parse_qs, urlencode, urlparse, urlunparse
 
-from sage.query_engine.protobuf.iterators_pb2 import RootTree
+from google.protobuf.descriptor import FieldDescriptor
+from google.protobuf.message import Message
+
+from sage.query_engine.protobuf.iterators_pb2 import CompactRootTree, RootTree
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# Version of the format of saved plans. Legacy saved plans are plain RootTree messages,
+# which always start with a field tag (>= 0x08), so they cannot be mistaken for a version byte.
+SAVED_PLAN_VERSION = 1
+
+# Compression algorithms used for saved plans
+NO_COMPRESSION = 0
+DEFLATE_COMPRESSION = 1
+ZSTD_COMPRESSION = 2
+
+# Saved plans smaller than this size (in bytes) are not worth compressing
+COMPRESSION_THRESHOLD = 128
+
+# Maximum size (in bytes) of a decompressed saved plan, as next links are sent by clients
+MAX_PLAN_SIZE = 8 * 1024 * 1024
+
+
+class InvalidSavedPlan(ValueError):
+    """Raised when a saved plan sent by a client cannot be decoded"""
+    pass
 
 
 def secure_url(url: str) -> str:
@@ -19,8 +49,94 @@ def secure_url(url: str) -> str:
     return urlunparse((scheme, netloc, path, params, query, fragment)).replace("%7E", "~")
 
 
-def encode_saved_plan(savedPlan: RootTree) -> str:
-    """Encode a Protobuf-based saved plan into string format.
+def _map_strings(message: Message, func: Callable[[str], str]) -> None:
+    """Apply a function to all strings of a Protobuf message, including map keys and values, in place."""
+    for field, value in message.ListFields():
+        if field.type == FieldDescriptor.TYPE_MESSAGE:
+            if field.message_type.GetOptions().map_entry:
+                map_value_is_string = field.message_type.fields_by_name['value'].type == FieldDescriptor.TYPE_STRING
+                items = list(value.items())
+                value.clear()
+                for k, v in items:
+                    value[func(k)] = func(v) if map_value_is_string else v
+            elif field.label == FieldDescriptor.LABEL_REPEATED:
+                for submessage in value:
+                    _map_strings(submessage, func)
+            else:
+                _map_strings(value, func)
+        elif field.type == FieldDescriptor.TYPE_STRING:
+            if field.label == FieldDescriptor.LABEL_REPEATED:
+                value[:] = [func(v) for v in value]
+            else:
+                setattr(message, field.name, func(value))
+
+
+def _compress(payload: bytes) -> (int, bytes):
+    """Compress a serialized saved plan, if it is worth it.
+
+    Argument: The serialized saved plan.
+
+    Returns: A tuple (compression algorithm, compressed payload).
+    """
+    if len(payload) < COMPRESSION_THRESHOLD:
+        return NO_COMPRESSION, payload
+    if zstandard is not None:
+        algorithm, compressed = ZSTD_COMPRESSION, zstandard.ZstdCompressor().compress(payload)
+    else:
+        # raw deflate stream, without the zlib header and checksum
+        compressor = zlib.compressobj(9, zlib.DEFLATED, -15)
+        algorithm, compressed = DEFLATE_COMPRESSION, compressor.compress(payload) + compressor.flush()
+    if len(compressed) >= len(payload):
+        return NO_COMPRESSION, payload
+    return algorithm, compressed
+
+
+def _decompress(algorithm: int, payload: bytes) -> bytes:
+    """Decompress a serialized saved plan.
+
+    At most `MAX_PLAN_SIZE` bytes are decompressed, so a small payload sent by a client cannot exhaust the memory of the server.
+
+    Args:
+      * algorithm: Compression algorithm used to compress the saved plan.
+      * payload: The compressed saved plan.
+
+    Returns: The serialized saved plan.
+
+    Throws: `InvalidSavedPlan` if the compression algorithm is not supported, or if the decompressed saved plan is larger than `MAX_PLAN_SIZE`.
+    """
+    if algorithm == NO_COMPRESSION:
+        return payload
+    elif algorithm == DEFLATE_COMPRESSION:
+        decompressor = zlib.decompressobj(-15)
+        plan = decompressor.decompress(payload, MAX_PLAN_SIZE + 1)
+        if len(plan) > MAX_PLAN_SIZE or len(decompressor.unconsumed_tail) > 0:
+            raise InvalidSavedPlan(f'The saved plan is larger than {MAX_PLAN_SIZE} bytes once decompressed')
+        elif not decompressor.eof:
+            raise InvalidSavedPlan('The compressed saved plan is truncated')
+        return plan
+    elif algorithm == ZSTD_COMPRESSION:
+        if zstandard is None:
+            raise InvalidSavedPlan('The saved plan is compressed with zstd, but the zstandard package is not installed')
+        # the size written in the frame header is not trusted, as it is also sent by the client
+        plan = b''
+        with zstandard.ZstdDecompressor().stream_reader(payload) as reader:
+            while len(plan) <= MAX_PLAN_SIZE:
+                chunk = reader.read(MAX_PLAN_SIZE + 1 - len(plan))
+                if len(chunk) == 0:
+                    break
+                plan += chunk
+        if len(plan) > MAX_PLAN_SIZE:
+            raise InvalidSavedPlan(f'The saved plan is larger than {MAX_PLAN_SIZE} bytes once decompressed')
+        return plan
+    raise InvalidSavedPlan(f'Unsupported compression algorithm for the saved plan: {algorithm}')
+
+
+def encode_saved_plan(savedPlan: RootTree) -> Optional[str]:
+    """Encode a Protobuf-based saved plan into a compact string format.
+
+    RDF terms and variables are dictionary-encoded, so each of them is stored once even when it appears in
+    several nodes of the plan, then the plan is compressed. The encoded plan starts with a version byte and
+    the compression algorithm used, and it is encoded using URL-safe base64.
 
     Argument: A saved plan, encoded as a Protobuf message.
 
@@ -28,15 +144,45 @@ def encode_saved_plan(savedPlan: RootTree) -> str:
     """
     if savedPlan is None:
         return None
-    bytes = savedPlan.SerializeToString()
-    return b64encode(bytes).decode('utf-8')
+    compact = CompactRootTree()
+    compact.plan.CopyFrom(savedPlan)
+    terms = dict()
+
+    def to_index(term: str) -> str:
+        if term not in terms:
+            terms[term] = str(len(terms))
+        return terms[term]
+
+    _map_strings(compact.plan, to_index)
+    compact.terms.extend(terms.keys())
+    algorithm, payload = _compress(compact.SerializeToString())
+    encoded = urlsafe_b64encode(bytes([SAVED_PLAN_VERSION, algorithm]) + payload)
+    return encoded.decode('utf-8').rstrip('=')
 
 
-def decode_saved_plan(input: str) -> RootTree:
+def decode_saved_plan(input: str) -> Optional[RootTree]:
     """Decode a Protobuf-based saved plan from a string format.
 
+    Saved plans encoded in the legacy format, i.e., a standard base64 encoding of a RootTree message, are also supported.
+
     Argument: A saved plan, encoded as a string of bytes.
 
     Returns: The saved plan, encoded as a Protobuf message.
+
+    Throws: `InvalidSavedPlan` if the format of the saved plan is not supported, or if the saved plan is too large (see `MAX_PLAN_SIZE`).
     """
-    return b64decode(input) if input is not None else None
+    if input is None:
+        return None
+    input = input.replace('+', '-').replace('/', '_')
+    data = urlsafe_b64decode(input + '=' * (-len(input) % 4))
+    root = RootTree()
+    if len(data) == 0 or data[0] >= 0x08:
+        root.ParseFromString(data)
+        return root
+    if data[0] != SAVED_PLAN_VERSION:
+        raise InvalidSavedPlan(f'Unsupported version of the saved plan format: {data[0]}')
+    compact = CompactRootTree()
+    compact.ParseFromString(_decompress(data[1], data[2:]))
+    terms = compact.terms
+    _map_strings(compact.plan, lambda index: terms[int(index)])
+    return compact.plan
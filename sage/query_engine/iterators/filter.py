@@ -1,33 +1,15 @@
 # filter.py
 # Author: Thomas MINIER - MIT License 2017-2020
-from typing import Dict, Optional, Union
-
-from rdflib import Literal, URIRef, Variable
-from rdflib.plugins.sparql.algebra import translateQuery
-from rdflib.plugins.sparql.parser import parseQuery
-from rdflib.plugins.sparql.sparql import Bindings, QueryContext
-from rdflib.util import from_n3
+from typing import Dict, List, Optional
 
+from sage.database.db_connector import DatabaseConnector
+from sage.query_engine.iterators.filter_compiler import compile_filter
 from sage.query_engine.iterators.preemptable_iterator import PreemptableIterator
+from sage.query_engine.preemption import get_scheduler
 from sage.query_engine.protobuf.iterators_pb2 import SavedFilterIterator
 from sage.query_engine.protobuf.utils import pyDict_to_protoDict
 
 
-def to_rdflib_term(value: str) -> Union[Literal, URIRef, Variable]:
-    """Convert a N3 term to a RDFLib Term.
-
-    Argument: A RDF Term in N3 format.
-
-    Returns: The RDF Term in rdflib format.
-    """
-    if value.startswith('http'):
-        return URIRef(value)
-    elif '"^^http' in value:
-        index = value.find('"^^http')
-        value = f"{value[0:index+3]}<{value[index+3:]}>"
-    return from_n3(value)
-
-
 class FilterIterator(PreemptableIterator):
     """A FilterIterator evaluates a FILTER clause in a pipeline of iterators.
 
@@ -41,11 +23,9 @@ class FilterIterator(PreemptableIterator):
         super(FilterIterator, self).__init__()
         self._source = source
         self._raw_expression = expression
-        # compile the expression using rdflib
-        compiled_expr = parseQuery(f"SELECT * WHERE {{?s ?p ?o . FILTER({expression})}}")
-        compiled_expr = translateQuery(compiled_expr)
-        self._prologue = compiled_expr.prologue
-        self._compiled_expression = compiled_expr.algebra.p.p.expr
+        # compile the expression into a Python closure, which evaluates it on solution mappings in SaGe text format
+        self._compiled_expression = compile_filter(expression)
+        self._scheduler = get_scheduler(context)
 
     def __repr__(self) -> str:
         return f"<FilterIterator '{self._raw_expression}' on {self._source}>"
@@ -61,11 +41,7 @@ class FilterIterator(PreemptableIterator):
 
         Returns: The outcome of evaluating the SPARQL FILTER on the input set of solution mappings.
         """
-        d = {Variable(key[1:]): to_rdflib_term(value) for key, value in bindings.items()}
-        b = Bindings(d=d)
-        context = QueryContext(bindings=b)
-        context.prologue = self._prologue
-        return self._compiled_expression.eval(context)
+        return self._compiled_expression(bindings)
 
     def next_stage(self, mappings: Dict[str, str]):
         """Propagate mappings to the bottom of the pipeline in order to compute nested loop joins"""
@@ -86,6 +62,24 @@ class FilterIterator(PreemptableIterator):
             mu = await self._source.next()
         return mu
 
+    async def next_batch(self, size: int) -> List[Dict[str, str]]:
+        """Get a batch of items from the iterator, following the batched iterator protocol.
+
+        Argument: Maximum number of solution mappings to produce.
+
+        Returns: A list of at most `size` solution mappings that satisfy the FILTER expression.
+        """
+        if not self.has_next():
+            return []
+        batch = await self._source.next_batch(size)
+        # evaluating the FILTER expression is reported to the preemption scheduler
+        self._scheduler.tick(len(batch))
+        return [mu for mu in batch if self._evaluate(mu)]
+
+    def connectors(self) -> List[DatabaseConnector]:
+        """Get the database connectors read by the iterator and its operands"""
+        return self._source.connectors()
+
     def has_next(self) -> bool:
         """Return True if the iterator has more item to yield"""
         return self._source.has_next()
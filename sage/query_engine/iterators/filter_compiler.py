@@ -0,0 +1,582 @@
+# filter_compiler.py
+# Author: Thomas MINIER - MIT License 2017-2020
+import re
+from decimal import Decimal, InvalidOperation
+from functools import lru_cache
+from math import isnan
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
+
+from rdflib import BNode, Literal, URIRef, Variable
+from rdflib.namespace import XSD
+from rdflib.plugins.sparql.algebra import translateQuery
+from rdflib.plugins.sparql.parser import parseQuery
+from rdflib.plugins.sparql.sparql import Bindings, QueryContext, SPARQLError
+from rdflib.util import from_n3
+
+from sage.database.term_dictionary import decode_term
+
+# An expression compiled into a function, which evaluates it using a set of solution mappings.
+# It produces a RDF term in SaGe text format, or a native Python value (bool, int, Decimal or float) for computed values.
+CompiledExpression = Callable[[Dict[str, str]], Any]
+
+XSD_INTEGERS = set([str(dtype) for dtype in [
+    XSD.integer, XSD.int, XSD.long, XSD.short, XSD.byte,
+    XSD.nonNegativeInteger, XSD.positiveInteger, XSD.nonPositiveInteger, XSD.negativeInteger,
+    XSD.unsignedLong, XSD.unsignedInt, XSD.unsignedShort, XSD.unsignedByte
+]])
+XSD_DECIMAL = str(XSD.decimal)
+XSD_FLOATS = set([str(XSD.float), str(XSD.double)])
+XSD_BOOLEAN = str(XSD.boolean)
+XSD_STRING = str(XSD.string)
+
+REGEX_FLAGS = {'i': re.IGNORECASE, 's': re.DOTALL, 'm': re.MULTILINE, 'x': re.VERBOSE}
+
+
+class ExpressionError(Exception):
+    """Raised when the evaluation of a SPARQL expression produces an error, e.g., a type error or an unbound variable"""
+    pass
+
+
+def to_rdflib_term(value: str) -> Union[Literal, URIRef, Variable]:
+    """Convert a N3 term to a RDFLib Term.
+
+    Argument: A RDF Term in N3 format.
+
+    Returns: The RDF Term in rdflib format.
+    """
+    if value.startswith('http'):
+        return URIRef(value)
+    elif '"^^http' in value:
+        index = value.find('"^^http')
+        value = f"{value[0:index+3]}<{value[index+3:]}>"
+    return from_n3(value)
+
+
+def parse_literal(term: str) -> Tuple[str, Optional[str], Optional[str]]:
+    """Split a RDF Literal in SaGe text format into its lexical form, language tag and datatype.
+
+    Argument: A RDF Literal in SaGe text format.
+
+    Returns: A tuple (`lexical form`, `language tag`, `datatype`), where the language tag and the datatype may be None.
+    """
+    index = term.rfind('"')
+    lexical, suffix = term[1:index], term[index + 1:]
+    if suffix.startswith('@'):
+        return lexical, suffix[1:], None
+    elif suffix.startswith('^^'):
+        datatype = suffix[2:]
+        if datatype.startswith('<'):
+            datatype = datatype[1:-1]
+        return lexical, None, datatype
+    return lexical, None, None
+
+
+def is_literal(value: Any) -> bool:
+    """Return True if a value is a RDF Literal or a computed value"""
+    return not isinstance(value, str) or value.startswith('"')
+
+
+def is_blank(value: Any) -> bool:
+    """Return True if a value is a blank node"""
+    return isinstance(value, str) and value.startswith('_:')
+
+
+def to_number(value: Any) -> Optional[Union[int, Decimal, float]]:
+    """Get the numeric value of a value, or None if it is not numeric"""
+    if isinstance(value, bool):
+        return None
+    elif isinstance(value, (int, Decimal, float)):
+        return value
+    elif not value.startswith('"'):
+        return None
+    lexical, _, datatype = parse_literal(value)
+    try:
+        if datatype in XSD_INTEGERS:
+            return int(lexical)
+        elif datatype == XSD_DECIMAL:
+            return Decimal(lexical)
+        elif datatype in XSD_FLOATS:
+            return float(lexical)
+    except (ValueError, InvalidOperation):
+        raise ExpressionError(f"Invalid numeric literal {value}")
+    return None
+
+
+def to_term(value: Any) -> str:
+    """Convert a computed value into a RDF term in SaGe text format"""
+    if isinstance(value, bool):
+        return f'"{str(value).lower()}"^^<{XSD_BOOLEAN}>'
+    elif isinstance(value, int):
+        return f'"{value}"^^<{XSD.integer}>'
+    elif isinstance(value, Decimal):
+        return f'"{value}"^^<{XSD_DECIMAL}>'
+    elif isinstance(value, float):
+        return f'"{value}"^^<{XSD.double}>'
+    return value
+
+
+def from_rdflib_term(term: Any) -> Any:
+    """Convert a value produced by rdflib into a RDF term in SaGe text format"""
+    if isinstance(term, SPARQLError):
+        raise ExpressionError(str(term))
+    elif isinstance(term, Literal):
+        return term.n3()
+    elif isinstance(term, BNode):
+        return f"_:{term}"
+    return str(term)
+
+
+def typed_value(value: Any) -> Tuple[str, Any]:
+    """Get the value of a RDF term, with a tag that indicates which values it can be compared with.
+
+    Literals with a datatype unknown to the compiler are tagged as 'literal'.
+    """
+    number = to_number(value)
+    if number is not None:
+        return 'numeric', number
+    elif isinstance(value, bool):
+        return 'boolean', value
+    elif is_blank(value):
+        return 'bnode', value
+    elif not value.startswith('"'):
+        return 'iri', value
+    lexical, lang, datatype = parse_literal(value)
+    if lang is not None:
+        return f"@{lang.lower()}", lexical
+    elif datatype is None or datatype == XSD_STRING:
+        return 'string', lexical
+    elif datatype == XSD_BOOLEAN:
+        return 'boolean', lexical in ('true', '1')
+    return 'literal', value
+
+
+def effective_boolean_value(value: Any) -> bool:
+    """Compute the Effective Boolean Value of a value, following the SPARQL semantics"""
+    if isinstance(value, bool):
+        return value
+    tag, v = typed_value(value)
+    if tag == 'boolean':
+        return v
+    elif tag == 'numeric':
+        return not (v == 0 or (isinstance(v, float) and isnan(v)))
+    elif tag == 'string' or tag.startswith('@'):
+        return len(v) > 0
+    raise ExpressionError(f"Cannot compute the Effective Boolean Value of {value}")
+
+
+def equals(left: Any, right: Any) -> bool:
+    """Evaluate the SPARQL = operator"""
+    left_tag, left_value = typed_value(left)
+    right_tag, right_value = typed_value(right)
+    if left_tag == right_tag and left_tag != 'literal':
+        return left_value == right_value
+    elif left_tag in ('iri', 'bnode') or right_tag in ('iri', 'bnode'):
+        return False
+    elif left_tag != 'literal' and right_tag != 'literal':
+        # literals of incompatible kinds, e.g., a simple literal and a language-tagged literal, are distinct RDF terms
+        return False
+    try:
+        return to_rdflib_term(to_term(left)).eq(to_rdflib_term(to_term(right)))
+    except (TypeError, SPARQLError) as e:
+        raise ExpressionError(str(e))
+
+
+def less_than(left: Any, right: Any) -> bool:
+    """Evaluate the SPARQL < operator"""
+    left_tag, left_value = typed_value(left)
+    right_tag, right_value = typed_value(right)
+    if left_tag == right_tag and left_tag in ('numeric', 'string', 'boolean'):
+        return left_value < right_value
+    elif left_tag == 'literal' and right_tag == 'literal':
+        try:
+            return to_rdflib_term(left) < to_rdflib_term(right)
+        except TypeError as e:
+            raise ExpressionError(str(e))
+    raise ExpressionError(f"Cannot compare {left} and {right}")
+
+
+def compute(op: str, left: Any, right: Any) -> Union[int, Decimal, float]:
+    """Evaluate a SPARQL arithmetic operator"""
+    left, right = to_number(left), to_number(right)
+    if left is None or right is None:
+        raise ExpressionError(f"Arithmetic operator {op} can only be applied to numeric values")
+    # apply the numeric type promotion rules
+    if isinstance(left, float) or isinstance(right, float):
+        left, right = float(left), float(right)
+    elif isinstance(left, Decimal) or isinstance(right, Decimal):
+        left, right = Decimal(left), Decimal(right)
+    try:
+        if op == '+':
+            return left + right
+        elif op == '-':
+            return left - right
+        elif op == '*':
+            return left * right
+        # the division of two integers produces a decimal
+        elif isinstance(left, int):
+            return Decimal(left) / Decimal(right)
+        return left / right
+    except (ZeroDivisionError, InvalidOperation) as e:
+        raise ExpressionError(str(e))
+
+
+def string_value(value: Any) -> Tuple[str, Optional[str]]:
+    """Get the lexical form and the language tag of a string literal"""
+    if isinstance(value, str) and value.startswith('"'):
+        lexical, lang, datatype = parse_literal(value)
+        if datatype is None or datatype == XSD_STRING:
+            return lexical, lang
+    raise ExpressionError(f"{value} is not a string literal")
+
+
+def string_literal(lexical: str, lang: Optional[str] = None) -> str:
+    """Build a string literal in SaGe text format"""
+    return f'"{lexical}"@{lang}' if lang is not None else f'"{lexical}"'
+
+
+def lang_matches(tag: str, lang_range: str) -> bool:
+    """Evaluate the SPARQL langMatches function"""
+    tag, lang_range = tag.lower(), lang_range.lower()
+    if lang_range == '*':
+        return len(tag) > 0
+    return tag == lang_range or tag.startswith(lang_range + '-')
+
+
+def compile_regex(pattern: str, flags: Optional[str]):
+    """Compile a SPARQL regular expression into a Python regular expression"""
+    compiled_flags = 0
+    for flag in flags or '':
+        if flag not in REGEX_FLAGS:
+            raise ExpressionError(f"Unsupported regex flag {flag}")
+        compiled_flags |= REGEX_FLAGS[flag]
+    try:
+        return re.compile(pattern, compiled_flags)
+    except re.error as e:
+        raise ExpressionError(str(e))
+
+
+def unary(fn: Callable[[Any], Any], arg: CompiledExpression) -> CompiledExpression:
+    """Compile a function of one argument"""
+    return lambda mappings: fn(arg(mappings))
+
+
+def binary(fn: Callable[[Any, Any], Any], left: CompiledExpression, right: CompiledExpression) -> CompiledExpression:
+    """Compile a function of two arguments"""
+    return lambda mappings: fn(left(mappings), right(mappings))
+
+
+def builtin_str(value: Any) -> str:
+    """Evaluate the SPARQL STR function"""
+    if is_blank(value):
+        raise ExpressionError("STR cannot be applied to a blank node")
+    elif not is_literal(value):
+        return string_literal(value)
+    return string_literal(parse_literal(to_term(value))[0])
+
+
+def builtin_lang(value: Any) -> str:
+    """Evaluate the SPARQL LANG function"""
+    if not is_literal(value):
+        raise ExpressionError("LANG can only be applied to a literal")
+    lang = parse_literal(to_term(value))[1]
+    return string_literal(lang if lang is not None else '')
+
+
+def builtin_datatype(value: Any) -> str:
+    """Evaluate the SPARQL DATATYPE function"""
+    if not is_literal(value):
+        raise ExpressionError("DATATYPE can only be applied to a literal")
+    _, lang, datatype = parse_literal(to_term(value))
+    if lang is not None:
+        return 'http://www.w3.org/1999/02/22-rdf-syntax-ns#langString'
+    return datatype if datatype is not None else XSD_STRING
+
+
+def builtin_strlen(value: Any) -> int:
+    """Evaluate the SPARQL STRLEN function"""
+    return len(string_value(value)[0])
+
+
+def builtin_ucase(value: Any) -> str:
+    """Evaluate the SPARQL UCASE function"""
+    lexical, lang = string_value(value)
+    return string_literal(lexical.upper(), lang)
+
+
+def builtin_lcase(value: Any) -> str:
+    """Evaluate the SPARQL LCASE function"""
+    lexical, lang = string_value(value)
+    return string_literal(lexical.lower(), lang)
+
+
+def builtin_abs(value: Any) -> Union[int, Decimal, float]:
+    """Evaluate the SPARQL ABS function"""
+    number = to_number(value)
+    if number is None:
+        raise ExpressionError("ABS can only be applied to a numeric value")
+    return abs(number)
+
+
+def string_test(fn: Callable[[str, str], bool]) -> Callable[[Any, Any], bool]:
+    """Build a SPARQL function that tests two string literals, e.g., CONTAINS"""
+    def evaluate(left: Any, right: Any) -> bool:
+        left_lexical, left_lang = string_value(left)
+        right_lexical, right_lang = string_value(right)
+        if right_lang is not None and left_lang != right_lang:
+            raise ExpressionError("Incompatible language tags")
+        return fn(left_lexical, right_lexical)
+    return evaluate
+
+
+UNARY_BUILTINS = {
+    'Builtin_isIRI': lambda v: not is_literal(v) and not is_blank(v),
+    'Builtin_isURI': lambda v: not is_literal(v) and not is_blank(v),
+    'Builtin_isBLANK': is_blank,
+    'Builtin_isLITERAL': is_literal,
+    'Builtin_isNUMERIC': lambda v: to_number(v) is not None,
+    'Builtin_STR': builtin_str,
+    'Builtin_LANG': builtin_lang,
+    'Builtin_DATATYPE': builtin_datatype,
+    'Builtin_STRLEN': builtin_strlen,
+    'Builtin_UCASE': builtin_ucase,
+    'Builtin_LCASE': builtin_lcase,
+    'Builtin_ABS': builtin_abs
+}
+
+BINARY_BUILTINS = {
+    'Builtin_sameTerm': lambda left, right: to_term(left) == to_term(right),
+    'Builtin_LANGMATCHES': lambda tag, lang_range: lang_matches(string_value(tag)[0], string_value(lang_range)[0]),
+    'Builtin_CONTAINS': string_test(lambda left, right: right in left),
+    'Builtin_STRSTARTS': string_test(lambda left, right: left.startswith(right)),
+    'Builtin_STRENDS': string_test(lambda left, right: left.endswith(right))
+}
+
+
+class FilterCompiler(object):
+    """A FilterCompiler compiles SPARQL FILTER expressions into Python closures.
+
+    The closures directly evaluate the expression on solution mappings in SaGe text format,
+    and RDF terms are only converted when, and as far as, an operator needs it.
+    Expressions not supported by the compiler are evaluated using rdflib.
+
+    Argument: Prologue of the rdflib query that contains the expression.
+    """
+
+    def __init__(self, prologue=None):
+        super(FilterCompiler, self).__init__()
+        self._prologue = prologue
+
+    def compile(self, expr: Any) -> CompiledExpression:
+        """Compile a rdflib SPARQL expression.
+
+        Argument: SPARQL expression in rdflib format.
+
+        Returns: A function that evaluates the expression using a set of solution mappings.
+        """
+        if isinstance(expr, Variable):
+            return self._compile_variable(f"?{expr}")
+        elif isinstance(expr, Literal):
+            value = to_number(expr.n3())
+            if value is None and expr.datatype is not None and str(expr.datatype) == XSD_BOOLEAN:
+                value = expr.toPython()
+            if value is None:
+                value = expr.n3()
+            return lambda mappings: value
+        elif isinstance(expr, URIRef):
+            value = str(expr)
+            return lambda mappings: value
+        elif not hasattr(expr, 'name'):
+            return self._compile_fallback(expr)
+        elif expr.name == 'ConditionalAndExpression':
+            return self._compile_and([self.compile(expr.expr)] + [self.compile(e) for e in expr.other])
+        elif expr.name == 'ConditionalOrExpression':
+            return self._compile_or([self.compile(expr.expr)] + [self.compile(e) for e in expr.other])
+        elif expr.name == 'UnaryNot':
+            return unary(lambda v: not effective_boolean_value(v), self.compile(expr.expr))
+        elif expr.name == 'UnaryMinus':
+            return unary(lambda v: compute('-', 0, v), self.compile(expr.expr))
+        elif expr.name == 'UnaryPlus':
+            return unary(lambda v: compute('+', 0, v), self.compile(expr.expr))
+        elif expr.name == 'RelationalExpression':
+            return self._compile_relational(expr)
+        elif expr.name in ('AdditiveExpression', 'MultiplicativeExpression'):
+            compiled = self.compile(expr.expr)
+            for op, other in zip(expr.op, expr.other):
+                compiled = binary(lambda left, right, op=op: compute(op, left, right), compiled, self.compile(other))
+            return compiled
+        elif expr.name == 'Builtin_BOUND':
+            variable = f"?{expr.arg}"
+            return lambda mappings: variable in mappings
+        elif expr.name in UNARY_BUILTINS:
+            return unary(UNARY_BUILTINS[expr.name], self.compile(expr.arg))
+        elif expr.name in BINARY_BUILTINS:
+            return binary(BINARY_BUILTINS[expr.name], self.compile(expr.arg1), self.compile(expr.arg2))
+        elif expr.name == 'Builtin_REGEX' and isinstance(expr.pattern, Literal) and (expr.flags is None or isinstance(expr.flags, Literal)):
+            # the regular expression is compiled once, and not for each set of solution mappings
+            try:
+                regex = compile_regex(str(expr.pattern), str(expr.flags) if expr.flags is not None else None)
+            except ExpressionError:
+                return self._compile_fallback(expr)
+            return unary(lambda v: regex.search(string_value(v)[0]) is not None, self.compile(expr.text))
+        return self._compile_fallback(expr)
+
+    def _compile_variable(self, variable: str) -> CompiledExpression:
+        def evaluate(mappings: Dict[str, str]) -> str:
+            if variable not in mappings:
+                raise ExpressionError(f"Unbound variable {variable}")
+            # RDF terms encoded by the database are decoded only when a FILTER needs their value
+            return decode_term(mappings[variable])
+        return evaluate
+
+    def _compile_and(self, operands: List[CompiledExpression]) -> CompiledExpression:
+        def evaluate(mappings: Dict[str, str]) -> bool:
+            error = None
+            for operand in operands:
+                try:
+                    if not effective_boolean_value(operand(mappings)):
+                        return False
+                except ExpressionError as e:
+                    error = e
+            # false && error = false, but true && error = error
+            if error is not None:
+                raise error
+            return True
+        return evaluate
+
+    def _compile_or(self, operands: List[CompiledExpression]) -> CompiledExpression:
+        def evaluate(mappings: Dict[str, str]) -> bool:
+            error = None
+            for operand in operands:
+                try:
+                    if effective_boolean_value(operand(mappings)):
+                        return True
+                except ExpressionError as e:
+                    error = e
+            # true || error = true, but false || error = error
+            if error is not None:
+                raise error
+            return False
+        return evaluate
+
+    def _compile_relational(self, expr: Any) -> CompiledExpression:
+        left = self.compile(expr.expr)
+        if expr.op in ('IN', 'NOT IN'):
+            members = [self.compile(e) for e in expr.other]
+            expected = expr.op == 'IN'
+
+            def evaluate(mappings: Dict[str, str]) -> bool:
+                value = left(mappings)
+                error = None
+                for member in members:
+                    try:
+                        if equals(value, member(mappings)):
+                            return expected
+                    except ExpressionError as e:
+                        error = e
+                if error is not None:
+                    raise error
+                return not expected
+            return evaluate
+        right = self.compile(expr.other)
+        if expr.op == '=':
+            return binary(equals, left, right)
+        elif expr.op == '!=':
+            return binary(lambda l, r: not equals(l, r), left, right)
+        elif expr.op == '<':
+            return binary(less_than, left, right)
+        elif expr.op == '>':
+            return binary(lambda l, r: less_than(r, l), left, right)
+        elif expr.op == '<=':
+            return binary(lambda l, r: not less_than(r, l), left, right)
+        elif expr.op == '>=':
+            return binary(lambda l, r: not less_than(l, r), left, right)
+        return self._compile_fallback(expr)
+
+    def _compile_fallback(self, expr: Any) -> CompiledExpression:
+        prologue = self._prologue
+
+        def evaluate(mappings: Dict[str, str]) -> Any:
+            d = {Variable(key[1:]): to_rdflib_term(decode_term(value)) for key, value in mappings.items()}
+            context = QueryContext(bindings=Bindings(d=d))
+            context.prologue = prologue
+            try:
+                return from_rdflib_term(expr.eval(context))
+            except SPARQLError as e:
+                raise ExpressionError(str(e))
+        return evaluate
+
+
+def parse_filter(expression: str) -> Tuple[Any, Any]:
+    """Parse a SPARQL FILTER expression using rdflib.
+
+    Argument: A SPARQL FILTER expression.
+
+    Returns: A tuple (`expression`, `prologue`) with the expression in rdflib format and the prologue of the query used to parse it.
+    """
+    compiled_query = translateQuery(parseQuery(f"SELECT * WHERE {{?s ?p ?o . FILTER({expression})}}"))
+    return compiled_query.algebra.p.p.expr, compiled_query.prologue
+
+
+# compiled expressions are stateless, so they can be shared by all iterators that evaluate the same expression
+@lru_cache(maxsize=1024)
+def compile_filter(expression: str) -> Callable[[Dict[str, str]], bool]:
+    """Compile a SPARQL FILTER expression into a Python closure.
+
+    Argument: A SPARQL FILTER expression.
+
+    Returns: A function that evaluates the FILTER expression on a set of solution mappings.
+    """
+    # rdflib is only used to parse the expression, once
+    expr, prologue = parse_filter(expression)
+    compiled_expression = FilterCompiler(prologue).compile(expr)
+
+    def evaluate(mappings: Dict[str, str]) -> bool:
+        try:
+            return effective_boolean_value(compiled_expression(mappings))
+        except ExpressionError:
+            # an error in a FILTER expression eliminates the solution
+            return False
+    return evaluate
+
+
+def get_term_constraint(expr: Any) -> Optional[Tuple[str, str, str]]:
+    """Get the constraint on a RDF term expressed by a simple SPARQL FILTER expression, if any"""
+    if not hasattr(expr, 'name'):
+        return None
+    elif expr.name == 'RelationalExpression' and expr.op == '=':
+        left, right = expr.expr, expr.other
+        if isinstance(right, Variable) or (hasattr(right, 'name') and right.name == 'Builtin_LANG'):
+            left, right = right, left
+        # ?x = <iri>, as the equality of IRIs is term equality
+        if isinstance(left, Variable) and isinstance(right, URIRef):
+            return f"?{left}", '=', str(right)
+        # lang(?x) = "en"
+        elif hasattr(left, 'name') and left.name == 'Builtin_LANG' and isinstance(left.arg, Variable) and isinstance(right, Literal) and right.language is None and right.datatype is None and len(str(right)) > 0:
+            return f"?{left.arg}", 'lang', str(right)
+    # strStarts(?x, "prefix")
+    elif expr.name == 'Builtin_STRSTARTS' and isinstance(expr.arg1, Variable) and isinstance(expr.arg2, Literal) and expr.arg2.language is None and expr.arg2.datatype is None:
+        # escaped characters may be encoded differently by the database
+        if '"' in expr.arg2 or '\\' in expr.arg2:
+            return None
+        return f"?{expr.arg1}", 'prefix', f'"{expr.arg2}'
+    return None
+
+
+@lru_cache(maxsize=1024)
+def get_term_constraints(expression: str) -> List[Tuple[str, str, str]]:
+    """Get the constraints on RDF terms that are necessary to satisfy a SPARQL FILTER expression.
+
+    Such constraints can be evaluated by database connectors when scanning for RDF triples.
+    Supported constraints are:
+      * (`variable`, '=', `term`): the variable is bound to the RDF term (in SaGe text format).
+      * (`variable`, 'prefix', `prefix`): the variable is bound to a RDF term whose text starts with the prefix.
+      * (`variable`, 'lang', `tag`): the variable is bound to a RDF literal with the language tag.
+
+    Argument: A SPARQL FILTER expression.
+
+    Returns: The list of constraints found in the conjunction of the FILTER expression.
+    """
+    expr, _ = parse_filter(expression)
+    conjuncts = [expr.expr] + expr.other if hasattr(expr, 'name') and expr.name == 'ConditionalAndExpression' else [expr]
+    constraints = [get_term_constraint(conjunct) for conjunct in conjuncts]
+    return [constraint for constraint in constraints if constraint is not None]
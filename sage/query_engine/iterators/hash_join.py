@@ -0,0 +1,207 @@
+# hash_join.py
+# Author: Thomas MINIER - MIT License 2017-2020
+from typing import Any, Dict, List, Optional, Tuple
+
+from sage.database.db_connector import DatabaseConnector
+from sage.database.term_dictionary import EncodedTerm, TermDictionary, decode_terms
+from sage.query_engine.iterators.mappings import get_schema, merge_mappings
+from sage.query_engine.iterators.preemptable_iterator import PreemptableIterator
+from sage.query_engine.preemption import get_scheduler
+from sage.query_engine.protobuf.iterators_pb2 import SavedSymmetricHashJoinIterator
+from sage.query_engine.protobuf.utils import pyDict_to_protoDict
+
+HashTable = Dict[Tuple[str, ...], List[Dict[str, str]]]
+
+
+class SymmetricHashJoinIterator(PreemptableIterator):
+    """A SymmetricHashJoinIterator implements a Symmetric Hash join in a pipeline of iterators.
+
+    Both operands are read alternatively. Each solution mappings read from one operand is
+    inserted in the hash table of this operand, and then probed against the hash table of the other operand.
+    Unlike an Index Loop join, it does not re-evaluate the inner relation for each solution of the outer relation,
+    so it is well suited when both operands have large cardinalities.
+    Both hash tables are saved with the iterator, so the join can be resumed exactly.
+
+    Join keys encoded by a database (see `sage.database.term_dictionary`) are hashed using their keys in the dictionary
+    of the first encoded RDF term read. Other RDF terms are converted to keys of this dictionary (`TermDictionary#key_of`).
+
+    Args:
+      * left: Left operand of the join.
+      * right: Right operand of the join.
+      * join_variables: SPARQL variables shared by both operands.
+      * context: Information about the query execution.
+      * left_table: Solution mappings already read from the left operand.
+      * right_table: Solution mappings already read from the right operand.
+      * pending: Solution mappings produced but not yet yielded when the preemption occured.
+      * read_left: True if the next solution mappings must be read from the left operand, False otherwise.
+    """
+
+    def __init__(self, left: PreemptableIterator, right: PreemptableIterator, join_variables: List[str], context: dict, left_table: List[Dict[str, str]] = list(), right_table: List[Dict[str, str]] = list(), pending: List[Dict[str, str]] = list(), read_left: bool = True):
+        super(SymmetricHashJoinIterator, self).__init__()
+        self._left = left
+        self._right = right
+        self._join_variables = sorted(join_variables)
+        self._left_table: HashTable = dict()
+        self._right_table: HashTable = dict()
+        self._nb_left = 0
+        self._nb_right = 0
+        # dictionary used to hash the join keys, and keys of the RDF terms converted for this dictionary
+        self._dictionary: Optional[TermDictionary] = None
+        self._converted_keys: Dict[Any, Any] = dict()
+        # mappings read from a saved plan use the schema of the pipeline
+        schema = get_schema(context)
+        self._scheduler = get_scheduler(context)
+        for mappings in left_table:
+            self._insert(schema.from_dict(mappings), True)
+        for mappings in right_table:
+            self._insert(schema.from_dict(mappings), False)
+        self._pending = [schema.from_dict(mappings) for mappings in pending]
+        self._read_left = read_left
+
+    def __repr__(self) -> str:
+        return f"<SymmetricHashJoinIterator ({self._left} JOIN {self._right} ON {self._join_variables})>"
+
+    def serialized_name(self) -> str:
+        """Get the name of the iterator, as used in the plan serialization protocol"""
+        return "hash_join"
+
+    def _key(self, mappings: Dict[str, str]) -> Tuple[Any, ...]:
+        terms = [mappings[v] for v in self._join_variables]
+        if self._dictionary is None:
+            for term in terms:
+                if type(term) is EncodedTerm:
+                    self._use_dictionary(term.dictionary)
+                    break
+        return tuple(self._term_key(term) for term in terms)
+
+    def _term_key(self, term: Any) -> Any:
+        """Get the key used to hash a RDF term, encoded or not"""
+        if self._dictionary is None:
+            return term
+        elif type(term) is EncodedTerm and term.dictionary is self._dictionary:
+            return term.key
+        value = str(term)
+        if value not in self._converted_keys:
+            self._converted_keys[value] = self._dictionary.key_of(value)
+        return self._converted_keys[value]
+
+    def _use_dictionary(self, dictionary: TermDictionary) -> None:
+        """Hash the join keys using the keys of a dictionary, and hash again the solution mappings already read"""
+        self._dictionary = dictionary
+        for table in [self._left_table, self._right_table]:
+            buckets = list(table.values())
+            table.clear()
+            for bucket in buckets:
+                for mappings in bucket:
+                    key = self._key(mappings)
+                    if key not in table:
+                        table[key] = list()
+                    table[key].append(mappings)
+
+    def _insert(self, mappings: Dict[str, str], is_left: bool) -> None:
+        """Insert a set of solution mappings in the hash table of one operand"""
+        table = self._left_table if is_left else self._right_table
+        key = self._key(mappings)
+        if key not in table:
+            table[key] = list()
+        table[key].append(mappings)
+        if is_left:
+            self._nb_left += 1
+        else:
+            self._nb_right += 1
+
+    def _probe(self, mappings: Dict[str, str], is_left: bool) -> List[Dict[str, str]]:
+        """Join a set of solution mappings with the hash table of the other operand"""
+        table = self._right_table if is_left else self._left_table
+        key = self._key(mappings)
+        if key not in table:
+            return []
+        return [merge_mappings(mappings, mu) for mu in table[key]]
+
+    def next_stage(self, mappings: Dict[str, str]):
+        """Propagate mappings to the bottom of the pipeline in order to compute nested loop joins"""
+        self._left_table, self._right_table = dict(), dict()
+        self._nb_left, self._nb_right = 0, 0
+        self._pending = list()
+        self._read_left = True
+        self._left.next_stage(mappings)
+        self._right.next_stage(mappings)
+
+    def connectors(self) -> List[DatabaseConnector]:
+        """Get the database connectors read by the iterator and its operands"""
+        return self._left.connectors() + self._right.connectors()
+
+    def has_next(self) -> bool:
+        """Return True if the iterator has more item to yield"""
+        if len(self._pending) > 0:
+            return True
+        # if an operand is exhausted and produced no solutions, the join cannot produce any more solutions
+        elif (not self._left.has_next() and self._nb_left == 0) or (not self._right.has_next() and self._nb_right == 0):
+            return False
+        return self._left.has_next() or self._right.has_next()
+
+    async def next(self) -> Optional[Dict[str, str]]:
+        """Get the next item from the iterator, following the iterator protocol.
+
+        This function may contains `non interruptible` clauses which must
+        be atomically evaluated before preemption occurs.
+
+        Returns: A set of solution mappings, or `None` if none was produced during this call.
+        """
+        batch = await self.next_batch(1)
+        return batch[0] if len(batch) > 0 else None
+
+    async def next_batch(self, size: int) -> List[Dict[str, str]]:
+        """Get a batch of items from the iterator, following the batched iterator protocol.
+
+        Solutions produced in excess are kept as pending solutions, and yielded first by the next call.
+        Each solution mappings inserted and probed is reported to the preemption scheduler,
+        and the call stops once the time quantum is exhausted.
+
+        Argument: Maximum number of solution mappings to produce.
+
+        Returns: A list of at most `size` solution mappings.
+        """
+        batch = self._pending[:size]
+        self._pending = self._pending[size:]
+        nb_reads = 0
+        while len(batch) < size and nb_reads < size and not self._scheduler.exhausted and self.has_next():
+            nb_reads += 1
+            # read alternatively from both operands, until one of them is exhausted
+            is_left = (self._read_left and self._left.has_next()) or not self._right.has_next()
+            self._read_left = not is_left
+            source, other = (self._left, self._right) if is_left else (self._right, self._left)
+            mappings_read = await source.next_batch(size - len(batch))
+            # the join keys encoded by another dictionary are converted using their values, which are decoded at once
+            if self._dictionary is not None:
+                decode_terms(mappings[v] for mappings in mappings_read for v in self._join_variables if v in mappings and type(mappings[v]) is EncodedTerm and mappings[v].dictionary is not self._dictionary)
+            for mappings in mappings_read:
+                # no need to store solutions that no longer need to be probed by the other operand
+                if other.has_next():
+                    self._insert(mappings, is_left)
+                batch += self._probe(mappings, is_left)
+            self._scheduler.tick(len(mappings_read) + 1)
+        if len(batch) > size:
+            self._pending += batch[size:]
+            batch = batch[:size]
+        return batch
+
+    def save(self) -> SavedSymmetricHashJoinIterator:
+        """Save and serialize the iterator as a Protobuf message"""
+        saved_join = SavedSymmetricHashJoinIterator()
+        # export left source
+        left_field = self._left.serialized_name() + '_left'
+        getattr(saved_join, left_field).CopyFrom(self._left.save())
+        # export right source
+        right_field = self._right.serialized_name() + '_right'
+        getattr(saved_join, right_field).CopyFrom(self._right.save())
+        saved_join.join_variables.extend(self._join_variables)
+        # export hash tables and pending solutions
+        for table, saved_table in [(self._left_table, saved_join.left_table), (self._right_table, saved_join.right_table)]:
+            for bucket in table.values():
+                for mappings in bucket:
+                    pyDict_to_protoDict(mappings, saved_table.add().values)
+        for mappings in self._pending:
+            pyDict_to_protoDict(mappings, saved_join.pending.add().values)
+        saved_join.read_left = self._read_left
+        return saved_join
@@ -5,20 +5,22 @@ from typing import Dict, Optional, Union
 
 from sage.database.core.dataset import Dataset
 from sage.query_engine.iterators.filter import FilterIterator
+from sage.query_engine.iterators.hash_join import SymmetricHashJoinIterator
 from sage.query_engine.iterators.nlj import IndexJoinIterator
 from sage.query_engine.iterators.preemptable_iterator import PreemptableIterator
 from sage.query_engine.iterators.projection import ProjectionIterator
 from sage.query_engine.iterators.scan import ScanIterator
-from sage.query_engine.iterators.union import BagUnionIterator
+from sage.query_engine.iterators.union import build_union
 from sage.query_engine.protobuf.iterators_pb2 import (RootTree,
                                                       SavedBagUnionIterator,
                                                       SavedFilterIterator,
                                                       SavedIndexJoinIterator,
                                                       SavedProjectionIterator,
-                                                      SavedScanIterator)
+                                                      SavedScanIterator,
+                                                      SavedSymmetricHashJoinIterator)
 from sage.query_engine.protobuf.utils import protoTriple_to_dict
 
-SavedProtobufPlan = Union[RootTree,SavedBagUnionIterator,SavedFilterIterator,SavedIndexJoinIterator,SavedProjectionIterator,SavedScanIterator]
+SavedProtobufPlan = Union[RootTree,SavedBagUnionIterator,SavedFilterIterator,SavedIndexJoinIterator,SavedProjectionIterator,SavedScanIterator,SavedSymmetricHashJoinIterator]
 
 
 def load(saved_plan: SavedProtobufPlan, dataset: Dataset, context: dict) -> PreemptableIterator:
@@ -36,8 +38,10 @@ def load(saved_plan: SavedProtobufPlan, dataset: Dataset, context: dict) -> Pree
     if isinstance(saved_plan, bytes):
         root = RootTree()
         root.ParseFromString(saved_plan)
-        sourceField = root.WhichOneof('source')
-        saved_plan = getattr(root, sourceField)
+        saved_plan = root
+    if type(saved_plan) is RootTree:
+        sourceField = saved_plan.WhichOneof('source')
+        saved_plan = getattr(saved_plan, sourceField)
     # load the plan based on the current node
     if type(saved_plan) is SavedFilterIterator:
         return load_filter(saved_plan, dataset, context)
@@ -49,6 +53,8 @@ def load(saved_plan: SavedProtobufPlan, dataset: Dataset, context: dict) -> Pree
         return load_nlj(saved_plan, dataset, context)
     elif type(saved_plan) is SavedBagUnionIterator:
         return load_union(saved_plan, dataset, context)
+    elif type(saved_plan) is SavedSymmetricHashJoinIterator:
+        return load_hash_join(saved_plan, dataset, context)
     else:
         raise Exception(f"Unknown iterator type '{type(saved_plan)}' when loading controls")
 
@@ -109,7 +115,10 @@ def load_scan(saved_plan: SavedScanIterator, dataset: Dataset, context: dict) ->
     mu = None
     if len(saved_plan.mu) > 0:
         mu = dict(saved_plan.mu)
-    return ScanIterator(connector, pattern, context, current_mappings=current_mappings, mu=mu, last_read=saved_plan.last_read, as_of=as_of)
+    # a scan saved before it was started has no last_read ID, nor a known cardinality
+    last_read = None if saved_plan.from_start else saved_plan.last_read
+    cardinality = None if saved_plan.from_start and saved_plan.cardinality == 0 else saved_plan.cardinality
+    return ScanIterator(connector, pattern, context, current_mappings=current_mappings, mu=mu, last_read=last_read, as_of=as_of, filters=list(saved_plan.filters), cardinality=cardinality)
 
 
 def load_nlj(saved_plan: SavedIndexJoinIterator, dataset: Dataset, context: dict) -> PreemptableIterator:
@@ -130,11 +139,33 @@ def load_nlj(saved_plan: SavedIndexJoinIterator, dataset: Dataset, context: dict
     current_mappings = None
     if len(saved_plan.muc) > 0:
         current_mappings = dict(saved_plan.muc)
-    return IndexJoinIterator(left, right, context, current_mappings=current_mappings)
+    pending_mappings = [dict(mappings.values) for mappings in saved_plan.pending]
+    return IndexJoinIterator(left, right, context, current_mappings=current_mappings, pending_mappings=pending_mappings)
+
+
+def load_hash_join(saved_plan: SavedSymmetricHashJoinIterator, dataset: Dataset, context: dict) -> PreemptableIterator:
+    """Load a SymmetricHashJoinIterator from a protobuf serialization.
+
+    Args:
+      * saved_plan: Saved query execution plan.
+      * dataset: RDF dataset used to execute the plan.
+      * context: Information about the query execution.
+
+    Returns:
+      The pipeline of iterator used to continue query execution.
+    """
+    leftField = saved_plan.WhichOneof('left')
+    left = load(getattr(saved_plan, leftField), dataset, context)
+    rightField = saved_plan.WhichOneof('right')
+    right = load(getattr(saved_plan, rightField), dataset, context)
+    left_table = [dict(mappings.values) for mappings in saved_plan.left_table]
+    right_table = [dict(mappings.values) for mappings in saved_plan.right_table]
+    pending = [dict(mappings.values) for mappings in saved_plan.pending]
+    return SymmetricHashJoinIterator(left, right, list(saved_plan.join_variables), context, left_table=left_table, right_table=right_table, pending=pending, read_left=saved_plan.read_left)
 
 
 def load_union(saved_plan: SavedBagUnionIterator, dataset: Dataset, context: dict) -> PreemptableIterator:
-    """Load a BagUnionIterator from a protobuf serialization.
+    """Load a BagUnionIterator, or a ParallelBagUnionIterator (see `build_union`), from a protobuf serialization.
 
     Args:
       * saved_plan: Saved query execution plan.
@@ -148,4 +179,4 @@ def load_union(saved_plan: SavedBagUnionIterator, dataset: Dataset, context: dic
     left = load(getattr(saved_plan, leftField), dataset, context)
     rightField = saved_plan.WhichOneof('right')
     right = load(getattr(saved_plan, rightField), dataset, context)
-    return BagUnionIterator(left, right, context)
+    return build_union(left, right, context)
@@ -0,0 +1,173 @@
+# mappings.py
+# Author: Thomas MINIER - MIT License 2017-2020
+from collections.abc import Mapping
+from itertools import zip_longest
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+
+class MappingsSchema(object):
+    """A MappingsSchema assigns a position (a slot) to each SPARQL variable of a query.
+
+    The schema is shared by all the iterators of a pipeline, through the context of the query execution (see `get_schema`).
+    Positions are resolved when the pipeline is built or loaded, and a variable never changes its position,
+    so all the `SolutionMappings` produced while executing the pipeline can be read using the same positions.
+    """
+
+    def __init__(self):
+        super(MappingsSchema, self).__init__()
+        self._variables: List[str] = list()
+        self._positions: Dict[str, int] = dict()
+
+    def __len__(self) -> int:
+        return len(self._variables)
+
+    def __repr__(self) -> str:
+        return f"<MappingsSchema {self._variables}>"
+
+    @property
+    def variables(self) -> List[str]:
+        """Get the SPARQL variables of the schema, ordered by position"""
+        return self._variables
+
+    def position(self, variable: str) -> int:
+        """Get the position of a SPARQL variable, and assign it a new position if it is not in the schema yet"""
+        if variable not in self._positions:
+            self._positions[variable] = len(self._variables)
+            self._variables.append(variable)
+        return self._positions[variable]
+
+    def selector(self, variables: List[Optional[str]]) -> List[Tuple[int, int]]:
+        """Resolve the positions of the SPARQL variables of a triple pattern.
+
+        Argument: SPARQL variables of the triple pattern (see `sage.query_engine.iterators.utils.vars_positions`).
+
+        Returns: A list of pairs (position in a RDF triple, position in the schema), to be used with `MappingsSchema#select`.
+        """
+        return [(index, self.position(variable)) for index, variable in enumerate(variables) if variable is not None]
+
+    def select(self, triple: Tuple[Any, Any, Any], selector: List[Tuple[int, int]]) -> 'SolutionMappings':
+        """Apply a selection on a RDF triple, producing a set of solution mappings.
+
+        Args:
+          * triple: RDF triple on which the selection is applied.
+          * selector: Positions of the variables of the selection (see `MappingsSchema#selector`).
+
+        Returns: A set of solution mappings built from the selection results.
+        """
+        values = [None] * len(self._variables)
+        for index, position in selector:
+            values[position] = triple[index]
+        return SolutionMappings(self, tuple(values))
+
+    def from_dict(self, mappings: Mapping) -> 'SolutionMappings':
+        """Convert a dict-based set of solution mappings, e.g., read from a saved plan, into a `SolutionMappings` of this schema"""
+        positions = [(self.position(variable), value) for variable, value in mappings.items()]
+        values = [None] * len(self._variables)
+        for position, value in positions:
+            values[position] = value
+        return SolutionMappings(self, tuple(values))
+
+
+class SolutionMappings(Mapping):
+    """A set of solution mappings, stored as a tuple of values indexed by the positions of a `MappingsSchema`.
+
+    Unbound variables have a None value. It behaves like a read-only dict of variables to RDF terms,
+    so FILTER expressions, bindings and saved plans read it like a dict, while joins merge two sets of
+    solution mappings without building a new dict. It is converted into a dict (see `to_dict`)
+    only when the results are serialized by the HTTP and gRPC servers.
+
+    Args:
+      * schema: Schema of the solution mappings.
+      * values: Values of the solution mappings, ordered by position in the schema.
+    """
+
+    __slots__ = ('_schema', '_values')
+
+    def __init__(self, schema: MappingsSchema, values: Tuple[Any, ...]):
+        self._schema = schema
+        self._values = values
+
+    @property
+    def schema(self) -> MappingsSchema:
+        return self._schema
+
+    def __getitem__(self, variable: str) -> Any:
+        position = self._schema._positions.get(variable)
+        if position is not None and position < len(self._values):
+            value = self._values[position]
+            if value is not None:
+                return value
+        raise KeyError(variable)
+
+    def __contains__(self, variable: Any) -> bool:
+        position = self._schema._positions.get(variable)
+        return position is not None and position < len(self._values) and self._values[position] is not None
+
+    def __iter__(self) -> Iterator[str]:
+        for variable, value in zip(self._schema._variables, self._values):
+            if value is not None:
+                yield variable
+
+    def __len__(self) -> int:
+        return len(self._values) - self._values.count(None)
+
+    def __repr__(self) -> str:
+        return f"<SolutionMappings {self.to_dict()}>"
+
+    def keys(self) -> List[str]:
+        return [variable for variable, value in zip(self._schema._variables, self._values) if value is not None]
+
+    def values(self) -> List[Any]:
+        return [value for value in self._values if value is not None]
+
+    def items(self) -> List[Tuple[str, Any]]:
+        return [(variable, value) for variable, value in zip(self._schema._variables, self._values) if value is not None]
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert the solution mappings into a dict"""
+        return dict(self.items())
+
+    def merge(self, other: Mapping) -> 'SolutionMappings':
+        """Merge two compatible sets of solution mappings, e.g., to produce the result of a join"""
+        if type(other) is SolutionMappings and other._schema is self._schema:
+            return SolutionMappings(self._schema, tuple(right if right is not None else left for left, right in zip_longest(self._values, other._values)))
+        return self._schema.from_dict({**self, **other})
+
+    def project(self, variables: Iterable[str]) -> 'SolutionMappings':
+        """Keep only the bindings of some SPARQL variables"""
+        return SolutionMappings(self._schema, tuple(value if variable in variables else None for variable, value in zip(self._schema._variables, self._values)))
+
+    def map_values(self, function: Callable[[Any], Any]) -> 'SolutionMappings':
+        """Apply a function to the value of each bound variable"""
+        return SolutionMappings(self._schema, tuple(function(value) if value is not None else None for value in self._values))
+
+
+Mappings = Union[SolutionMappings, Dict[str, Any]]
+
+
+def get_schema(context: dict) -> MappingsSchema:
+    """Get the schema of the solution mappings produced by a pipeline of iterators, stored in the context of the query execution"""
+    if 'schema' not in context:
+        context['schema'] = MappingsSchema()
+    return context['schema']
+
+
+def merge_mappings(left: Mappings, right: Mappings) -> Mappings:
+    """Merge two compatible sets of solution mappings, using `SolutionMappings#merge` when possible"""
+    if type(left) is SolutionMappings:
+        return left.merge(right)
+    elif type(right) is SolutionMappings:
+        return right.schema.from_dict({**left, **right})
+    return {**left, **right}
+
+
+def project_mappings(mappings: Mappings, variables: Iterable[str]) -> Mappings:
+    """Keep only the bindings of some SPARQL variables in a set of solution mappings"""
+    if type(mappings) is SolutionMappings:
+        return mappings.project(variables)
+    return {variable: value for variable, value in mappings.items() if variable in variables}
+
+
+def to_dict(mappings: Mappings) -> Dict[str, Any]:
+    """Convert a set of solution mappings into a dict"""
+    return mappings.to_dict() if type(mappings) is SolutionMappings else mappings
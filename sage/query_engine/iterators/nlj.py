@@ -1,8 +1,12 @@
 # nlj.py
 # Author: Thomas MINIER - MIT License 2017-2020
-from typing import Dict, Optional
+from typing import Dict, List, Optional
 
+from sage.database.db_connector import DatabaseConnector
+from sage.query_engine.iterators.mappings import get_schema, merge_mappings
 from sage.query_engine.iterators.preemptable_iterator import PreemptableIterator
+from sage.query_engine.iterators.scan import ScanIterator
+from sage.query_engine.preemption import get_scheduler
 from sage.query_engine.protobuf.iterators_pb2 import SavedIndexJoinIterator, TriplePattern
 from sage.query_engine.protobuf.utils import pyDict_to_protoDict
 
@@ -15,13 +19,18 @@ class IndexJoinIterator(PreemptableIterator):
       * right: Next iterator in the pipeline, i.e., the inner relation of the join.
       * context: Information about the query execution.
       * current_mappings: The current mappings when the join is performed.
+      * pending_mappings: Mappings read from the outer relation but not yet joined with the inner relation.
     """
 
-    def __init__(self, left: PreemptableIterator, right: PreemptableIterator, context: dict, current_mappings: Optional[Dict[str, str]] = None):
+    def __init__(self, left: PreemptableIterator, right: PreemptableIterator, context: dict, current_mappings: Optional[Dict[str, str]] = None, pending_mappings: List[Dict[str, str]] = list()):
         super(IndexJoinIterator, self).__init__()
         self._left = left
         self._right = right
-        self._current_mappings = current_mappings
+        # mappings read from a saved plan use the schema of the pipeline
+        schema = get_schema(context)
+        self._current_mappings = schema.from_dict(current_mappings) if current_mappings is not None else None
+        self._pending_mappings = [schema.from_dict(mappings) for mappings in pending_mappings]
+        self._scheduler = get_scheduler(context)
 
     def __repr__(self) -> str:
         return f"<IndexJoinIterator ({self._left} JOIN {self._right} WITH {self._current_mappings})>"
@@ -33,11 +42,16 @@ class IndexJoinIterator(PreemptableIterator):
     def next_stage(self, mappings: Dict[str, str]):
         """Propagate mappings to the bottom of the pipeline in order to compute nested loop joins"""
         self._current_mappings = None
+        self._pending_mappings = list()
         self._left.next_stage(mappings)
 
+    def connectors(self) -> List[DatabaseConnector]:
+        """Get the database connectors read by the iterator and its operands"""
+        return self._left.connectors() + self._right.connectors()
+
     def has_next(self) -> bool:
         """Return True if the iterator has more item to yield"""
-        return self._left.has_next() or (self._current_mappings is not None and self._right.has_next())
+        return len(self._pending_mappings) > 0 or self._left.has_next() or (self._current_mappings is not None and self._right.has_next())
 
     async def next(self) -> Optional[Dict[str, str]]:
         """Get the next item from the iterator, following the iterator protocol.
@@ -50,15 +64,53 @@ class IndexJoinIterator(PreemptableIterator):
         if not self.has_next():
             return None
         while self._current_mappings is None or not self._right.has_next():
-            self._current_mappings = await self._left.next()
+            if len(self._pending_mappings) > 0:
+                self._current_mappings = self._pending_mappings.pop(0)
+            else:
+                self._current_mappings = await self._left.next()
             if self._current_mappings is None:
                 return None
             self._right.next_stage(self._current_mappings)
         mu = await self._right.next()
         if mu is not None:
-            return {**self._current_mappings, **mu}
+            return merge_mappings(self._current_mappings, mu)
         return None
 
+    async def next_batch(self, size: int) -> List[Dict[str, str]]:
+        """Get a batch of items from the iterator, following the batched iterator protocol.
+
+        The number of inner loops performed during a call is bounded by `size`,
+        so a call may return fewer than `size` solution mappings even if the join is not finished.
+        Each loop is reported to the preemption scheduler, and the call stops once the time quantum is exhausted.
+        When the database supports it, the inner relation is probed by blocks of solutions from the outer relation,
+        using a single call to search_many per block.
+
+        Argument: Maximum number of solution mappings to produce.
+
+        Returns: A list of at most `size` solution mappings.
+        """
+        batch = list()
+        nb_loops = 0
+        while len(batch) < size and nb_loops < size and not self._scheduler.exhausted and self.has_next():
+            nb_loops += 1
+            self._scheduler.tick()
+            if self._current_mappings is None or not self._right.has_next():
+                if len(self._pending_mappings) == 0:
+                    if isinstance(self._right, ScanIterator) and self._right.can_prefetch():
+                        self._pending_mappings = await self._left.next_batch(size)
+                        await self._right.prefetch(self._pending_mappings)
+                    else:
+                        self._pending_mappings = await self._left.next_batch(1)
+                if len(self._pending_mappings) == 0:
+                    self._current_mappings = None
+                else:
+                    self._current_mappings = self._pending_mappings.pop(0)
+                    self._right.next_stage(self._current_mappings)
+            else:
+                for mu in await self._right.next_batch(size - len(batch)):
+                    batch.append(merge_mappings(self._current_mappings, mu))
+        return batch
+
     def save(self) -> SavedIndexJoinIterator:
         """Save and serialize the iterator as a Protobuf message"""
         saved_join = SavedIndexJoinIterator()
@@ -70,4 +122,6 @@ class IndexJoinIterator(PreemptableIterator):
         getattr(saved_join, right_field).CopyFrom(self._right.save())
         if self._current_mappings is not None:
             pyDict_to_protoDict(self._current_mappings, saved_join.muc)
+        for mappings in self._pending_mappings:
+            pyDict_to_protoDict(mappings, saved_join.pending.add().values)
         return saved_join
@@ -1,7 +1,9 @@
 # preemptable_iterator.py
 # Author: Thomas MINIER - MIT License 2017-2020
 from abc import ABC, abstractmethod
-from typing import Any, Dict, Optional
+from typing import Any, Dict, List, Optional
+
+from sage.database.db_connector import DatabaseConnector
 
 
 class PreemptableIterator(ABC):
@@ -28,6 +30,26 @@ class PreemptableIterator(ABC):
         """
         pass
 
+    async def next_batch(self, size: int) -> List[Dict[str, str]]:
+        """Get a batch of items from the iterator, following the batched iterator protocol.
+
+        A call to this function performs a bounded amount of work and never holds
+        solution mappings across a preemption: when it returns, the iterator can be saved
+        exactly, at the granularity of a single solution mapping.
+        The default implementation reads at most one item using `next`,
+        so subclasses should override it to move several solution mappings at once.
+
+        Argument: Maximum number of solution mappings to produce.
+
+        Returns: A list of at most `size` solution mappings. It may be empty, even if the iterator has more items to yield.
+        """
+        mu = await self.next()
+        return [mu] if mu is not None else []
+
+    def connectors(self) -> List[DatabaseConnector]:
+        """Get the database connectors read by the iterator and its operands"""
+        return []
+
     @abstractmethod
     def has_next(self) -> bool:
         """Return True if the iterator has more item to yield"""
@@ -3,6 +3,9 @@
 from time import time
 from typing import Dict, List, Optional
 
+from sage.database.db_connector import DatabaseConnector
+from sage.database.term_dictionary import decode_mappings
+from sage.query_engine.iterators.mappings import project_mappings
 from sage.query_engine.iterators.preemptable_iterator import PreemptableIterator
 from sage.query_engine.protobuf.iterators_pb2 import SavedProjectionIterator
 
@@ -10,6 +13,8 @@ from sage.query_engine.protobuf.iterators_pb2 import SavedProjectionIterator
 class ProjectionIterator(PreemptableIterator):
     """A ProjectionIterator evaluates a SPARQL projection (SELECT) in a pipeline of iterators.
 
+    It decodes the RDF terms encoded by the database (see `sage.database.term_dictionary`), once the solution mappings are projected.
+
     Args:
       * source: Previous iterator in the pipeline.
       * projection: Projection variables.
@@ -28,6 +33,10 @@ class ProjectionIterator(PreemptableIterator):
         """Get the name of the iterator, as used in the plan serialization protocol"""
         return "proj"
 
+    def connectors(self) -> List[DatabaseConnector]:
+        """Get the database connectors read by the iterator and its operands"""
+        return self._source.connectors()
+
     def has_next(self) -> bool:
         """Return True if the iterator has more item to yield"""
         return self._source.has_next()
@@ -50,8 +59,22 @@ class ProjectionIterator(PreemptableIterator):
         if mappings is None:
             return None
         elif self._projection is None:
-            return mappings
-        return {k: v for k, v in mappings.items() if k in self._projection}
+            return decode_mappings([mappings])[0]
+        return decode_mappings([project_mappings(mappings, self._projection)])[0]
+
+    async def next_batch(self, size: int) -> List[Dict[str, str]]:
+        """Get a batch of items from the iterator, following the batched iterator protocol.
+
+        Argument: Maximum number of solution mappings to produce.
+
+        Returns: A list of at most `size` solution mappings.
+        """
+        if not self.has_next():
+            return []
+        batch = await self._source.next_batch(size)
+        if self._projection is None:
+            return decode_mappings(batch)
+        return decode_mappings([project_mappings(mappings, self._projection) for mappings in batch])
 
     def save(self) -> SavedProjectionIterator:
         """Save and serialize the iterator as a Protobuf message"""
@@ -1,16 +1,26 @@
 # scan.py
 # Author: Thomas MINIER - MIT License 2017-2020
+from asyncio import get_running_loop
+from contextvars import copy_context
 from datetime import datetime
-from time import time
-from typing import Dict, Optional
+from math import inf
+from typing import Dict, List, Optional
 
 from sage.database.db_connector import DatabaseConnector
+from sage.database.db_iterator import DBIterator
+from sage.database.term_dictionary import decode_term
 from sage.query_engine.exceptions import QuantumExhausted
+from sage.query_engine.iterators.filter_compiler import compile_filter, get_term_constraints
+from sage.query_engine.iterators.mappings import get_schema
 from sage.query_engine.iterators.preemptable_iterator import PreemptableIterator
-from sage.query_engine.iterators.utils import selection, vars_positions
+from sage.query_engine.iterators.utils import vars_positions
 from sage.query_engine.protobuf.iterators_pb2 import SavedScanIterator, TriplePattern
 from sage.query_engine.protobuf.utils import pyDict_to_protoDict
 from sage.query_engine.iterators.utils import find_in_mappings
+from sage.query_engine.preemption import get_scheduler
+
+# maximum number of RDF triples read in advance by a call to ScanIterator#prefetch, when the page size is unbounded
+MAX_PREFETCHED_TRIPLES = 5000
 
 
 class ScanIterator(PreemptableIterator):
@@ -26,33 +36,60 @@ class ScanIterator(PreemptableIterator):
       * mu: The last triple read when the preemption occured. This triple must be the next returned triple when the query is resumed.
       * last_read: An offset ID used to resume the ScanIterator.
       * as_of: Perform all reads against a consistent snapshot represented by a timestamp.
+      * filters: SPARQL FILTER expressions pushed down to the scan, which only use variables of the triple pattern. Constraints found in these expressions are also given to the database connector.
+      * cardinality: The cardinality of the triple pattern, when already known (e.g., when the scan is resumed). Otherwise, it is estimated by the database connector.
+
+    The iterator on the database is only opened when the scan is read for the first time,
+    so resuming a plan does not query the database for scans whose mappings are replaced by `next_stage` before being read,
+    and saving a plan does not query the database for scans which have not been read since they were resumed or since their last stage.
+
+    When late materialization is enabled for the RDF graph (see `Graph#late_materialization`),
+    RDF triples are read as `EncodedTerm`, so joins and bindings use the identifiers of the database,
+    and RDF terms are only decoded by the `ProjectionIterator`. As `search_many` reads RDF terms,
+    such scans are not prefetched by index loop joins.
+
+    Solution mappings are produced as `SolutionMappings`, using the positions given to the variables
+    of the triple pattern by the schema of the pipeline (see `sage.query_engine.iterators.mappings`).
+
+    Each RDF triple read is reported to the preemption scheduler of the query (see `sage.query_engine.preemption`),
+    which only reads the wall clock every few triples.
     """
 
-    def __init__(self, connector: DatabaseConnector, pattern: Dict[str, str], context: dict, current_mappings: Optional[Dict[str, str]] = None, mu: Optional[Dict[str, str]] = None, last_read: Optional[str] = None, as_of: Optional[datetime] = None):
+    def __init__(self, connector: DatabaseConnector, pattern: Dict[str, str], context: dict, current_mappings: Optional[Dict[str, str]] = None, mu: Optional[Dict[str, str]] = None, last_read: Optional[str] = None, as_of: Optional[datetime] = None, filters: List[str] = list(), cardinality: Optional[int] = None):
         super(ScanIterator, self).__init__()
         self._connector = connector
         self._pattern = pattern
         self._context = context
         self._variables = vars_positions(pattern['subject'], pattern['predicate'], pattern['object'])
+        # positions of the variables in the solution mappings, resolved when the pipeline is built
+        self._schema = get_schema(context)
+        self._selector = self._schema.selector(self._variables)
         self._current_mappings = current_mappings
-        self._mu = mu
+        self._mu = self._schema.from_dict(mu) if mu is not None else None
         self._last_read = last_read
         self._start_timestamp = as_of
-        # Create an iterator on the database
-        if current_mappings is None:
-            it, card = self._connector.search(pattern['subject'], pattern['predicate'], pattern['object'], last_read=last_read, as_of=as_of)
-            self._source = it
-            self._cardinality = card
-        else:
-            (s, p, o) = (find_in_mappings(pattern['subject'], current_mappings), find_in_mappings(pattern['predicate'], current_mappings), find_in_mappings(pattern['object'], current_mappings))
-            it, card = self._connector.search(s, p, o, last_read=last_read, as_of=as_of)
-            self._source = it
-            self._cardinality = card
+        self._filters = list(filters)
+        self._compiled_filters = [compile_filter(expression) for expression in self._filters]
+        self._constraints = [constraint for expression in self._filters for constraint in get_term_constraints(expression)]
+        # iterators fetched in advance for the next stages of the scan, using search_many
+        self._prefetched = list()
+        # iterator on the database, opened lazily
+        self._source = None
+        # when the connector performs blocking I/O, the iterator on the database is opened and refilled in a thread pool
+        self._blocking_io = getattr(connector, 'blocking_io', False)
+        self._cardinality = cardinality
+        # RDF triples are read as identifiers only when late materialization is enabled for the RDF graph
+        self._dictionary = connector.term_dictionary if getattr(connector, 'late_materialization', False) else None
+        self._scheduler = get_scheduler(context)
 
     def __len__(self) -> int:
+        if self._cardinality is None:
+            self._open()
         return self._cardinality
 
     def __repr__(self) -> str:
+        if len(self._filters) > 0:
+            return f"<ScanIterator ({self._pattern['subject']} {self._pattern['predicate']} {self._pattern['object']}) FILTER {' && '.join(self._filters)}>"
         return f"<ScanIterator ({self._pattern['subject']} {self._pattern['predicate']} {self._pattern['object']})>"
 
     def serialized_name(self):
@@ -60,19 +97,115 @@ class ScanIterator(PreemptableIterator):
         return "scan"
 
     def last_read(self) -> str:
+        if self._source is None:
+            # the scan has not been opened since it was resumed, or since its last stage
+            return self._last_read if self._last_read is not None else ''
         return self._source.last_read()
 
+    def connectors(self) -> List[DatabaseConnector]:
+        """Get the database connectors read by the iterator and its operands"""
+        return [self._connector]
+
     def has_next(self) -> bool:
         """Return True if the iterator has more item to yield"""
-        return self._source.has_next() or self._mu is not None
+        if self._mu is not None:
+            return True
+        elif self._blocking_io and (self._source is None or self._source.must_fetch()):
+            # do not block the event loop: assume there are more items, as the next call
+            # to next or next_batch opens or refills the iterator on the database in a thread pool
+            return self._source is not None or self._last_read != ''
+        return self._open().has_next()
+
+    def _open(self) -> DBIterator:
+        """Open the iterator on the database, if it is not opened yet, and return it"""
+        if self._source is None:
+            mappings = self._current_mappings if self._current_mappings is not None else dict()
+            self._source, cardinality = self._search(mappings, last_read=self._last_read)
+            if self._cardinality is None:
+                self._cardinality = cardinality
+        return self._source
+
+    def _open_for_read(self) -> DBIterator:
+        """Open the iterator on the database, and give it a hint about how many RDF triples to fetch:
+        never more than a page of results, nor more than what can be fetched before the end of the quantum.
+        """
+        source = self._open()
+        deadline = None
+        if 'start_timestamp' in self._context:
+            deadline = self._context['start_timestamp'] + self._context['quantum'] / 1000
+        source.limit_fetch(self._context['max_results'], deadline=deadline)
+        return source
+
+    async def _async_open(self) -> DBIterator:
+        """Open the iterator on the database before reading it (see `_open_for_read`).
+
+        When the database connector performs blocking I/O, the iterator is opened
+        and fetches RDF triples in a thread pool instead of blocking the event loop.
+        """
+        if self._blocking_io and (self._source is None or self._source.must_fetch()):
+            # the thread uses the context of the query quantum, e.g., to find its database connection
+            await get_running_loop().run_in_executor(None, copy_context().run, lambda: self._open_for_read().has_next())
+        return self._open_for_read()
+
+    def _late_materialization(self) -> bool:
+        """Return True if the scan reads RDF triples made of `EncodedTerm`"""
+        return self._dictionary is not None
+
+    def _search(self, mappings: Dict[str, str], last_read: Optional[str] = None):
+        """Search for the RDF triples matching the triple pattern, with its variables substituted by a set of solution mappings"""
+        (s, p, o) = (find_in_mappings(self._pattern['subject'], mappings), find_in_mappings(self._pattern['predicate'], mappings), find_in_mappings(self._pattern['object'], mappings))
+        # give the constraints on the variables that are not substituted to the database connector
+        filters = [(position, operator, value) for position, term in zip(['subject', 'predicate', 'object'], (s, p, o)) for variable, operator, value in self._constraints if isinstance(term, str) and term == variable]
+        if self._late_materialization():
+            return self._connector.search_ids(s, p, o, last_read=last_read, as_of=self._start_timestamp, filters=filters)
+        (s, p, o) = (decode_term(s), decode_term(p), decode_term(o))
+        if len(filters) > 0:
+            return self._connector.search(s, p, o, last_read=last_read, as_of=self._start_timestamp, filters=filters)
+        # custom connectors may not support filters
+        return self._connector.search(s, p, o, last_read=last_read, as_of=self._start_timestamp)
+
+    def _accept(self, mappings: Dict[str, str]) -> bool:
+        """Return True if a set of solution mappings satisfies the FILTER expressions pushed down to the scan"""
+        for evaluate in self._compiled_filters:
+            if not evaluate(mappings):
+                return False
+        return True
+
+    def can_prefetch(self) -> bool:
+        """Return True if the database connector can evaluate several stages of the scan using a single request"""
+        # search_many does not support filters, so prefetching would change the IDs used to resume the scan
+        return len(self._filters) == 0 and getattr(self._connector, 'native_search_many', False) and not self._late_materialization()
+
+    async def prefetch(self, mappings: List[Dict[str, str]]) -> None:
+        """Evaluate the next stages of the scan, i.e., the next calls to `next_stage`, using a single call to search_many.
+
+        At most a page of results is read in advance: the stages that could not be evaluated within this limit
+        are opened lazily, like without prefetching. When the database connector performs blocking I/O,
+        search_many is executed in a thread pool instead of blocking the event loop.
+
+        Argument: Mappings that will be propagated to the scan by the next calls to `next_stage`, in order.
+        """
+        patterns = [(find_in_mappings(self._pattern['subject'], mu), find_in_mappings(self._pattern['predicate'], mu), find_in_mappings(self._pattern['object'], mu)) for mu in mappings]
+        limit = self._context['max_results'] if 'max_results' in self._context else inf
+        limit = int(limit) if limit != inf else MAX_PREFETCHED_TRIPLES
+        if self._blocking_io:
+            # the thread uses the context of the query quantum, e.g., to find its database connection
+            results = await get_running_loop().run_in_executor(None, copy_context().run, lambda: self._connector.search_many(patterns, as_of=self._start_timestamp, limit=limit))
+        else:
+            results = self._connector.search_many(patterns, as_of=self._start_timestamp, limit=limit)
+        self._prefetched = list(zip(mappings, results))
 
     def next_stage(self, mappings: Dict[str, str]):
         """Propagate mappings to the bottom of the pipeline in order to compute nested loop joins"""
-        (s, p, o) = (find_in_mappings(self._pattern['subject'], mappings), find_in_mappings(self._pattern['predicate'], mappings), find_in_mappings(self._pattern['object'], mappings))
-        it, card = self._connector.search(s, p, o, as_of=self._start_timestamp)
+        if len(self._prefetched) > 0 and self._prefetched[0][0] is mappings:
+            prefetched = self._prefetched.pop(0)[1]
+            # the stages not evaluated in advance, due to the limit of search_many, are opened when they are read
+            self._source, self._cardinality = prefetched if prefetched is not None else (None, None)
+        else:
+            # the scan is opened again when it is read
+            self._prefetched = list()
+            self._source, self._cardinality = None, None
         self._current_mappings = mappings
-        self._source = it
-        self._cardinality = card
         self._last_read = None
         self._mu = None
 
@@ -88,19 +221,53 @@ class ScanIterator(PreemptableIterator):
             triple = self._mu
             self._mu = None
             return triple
-        elif not self.has_next():
+        source = await self._async_open()
+        if not source.has_next():
             return None
         else:
-            triple = self._source.next()
+            triple = source.next()
             if triple is not None:
-                triple = selection(triple, self._variables)
-            timestamp = (time() - self._context['start_timestamp']) * 1000
-            if self._context['quantum'] <= timestamp:
+                triple = self._schema.select(triple, self._selector)
+                if not self._accept(triple):
+                    triple = None
+            if self._scheduler.tick():
                 self._mu = triple
                 raise QuantumExhausted()
             else:
                 return triple
 
+    async def next_batch(self, size: int) -> List[Dict[str, str]]:
+        """Get a batch of items from the iterator, following the batched iterator protocol.
+
+        At most `size` triples are read from the database, and the scan never raises a preemption:
+        this is done by the caller between two batches, so no triple is lost when the iterator is saved.
+        The batch is cut short once the preemption scheduler finds the time quantum exhausted.
+
+        Argument: Maximum number of solution mappings to produce.
+
+        Returns: A list of at most `size` solution mappings.
+        """
+        batch = list()
+        if self._mu is not None:
+            batch.append(self._mu)
+            self._mu = None
+        nb_reads = len(batch)
+        while nb_reads < size and not self._scheduler.exhausted:
+            source = await self._async_open()
+            if not source.has_next():
+                break
+            # read the RDF triples that do not need to be fetched from the database
+            while nb_reads < size and (not source.must_fetch()) and source.has_next():
+                nb_reads += 1
+                triple = source.next()
+                if triple is not None:
+                    mu = self._schema.select(triple, self._selector)
+                    if self._accept(mu):
+                        batch.append(mu)
+                if self._scheduler.tick():
+                    break
+        return batch
+
     def save(self) -> SavedScanIterator:
         """Save and serialize the iterator as a Protobuf message"""
         saved_scan = SavedScanIterator()
@@ -110,12 +277,16 @@ class ScanIterator(PreemptableIterator):
         triple.object = self._pattern['object']
         triple.graph = self._pattern['graph']
         saved_scan.pattern.CopyFrom(triple)
-        saved_scan.cardinality = self._cardinality
+        # a scan which has not been opened is saved as is, without searching the database:
+        # an unknown cardinality is saved as zero, and estimated again when the scan is resumed
+        saved_scan.cardinality = self._cardinality if self._cardinality is not None else 0
         if self._current_mappings is not None:
             pyDict_to_protoDict(self._current_mappings, saved_scan.muc)
-        saved_scan.last_read = self._source.last_read()
+        saved_scan.last_read = self.last_read()
+        saved_scan.from_start = self._source is None and self._last_read is None
         if self._start_timestamp is not None:
             saved_scan.timestamp = self._start_timestamp.isoformat()
         if self._mu is not None:
             pyDict_to_protoDict(self._mu, saved_scan.mu)
+        saved_scan.filters.extend(self._filters)
         return saved_scan
@@ -1,8 +1,10 @@
 # union.py
 # Author: Thomas MINIER - MIT License 2017-2020
-from typing import Dict, Optional
+from asyncio import gather
+from typing import Dict, List, Optional
 from random import random
 
+from sage.database.db_connector import DatabaseConnector
 from sage.query_engine.iterators.preemptable_iterator import PreemptableIterator
 from sage.query_engine.protobuf.iterators_pb2 import SavedBagUnionIterator
 
@@ -31,6 +33,10 @@ class BagUnionIterator(PreemptableIterator):
         """Get the name of the iterator, as used in the plan serialization protocol"""
         return "union"
 
+    def connectors(self) -> List[DatabaseConnector]:
+        """Get the database connectors read by the iterator and its operands"""
+        return self._left.connectors() + self._right.connectors()
+
     def has_next(self) -> bool:
         """Return True if the iterator has more item to yield"""
         return self._left.has_next() or self._right.has_next()
@@ -55,6 +61,19 @@ class BagUnionIterator(PreemptableIterator):
         else:
             return await self._right.next()
 
+    async def next_batch(self, size: int) -> List[Dict[str, str]]:
+        """Get a batch of items from the iterator, following the batched iterator protocol.
+
+        Argument: Maximum number of solution mappings to produce.
+
+        Returns: A list of at most `size` solution mappings.
+        """
+        if self._left.has_next():
+            return await self._left.next_batch(size)
+        elif self._right.has_next():
+            return await self._right.next_batch(size)
+        return []
+
     def save(self) -> SavedBagUnionIterator:
         """Save and serialize the iterator as a Protobuf message"""
         saved_union = SavedBagUnionIterator()
@@ -107,3 +126,83 @@ class RandomBagUnionIterator(BagUnionIterator):
                 return await self._right.next()
             else:
                 return await self._left.next()
+
+    async def next_batch(self, size: int) -> List[Dict[str, str]]:
+        """Get a batch of items from the iterator, following the batched iterator protocol.
+
+        Argument: Maximum number of solution mappings to produce.
+
+        Returns: A list of at most `size` solution mappings.
+        """
+        if not self.has_next():
+            return []
+        elif random() < 0.5:
+            if self._left.has_next():
+                return await self._left.next_batch(size)
+            else:
+                return await self._right.next_batch(size)
+        else:
+            if self._right.has_next():
+                return await self._right.next_batch(size)
+            else:
+                return await self._left.next_batch(size)
+
+
+class ParallelBagUnionIterator(BagUnionIterator):
+    """A ParallelBagUnionIterator performs a SPARQL UNION with bag semantics in a pipeline of iterators.
+
+    This operator evaluates both operands concurrently: each batch of solution mappings is made of a batch read
+    from the left operand and a batch read from the right operand, read at the same time. The I/O of the operands
+    only overlap when they read different databases, and at least one of them performs blocking I/O (see `DatabaseConnector#blocking_io`):
+    the scans of a single PostgreSQL graph share the connection of the time quantum, so their reads are still sequential.
+    Use `build_union` to only evaluate a UNION concurrently in this case.
+    Batches are always completed before preemption, so the states of both operands are saved exactly.
+
+    Args:
+      * left: left operand of the union.
+      * right: right operand of the union.
+      * context: Information about the query execution.
+    """
+
+    def __init__(self, left: PreemptableIterator, right: PreemptableIterator, context: dict):
+        super(ParallelBagUnionIterator, self).__init__(left, right, context)
+
+    def __repr__(self):
+        return f"<ParallelBagUnionIterator {self._left} UNION {self._right}>"
+
+    async def next_batch(self, size: int) -> List[Dict[str, str]]:
+        """Get a batch of items from the iterator, following the batched iterator protocol.
+
+        While both operands have more items, half of the batch is read from each operand, concurrently.
+
+        Argument: Maximum number of solution mappings to produce.
+
+        Returns: A list of at most `size` solution mappings.
+        """
+        if size > 1 and self._left.has_next() and self._right.has_next():
+            left_batch, right_batch = await gather(self._left.next_batch(size - size // 2), self._right.next_batch(size // 2))
+            return left_batch + right_batch
+        return await super(ParallelBagUnionIterator, self).next_batch(size)
+
+
+def build_union(left: PreemptableIterator, right: PreemptableIterator, context: dict) -> BagUnionIterator:
+    """Build the iterator which evaluates a SPARQL UNION.
+
+    Both operands are evaluated concurrently, using a ParallelBagUnionIterator, when they read different databases
+    and at least one of them performs blocking I/O, so their reads overlap. Otherwise, they are evaluated one after the other,
+    using a BagUnionIterator.
+
+    Args:
+      * left: left operand of the union.
+      * right: right operand of the union.
+      * context: Information about the query execution.
+
+    Returns: The iterator which evaluates the union.
+    """
+    left_connectors = left.connectors()
+    right_connectors = right.connectors()
+    disjoint = all(connector not in right_connectors for connector in left_connectors)
+    blocking_io = any(getattr(connector, 'blocking_io', False) for connector in left_connectors + right_connectors)
+    if disjoint and blocking_io:
+        return ParallelBagUnionIterator(left, right, context)
+    return BagUnionIterator(left, right, context)
@@ -12,6 +12,10 @@ class EmptyIterator(object):
     def __len__(self) -> int:
         return 0
 
+    def connectors(self) -> list:
+        """Get the database connectors read by the iterator and its operands"""
+        return []
+
     def has_next(self) -> bool:
         """Return True if the iterator has more item to yield"""
         return False
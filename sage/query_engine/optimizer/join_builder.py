@@ -5,6 +5,7 @@ from typing import Dict, List, Optional, Tuple
 
 from sage.database.core.dataset import Dataset
 from sage.query_engine.iterators.filter import FilterIterator
+from sage.query_engine.iterators.hash_join import SymmetricHashJoinIterator
 from sage.query_engine.iterators.nlj import IndexJoinIterator
 from sage.query_engine.iterators.preemptable_iterator import PreemptableIterator
 from sage.query_engine.iterators.scan import ScanIterator
@@ -13,16 +14,26 @@ from sage.query_engine.optimizer.utils import (equality_variables,
                                                find_connected_pattern,
                                                get_vars)
 
+# Minimum estimated cardinality of both operands of a join to evaluate it using a Symmetric Hash join
+HASH_JOIN_THRESHOLD = 5000
 
-def build_left_join_tree(bgp: List[Dict[str, str]], dataset: Dataset, default_graph: str, context: dict, as_of: Optional[datetime] = None) -> Tuple[PreemptableIterator, List[str], Dict[str, str]]:
+
+def build_left_join_tree(bgp: List[Dict[str, str]], dataset: Dataset, default_graph: str, context: dict, as_of: Optional[datetime] = None, join_orders: Optional[dict] = None, filters: Optional[Dict[str, List[str]]] = None) -> Tuple[PreemptableIterator, List[str], Dict[str, str]]:
     """Build a Left-linear join tree from a Basic Graph pattern.
 
+    Joins are evaluated using Index Loop joins, unless both operands have large estimated cardinalities:
+    such joins are evaluated using Symmetric Hash joins. The threshold can be set using the `hash_join_threshold` key of the context.
+    Symmetric Hash joins are not used in stateless mode (the `stateless` key of the context), as their hash tables would be saved
+    in the next links, which are sent back and forth between the client and the server for each time quantum.
+
     Args:
       * bgp: Basic Graph pattern used to build the join tree.
       * dataset: RDF dataset on which the BGPC is evaluated.
       * default_graph: URI of the default graph used for BGP evaluation.
       * context: Information about the query execution.
       * as_of: A timestamp used to perform all reads against a consistent version of the dataset. If `None`, use the latest version of the dataset, which does not guarantee snapshot isolation.
+      * join_orders: (Optional) Estimated cardinalities of the triple patterns of Basic Graph patterns, indexed by BGP. When the BGP is found, these cardinalities are used to order joins instead of estimating them again. Otherwise, the estimated cardinalities are stored in it.
+      * filters: (Optional) SPARQL FILTER expressions that only use one variable of the BGP, indexed by this variable. They are pushed down to all scans that bind the variable. Database connectors may use the constraints found in these filters to skip RDF triples, but the cardinalities are estimated without the filters, except for the equality constraints evaluated by the HDT connector.
 
     Returns: A tuple (`iterator`, `query_vars`, `cardinalities`) where:
       * `iterator` is the root of the Left-linear join tree.
@@ -33,20 +44,28 @@ def build_left_join_tree(bgp: List[Dict[str, str]], dataset: Dataset, default_gr
     triples = []
     cardinalities = []
 
+    # reuse the join order of the BGP, if it was computed before
+    bgp_key = tuple((triple['subject'], triple['predicate'], triple['object'], triple['graph'] if 'graph' in triple else '') for triple in bgp)
+    join_order = join_orders[bgp_key] if join_orders is not None and bgp_key in join_orders else None
+
     # analyze each triple pattern in the BGP
-    for triple in bgp:
+    for index, triple in enumerate(bgp):
         # select the graph used to evaluate the pattern
         graph_uri = triple['graph'] if 'graph' in triple and len(triple['graph']) > 0 else default_graph
         triple['graph'] = graph_uri
         # get iterator and statistics about the pattern
         if dataset.has_graph(graph_uri):
-            it = ScanIterator(dataset.get_graph(graph_uri), triple, context, as_of=as_of)
-            c = it.__len__()
+            scan_filters = [expression for variable in sorted(get_vars(triple)) if filters is not None and variable in filters for expression in filters[variable]]
+            it = ScanIterator(dataset.get_graph(graph_uri), triple, context, as_of=as_of, filters=scan_filters)
+            c = join_order[index] if join_order is not None else it.__len__()
         else:
             it, c = EmptyIterator(), 0
         triples += [{'triple': triple, 'cardinality': c, 'iterator': it}]
         cardinalities += [{'triple': triple, 'cardinality': c}]
 
+    if join_orders is not None and join_order is None:
+        join_orders[bgp_key] = [v['cardinality'] for v in triples]
+
     # sort triples by ascending cardinality
     triples = sorted(triples, key=lambda v: v['cardinality'])
 
@@ -72,9 +91,15 @@ def build_left_join_tree(bgp: List[Dict[str, str]], dataset: Dataset, default_gr
     #     pipeline = ScanIterator(pattern['iterator'], pattern['triple'], pattern['cardinality'])
 
     pipeline = pattern['iterator']
+    # estimated cardinality of the pipeline, updated after each join.
+    # Patterns are sorted by ascending cardinality, so the first one is only a lower bound on the cardinalities of the others
+    pipeline_cardinality = pattern['cardinality']
+    hash_join_threshold = context['hash_join_threshold'] if 'hash_join_threshold' in context else HASH_JOIN_THRESHOLD
+    is_stateless = context['stateless'] if 'stateless' in context else False
 
     # build the left linear tree of joins
     while len(triples) > 0:
+        pipeline_vars = query_vars
         pattern, pos, query_vars = find_connected_pattern(query_vars, triples)
         # no connected pattern = disconnected BGP => pick the first remaining pattern in the BGP
         if pattern is None:
@@ -82,6 +107,16 @@ def build_left_join_tree(bgp: List[Dict[str, str]], dataset: Dataset, default_gr
             query_vars = query_vars | get_vars(pattern['triple'])
             pos = 0
         graph_uri = pattern['triple']['graph']
-        pipeline = IndexJoinIterator(pipeline, pattern['iterator'], context)
+        join_vars = pipeline_vars & get_vars(pattern['triple'])
+        use_hash_join = (not is_stateless) and len(join_vars) > 0 and pipeline_cardinality >= hash_join_threshold and pattern['cardinality'] >= hash_join_threshold
+        if use_hash_join:
+            pipeline = SymmetricHashJoinIterator(pipeline, pattern['iterator'], list(join_vars), context)
+        else:
+            pipeline = IndexJoinIterator(pipeline, pattern['iterator'], context)
+        # estimate a join by its smallest operand, as for a key/foreign key join, and a cartesian product by the product of its operands
+        if len(join_vars) > 0:
+            pipeline_cardinality = min(pipeline_cardinality, pattern['cardinality'])
+        else:
+            pipeline_cardinality = pipeline_cardinality * pattern['cardinality']
         triples.pop(pos)
     return pipeline, query_vars, cardinalities
@@ -0,0 +1,127 @@
+# plan_cache.py
+# Author: Thomas MINIER - MIT License 2017-2020
+import re
+from math import inf
+from threading import Lock
+from time import time
+from typing import Dict, List, Optional, Tuple
+
+from pylru import lrucache
+
+# SPARQL string literals and IRIs, in which whitespaces are significant, or runs of whitespaces and comments
+r_protected = re.compile(r'("""(?:[^"\\]|\\.|"(?!""))*"""|\'\'\'(?:[^\'\\]|\\.|\'(?!\'\'))*\'\'\'|"(?:[^"\\\n]|\\.)*"|\'(?:[^\'\\\n]|\\.)*\'|<[^<>"{}|^`\\\s]*>)|((?:\s|#[^\n]*)+)')
+
+
+def normalize_query(query: str) -> str:
+    """Normalize a SPARQL query, so that queries which only differ by their whitespaces share the same text.
+
+    Comments are removed and runs of whitespaces are replaced by a single space,
+    except in string literals and IRIs, which are left untouched.
+
+    Argument: SPARQL query to normalize.
+
+    Returns: The normalized SPARQL query.
+    """
+    def replace(match) -> str:
+        if match.group(1) is not None:
+            return match.group(1)
+        return ' '
+    return r_protected.sub(replace, query).strip()
+
+
+class CachedPlan(object):
+    """A logical query execution plan stored in a PlanCache, with the join orders of its Basic Graph patterns.
+
+    Args:
+      * logical_plan: Logical query execution plan, as produced by rdflib.
+    """
+
+    def __init__(self, logical_plan):
+        super(CachedPlan, self).__init__()
+        self._logical_plan = logical_plan
+        self._join_orders = dict()
+        self._timestamp = time()
+
+    @property
+    def logical_plan(self):
+        return self._logical_plan
+
+    @property
+    def join_orders(self) -> Dict[Tuple[Tuple[str, str, str, str], ...], List[int]]:
+        """Estimated cardinalities of the triple patterns of each Basic Graph pattern, used to order joins."""
+        return self._join_orders
+
+    @property
+    def timestamp(self) -> float:
+        return self._timestamp
+
+
+class PlanCache(object):
+    """A LRU cache of logical query execution plans, keyed by normalized SPARQL query and default RDF graph.
+
+    It allows to skip the parsing of SPARQL queries and the estimation of triple patterns cardinalities
+    for queries that are frequently executed. Only read-only queries are cached, so a miss is only counted
+    when the plan of a query is stored (see `put`), i.e., SPARQL UPDATE queries are not counted.
+
+    Args:
+      * size: Maximum number of query execution plans stored in the cache.
+      * ttl: Time-to-live of a query execution plan in the cache, in seconds. It bounds the age of cached join orders.
+    """
+
+    def __init__(self, size: int = 500, ttl: float = 3600):
+        super(PlanCache, self).__init__()
+        self._plans = lrucache(size)
+        # the cache can be shared by the threads of the gRPC server
+        self._lock = Lock()
+        self._ttl = ttl
+        self._hits = 0
+        self._misses = 0
+
+    @property
+    def hits(self) -> int:
+        return self._hits
+
+    @property
+    def misses(self) -> int:
+        return self._misses
+
+    def get(self, query: str, default_graph: str) -> Optional[CachedPlan]:
+        """Get the plan of a SPARQL query from the cache.
+
+        Args:
+          * query: SPARQL query.
+          * default_graph: URI of the default RDF graph.
+
+        Returns: The cached plan of the SPARQL query, or None if the query is not in the cache.
+        """
+        key = (normalize_query(query), default_graph)
+        with self._lock:
+            if key in self._plans and time() - self._plans[key].timestamp < self._ttl:
+                self._hits += 1
+                return self._plans[key]
+            return None
+
+    def put(self, query: str, default_graph: str, plan: CachedPlan) -> None:
+        """Store the plan of a SPARQL query, which was not found in the cache, and count a miss.
+
+        Args:
+          * query: SPARQL query.
+          * default_graph: URI of the default RDF graph.
+          * plan: Plan to store.
+        """
+        key = (normalize_query(query), default_graph)
+        with self._lock:
+            self._misses += 1
+            self._plans[key] = plan
+
+    def stats(self) -> Dict[str, int]:
+        """Get the hit/miss counters of the cache"""
+        return {"hits": self._hits, "misses": self._misses}
+
+    def from_config(config: dict):
+        """Build a PlanCache from a config dictionnary"""
+        size = config['size'] if 'size' in config else 500
+        ttl = 3600
+        if 'ttl' in config:
+            ttl = inf if config['ttl'] == 'inf' else config['ttl']
+        return PlanCache(size=size, ttl=ttl)
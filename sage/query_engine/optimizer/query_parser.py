@@ -2,7 +2,7 @@
 # Author: Thomas MINIER - MIT License 2017-2020
 from datetime import datetime
 from enum import Enum
-from typing import Dict, Iterable, List, Optional, Tuple, Union
+from typing import Dict, Iterable, List, Optional, Set, Tuple, Union
 
 import re
 import pyparsing
@@ -17,8 +17,10 @@ from sage.query_engine.exceptions import UnsupportedSPARQL
 from sage.query_engine.iterators.filter import FilterIterator
 from sage.query_engine.iterators.preemptable_iterator import PreemptableIterator
 from sage.query_engine.iterators.projection import ProjectionIterator
-from sage.query_engine.iterators.union import BagUnionIterator
+from sage.query_engine.iterators.union import build_union
 from sage.query_engine.optimizer.join_builder import build_left_join_tree
+from sage.query_engine.optimizer.plan_cache import CachedPlan, PlanCache
+from sage.query_engine.optimizer.utils import get_vars
 from sage.query_engine.update.delete import DeleteOperator
 from sage.query_engine.update.if_exists import IfExistsOperator
 from sage.query_engine.update.insert import InsertOperator
@@ -157,8 +159,11 @@ def parse_filter_expr(expr: dict) -> str:
             return expr.n3()
     else:
         if expr.name == 'RelationalExpression':
+            if expr.op in ('IN', 'NOT IN'):
+                members = ', '.join([parse_filter_expr(e) for e in expr.other])
+                return f"({parse_filter_expr(expr.expr)} {expr.op} ({members}))"
             return f"({parse_filter_expr(expr.expr)} {expr.op} {parse_filter_expr(expr.other)})"
-        elif expr.name == 'AdditiveExpression':
+        elif expr.name == 'AdditiveExpression' or expr.name == 'MultiplicativeExpression':
             expression = parse_filter_expr(expr.expr)
             for i in range(len(expr.op)):
                 expression = f"({expression} {expr.op[i]} {parse_filter_expr(expr.other[i])})"
@@ -173,12 +178,74 @@ def parse_filter_expr(expr: dict) -> str:
             for other in expr.other:
                 expression = f"({expression} || {parse_filter_expr(other)})"
             return expression
+        elif expr.name == 'UnaryNot':
+            return f"(!{parse_filter_expr(expr.expr)})"
+        elif expr.name == 'UnaryMinus':
+            return f"(-{parse_filter_expr(expr.expr)})"
+        elif expr.name == 'UnaryPlus':
+            return f"(+{parse_filter_expr(expr.expr)})"
+        elif expr.name in ('Builtin_EXISTS', 'Builtin_NOTEXISTS'):
+            raise UnsupportedSPARQL(f"Unsupported SPARQL FILTER expression: {expr.name}")
         elif expr.name.startswith('Builtin_'):
-            return f"{expr.name[8:]}({parse_filter_expr(expr.arg)})"
+            # arguments of builtin functions, in the order of their declaration
+            args = [expr[key] for key in ['arg', 'arg1', 'arg2', 'arg3', 'text', 'pattern', 'flags'] if key in expr and expr[key] is not None]
+            return f"{expr.name[8:]}({', '.join([parse_filter_expr(arg) for arg in args])})"
         raise UnsupportedSPARQL(f"Unsupported SPARQL FILTER expression: {expr.name}")
 
 
-def parse_query(query: str, dataset: Dataset, default_graph: str, context: dict) -> Tuple[PreemptableIterator, dict]:
+def get_filter_vars(expr: dict) -> Set[str]:
+    """Get all SPARQL variables used in a rdflib SPARQL FILTER expression.
+
+    Argument: SPARQL FILTER expression in rdflib format.
+
+    Returns: The set of SPARQL variables used in the expression.
+    """
+    if isinstance(expr, Variable):
+        return set([f"?{expr}"])
+    elif isinstance(expr, BNode):
+        return set([f"?v_{expr}"])
+    elif isinstance(expr, list):
+        return set().union(*[get_filter_vars(e) for e in expr])
+    elif hasattr(expr, 'name'):
+        return set().union(*[get_filter_vars(value) for key, value in expr.items() if key != '_vars'])
+    return set()
+
+
+def push_down_filter(expr: dict, node: dict, current_graphs: List[str]) -> Tuple[Dict[str, List[str]], List[str]]:
+    """Split a rdflib SPARQL FILTER expression into the parts that can be pushed down to the scans of a BGP, and the rest.
+
+    A conjunct of the FILTER can be pushed down if it only uses one variable of the BGP,
+    as it can then be evaluated by the scans which bind this variable.
+
+    Args:
+      * expr: SPARQL FILTER expression in rdflib format.
+      * node: Node of the logical query execution plan on which the FILTER is applied.
+      * current_graphs: List of IRI of the current RDF graphs queried.
+
+    Returns: A tuple (`filters`, `expressions`) where:
+      * `filters` are the SPARQL FILTER expressions pushed down to the scans, indexed by the variable they use.
+      * `expressions` are the SPARQL FILTER expressions that must be evaluated after the BGP.
+    """
+    conjuncts = [expr.expr] + expr.other if expr.name == 'ConditionalAndExpression' else [expr]
+    bgp_vars = set()
+    if node.name == 'BGP':
+        bgp_vars = set().union(*[get_vars(triple) for triple in localize_triples(node.triples, current_graphs)])
+    elif node.name == 'Join':
+        bgp_vars = set().union(*[get_vars(triple) for triple in get_triples_from_graph(node.p1, current_graphs) + get_triples_from_graph(node.p2, current_graphs)])
+    filters, expressions = dict(), list()
+    for conjunct in conjuncts:
+        variables = get_filter_vars(conjunct)
+        if len(variables) == 1 and variables <= bgp_vars:
+            variable = variables.pop()
+            if variable not in filters:
+                filters[variable] = list()
+            filters[variable].append(parse_filter_expr(conjunct))
+        else:
+            expressions.append(parse_filter_expr(conjunct))
+    return filters, expressions
+
+
+def parse_query(query: str, dataset: Dataset, default_graph: str, context: dict, plan_cache: Optional[PlanCache] = None) -> Tuple[PreemptableIterator, dict]:
     """Parse a read-only SPARQL query into a physical query execution plan.
 
     For parsing SPARQL UPDATE query, please refers to the `parse_update` method.
@@ -188,6 +255,7 @@ def parse_query(query: str, dataset: Dataset, default_graph: str, context: dict)
       * dataset: RDF dataset on which the query is executed.
       * default_graph: URI of the default graph.
       * context: Information about the query execution.
+      * plan_cache: (Optional) A cache of logical plans and join orders, used to skip parsing and cardinality estimation of frequent queries.
 
     Returns: A tuple (`iterator`, `cardinalities`) where:
       * `iterator` is the root of a pipeline of iterators used to execute the query.
@@ -200,15 +268,19 @@ def parse_query(query: str, dataset: Dataset, default_graph: str, context: dict)
     # rdflib has no tool for parsing both read and update query,
     # so we must rely on a try/catch dirty trick...
     try:
-        logical_plan = translateQuery(parseQuery(query)).algebra
+        cached_plan = plan_cache.get(query, default_graph) if plan_cache is not None else None
+        if cached_plan is None:
+            cached_plan = CachedPlan(translateQuery(parseQuery(query)).algebra)
+            if plan_cache is not None:
+                plan_cache.put(query, default_graph, cached_plan)
         cardinalities = list()
-        iterator = parse_query_node(logical_plan, dataset, [default_graph], context, cardinalities, as_of=start_timestamp)
+        iterator = parse_query_node(cached_plan.logical_plan, dataset, [default_graph], context, cardinalities, as_of=start_timestamp, join_orders=cached_plan.join_orders)
         return iterator, cardinalities
     except ParseException:
         return parse_update(query, dataset, default_graph, context, as_of=start_timestamp)
 
 
-def parse_query_node(node: dict, dataset: Dataset, current_graphs: List[str], context: dict, cardinalities: dict, as_of: Optional[datetime] = None) -> PreemptableIterator:
+def parse_query_node(node: dict, dataset: Dataset, current_graphs: List[str], context: dict, cardinalities: dict, as_of: Optional[datetime] = None, join_orders: Optional[dict] = None, filters: Optional[Dict[str, List[str]]] = None) -> PreemptableIterator:
     """Recursively parse node in the query logical plan to build a preemptable physical query execution plan.
 
     Args:
@@ -218,6 +290,8 @@ def parse_query_node(node: dict, dataset: Dataset, current_graphs: List[str], co
       * context: Information about the query execution.
       * cardinalities: A dict used to track triple patterns cardinalities.
       * as_of: A timestamp used to perform all reads against a consistent version of the dataset. If `None`, use the latest version of the dataset, which does not guarantee snapshot isolation.
+      * join_orders: (Optional) Join orders of Basic Graph patterns, reused from previous executions of the query.
+      * filters: (Optional) SPARQL FILTER expressions pushed down to the scans of the node, if it is a BGP, indexed by the variable they use.
 
     Returns: An iterator used to evaluate the input node.
 
@@ -228,30 +302,32 @@ def parse_query_node(node: dict, dataset: Dataset, current_graphs: List[str], co
         graphs = current_graphs
         if node.datasetClause is not None:
             graphs = [format_term(graph_iri.default) for graph_iri in node.datasetClause]
-        return parse_query_node(node.p, dataset, graphs, context, cardinalities, as_of=as_of)
+        return parse_query_node(node.p, dataset, graphs, context, cardinalities, as_of=as_of, join_orders=join_orders)
     elif node.name == 'Project':
         query_vars = list(map(lambda t: '?' + str(t), node.PV))
-        child = parse_query_node(node.p, dataset, current_graphs, context, cardinalities, as_of=as_of)
+        child = parse_query_node(node.p, dataset, current_graphs, context, cardinalities, as_of=as_of, join_orders=join_orders)
         return ProjectionIterator(child, query_vars)
     elif node.name == 'BGP':
         # bgp_vars = node._vars
         triples = list(localize_triples(node.triples, current_graphs))
-        iterator, query_vars, c = build_left_join_tree(triples, dataset, current_graphs, context, as_of=as_of)
+        iterator, query_vars, c = build_left_join_tree(triples, dataset, current_graphs, context, as_of=as_of, join_orders=join_orders, filters=filters)
         # track cardinalities of every triple pattern
         cardinalities += c
         return iterator
     elif node.name == 'Union':
-        left = parse_query_node(node.p1, dataset, current_graphs, context, cardinalities, as_of=as_of)
-        right = parse_query_node(node.p2, dataset, current_graphs, context, cardinalities, as_of=as_of)
-        return BagUnionIterator(left, right, context)
+        left = parse_query_node(node.p1, dataset, current_graphs, context, cardinalities, as_of=as_of, join_orders=join_orders)
+        right = parse_query_node(node.p2, dataset, current_graphs, context, cardinalities, as_of=as_of, join_orders=join_orders)
+        return build_union(left, right, context)
     elif node.name == 'Filter':
-        expression = parse_filter_expr(node.expr)
-        iterator = parse_query_node(node.p, dataset, current_graphs, context, cardinalities, as_of=as_of)
-        return FilterIterator(iterator, expression, context)
+        filters, expressions = push_down_filter(node.expr, node.p, current_graphs)
+        iterator = parse_query_node(node.p, dataset, current_graphs, context, cardinalities, as_of=as_of, join_orders=join_orders, filters=filters)
+        if len(expressions) == 0:
+            return iterator
+        return FilterIterator(iterator, ' && '.join(expressions), context)
     elif node.name == 'Join':
         # only allow for joining BGPs from different GRAPH clauses
         triples = get_triples_from_graph(node.p1, current_graphs) + get_triples_from_graph(node.p2, current_graphs)
-        iterator, query_vars, c = build_left_join_tree(triples, dataset, current_graphs, context)
+        iterator, query_vars, c = build_left_join_tree(triples, dataset, current_graphs, context, join_orders=join_orders, filters=filters)
         # track cardinalities of every triple pattern
         cardinalities += c
         return iterator
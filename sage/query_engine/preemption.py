@@ -0,0 +1,91 @@
+# preemption.py
+# Author: Thomas MINIER - MIT License 2017-2020
+from math import inf
+from time import time
+from typing import Optional
+
+# Default number of ticks between two readings of the wall clock
+DEFAULT_CLOCK_INTERVAL = 64
+
+
+class PreemptionScheduler(object):
+    """A PreemptionScheduler decides when the execution of a query must be preempted, i.e., when its time quantum is exhausted.
+
+    Iterators report each unit of work (a RDF triple read, a loop of a join, a FILTER evaluation...) by calling `tick`,
+    which only decrements a counter: the wall clock is read every `interval` ticks. Once the quantum is exhausted,
+    `tick` returns True, and iterators stop their current batch of solution mappings at a point where they can be saved
+    without losing solutions. Then, the SageEngine preempts the query between two batches (see `sage.query_engine.sage_engine.executor`).
+
+    The scheduler is shared by all the iterators of a pipeline, through the context of the query execution (see `get_scheduler`).
+
+    Argument: Number of ticks between two readings of the wall clock.
+    """
+
+    def __init__(self, interval: int = DEFAULT_CLOCK_INTERVAL):
+        super(PreemptionScheduler, self).__init__()
+        self._interval = interval
+        self._deadline: Optional[float] = None
+        self._countdown = interval
+        self._ticks = 0
+        self._clock_readings = 0
+        self._exhausted = False
+
+    @property
+    def exhausted(self) -> bool:
+        """Return True if the time quantum has been found exhausted, without reading the wall clock"""
+        return self._exhausted
+
+    @property
+    def ticks(self) -> int:
+        """Get the number of ticks reported since the beginning of the time quantum"""
+        return self._ticks
+
+    @property
+    def clock_readings(self) -> int:
+        """Get the number of readings of the wall clock since the beginning of the time quantum"""
+        return self._clock_readings
+
+    def start(self, start_timestamp: float, quantum: float) -> None:
+        """Start a new time quantum.
+
+        Args:
+          * start_timestamp: Time (as given by `time.time()`) at which the time quantum starts.
+          * quantum: Duration of the time quantum, in milliseconds.
+        """
+        self._deadline = start_timestamp + quantum / 1000 if quantum != inf else None
+        self._countdown = self._interval
+        self._ticks = 0
+        self._clock_readings = 0
+        self._exhausted = False
+
+    def tick(self, work: int = 1) -> bool:
+        """Report units of work done by an iterator.
+
+        Argument: Number of units of work done.
+
+        Returns: True if the time quantum is exhausted, so the iterator should stop its current batch, False otherwise.
+        """
+        self._ticks += work
+        self._countdown -= work
+        if self._countdown <= 0:
+            self._countdown = self._interval
+            return self.check()
+        return self._exhausted
+
+    def check(self) -> bool:
+        """Read the wall clock, and return True if the time quantum is exhausted, False otherwise"""
+        if not self._exhausted and self._deadline is not None:
+            self._clock_readings += 1
+            self._exhausted = time() >= self._deadline
+        return self._exhausted
+
+
+def get_scheduler(context: dict) -> PreemptionScheduler:
+    """Get the preemption scheduler of a query execution, stored in its context.
+
+    The number of ticks between two readings of the wall clock can be set using the `clock_interval` key of the context.
+    """
+    if 'scheduler' not in context:
+        interval = context['clock_interval'] if 'clock_interval' in context else DEFAULT_CLOCK_INTERVAL
+        context['scheduler'] = PreemptionScheduler(interval=interval)
+    return context['scheduler']
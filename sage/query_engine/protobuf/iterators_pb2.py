@@ -19,7 +19,7 @@ DESCRIPTOR = _descriptor.FileDescriptor(
   syntax='proto3',
   serialized_options=None,
   create_key=_descriptor._internal_create_key,
-  serialized_pb=b'\n\x0fiterators.proto\x12\titerators\"R\n\rTriplePattern\x12\x0f\n\x07subject\x18\x01 \x01(\t\x12\x11\n\tpredicate\x18\x02 \x01(\t\x12\x0e\n\x06object\x18\x03 \x01(\t\x12\r\n\x05graph\x18\x04 \x01(\t\"\xb6\x02\n\x11SavedScanIterator\x12)\n\x07pattern\x18\x01 \x01(\x0b\x32\x18.iterators.TriplePattern\x12\x32\n\x03muc\x18\x02 \x03(\x0b\x32%.iterators.SavedScanIterator.MucEntry\x12\x30\n\x02mu\x18\x03 \x03(\x0b\x32$.iterators.SavedScanIterator.MuEntry\x12\x11\n\tlast_read\x18\x04 \x01(\t\x12\x11\n\ttimestamp\x18\x05 \x01(\t\x12\x13\n\x0b\x63\x61rdinality\x18\x06 \x01(\x03\x1a*\n\x08MucEntry\x12\x0b\n\x03key\x18\x01 \x01(\t\x12\r\n\x05value\x18\x02 \x01(\t:\x02\x38\x01\x1a)\n\x07MuEntry\x12\x0b\n\x03key\x18\x01 \x01(\t\x12\r\n\x05value\x18\x02 \x01(\t:\x02\x38\x01\"\x95\x02\n\x17SavedProjectionIterator\x12\x0e\n\x06values\x18\x01 \x03(\t\x12\x33\n\x0bscan_source\x18\x02 \x01(\x0b\x32\x1c.iterators.SavedScanIteratorH\x00\x12\x38\n\x0bjoin_source\x18\x03 \x01(\x0b\x32!.iterators.SavedIndexJoinIteratorH\x00\x12\x38\n\x0cunion_source\x18\x04 \x01(\x0b\x32 .iterators.SavedBagUnionIteratorH\x00\x12\x37\n\rfilter_source\x18\x05 \x01(\x0b\x32\x1e.iterators.SavedFilterIteratorH\x00\x42\x08\n\x06source\"\xb9\x05\n\x16SavedIndexJoinIterator\x12\x31\n\tscan_left\x18\x01 \x01(\x0b\x32\x1c.iterators.SavedScanIteratorH\x00\x12\x37\n\tproj_left\x18\x02 \x01(\x0b\x32\".iterators.SavedProjectionIteratorH\x00\x12\x36\n\nunion_left\x18\x03 \x01(\x0b\x32 .iterators.SavedBagUnionIteratorH\x00\x12\x36\n\tjoin_left\x18\x04 \x01(\x0b\x32!.iterators.SavedIndexJoinIteratorH\x00\x12\x35\n\x0b\x66ilter_left\x18\x05 \x01(\x0b\x32\x1e.iterators.SavedFilterIteratorH\x00\x12\x32\n\nscan_right\x18\x06 \x01(\x0b\x32\x1c.iterators.SavedScanIteratorH\x01\x12\x38\n\nproj_right\x18\x07 \x01(\x0b\x32\".iterators.SavedProjectionIteratorH\x01\x12\x37\n\x0bunion_right\x18\x08 \x01(\x0b\x32 .iterators.SavedBagUnionIteratorH\x01\x12\x37\n\njoin_right\x18\t \x01(\x0b\x32!.iterators.SavedIndexJoinIteratorH\x01\x12\x36\n\x0c\x66ilter_right\x18\n \x01(\x0b\x32\x1e.iterators.SavedFilterIteratorH\x01\x12\x37\n\x03muc\x18\x0b \x03(\x0b\x32*.iterators.SavedIndexJoinIterator.MucEntry\x1a*\n\x08MucEntry\x12\x0b\n\x03key\x18\x01 \x01(\t\x12\r\n\x05value\x18\x02 \x01(\t:\x02\x38\x01\x42\x06\n\x04leftB\x07\n\x05right\"\xd3\x04\n\x15SavedBagUnionIterator\x12\x31\n\tscan_left\x18\x01 \x01(\x0b\x32\x1c.iterators.SavedScanIteratorH\x00\x12\x37\n\tproj_left\x18\x02 \x01(\x0b\x32\".iterators.SavedProjectionIteratorH\x00\x12\x36\n\nunion_left\x18\x03 \x01(\x0b\x32 .iterators.SavedBagUnionIteratorH\x00\x12\x36\n\tjoin_left\x18\x04 \x01(\x0b\x32!.iterators.SavedIndexJoinIteratorH\x00\x12\x35\n\x0b\x66ilter_left\x18\x05 \x01(\x0b\x32\x1e.iterators.SavedFilterIteratorH\x00\x12\x32\n\nscan_right\x18\x06 \x01(\x0b\x32\x1c.iterators.SavedScanIteratorH\x01\x12\x38\n\nproj_right\x18\x07 \x01(\x0b\x32\".iterators.SavedProjectionIteratorH\x01\x12\x37\n\x0bunion_right\x18\x08 \x01(\x0b\x32 .iterators.SavedBagUnionIteratorH\x01\x12\x37\n\njoin_right\x18\t \x01(\x0b\x32!.iterators.SavedIndexJoinIteratorH\x01\x12\x36\n\x0c\x66ilter_right\x18\n \x01(\x0b\x32\x1e.iterators.SavedFilterIteratorH\x01\x42\x06\n\x04leftB\x07\n\x05right\"\x96\x02\n\x13SavedFilterIterator\x12\x33\n\x0bscan_source\x18\x01 \x01(\x0b\x32\x1c.iterators.SavedScanIteratorH\x00\x12\x39\n\x0bproj_source\x18\x02 \x01(\x0b\x32\".iterators.SavedProjectionIteratorH\x00\x12\x37\n\rfilter_source\x18\x03 \x01(\x0b\x32\x1e.iterators.SavedFilterIteratorH\x00\x12\x38\n\x0bjoin_source\x18\x04 \x01(\x0b\x32!.iterators.SavedIndexJoinIteratorH\x00\x12\x12\n\nexpression\x18\x05 \x01(\tB\x08\n\x06source\"\x85\x01\n\x0fSavedInsertData\x12?\n\x0bnb_inserted\x18\x01 \x03(\x0b\x32*.iterators.SavedInsertData.NbInsertedEntry\x1a\x31\n\x0fNbInsertedEntry\x12\x0b\n\x03key\x18\x01 \x01(\t\x12\r\n\x05value\x18\x02 \x01(\x04:\x02\x38\x01\"\x85\x01\n\x0fSavedDeleteData\x12?\n\x0bnb_inserted\x18\x01 \x03(\x0b\x32*.iterators.SavedDeleteData.NbInsertedEntry\x1a\x31\n\x0fNbInsertedEntry\x12\x0b\n\x03key\x18\x01 \x01(\t\x12\r\n\x05value\x18\x02 \x01(\x04:\x02\x38\x01\"\x9b\x03\n\x08RootTree\x12\x33\n\x0bscan_source\x18\x01 \x01(\x0b\x32\x1c.iterators.SavedScanIteratorH\x00\x12\x39\n\x0bproj_source\x18\x02 \x01(\x0b\x32\".iterators.SavedProjectionIteratorH\x00\x12\x38\n\x0bjoin_source\x18\x03 \x01(\x0b\x32!.iterators.SavedIndexJoinIteratorH\x00\x12\x38\n\x0cunion_source\x18\x04 \x01(\x0b\x32 .iterators.SavedBagUnionIteratorH\x00\x12\x37\n\rfilter_source\x18\x05 \x01(\x0b\x32\x1e.iterators.SavedFilterIteratorH\x00\x12\x33\n\rinsert_source\x18\x06 \x01(\x0b\x32\x1a.iterators.SavedInsertDataH\x00\x12\x33\n\rdelete_source\x18\x07 \x01(\x0b\x32\x1a.iterators.SavedDeleteDataH\x00\x42\x08\n\x06sourceb\x06proto3'
+  serialized_pb=b'\n\x0fiterators.proto\x12\titerators\"R\n\rTriplePattern\x12\x0f\n\x07subject\x18\x01 \x01(\t\x12\x11\n\tpredicate\x18\x02 \x01(\t\x12\x0e\n\x06object\x18\x03 \x01(\t\x12\r\n\x05graph\x18\x04 \x01(\t\"\xdb\x02\n\x11SavedScanIterator\x12)\n\x07pattern\x18\x01 \x01(\x0b\x32\x18.iterators.TriplePattern\x12\x32\n\x03muc\x18\x02 \x03(\x0b\x32%.iterators.SavedScanIterator.MucEntry\x12\x30\n\x02mu\x18\x03 \x03(\x0b\x32$.iterators.SavedScanIterator.MuEntry\x12\x11\n\tlast_read\x18\x04 \x01(\t\x12\x11\n\ttimestamp\x18\x05 \x01(\t\x12\x13\n\x0b\x63\x61rdinality\x18\x06 \x01(\x03\x12\x0f\n\x07\x66ilters\x18\x07 \x03(\t\x12\x12\n\nfrom_start\x18\x08 \x01(\x08\x1a*\n\x08MucEntry\x12\x0b\n\x03key\x18\x01 \x01(\t\x12\r\n\x05value\x18\x02 \x01(\t:\x02\x38\x01\x1a)\n\x07MuEntry\x12\x0b\n\x03key\x18\x01 \x01(\t\x12\r\n\x05value\x18\x02 \x01(\t:\x02\x38\x01\"\xdc\x02\n\x17SavedProjectionIterator\x12\x0e\n\x06values\x18\x01 \x03(\t\x12\x33\n\x0bscan_source\x18\x02 \x01(\x0b\x32\x1c.iterators.SavedScanIteratorH\x00\x12\x38\n\x0bjoin_source\x18\x03 \x01(\x0b\x32!.iterators.SavedIndexJoinIteratorH\x00\x12\x38\n\x0cunion_source\x18\x04 \x01(\x0b\x32 .iterators.SavedBagUnionIteratorH\x00\x12\x37\n\rfilter_source\x18\x05 \x01(\x0b\x32\x1e.iterators.SavedFilterIteratorH\x00\x12\x45\n\x10hash_join_source\x18\x06 \x01(\x0b\x32).iterators.SavedSymmetricHashJoinIteratorH\x00\x42\x08\n\x06source\"\xf2\x06\n\x16SavedIndexJoinIterator\x12\x31\n\tscan_left\x18\x01 \x01(\x0b\x32\x1c.iterators.SavedScanIteratorH\x00\x12\x37\n\tproj_left\x18\x02 \x01(\x0b\x32\".iterators.SavedProjectionIteratorH\x00\x12\x36\n\nunion_left\x18\x03 \x01(\x0b\x32 .iterators.SavedBagUnionIteratorH\x00\x12\x36\n\tjoin_left\x18\x04 \x01(\x0b\x32!.iterators.SavedIndexJoinIteratorH\x00\x12\x35\n\x0b\x66ilter_left\x18\x05 \x01(\x0b\x32\x1e.iterators.SavedFilterIteratorH\x00\x12\x43\n\x0ehash_join_left\x18\x0c \x01(\x0b\x32).iterators.SavedSymmetricHashJoinIteratorH\x00\x12\x32\n\nscan_right\x18\x06 \x01(\x0b\x32\x1c.iterators.SavedScanIteratorH\x01\x12\x38\n\nproj_right\x18\x07 \x01(\x0b\x32\".iterators.SavedProjectionIteratorH\x01\x12\x37\n\x0bunion_right\x18\x08 \x01(\x0b\x32 .iterators.SavedBagUnionIteratorH\x01\x12\x37\n\njoin_right\x18\t \x01(\x0b\x32!.iterators.SavedIndexJoinIteratorH\x01\x12\x36\n\x0c\x66ilter_right\x18\n \x01(\x0b\x32\x1e.iterators.SavedFilterIteratorH\x01\x12\x44\n\x0fhash_join_right\x18\r \x01(\x0b\x32).iterators.SavedSymmetricHashJoinIteratorH\x01\x12\x37\n\x03muc\x18\x0b \x03(\x0b\x32*.iterators.SavedIndexJoinIterator.MucEntry\x12,\n\x07pending\x18\x0e \x03(\x0b\x32\x1b.iterators.SolutionMappings\x1a*\n\x08MucEntry\x12\x0b\n\x03key\x18\x01 \x01(\t\x12\r\n\x05value\x18\x02 \x01(\t:\x02\x38\x01\x42\x06\n\x04leftB\x07\n\x05right\"\xde\x05\n\x15SavedBagUnionIterator\x12\x31\n\tscan_left\x18\x01 \x01(\x0b\x32\x1c.iterators.SavedScanIteratorH\x00\x12\x37\n\tproj_left\x18\x02 \x01(\x0b\x32\".iterators.SavedProjectionIteratorH\x00\x12\x36\n\nunion_left\x18\x03 \x01(\x0b\x32 .iterators.SavedBagUnionIteratorH\x00\x12\x36\n\tjoin_left\x18\x04 \x01(\x0b\x32!.iterators.SavedIndexJoinIteratorH\x00\x12\x35\n\x0b\x66ilter_left\x18\x05 \x01(\x0b\x32\x1e.iterators.SavedFilterIteratorH\x00\x12\x43\n\x0ehash_join_left\x18\x0b \x01(\x0b\x32).iterators.SavedSymmetricHashJoinIteratorH\x00\x12\x32\n\nscan_right\x18\x06 \x01(\x0b\x32\x1c.iterators.SavedScanIteratorH\x01\x12\x38\n\nproj_right\x18\x07 \x01(\x0b\x32\".iterators.SavedProjectionIteratorH\x01\x12\x37\n\x0bunion_right\x18\x08 \x01(\x0b\x32 .iterators.SavedBagUnionIteratorH\x01\x12\x37\n\njoin_right\x18\t \x01(\x0b\x32!.iterators.SavedIndexJoinIteratorH\x01\x12\x36\n\x0c\x66ilter_right\x18\n \x01(\x0b\x32\x1e.iterators.SavedFilterIteratorH\x01\x12\x44\n\x0fhash_join_right\x18\x0c \x01(\x0b\x32).iterators.SavedSymmetricHashJoinIteratorH\x01\x42\x06\n\x04leftB\x07\n\x05right\"z\n\x10SolutionMappings\x12\x37\n\x06values\x18\x01 \x03(\x0b\x32\'.iterators.SolutionMappings.ValuesEntry\x1a-\n\x0bValuesEntry\x12\x0b\n\x03key\x18\x01 \x01(\t\x12\r\n\x05value\x18\x02 \x01(\t:\x02\x38\x01\"\xa3\x07\n\x1eSavedSymmetricHashJoinIterator\x12\x31\n\tscan_left\x18\x01 \x01(\x0b\x32\x1c.iterators.SavedScanIteratorH\x00\x12\x37\n\tproj_left\x18\x02 \x01(\x0b\x32\".iterators.SavedProjectionIteratorH\x00\x12\x36\n\nunion_left\x18\x03 \x01(\x0b\x32 .iterators.SavedBagUnionIteratorH\x00\x12\x36\n\tjoin_left\x18\x04 \x01(\x0b\x32!.iterators.SavedIndexJoinIteratorH\x00\x12\x35\n\x0b\x66ilter_left\x18\x05 \x01(\x0b\x32\x1e.iterators.SavedFilterIteratorH\x00\x12\x43\n\x0ehash_join_left\x18\x06 \x01(\x0b\x32).iterators.SavedSymmetricHashJoinIteratorH\x00\x12\x32\n\nscan_right\x18\x07 \x01(\x0b\x32\x1c.iterators.SavedScanIteratorH\x01\x12\x38\n\nproj_right\x18\x08 \x01(\x0b\x32\".iterators.SavedProjectionIteratorH\x01\x12\x37\n\x0bunion_right\x18\t \x01(\x0b\x32 .iterators.SavedBagUnionIteratorH\x01\x12\x37\n\njoin_right\x18\n \x01(\x0b\x32!.iterators.SavedIndexJoinIteratorH\x01\x12\x36\n\x0c\x66ilter_right\x18\x0b \x01(\x0b\x32\x1e.iterators.SavedFilterIteratorH\x01\x12\x44\n\x0fhash_join_right\x18\x0c \x01(\x0b\x32).iterators.SavedSymmetricHashJoinIteratorH\x01\x12\x16\n\x0ejoin_variables\x18\r \x03(\t\x12/\n\nleft_table\x18\x0e \x03(\x0b\x32\x1b.iterators.SolutionMappings\x12\x30\n\x0bright_table\x18\x0f \x03(\x0b\x32\x1b.iterators.SolutionMappings\x12,\n\x07pending\x18\x10 \x03(\x0b\x32\x1b.iterators.SolutionMappings\x12\x11\n\tread_left\x18\x11 \x01(\x08\x42\x06\n\x04leftB\x07\n\x05right\"\xdd\x02\n\x13SavedFilterIterator\x12\x33\n\x0bscan_source\x18\x01 \x01(\x0b\x32\x1c.iterators.SavedScanIteratorH\x00\x12\x39\n\x0bproj_source\x18\x02 \x01(\x0b\x32\".iterators.SavedProjectionIteratorH\x00\x12\x37\n\rfilter_source\x18\x03 \x01(\x0b\x32\x1e.iterators.SavedFilterIteratorH\x00\x12\x38\n\x0bjoin_source\x18\x04 \x01(\x0b\x32!.iterators.SavedIndexJoinIteratorH\x00\x12\x45\n\x10hash_join_source\x18\x06 \x01(\x0b\x32).iterators.SavedSymmetricHashJoinIteratorH\x00\x12\x12\n\nexpression\x18\x05 \x01(\tB\x08\n\x06source\"\x85\x01\n\x0fSavedInsertData\x12?\n\x0bnb_inserted\x18\x01 \x03(\x0b\x32*.iterators.SavedInsertData.NbInsertedEntry\x1a\x31\n\x0fNbInsertedEntry\x12\x0b\n\x03key\x18\x01 \x01(\t\x12\r\n\x05value\x18\x02 \x01(\x04:\x02\x38\x01\"\x85\x01\n\x0fSavedDeleteData\x12?\n\x0bnb_inserted\x18\x01 \x03(\x0b\x32*.iterators.SavedDeleteData.NbInsertedEntry\x1a\x31\n\x0fNbInsertedEntry\x12\x0b\n\x03key\x18\x01 \x01(\t\x12\r\n\x05value\x18\x02 \x01(\x04:\x02\x38\x01\"\xe2\x03\n\x08RootTree\x12\x33\n\x0bscan_source\x18\x01 \x01(\x0b\x32\x1c.iterators.SavedScanIteratorH\x00\x12\x39\n\x0bproj_source\x18\x02 \x01(\x0b\x32\".iterators.SavedProjectionIteratorH\x00\x12\x38\n\x0bjoin_source\x18\x03 \x01(\x0b\x32!.iterators.SavedIndexJoinIteratorH\x00\x12\x38\n\x0cunion_source\x18\x04 \x01(\x0b\x32 .iterators.SavedBagUnionIteratorH\x00\x12\x37\n\rfilter_source\x18\x05 \x01(\x0b\x32\x1e.iterators.SavedFilterIteratorH\x00\x12\x33\n\rinsert_source\x18\x06 \x01(\x0b\x32\x1a.iterators.SavedInsertDataH\x00\x12\x33\n\rdelete_source\x18\x07 \x01(\x0b\x32\x1a.iterators.SavedDeleteDataH\x00\x12\x45\n\x10hash_join_source\x18\x08 \x01(\x0b\x32).iterators.SavedSymmetricHashJoinIteratorH\x00\x42\x08\n\x06source\"C\n\x0f\x43ompactRootTree\x12\r\n\x05terms\x18\x01 \x03(\t\x12!\n\x04plan\x18\x02 \x01(\x0b\x32\x13.iterators.RootTreeb\x06proto3'
 )
 
 
@@ -112,8 +112,8 @@ _SAVEDSCANITERATOR_MUCENTRY = _descriptor.Descriptor(
   extension_ranges=[],
   oneofs=[
   ],
-  serialized_start=340,
-  serialized_end=382,
+  serialized_start=377,
+  serialized_end=419,
 )
 
 _SAVEDSCANITERATOR_MUENTRY = _descriptor.Descriptor(
@@ -150,8 +150,8 @@ _SAVEDSCANITERATOR_MUENTRY = _descriptor.Descriptor(
   extension_ranges=[],
   oneofs=[
   ],
-  serialized_start=384,
-  serialized_end=425,
+  serialized_start=421,
+  serialized_end=462,
 )
 
 _SAVEDSCANITERATOR = _descriptor.Descriptor(
@@ -204,6 +204,20 @@ _SAVEDSCANITERATOR = _descriptor.Descriptor(
       message_type=None, enum_type=None, containing_type=None,
       is_extension=False, extension_scope=None,
       serialized_options=None, file=DESCRIPTOR,  create_key=_descriptor._internal_create_key),
+    _descriptor.FieldDescriptor(
+      name='filters', full_name='iterators.SavedScanIterator.filters', index=6,
+      number=7, type=9, cpp_type=9, label=3,
+      has_default_value=False, default_value=[],
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR,  create_key=_descriptor._internal_create_key),
+    _descriptor.FieldDescriptor(
+      name='from_start', full_name='iterators.SavedScanIterator.from_start', index=7,
+      number=8, type=8, cpp_type=7, label=1,
+      has_default_value=False, default_value=False,
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR,  create_key=_descriptor._internal_create_key),
   ],
   extensions=[
   ],
@@ -217,7 +231,7 @@ _SAVEDSCANITERATOR = _descriptor.Descriptor(
   oneofs=[
   ],
   serialized_start=115,
-  serialized_end=425,
+  serialized_end=462,
 )
 
 
@@ -264,6 +278,13 @@ _SAVEDPROJECTIONITERATOR = _descriptor.Descriptor(
       message_type=None, enum_type=None, containing_type=None,
       is_extension=False, extension_scope=None,
       serialized_options=None, file=DESCRIPTOR,  create_key=_descriptor._internal_create_key),
+    _descriptor.FieldDescriptor(
+      name='hash_join_source', full_name='iterators.SavedProjectionIterator.hash_join_source', index=5,
+      number=6, type=11, cpp_type=10, label=1,
+      has_default_value=False, default_value=None,
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR,  create_key=_descriptor._internal_create_key),
   ],
   extensions=[
   ],
@@ -281,8 +302,8 @@ _SAVEDPROJECTIONITERATOR = _descriptor.Descriptor(
       create_key=_descriptor._internal_create_key,
     fields=[]),
   ],
-  serialized_start=428,
-  serialized_end=705,
+  serialized_start=465,
+  serialized_end=813,
 )
 
 
@@ -320,8 +341,8 @@ _SAVEDINDEXJOINITERATOR_MUCENTRY = _descriptor.Descriptor(
   extension_ranges=[],
   oneofs=[
   ],
-  serialized_start=340,
-  serialized_end=382,
+  serialized_start=377,
+  serialized_end=419,
 )
 
 _SAVEDINDEXJOINITERATOR = _descriptor.Descriptor(
@@ -368,47 +389,68 @@ _SAVEDINDEXJOINITERATOR = _descriptor.Descriptor(
       is_extension=False, extension_scope=None,
       serialized_options=None, file=DESCRIPTOR,  create_key=_descriptor._internal_create_key),
     _descriptor.FieldDescriptor(
-      name='scan_right', full_name='iterators.SavedIndexJoinIterator.scan_right', index=5,
+      name='hash_join_left', full_name='iterators.SavedIndexJoinIterator.hash_join_left', index=5,
+      number=12, type=11, cpp_type=10, label=1,
+      has_default_value=False, default_value=None,
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR,  create_key=_descriptor._internal_create_key),
+    _descriptor.FieldDescriptor(
+      name='scan_right', full_name='iterators.SavedIndexJoinIterator.scan_right', index=6,
       number=6, type=11, cpp_type=10, label=1,
       has_default_value=False, default_value=None,
       message_type=None, enum_type=None, containing_type=None,
       is_extension=False, extension_scope=None,
       serialized_options=None, file=DESCRIPTOR,  create_key=_descriptor._internal_create_key),
     _descriptor.FieldDescriptor(
-      name='proj_right', full_name='iterators.SavedIndexJoinIterator.proj_right', index=6,
+      name='proj_right', full_name='iterators.SavedIndexJoinIterator.proj_right', index=7,
       number=7, type=11, cpp_type=10, label=1,
       has_default_value=False, default_value=None,
       message_type=None, enum_type=None, containing_type=None,
       is_extension=False, extension_scope=None,
       serialized_options=None, file=DESCRIPTOR,  create_key=_descriptor._internal_create_key),
     _descriptor.FieldDescriptor(
-      name='union_right', full_name='iterators.SavedIndexJoinIterator.union_right', index=7,
+      name='union_right', full_name='iterators.SavedIndexJoinIterator.union_right', index=8,
       number=8, type=11, cpp_type=10, label=1,
       has_default_value=False, default_value=None,
       message_type=None, enum_type=None, containing_type=None,
       is_extension=False, extension_scope=None,
       serialized_options=None, file=DESCRIPTOR,  create_key=_descriptor._internal_create_key),
     _descriptor.FieldDescriptor(
-      name='join_right', full_name='iterators.SavedIndexJoinIterator.join_right', index=8,
+      name='join_right', full_name='iterators.SavedIndexJoinIterator.join_right', index=9,
       number=9, type=11, cpp_type=10, label=1,
       has_default_value=False, default_value=None,
       message_type=None, enum_type=None, containing_type=None,
       is_extension=False, extension_scope=None,
       serialized_options=None, file=DESCRIPTOR,  create_key=_descriptor._internal_create_key),
     _descriptor.FieldDescriptor(
-      name='filter_right', full_name='iterators.SavedIndexJoinIterator.filter_right', index=9,
+      name='filter_right', full_name='iterators.SavedIndexJoinIterator.filter_right', index=10,
       number=10, type=11, cpp_type=10, label=1,
       has_default_value=False, default_value=None,
       message_type=None, enum_type=None, containing_type=None,
       is_extension=False, extension_scope=None,
       serialized_options=None, file=DESCRIPTOR,  create_key=_descriptor._internal_create_key),
     _descriptor.FieldDescriptor(
-      name='muc', full_name='iterators.SavedIndexJoinIterator.muc', index=10,
+      name='hash_join_right', full_name='iterators.SavedIndexJoinIterator.hash_join_right', index=11,
+      number=13, type=11, cpp_type=10, label=1,
+      has_default_value=False, default_value=None,
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR,  create_key=_descriptor._internal_create_key),
+    _descriptor.FieldDescriptor(
+      name='muc', full_name='iterators.SavedIndexJoinIterator.muc', index=12,
       number=11, type=11, cpp_type=10, label=3,
       has_default_value=False, default_value=[],
       message_type=None, enum_type=None, containing_type=None,
       is_extension=False, extension_scope=None,
       serialized_options=None, file=DESCRIPTOR,  create_key=_descriptor._internal_create_key),
+    _descriptor.FieldDescriptor(
+      name='pending', full_name='iterators.SavedIndexJoinIterator.pending', index=13,
+      number=14, type=11, cpp_type=10, label=3,
+      has_default_value=False, default_value=[],
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR,  create_key=_descriptor._internal_create_key),
   ],
   extensions=[
   ],
@@ -431,8 +473,8 @@ _SAVEDINDEXJOINITERATOR = _descriptor.Descriptor(
       create_key=_descriptor._internal_create_key,
     fields=[]),
   ],
-  serialized_start=708,
-  serialized_end=1405,
+  serialized_start=816,
+  serialized_end=1698,
 )
 
 
@@ -480,40 +522,54 @@ _SAVEDBAGUNIONITERATOR = _descriptor.Descriptor(
       is_extension=False, extension_scope=None,
       serialized_options=None, file=DESCRIPTOR,  create_key=_descriptor._internal_create_key),
     _descriptor.FieldDescriptor(
-      name='scan_right', full_name='iterators.SavedBagUnionIterator.scan_right', index=5,
+      name='hash_join_left', full_name='iterators.SavedBagUnionIterator.hash_join_left', index=5,
+      number=11, type=11, cpp_type=10, label=1,
+      has_default_value=False, default_value=None,
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR,  create_key=_descriptor._internal_create_key),
+    _descriptor.FieldDescriptor(
+      name='scan_right', full_name='iterators.SavedBagUnionIterator.scan_right', index=6,
       number=6, type=11, cpp_type=10, label=1,
       has_default_value=False, default_value=None,
       message_type=None, enum_type=None, containing_type=None,
       is_extension=False, extension_scope=None,
       serialized_options=None, file=DESCRIPTOR,  create_key=_descriptor._internal_create_key),
     _descriptor.FieldDescriptor(
-      name='proj_right', full_name='iterators.SavedBagUnionIterator.proj_right', index=6,
+      name='proj_right', full_name='iterators.SavedBagUnionIterator.proj_right', index=7,
       number=7, type=11, cpp_type=10, label=1,
       has_default_value=False, default_value=None,
       message_type=None, enum_type=None, containing_type=None,
       is_extension=False, extension_scope=None,
       serialized_options=None, file=DESCRIPTOR,  create_key=_descriptor._internal_create_key),
     _descriptor.FieldDescriptor(
-      name='union_right', full_name='iterators.SavedBagUnionIterator.union_right', index=7,
+      name='union_right', full_name='iterators.SavedBagUnionIterator.union_right', index=8,
       number=8, type=11, cpp_type=10, label=1,
       has_default_value=False, default_value=None,
       message_type=None, enum_type=None, containing_type=None,
       is_extension=False, extension_scope=None,
       serialized_options=None, file=DESCRIPTOR,  create_key=_descriptor._internal_create_key),
     _descriptor.FieldDescriptor(
-      name='join_right', full_name='iterators.SavedBagUnionIterator.join_right', index=8,
+      name='join_right', full_name='iterators.SavedBagUnionIterator.join_right', index=9,
       number=9, type=11, cpp_type=10, label=1,
       has_default_value=False, default_value=None,
       message_type=None, enum_type=None, containing_type=None,
       is_extension=False, extension_scope=None,
       serialized_options=None, file=DESCRIPTOR,  create_key=_descriptor._internal_create_key),
     _descriptor.FieldDescriptor(
-      name='filter_right', full_name='iterators.SavedBagUnionIterator.filter_right', index=9,
+      name='filter_right', full_name='iterators.SavedBagUnionIterator.filter_right', index=10,
       number=10, type=11, cpp_type=10, label=1,
       has_default_value=False, default_value=None,
       message_type=None, enum_type=None, containing_type=None,
       is_extension=False, extension_scope=None,
       serialized_options=None, file=DESCRIPTOR,  create_key=_descriptor._internal_create_key),
+    _descriptor.FieldDescriptor(
+      name='hash_join_right', full_name='iterators.SavedBagUnionIterator.hash_join_right', index=11,
+      number=12, type=11, cpp_type=10, label=1,
+      has_default_value=False, default_value=None,
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR,  create_key=_descriptor._internal_create_key),
   ],
   extensions=[
   ],
@@ -536,8 +592,232 @@ _SAVEDBAGUNIONITERATOR = _descriptor.Descriptor(
       create_key=_descriptor._internal_create_key,
     fields=[]),
   ],
-  serialized_start=1408,
-  serialized_end=2003,
+  serialized_start=1701,
+  serialized_end=2435,
+)
+
+
+_SOLUTIONMAPPINGS_VALUESENTRY = _descriptor.Descriptor(
+  name='ValuesEntry',
+  full_name='iterators.SolutionMappings.ValuesEntry',
+  filename=None,
+  file=DESCRIPTOR,
+  containing_type=None,
+  create_key=_descriptor._internal_create_key,
+  fields=[
+    _descriptor.FieldDescriptor(
+      name='key', full_name='iterators.SolutionMappings.ValuesEntry.key', index=0,
+      number=1, type=9, cpp_type=9, label=1,
+      has_default_value=False, default_value=b"".decode('utf-8'),
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR,  create_key=_descriptor._internal_create_key),
+    _descriptor.FieldDescriptor(
+      name='value', full_name='iterators.SolutionMappings.ValuesEntry.value', index=1,
+      number=2, type=9, cpp_type=9, label=1,
+      has_default_value=False, default_value=b"".decode('utf-8'),
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR,  create_key=_descriptor._internal_create_key),
+  ],
+  extensions=[
+  ],
+  nested_types=[],
+  enum_types=[
+  ],
+  serialized_options=b'8\001',
+  is_extendable=False,
+  syntax='proto3',
+  extension_ranges=[],
+  oneofs=[
+  ],
+  serialized_start=2514,
+  serialized_end=2559,
+)
+
+_SOLUTIONMAPPINGS = _descriptor.Descriptor(
+  name='SolutionMappings',
+  full_name='iterators.SolutionMappings',
+  filename=None,
+  file=DESCRIPTOR,
+  containing_type=None,
+  create_key=_descriptor._internal_create_key,
+  fields=[
+    _descriptor.FieldDescriptor(
+      name='values', full_name='iterators.SolutionMappings.values', index=0,
+      number=1, type=11, cpp_type=10, label=3,
+      has_default_value=False, default_value=[],
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR,  create_key=_descriptor._internal_create_key),
+  ],
+  extensions=[
+  ],
+  nested_types=[_SOLUTIONMAPPINGS_VALUESENTRY, ],
+  enum_types=[
+  ],
+  serialized_options=None,
+  is_extendable=False,
+  syntax='proto3',
+  extension_ranges=[],
+  oneofs=[
+  ],
+  serialized_start=2437,
+  serialized_end=2559,
+)
+
+
+_SAVEDSYMMETRICHASHJOINITERATOR = _descriptor.Descriptor(
+  name='SavedSymmetricHashJoinIterator',
+  full_name='iterators.SavedSymmetricHashJoinIterator',
+  filename=None,
+  file=DESCRIPTOR,
+  containing_type=None,
+  create_key=_descriptor._internal_create_key,
+  fields=[
+    _descriptor.FieldDescriptor(
+      name='scan_left', full_name='iterators.SavedSymmetricHashJoinIterator.scan_left', index=0,
+      number=1, type=11, cpp_type=10, label=1,
+      has_default_value=False, default_value=None,
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR,  create_key=_descriptor._internal_create_key),
+    _descriptor.FieldDescriptor(
+      name='proj_left', full_name='iterators.SavedSymmetricHashJoinIterator.proj_left', index=1,
+      number=2, type=11, cpp_type=10, label=1,
+      has_default_value=False, default_value=None,
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR,  create_key=_descriptor._internal_create_key),
+    _descriptor.FieldDescriptor(
+      name='union_left', full_name='iterators.SavedSymmetricHashJoinIterator.union_left', index=2,
+      number=3, type=11, cpp_type=10, label=1,
+      has_default_value=False, default_value=None,
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR,  create_key=_descriptor._internal_create_key),
+    _descriptor.FieldDescriptor(
+      name='join_left', full_name='iterators.SavedSymmetricHashJoinIterator.join_left', index=3,
+      number=4, type=11, cpp_type=10, label=1,
+      has_default_value=False, default_value=None,
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR,  create_key=_descriptor._internal_create_key),
+    _descriptor.FieldDescriptor(
+      name='filter_left', full_name='iterators.SavedSymmetricHashJoinIterator.filter_left', index=4,
+      number=5, type=11, cpp_type=10, label=1,
+      has_default_value=False, default_value=None,
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR,  create_key=_descriptor._internal_create_key),
+    _descriptor.FieldDescriptor(
+      name='hash_join_left', full_name='iterators.SavedSymmetricHashJoinIterator.hash_join_left', index=5,
+      number=6, type=11, cpp_type=10, label=1,
+      has_default_value=False, default_value=None,
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR,  create_key=_descriptor._internal_create_key),
+    _descriptor.FieldDescriptor(
+      name='scan_right', full_name='iterators.SavedSymmetricHashJoinIterator.scan_right', index=6,
+      number=7, type=11, cpp_type=10, label=1,
+      has_default_value=False, default_value=None,
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR,  create_key=_descriptor._internal_create_key),
+    _descriptor.FieldDescriptor(
+      name='proj_right', full_name='iterators.SavedSymmetricHashJoinIterator.proj_right', index=7,
+      number=8, type=11, cpp_type=10, label=1,
+      has_default_value=False, default_value=None,
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR,  create_key=_descriptor._internal_create_key),
+    _descriptor.FieldDescriptor(
+      name='union_right', full_name='iterators.SavedSymmetricHashJoinIterator.union_right', index=8,
+      number=9, type=11, cpp_type=10, label=1,
+      has_default_value=False, default_value=None,
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR,  create_key=_descriptor._internal_create_key),
+    _descriptor.FieldDescriptor(
+      name='join_right', full_name='iterators.SavedSymmetricHashJoinIterator.join_right', index=9,
+      number=10, type=11, cpp_type=10, label=1,
+      has_default_value=False, default_value=None,
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR,  create_key=_descriptor._internal_create_key),
+    _descriptor.FieldDescriptor(
+      name='filter_right', full_name='iterators.SavedSymmetricHashJoinIterator.filter_right', index=10,
+      number=11, type=11, cpp_type=10, label=1,
+      has_default_value=False, default_value=None,
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR,  create_key=_descriptor._internal_create_key),
+    _descriptor.FieldDescriptor(
+      name='hash_join_right', full_name='iterators.SavedSymmetricHashJoinIterator.hash_join_right', index=11,
+      number=12, type=11, cpp_type=10, label=1,
+      has_default_value=False, default_value=None,
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR,  create_key=_descriptor._internal_create_key),
+    _descriptor.FieldDescriptor(
+      name='join_variables', full_name='iterators.SavedSymmetricHashJoinIterator.join_variables', index=12,
+      number=13, type=9, cpp_type=9, label=3,
+      has_default_value=False, default_value=[],
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR,  create_key=_descriptor._internal_create_key),
+    _descriptor.FieldDescriptor(
+      name='left_table', full_name='iterators.SavedSymmetricHashJoinIterator.left_table', index=13,
+      number=14, type=11, cpp_type=10, label=3,
+      has_default_value=False, default_value=[],
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR,  create_key=_descriptor._internal_create_key),
+    _descriptor.FieldDescriptor(
+      name='right_table', full_name='iterators.SavedSymmetricHashJoinIterator.right_table', index=14,
+      number=15, type=11, cpp_type=10, label=3,
+      has_default_value=False, default_value=[],
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR,  create_key=_descriptor._internal_create_key),
+    _descriptor.FieldDescriptor(
+      name='pending', full_name='iterators.SavedSymmetricHashJoinIterator.pending', index=15,
+      number=16, type=11, cpp_type=10, label=3,
+      has_default_value=False, default_value=[],
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR,  create_key=_descriptor._internal_create_key),
+    _descriptor.FieldDescriptor(
+      name='read_left', full_name='iterators.SavedSymmetricHashJoinIterator.read_left', index=16,
+      number=17, type=8, cpp_type=7, label=1,
+      has_default_value=False, default_value=False,
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR,  create_key=_descriptor._internal_create_key),
+  ],
+  extensions=[
+  ],
+  nested_types=[],
+  enum_types=[
+  ],
+  serialized_options=None,
+  is_extendable=False,
+  syntax='proto3',
+  extension_ranges=[],
+  oneofs=[
+    _descriptor.OneofDescriptor(
+      name='left', full_name='iterators.SavedSymmetricHashJoinIterator.left',
+      index=0, containing_type=None,
+      create_key=_descriptor._internal_create_key,
+    fields=[]),
+    _descriptor.OneofDescriptor(
+      name='right', full_name='iterators.SavedSymmetricHashJoinIterator.right',
+      index=1, containing_type=None,
+      create_key=_descriptor._internal_create_key,
+    fields=[]),
+  ],
+  serialized_start=2562,
+  serialized_end=3493,
 )
 
 
@@ -578,7 +858,14 @@ _SAVEDFILTERITERATOR = _descriptor.Descriptor(
       is_extension=False, extension_scope=None,
       serialized_options=None, file=DESCRIPTOR,  create_key=_descriptor._internal_create_key),
     _descriptor.FieldDescriptor(
-      name='expression', full_name='iterators.SavedFilterIterator.expression', index=4,
+      name='hash_join_source', full_name='iterators.SavedFilterIterator.hash_join_source', index=4,
+      number=6, type=11, cpp_type=10, label=1,
+      has_default_value=False, default_value=None,
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR,  create_key=_descriptor._internal_create_key),
+    _descriptor.FieldDescriptor(
+      name='expression', full_name='iterators.SavedFilterIterator.expression', index=5,
       number=5, type=9, cpp_type=9, label=1,
       has_default_value=False, default_value=b"".decode('utf-8'),
       message_type=None, enum_type=None, containing_type=None,
@@ -601,8 +888,8 @@ _SAVEDFILTERITERATOR = _descriptor.Descriptor(
       create_key=_descriptor._internal_create_key,
     fields=[]),
   ],
-  serialized_start=2006,
-  serialized_end=2284,
+  serialized_start=3496,
+  serialized_end=3845,
 )
 
 
@@ -640,8 +927,8 @@ _SAVEDINSERTDATA_NBINSERTEDENTRY = _descriptor.Descriptor(
   extension_ranges=[],
   oneofs=[
   ],
-  serialized_start=2371,
-  serialized_end=2420,
+  serialized_start=3932,
+  serialized_end=3981,
 )
 
 _SAVEDINSERTDATA = _descriptor.Descriptor(
@@ -671,8 +958,8 @@ _SAVEDINSERTDATA = _descriptor.Descriptor(
   extension_ranges=[],
   oneofs=[
   ],
-  serialized_start=2287,
-  serialized_end=2420,
+  serialized_start=3848,
+  serialized_end=3981,
 )
 
 
@@ -710,8 +997,8 @@ _SAVEDDELETEDATA_NBINSERTEDENTRY = _descriptor.Descriptor(
   extension_ranges=[],
   oneofs=[
   ],
-  serialized_start=2371,
-  serialized_end=2420,
+  serialized_start=3932,
+  serialized_end=3981,
 )
 
 _SAVEDDELETEDATA = _descriptor.Descriptor(
@@ -741,8 +1028,8 @@ _SAVEDDELETEDATA = _descriptor.Descriptor(
   extension_ranges=[],
   oneofs=[
   ],
-  serialized_start=2423,
-  serialized_end=2556,
+  serialized_start=3984,
+  serialized_end=4117,
 )
 
 
@@ -803,6 +1090,13 @@ _ROOTTREE = _descriptor.Descriptor(
       message_type=None, enum_type=None, containing_type=None,
       is_extension=False, extension_scope=None,
       serialized_options=None, file=DESCRIPTOR,  create_key=_descriptor._internal_create_key),
+    _descriptor.FieldDescriptor(
+      name='hash_join_source', full_name='iterators.RootTree.hash_join_source', index=7,
+      number=8, type=11, cpp_type=10, label=1,
+      has_default_value=False, default_value=None,
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR,  create_key=_descriptor._internal_create_key),
   ],
   extensions=[
   ],
@@ -820,8 +1114,47 @@ _ROOTTREE = _descriptor.Descriptor(
       create_key=_descriptor._internal_create_key,
     fields=[]),
   ],
-  serialized_start=2559,
-  serialized_end=2970,
+  serialized_start=4120,
+  serialized_end=4602,
+)
+
+
+_COMPACTROOTTREE = _descriptor.Descriptor(
+  name='CompactRootTree',
+  full_name='iterators.CompactRootTree',
+  filename=None,
+  file=DESCRIPTOR,
+  containing_type=None,
+  create_key=_descriptor._internal_create_key,
+  fields=[
+    _descriptor.FieldDescriptor(
+      name='terms', full_name='iterators.CompactRootTree.terms', index=0,
+      number=1, type=9, cpp_type=9, label=3,
+      has_default_value=False, default_value=[],
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR,  create_key=_descriptor._internal_create_key),
+    _descriptor.FieldDescriptor(
+      name='plan', full_name='iterators.CompactRootTree.plan', index=1,
+      number=2, type=11, cpp_type=10, label=1,
+      has_default_value=False, default_value=None,
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR,  create_key=_descriptor._internal_create_key),
+  ],
+  extensions=[
+  ],
+  nested_types=[],
+  enum_types=[
+  ],
+  serialized_options=None,
+  is_extendable=False,
+  syntax='proto3',
+  extension_ranges=[],
+  oneofs=[
+  ],
+  serialized_start=4604,
+  serialized_end=4671,
 )
 
 _SAVEDSCANITERATOR_MUCENTRY.containing_type = _SAVEDSCANITERATOR
@@ -833,6 +1166,7 @@ _SAVEDPROJECTIONITERATOR.fields_by_name['scan_source'].message_type = _SAVEDSCAN
 _SAVEDPROJECTIONITERATOR.fields_by_name['join_source'].message_type = _SAVEDINDEXJOINITERATOR
 _SAVEDPROJECTIONITERATOR.fields_by_name['union_source'].message_type = _SAVEDBAGUNIONITERATOR
 _SAVEDPROJECTIONITERATOR.fields_by_name['filter_source'].message_type = _SAVEDFILTERITERATOR
+_SAVEDPROJECTIONITERATOR.fields_by_name['hash_join_source'].message_type = _SAVEDSYMMETRICHASHJOINITERATOR
 _SAVEDPROJECTIONITERATOR.oneofs_by_name['source'].fields.append(
   _SAVEDPROJECTIONITERATOR.fields_by_name['scan_source'])
 _SAVEDPROJECTIONITERATOR.fields_by_name['scan_source'].containing_oneof = _SAVEDPROJECTIONITERATOR.oneofs_by_name['source']
@@ -845,18 +1179,24 @@ _SAVEDPROJECTIONITERATOR.fields_by_name['union_source'].containing_oneof = _SAVE
 _SAVEDPROJECTIONITERATOR.oneofs_by_name['source'].fields.append(
   _SAVEDPROJECTIONITERATOR.fields_by_name['filter_source'])
 _SAVEDPROJECTIONITERATOR.fields_by_name['filter_source'].containing_oneof = _SAVEDPROJECTIONITERATOR.oneofs_by_name['source']
+_SAVEDPROJECTIONITERATOR.oneofs_by_name['source'].fields.append(
+  _SAVEDPROJECTIONITERATOR.fields_by_name['hash_join_source'])
+_SAVEDPROJECTIONITERATOR.fields_by_name['hash_join_source'].containing_oneof = _SAVEDPROJECTIONITERATOR.oneofs_by_name['source']
 _SAVEDINDEXJOINITERATOR_MUCENTRY.containing_type = _SAVEDINDEXJOINITERATOR
 _SAVEDINDEXJOINITERATOR.fields_by_name['scan_left'].message_type = _SAVEDSCANITERATOR
 _SAVEDINDEXJOINITERATOR.fields_by_name['proj_left'].message_type = _SAVEDPROJECTIONITERATOR
 _SAVEDINDEXJOINITERATOR.fields_by_name['union_left'].message_type = _SAVEDBAGUNIONITERATOR
 _SAVEDINDEXJOINITERATOR.fields_by_name['join_left'].message_type = _SAVEDINDEXJOINITERATOR
 _SAVEDINDEXJOINITERATOR.fields_by_name['filter_left'].message_type = _SAVEDFILTERITERATOR
+_SAVEDINDEXJOINITERATOR.fields_by_name['hash_join_left'].message_type = _SAVEDSYMMETRICHASHJOINITERATOR
 _SAVEDINDEXJOINITERATOR.fields_by_name['scan_right'].message_type = _SAVEDSCANITERATOR
 _SAVEDINDEXJOINITERATOR.fields_by_name['proj_right'].message_type = _SAVEDPROJECTIONITERATOR
 _SAVEDINDEXJOINITERATOR.fields_by_name['union_right'].message_type = _SAVEDBAGUNIONITERATOR
 _SAVEDINDEXJOINITERATOR.fields_by_name['join_right'].message_type = _SAVEDINDEXJOINITERATOR
 _SAVEDINDEXJOINITERATOR.fields_by_name['filter_right'].message_type = _SAVEDFILTERITERATOR
+_SAVEDINDEXJOINITERATOR.fields_by_name['hash_join_right'].message_type = _SAVEDSYMMETRICHASHJOINITERATOR
 _SAVEDINDEXJOINITERATOR.fields_by_name['muc'].message_type = _SAVEDINDEXJOINITERATOR_MUCENTRY
+_SAVEDINDEXJOINITERATOR.fields_by_name['pending'].message_type = _SOLUTIONMAPPINGS
 _SAVEDINDEXJOINITERATOR.oneofs_by_name['left'].fields.append(
   _SAVEDINDEXJOINITERATOR.fields_by_name['scan_left'])
 _SAVEDINDEXJOINITERATOR.fields_by_name['scan_left'].containing_oneof = _SAVEDINDEXJOINITERATOR.oneofs_by_name['left']
@@ -872,6 +1212,9 @@ _SAVEDINDEXJOINITERATOR.fields_by_name['join_left'].containing_oneof = _SAVEDIND
 _SAVEDINDEXJOINITERATOR.oneofs_by_name['left'].fields.append(
   _SAVEDINDEXJOINITERATOR.fields_by_name['filter_left'])
 _SAVEDINDEXJOINITERATOR.fields_by_name['filter_left'].containing_oneof = _SAVEDINDEXJOINITERATOR.oneofs_by_name['left']
+_SAVEDINDEXJOINITERATOR.oneofs_by_name['left'].fields.append(
+  _SAVEDINDEXJOINITERATOR.fields_by_name['hash_join_left'])
+_SAVEDINDEXJOINITERATOR.fields_by_name['hash_join_left'].containing_oneof = _SAVEDINDEXJOINITERATOR.oneofs_by_name['left']
 _SAVEDINDEXJOINITERATOR.oneofs_by_name['right'].fields.append(
   _SAVEDINDEXJOINITERATOR.fields_by_name['scan_right'])
 _SAVEDINDEXJOINITERATOR.fields_by_name['scan_right'].containing_oneof = _SAVEDINDEXJOINITERATOR.oneofs_by_name['right']
@@ -887,16 +1230,21 @@ _SAVEDINDEXJOINITERATOR.fields_by_name['join_right'].containing_oneof = _SAVEDIN
 _SAVEDINDEXJOINITERATOR.oneofs_by_name['right'].fields.append(
   _SAVEDINDEXJOINITERATOR.fields_by_name['filter_right'])
 _SAVEDINDEXJOINITERATOR.fields_by_name['filter_right'].containing_oneof = _SAVEDINDEXJOINITERATOR.oneofs_by_name['right']
+_SAVEDINDEXJOINITERATOR.oneofs_by_name['right'].fields.append(
+  _SAVEDINDEXJOINITERATOR.fields_by_name['hash_join_right'])
+_SAVEDINDEXJOINITERATOR.fields_by_name['hash_join_right'].containing_oneof = _SAVEDINDEXJOINITERATOR.oneofs_by_name['right']
 _SAVEDBAGUNIONITERATOR.fields_by_name['scan_left'].message_type = _SAVEDSCANITERATOR
 _SAVEDBAGUNIONITERATOR.fields_by_name['proj_left'].message_type = _SAVEDPROJECTIONITERATOR
 _SAVEDBAGUNIONITERATOR.fields_by_name['union_left'].message_type = _SAVEDBAGUNIONITERATOR
 _SAVEDBAGUNIONITERATOR.fields_by_name['join_left'].message_type = _SAVEDINDEXJOINITERATOR
 _SAVEDBAGUNIONITERATOR.fields_by_name['filter_left'].message_type = _SAVEDFILTERITERATOR
+_SAVEDBAGUNIONITERATOR.fields_by_name['hash_join_left'].message_type = _SAVEDSYMMETRICHASHJOINITERATOR
 _SAVEDBAGUNIONITERATOR.fields_by_name['scan_right'].message_type = _SAVEDSCANITERATOR
 _SAVEDBAGUNIONITERATOR.fields_by_name['proj_right'].message_type = _SAVEDPROJECTIONITERATOR
 _SAVEDBAGUNIONITERATOR.fields_by_name['union_right'].message_type = _SAVEDBAGUNIONITERATOR
 _SAVEDBAGUNIONITERATOR.fields_by_name['join_right'].message_type = _SAVEDINDEXJOINITERATOR
 _SAVEDBAGUNIONITERATOR.fields_by_name['filter_right'].message_type = _SAVEDFILTERITERATOR
+_SAVEDBAGUNIONITERATOR.fields_by_name['hash_join_right'].message_type = _SAVEDSYMMETRICHASHJOINITERATOR
 _SAVEDBAGUNIONITERATOR.oneofs_by_name['left'].fields.append(
   _SAVEDBAGUNIONITERATOR.fields_by_name['scan_left'])
 _SAVEDBAGUNIONITERATOR.fields_by_name['scan_left'].containing_oneof = _SAVEDBAGUNIONITERATOR.oneofs_by_name['left']
@@ -912,6 +1260,9 @@ _SAVEDBAGUNIONITERATOR.fields_by_name['join_left'].containing_oneof = _SAVEDBAGU
 _SAVEDBAGUNIONITERATOR.oneofs_by_name['left'].fields.append(
   _SAVEDBAGUNIONITERATOR.fields_by_name['filter_left'])
 _SAVEDBAGUNIONITERATOR.fields_by_name['filter_left'].containing_oneof = _SAVEDBAGUNIONITERATOR.oneofs_by_name['left']
+_SAVEDBAGUNIONITERATOR.oneofs_by_name['left'].fields.append(
+  _SAVEDBAGUNIONITERATOR.fields_by_name['hash_join_left'])
+_SAVEDBAGUNIONITERATOR.fields_by_name['hash_join_left'].containing_oneof = _SAVEDBAGUNIONITERATOR.oneofs_by_name['left']
 _SAVEDBAGUNIONITERATOR.oneofs_by_name['right'].fields.append(
   _SAVEDBAGUNIONITERATOR.fields_by_name['scan_right'])
 _SAVEDBAGUNIONITERATOR.fields_by_name['scan_right'].containing_oneof = _SAVEDBAGUNIONITERATOR.oneofs_by_name['right']
@@ -927,10 +1278,67 @@ _SAVEDBAGUNIONITERATOR.fields_by_name['join_right'].containing_oneof = _SAVEDBAG
 _SAVEDBAGUNIONITERATOR.oneofs_by_name['right'].fields.append(
   _SAVEDBAGUNIONITERATOR.fields_by_name['filter_right'])
 _SAVEDBAGUNIONITERATOR.fields_by_name['filter_right'].containing_oneof = _SAVEDBAGUNIONITERATOR.oneofs_by_name['right']
+_SAVEDBAGUNIONITERATOR.oneofs_by_name['right'].fields.append(
+  _SAVEDBAGUNIONITERATOR.fields_by_name['hash_join_right'])
+_SAVEDBAGUNIONITERATOR.fields_by_name['hash_join_right'].containing_oneof = _SAVEDBAGUNIONITERATOR.oneofs_by_name['right']
+_SOLUTIONMAPPINGS_VALUESENTRY.containing_type = _SOLUTIONMAPPINGS
+_SOLUTIONMAPPINGS.fields_by_name['values'].message_type = _SOLUTIONMAPPINGS_VALUESENTRY
+_SAVEDSYMMETRICHASHJOINITERATOR.fields_by_name['scan_left'].message_type = _SAVEDSCANITERATOR
+_SAVEDSYMMETRICHASHJOINITERATOR.fields_by_name['proj_left'].message_type = _SAVEDPROJECTIONITERATOR
+_SAVEDSYMMETRICHASHJOINITERATOR.fields_by_name['union_left'].message_type = _SAVEDBAGUNIONITERATOR
+_SAVEDSYMMETRICHASHJOINITERATOR.fields_by_name['join_left'].message_type = _SAVEDINDEXJOINITERATOR
+_SAVEDSYMMETRICHASHJOINITERATOR.fields_by_name['filter_left'].message_type = _SAVEDFILTERITERATOR
+_SAVEDSYMMETRICHASHJOINITERATOR.fields_by_name['hash_join_left'].message_type = _SAVEDSYMMETRICHASHJOINITERATOR
+_SAVEDSYMMETRICHASHJOINITERATOR.fields_by_name['scan_right'].message_type = _SAVEDSCANITERATOR
+_SAVEDSYMMETRICHASHJOINITERATOR.fields_by_name['proj_right'].message_type = _SAVEDPROJECTIONITERATOR
+_SAVEDSYMMETRICHASHJOINITERATOR.fields_by_name['union_right'].message_type = _SAVEDBAGUNIONITERATOR
+_SAVEDSYMMETRICHASHJOINITERATOR.fields_by_name['join_right'].message_type = _SAVEDINDEXJOINITERATOR
+_SAVEDSYMMETRICHASHJOINITERATOR.fields_by_name['filter_right'].message_type = _SAVEDFILTERITERATOR
+_SAVEDSYMMETRICHASHJOINITERATOR.fields_by_name['hash_join_right'].message_type = _SAVEDSYMMETRICHASHJOINITERATOR
+_SAVEDSYMMETRICHASHJOINITERATOR.fields_by_name['left_table'].message_type = _SOLUTIONMAPPINGS
+_SAVEDSYMMETRICHASHJOINITERATOR.fields_by_name['right_table'].message_type = _SOLUTIONMAPPINGS
+_SAVEDSYMMETRICHASHJOINITERATOR.fields_by_name['pending'].message_type = _SOLUTIONMAPPINGS
+_SAVEDSYMMETRICHASHJOINITERATOR.oneofs_by_name['left'].fields.append(
+  _SAVEDSYMMETRICHASHJOINITERATOR.fields_by_name['scan_left'])
+_SAVEDSYMMETRICHASHJOINITERATOR.fields_by_name['scan_left'].containing_oneof = _SAVEDSYMMETRICHASHJOINITERATOR.oneofs_by_name['left']
+_SAVEDSYMMETRICHASHJOINITERATOR.oneofs_by_name['left'].fields.append(
+  _SAVEDSYMMETRICHASHJOINITERATOR.fields_by_name['proj_left'])
+_SAVEDSYMMETRICHASHJOINITERATOR.fields_by_name['proj_left'].containing_oneof = _SAVEDSYMMETRICHASHJOINITERATOR.oneofs_by_name['left']
+_SAVEDSYMMETRICHASHJOINITERATOR.oneofs_by_name['left'].fields.append(
+  _SAVEDSYMMETRICHASHJOINITERATOR.fields_by_name['union_left'])
+_SAVEDSYMMETRICHASHJOINITERATOR.fields_by_name['union_left'].containing_oneof = _SAVEDSYMMETRICHASHJOINITERATOR.oneofs_by_name['left']
+_SAVEDSYMMETRICHASHJOINITERATOR.oneofs_by_name['left'].fields.append(
+  _SAVEDSYMMETRICHASHJOINITERATOR.fields_by_name['join_left'])
+_SAVEDSYMMETRICHASHJOINITERATOR.fields_by_name['join_left'].containing_oneof = _SAVEDSYMMETRICHASHJOINITERATOR.oneofs_by_name['left']
+_SAVEDSYMMETRICHASHJOINITERATOR.oneofs_by_name['left'].fields.append(
+  _SAVEDSYMMETRICHASHJOINITERATOR.fields_by_name['filter_left'])
+_SAVEDSYMMETRICHASHJOINITERATOR.fields_by_name['filter_left'].containing_oneof = _SAVEDSYMMETRICHASHJOINITERATOR.oneofs_by_name['left']
+_SAVEDSYMMETRICHASHJOINITERATOR.oneofs_by_name['left'].fields.append(
+  _SAVEDSYMMETRICHASHJOINITERATOR.fields_by_name['hash_join_left'])
+_SAVEDSYMMETRICHASHJOINITERATOR.fields_by_name['hash_join_left'].containing_oneof = _SAVEDSYMMETRICHASHJOINITERATOR.oneofs_by_name['left']
+_SAVEDSYMMETRICHASHJOINITERATOR.oneofs_by_name['right'].fields.append(
+  _SAVEDSYMMETRICHASHJOINITERATOR.fields_by_name['scan_right'])
+_SAVEDSYMMETRICHASHJOINITERATOR.fields_by_name['scan_right'].containing_oneof = _SAVEDSYMMETRICHASHJOINITERATOR.oneofs_by_name['right']
+_SAVEDSYMMETRICHASHJOINITERATOR.oneofs_by_name['right'].fields.append(
+  _SAVEDSYMMETRICHASHJOINITERATOR.fields_by_name['proj_right'])
+_SAVEDSYMMETRICHASHJOINITERATOR.fields_by_name['proj_right'].containing_oneof = _SAVEDSYMMETRICHASHJOINITERATOR.oneofs_by_name['right']
+_SAVEDSYMMETRICHASHJOINITERATOR.oneofs_by_name['right'].fields.append(
+  _SAVEDSYMMETRICHASHJOINITERATOR.fields_by_name['union_right'])
+_SAVEDSYMMETRICHASHJOINITERATOR.fields_by_name['union_right'].containing_oneof = _SAVEDSYMMETRICHASHJOINITERATOR.oneofs_by_name['right']
+_SAVEDSYMMETRICHASHJOINITERATOR.oneofs_by_name['right'].fields.append(
+  _SAVEDSYMMETRICHASHJOINITERATOR.fields_by_name['join_right'])
+_SAVEDSYMMETRICHASHJOINITERATOR.fields_by_name['join_right'].containing_oneof = _SAVEDSYMMETRICHASHJOINITERATOR.oneofs_by_name['right']
+_SAVEDSYMMETRICHASHJOINITERATOR.oneofs_by_name['right'].fields.append(
+  _SAVEDSYMMETRICHASHJOINITERATOR.fields_by_name['filter_right'])
+_SAVEDSYMMETRICHASHJOINITERATOR.fields_by_name['filter_right'].containing_oneof = _SAVEDSYMMETRICHASHJOINITERATOR.oneofs_by_name['right']
+_SAVEDSYMMETRICHASHJOINITERATOR.oneofs_by_name['right'].fields.append(
+  _SAVEDSYMMETRICHASHJOINITERATOR.fields_by_name['hash_join_right'])
+_SAVEDSYMMETRICHASHJOINITERATOR.fields_by_name['hash_join_right'].containing_oneof = _SAVEDSYMMETRICHASHJOINITERATOR.oneofs_by_name['right']
 _SAVEDFILTERITERATOR.fields_by_name['scan_source'].message_type = _SAVEDSCANITERATOR
 _SAVEDFILTERITERATOR.fields_by_name['proj_source'].message_type = _SAVEDPROJECTIONITERATOR
 _SAVEDFILTERITERATOR.fields_by_name['filter_source'].message_type = _SAVEDFILTERITERATOR
 _SAVEDFILTERITERATOR.fields_by_name['join_source'].message_type = _SAVEDINDEXJOINITERATOR
+_SAVEDFILTERITERATOR.fields_by_name['hash_join_source'].message_type = _SAVEDSYMMETRICHASHJOINITERATOR
 _SAVEDFILTERITERATOR.oneofs_by_name['source'].fields.append(
   _SAVEDFILTERITERATOR.fields_by_name['scan_source'])
 _SAVEDFILTERITERATOR.fields_by_name['scan_source'].containing_oneof = _SAVEDFILTERITERATOR.oneofs_by_name['source']
@@ -943,6 +1351,9 @@ _SAVEDFILTERITERATOR.fields_by_name['filter_source'].containing_oneof = _SAVEDFI
 _SAVEDFILTERITERATOR.oneofs_by_name['source'].fields.append(
   _SAVEDFILTERITERATOR.fields_by_name['join_source'])
 _SAVEDFILTERITERATOR.fields_by_name['join_source'].containing_oneof = _SAVEDFILTERITERATOR.oneofs_by_name['source']
+_SAVEDFILTERITERATOR.oneofs_by_name['source'].fields.append(
+  _SAVEDFILTERITERATOR.fields_by_name['hash_join_source'])
+_SAVEDFILTERITERATOR.fields_by_name['hash_join_source'].containing_oneof = _SAVEDFILTERITERATOR.oneofs_by_name['source']
 _SAVEDINSERTDATA_NBINSERTEDENTRY.containing_type = _SAVEDINSERTDATA
 _SAVEDINSERTDATA.fields_by_name['nb_inserted'].message_type = _SAVEDINSERTDATA_NBINSERTEDENTRY
 _SAVEDDELETEDATA_NBINSERTEDENTRY.containing_type = _SAVEDDELETEDATA
@@ -954,6 +1365,7 @@ _ROOTTREE.fields_by_name['union_source'].message_type = _SAVEDBAGUNIONITERATOR
 _ROOTTREE.fields_by_name['filter_source'].message_type = _SAVEDFILTERITERATOR
 _ROOTTREE.fields_by_name['insert_source'].message_type = _SAVEDINSERTDATA
 _ROOTTREE.fields_by_name['delete_source'].message_type = _SAVEDDELETEDATA
+_ROOTTREE.fields_by_name['hash_join_source'].message_type = _SAVEDSYMMETRICHASHJOINITERATOR
 _ROOTTREE.oneofs_by_name['source'].fields.append(
   _ROOTTREE.fields_by_name['scan_source'])
 _ROOTTREE.fields_by_name['scan_source'].containing_oneof = _ROOTTREE.oneofs_by_name['source']
@@ -975,15 +1387,22 @@ _ROOTTREE.fields_by_name['insert_source'].containing_oneof = _ROOTTREE.oneofs_by
 _ROOTTREE.oneofs_by_name['source'].fields.append(
   _ROOTTREE.fields_by_name['delete_source'])
 _ROOTTREE.fields_by_name['delete_source'].containing_oneof = _ROOTTREE.oneofs_by_name['source']
+_ROOTTREE.oneofs_by_name['source'].fields.append(
+  _ROOTTREE.fields_by_name['hash_join_source'])
+_ROOTTREE.fields_by_name['hash_join_source'].containing_oneof = _ROOTTREE.oneofs_by_name['source']
+_COMPACTROOTTREE.fields_by_name['plan'].message_type = _ROOTTREE
 DESCRIPTOR.message_types_by_name['TriplePattern'] = _TRIPLEPATTERN
 DESCRIPTOR.message_types_by_name['SavedScanIterator'] = _SAVEDSCANITERATOR
 DESCRIPTOR.message_types_by_name['SavedProjectionIterator'] = _SAVEDPROJECTIONITERATOR
 DESCRIPTOR.message_types_by_name['SavedIndexJoinIterator'] = _SAVEDINDEXJOINITERATOR
 DESCRIPTOR.message_types_by_name['SavedBagUnionIterator'] = _SAVEDBAGUNIONITERATOR
+DESCRIPTOR.message_types_by_name['SolutionMappings'] = _SOLUTIONMAPPINGS
+DESCRIPTOR.message_types_by_name['SavedSymmetricHashJoinIterator'] = _SAVEDSYMMETRICHASHJOINITERATOR
 DESCRIPTOR.message_types_by_name['SavedFilterIterator'] = _SAVEDFILTERITERATOR
 DESCRIPTOR.message_types_by_name['SavedInsertData'] = _SAVEDINSERTDATA
 DESCRIPTOR.message_types_by_name['SavedDeleteData'] = _SAVEDDELETEDATA
 DESCRIPTOR.message_types_by_name['RootTree'] = _ROOTTREE
+DESCRIPTOR.message_types_by_name['CompactRootTree'] = _COMPACTROOTTREE
 _sym_db.RegisterFileDescriptor(DESCRIPTOR)
 
 TriplePattern = _reflection.GeneratedProtocolMessageType('TriplePattern', (_message.Message,), {
@@ -1045,6 +1464,28 @@ SavedBagUnionIterator = _reflection.GeneratedProtocolMessageType('SavedBagUnionI
   })
 _sym_db.RegisterMessage(SavedBagUnionIterator)
 
+SolutionMappings = _reflection.GeneratedProtocolMessageType('SolutionMappings', (_message.Message,), {
+
+  'ValuesEntry' : _reflection.GeneratedProtocolMessageType('ValuesEntry', (_message.Message,), {
+    'DESCRIPTOR' : _SOLUTIONMAPPINGS_VALUESENTRY,
+    '__module__' : 'iterators_pb2'
+    # @@protoc_insertion_point(class_scope:iterators.SolutionMappings.ValuesEntry)
+    })
+  ,
+  'DESCRIPTOR' : _SOLUTIONMAPPINGS,
+  '__module__' : 'iterators_pb2'
+  # @@protoc_insertion_point(class_scope:iterators.SolutionMappings)
+  })
+_sym_db.RegisterMessage(SolutionMappings)
+_sym_db.RegisterMessage(SolutionMappings.ValuesEntry)
+
+SavedSymmetricHashJoinIterator = _reflection.GeneratedProtocolMessageType('SavedSymmetricHashJoinIterator', (_message.Message,), {
+  'DESCRIPTOR' : _SAVEDSYMMETRICHASHJOINITERATOR,
+  '__module__' : 'iterators_pb2'
+  # @@protoc_insertion_point(class_scope:iterators.SavedSymmetricHashJoinIterator)
+  })
+_sym_db.RegisterMessage(SavedSymmetricHashJoinIterator)
+
 SavedFilterIterator = _reflection.GeneratedProtocolMessageType('SavedFilterIterator', (_message.Message,), {
   'DESCRIPTOR' : _SAVEDFILTERITERATOR,
   '__module__' : 'iterators_pb2'
@@ -1089,10 +1530,18 @@ RootTree = _reflection.GeneratedProtocolMessageType('RootTree', (_message.Messag
   })
 _sym_db.RegisterMessage(RootTree)
 
+CompactRootTree = _reflection.GeneratedProtocolMessageType('CompactRootTree', (_message.Message,), {
+  'DESCRIPTOR' : _COMPACTROOTTREE,
+  '__module__' : 'iterators_pb2'
+  # @@protoc_insertion_point(class_scope:iterators.CompactRootTree)
+  })
+_sym_db.RegisterMessage(CompactRootTree)
+
 
 _SAVEDSCANITERATOR_MUCENTRY._options = None
 _SAVEDSCANITERATOR_MUENTRY._options = None
 _SAVEDINDEXJOINITERATOR_MUCENTRY._options = None
+_SOLUTIONMAPPINGS_VALUESENTRY._options = None
 _SAVEDINSERTDATA_NBINSERTEDENTRY._options = None
 _SAVEDDELETEDATA_NBINSERTEDENTRY._options = None
 # @@protoc_insertion_point(module_scope)
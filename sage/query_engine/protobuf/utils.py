@@ -5,7 +5,8 @@
 def pyDict_to_protoDict(source, target):
     """Copy a python dict into a Protobuf map<K,V>"""
     for key in source:
-        target[key] = source[key]
+        # RDF terms encoded by the database are saved as RDF terms
+        target[key] = str(source[key])
 
 
 def protoTriple_to_dict(triple):
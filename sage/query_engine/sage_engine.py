@@ -1,31 +1,75 @@
 # sage_engine.py
 # Author: Thomas MINIER - MIT License 2017-2020
+from asyncio import get_running_loop
+from contextvars import copy_context
 from time import time
-from typing import Dict, List, Optional, Tuple
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
 
+from sage.database.term_dictionary import decode_mappings
 from sage.query_engine.exceptions import DeleteInsertConflict, TooManyResults, QuantumExhausted
 from sage.query_engine.iterators.preemptable_iterator import PreemptableIterator
+from sage.query_engine.preemption import get_scheduler
 from sage.query_engine.protobuf.iterators_pb2 import RootTree
 
 ExecutionResults = Tuple[List[Dict[str, str]], Optional[RootTree], bool, Optional[str]]
 
+# Coroutine called with each batch of solution mappings produced during a time quantum
+ResultsCallback = Callable[[List[Dict[str, str]]], Awaitable[None]]
 
-async def executor(pipeline: PreemptableIterator, results: list, context: dict) -> None:
+# Default maximum number of solution mappings moved through the pipeline by a call to next_batch
+DEFAULT_BATCH_SIZE = 100
+
+
+async def executor(pipeline: PreemptableIterator, results: list, context: dict, on_results: Optional[ResultsCallback] = None) -> None:
     """Execute a pipeline of iterator under a time quantum.
 
+    Solution mappings are pulled by batches from the pipeline. Preemption is checked between two batches,
+    where the pipeline holds no pending solution mappings and can be saved exactly.
+    Iterators report their work to the preemption scheduler of the query (see `sage.query_engine.preemption`),
+    and cut their batches short once the time quantum is exhausted.
+
     Args:
       * pipeline: Root of the pipeline of iterator.
       * results: List used to store query results.
       * context: Information about the query execution.
+      * on_results: (Optional) Coroutine called with each batch of query results, e.g., to stream them to the client. If set, query results are not stored in `results`.
 
     Throws: Any exception raised during query execution.
     """
+    batch_size = context['batch_size'] if 'batch_size' in context else DEFAULT_BATCH_SIZE
+    scheduler = get_scheduler(context)
+    nb_results = 0
     while pipeline.has_next():
-        value = await pipeline.next()
-        if value is not None:
-            results.append(value)
-        if len(results) >= context['max_results']:
+        # never produce more solution mappings than allowed for a page of results
+        size = max(1, int(min(batch_size, context['max_results'] - nb_results)))
+        # RDF terms encoded by the database are decoded by the ProjectionIterator, or here if the plan has no projection
+        batch = decode_mappings(await pipeline.next_batch(size))
+        nb_results += len(batch)
+        if on_results is None:
+            results.extend(batch)
+        elif len(batch) > 0:
+            await on_results(batch)
+        if nb_results >= context['max_results']:
             raise TooManyResults()
+        if scheduler.check():
+            raise QuantumExhausted()
+
+
+async def save_plan(plan: PreemptableIterator) -> Any:
+    """Save a pipeline of iterators, as a Protobuf message.
+
+    Saving a scan may fetch RDF triples from the database, as SQL iterators resume from the next RDF triple to read.
+    When the pipeline reads a database which performs blocking I/O (see `DatabaseConnector#blocking_io`),
+    it is saved in a thread pool instead of blocking the event loop.
+
+    Argument: Root of the pipeline of iterator.
+
+    Returns: The saved pipeline of iterators.
+    """
+    if any(getattr(connector, 'blocking_io', False) for connector in plan.connectors()):
+        # the thread uses the context of the query quantum, e.g., to find its database connection
+        return await get_running_loop().run_in_executor(None, copy_context().run, plan.save)
+    return plan.save()
 
 
 class SageEngine(object):
@@ -34,12 +78,13 @@ class SageEngine(object):
     def __init__(self):
         super(SageEngine, self).__init__()
 
-    async def execute(self, plan: PreemptableIterator, context: dict) -> ExecutionResults:
+    async def execute(self, plan: PreemptableIterator, context: dict, on_results: Optional[ResultsCallback] = None) -> ExecutionResults:
         """Execute a preemptable physical query execution plan under a time quantum.
 
         Args:
           * plan: Root of the pipeline of iterator.
           * context: Information about the query execution.
+          * on_results: (Optional) Coroutine called with each batch of solution mappings, as soon as it is produced. If set, ``results`` is empty.
 
         Returns: A tuple (``results``, ``saved_plan``, ``is_done``, ``abort_reason``) where:
           * ``results`` is a list of solution mappings found during query execution
@@ -55,7 +100,8 @@ class SageEngine(object):
         abort_reason = None
         try:
             context['start_timestamp'] = time()
-            await executor(plan, results, context)
+            get_scheduler(context).start(context['start_timestamp'], context['quantum'])
+            await executor(plan, results, context, on_results=on_results)
             query_done = True
         except QuantumExhausted:
             pass
@@ -67,5 +113,5 @@ class SageEngine(object):
         if not query_done and abort_reason is None:
             root = RootTree()
             source_field = plan.serialized_name() + '_source'
-            getattr(root, source_field).CopyFrom(plan.save())
+            getattr(root, source_field).CopyFrom(await save_plan(plan))
         return (results, root, query_done, abort_reason)
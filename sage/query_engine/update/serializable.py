@@ -5,6 +5,7 @@ from typing import Dict, Iterable, List, Tuple
 from rdflib import Variable
 
 from sage.database.core.dataset import Dataset
+from sage.database.term_dictionary import decode_mappings
 from sage.query_engine.iterators.preemptable_iterator import PreemptableIterator
 
 Quad = Tuple[str, str, str, str]
@@ -86,6 +87,7 @@ class SerializableUpdate(PreemptableIterator):
         while self._read_input.has_next():
             mu = await self._read_input.next()
             mappings.append(mu)
+        mappings = decode_mappings([mu for mu in mappings if mu is not None])
 
         # apply all deletes
         for s, p, o, g in apply_templates(mappings, self._delete_templates):
@@ -43,3 +43,14 @@ def test_hdt_scan_unknown_pattern():
     with HDTFileConnector('tests/data/watdiv.10M.hdt') as backend:
         iterator, c = backend.search('http://example.org#toto', None, None)
         assert next(iterator) is None
+
+
+def test_hdt_decode_many():
+    with HDTFileConnector('tests/data/test.hdt') as backend:
+        dictionary = backend.term_dictionary
+        iterator, _ = backend.search_ids('?s', '?p', '?o')
+        triples = [iterator.next() for _ in range(5)]
+        terms = [term for triple in triples for term in triple]
+        expected = [dictionary.decode(term.identifier, term.position) for term in terms]
+        dictionary.decode_many(terms)
+        assert [term._value for term in terms] == expected
@@ -1,7 +1,10 @@
 # postgre_backend_test.py
 # Author: Thomas MINIER - MIT License 2017-2019
 import pytest
+from asyncio import ensure_future, gather, sleep
+from time import time
 from sage.database.postgres_backends.postgres.connector import PostgresConnector
+from sage.database.postgres_backends.transaction_manager import ConnectionPool, PoolTimeout, TransactionManager
 from tests.database.fixtures import index_scan_fixtures
 
 DB_NAME = 'watdiv'
@@ -48,3 +51,86 @@ def test_postgre_scan_unknown_pattern():
         iterator, c = backend.search('http://example.org#toto', None, None)
         assert not iterator.has_next()
         assert next(iterator) is None
+
+
+class FakeConnection(object):
+    """Stand-in for a psycopg2 connection, used to test the pool of connections without a database"""
+
+    def __init__(self):
+        self.closed = 0
+
+    def close(self):
+        self.closed = 1
+
+    def cursor(self):
+        return FakeCursor()
+
+    def commit(self):
+        pass
+
+    def rollback(self):
+        pass
+
+
+class FakeCursor(object):
+    def close(self):
+        pass
+
+
+class FakeTransactionManager(TransactionManager):
+    """A TransactionManager which opens fake connections"""
+
+    def _connect(self):
+        return FakeConnection()
+
+
+def test_postgre_connection_pool():
+    pool = ConnectionPool(FakeConnection, min_size=1, max_size=2, timeout=0.05)
+    first = pool.acquire()
+    second = pool.acquire()
+    assert first is not second
+    # all connections are in use
+    with pytest.raises(PoolTimeout):
+        pool.acquire()
+    pool.release(first)
+    assert pool.acquire() is first
+    # closed connections are not reused
+    second.close()
+    pool.release(second)
+    third = pool.acquire()
+    assert third is not second
+    stats = pool.stats()
+    assert stats['size'] == 2 and stats['idle'] == 0
+    assert stats['checkouts'] == 4 and stats['waits'] == 1 and stats['timeouts'] == 1
+    assert stats['max_wait_time'] >= 50
+
+
+@pytest.mark.asyncio
+async def test_postgre_pool_concurrent_quanta():
+    manager = FakeTransactionManager('watdiv', 'sage', 'sage', max_pool_size=2, pool_timeout=5)
+    finished = list()
+
+    async def quantum(index):
+        await manager.async_start_transaction()
+        # the quantum is suspended while it holds its connection, e.g., while its results are sent
+        await sleep(0.05)
+        manager.commit()
+        finished.append(index)
+
+    # measure the longest time the event loop was blocked while quanta wait for a connection
+    ticks = list()
+
+    async def heartbeat():
+        while len(finished) < 3:
+            ticks.append(time())
+            await sleep(0.005)
+
+    monitor = ensure_future(heartbeat())
+    start = time()
+    await gather(*[quantum(index) for index in range(3)])
+    await monitor
+    assert sorted(finished) == [0, 1, 2]
+    assert time() - start < 1
+    assert max(b - a for a, b in zip(ticks, ticks[1:])) < 0.04
+    stats = manager.stats()
+    assert stats['size'] == 2 and stats['checkouts'] == 3 and stats['waits'] == 1 and stats['timeouts'] == 0
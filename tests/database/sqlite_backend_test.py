@@ -0,0 +1,165 @@
+# sqlite_backend_test.py
+# Author: Thomas MINIER - MIT License 2017-2020
+import sqlite3
+import pytest
+from sage.cli.sqlite_utils import get_analyze_query, get_create_indexes_queries, get_create_tables_queries, get_insert_into_query
+from sage.database.hdt.connector import HDTFileConnector
+from sage.database.sqlite_backends.sqlite.connector import DefaultSQliteConnector
+from sage.query_engine.iterators.loader import load
+from sage.query_engine.iterators.nlj import IndexJoinIterator
+from sage.query_engine.iterators.scan import ScanIterator
+from sage.query_engine.sage_engine import SageEngine
+from tests.utils import DummyDataset
+
+engine = SageEngine()
+
+
+def read_all(iterator):
+    triples = list()
+    while iterator.has_next():
+        triples.append(tuple(iterator.next()))
+    return triples
+
+
+@pytest.fixture(scope="module")
+def connector(tmp_path_factory):
+    database = str(tmp_path_factory.mktemp("sqlite") / "test.db")
+    # load the RDF triples of the test HDT file into a SQlite database
+    triples, _ = HDTFileConnector('tests/data/test.hdt').search('?s', '?p', '?o')
+    connection = sqlite3.connect(database)
+    cursor = connection.cursor()
+    for query in get_create_tables_queries('testdata', 'sqlite') + get_create_indexes_queries('testdata', 'sqlite'):
+        cursor.execute(query)
+    cursor.executemany(get_insert_into_query('testdata'), read_all(triples))
+    cursor.execute(get_analyze_query('testdata'))
+    connection.commit()
+    connection.close()
+    connector = DefaultSQliteConnector('testdata', database)
+    yield connector
+    connector.close()
+
+
+def test_search_many(connector):
+    patterns = [
+        ('http://example.org/s1', '?p', '?o'),
+        ('?s', 'http://example.org/p1', 'http://example.org/o001'),
+        ('?s', 'http://example.org/p2', '?o'),
+        ('http://example.org/s1', '?p', '?o'),
+        ('http://example.org/unknown', '?p', '?o')
+    ]
+    results = connector.search_many(patterns)
+    assert len(results) == len(patterns)
+    for (subject, predicate, obj), (iterator, card) in zip(patterns, results):
+        expected, _ = connector.search(subject, predicate, obj)
+        expected = read_all(expected)
+        assert read_all(iterator) == expected
+        assert card == len(expected)
+
+
+def test_search_many_limit(connector):
+    patterns = [('?s', 'http://example.org/p1', f"http://example.org/o{index:03d}") for index in range(1, 11)]
+    expected = [read_all(connector.search(subject, predicate, obj)[0]) for subject, predicate, obj in patterns]
+    results = connector.search_many(patterns, limit=3)
+    # the triple patterns whose RDF triples were not all read within the limit are not evaluated
+    assert results[-1] is None
+    evaluated = [(result, triples) for result, triples in zip(results, expected) if result is not None]
+    assert sum(len(triples) for _, triples in evaluated) <= 3
+    for (iterator, card), triples in evaluated:
+        assert read_all(iterator) == triples
+        assert card == len(triples)
+
+
+def test_search_many_max_parameters(connector):
+    # more triple patterns than SQLite can bind in a single query
+    patterns = [('?s', 'http://example.org/p1', f"http://example.org/o{index:03d}") for index in range(1, 1001)]
+    results = connector.search_many(patterns)
+    assert len(results) == len(patterns)
+    for (subject, predicate, obj), (iterator, card) in zip(patterns[:20], results[:20]):
+        assert read_all(iterator) == read_all(connector.search(subject, predicate, obj)[0])
+
+
+def test_search_many_resume(connector):
+    iterator, card = connector.search_many([('?s', 'http://example.org/p2', '?o')])[0]
+    assert card > 2
+    iterator.next()
+    iterator.next()
+    # resume a scan using a last_read ID produced by search_many
+    resumed, _ = connector.search('?s', 'http://example.org/p2', '?o', last_read=iterator.last_read())
+    assert read_all(resumed) == read_all(iterator)
+
+
+@pytest.mark.asyncio
+async def test_nlj_search_many(connector):
+    context = { 'quantum': 10e7, 'max_results': 10e7 }
+    left_scan = ScanIterator(connector, {'subject': '?s1', 'predicate': 'http://example.org/p1', 'object': '?common', 'graph': 'testdata'}, context)
+    right_scan = ScanIterator(connector, {'subject': '?s2', 'predicate': 'http://example.org/p2', 'object': '?common', 'graph': 'testdata'}, context)
+    join = IndexJoinIterator(left_scan, right_scan, context)
+    (results, saved, done, _) = await engine.execute(join, context)
+    assert len(results) == 20
+    assert done
+
+
+@pytest.mark.asyncio
+async def test_nlj_search_many_resume(connector):
+    context = { 'quantum': 10e7, 'max_results': 3, 'batch_size': 5 }
+    left_scan = ScanIterator(connector, {'subject': '?s1', 'predicate': 'http://example.org/p1', 'object': '?common', 'graph': 'testdata'}, context)
+    right_scan = ScanIterator(connector, {'subject': '?s2', 'predicate': 'http://example.org/p2', 'object': '?common', 'graph': 'testdata'}, context)
+    join = IndexJoinIterator(left_scan, right_scan, context)
+    (results, saved, done, _) = await engine.execute(join, context)
+    all_results = results
+    while not done:
+        reloaded = load(saved.SerializeToString(), DummyDataset(connector, 'testdata'), context)
+        (results, saved, done, _) = await engine.execute(reloaded, context)
+        all_results += results
+    assert len(all_results) == 20
+    assert len({frozenset(mu.items()) for mu in all_results}) == 20
+
+
+def test_search_filters(connector):
+    expected, _ = connector.search('?s', 'http://example.org/p1', '?o')
+    expected = [triple for triple in read_all(expected) if triple[0] == 'http://example.org/s1' and triple[2].startswith('http://example.org/o00')]
+    filters = [('subject', '=', 'http://example.org/s1'), ('object', 'prefix', 'http://example.org/o00')]
+    iterator, _ = connector.search('?s', 'http://example.org/p1', '?o', filters=filters)
+    assert len(expected) > 0
+    assert read_all(iterator) == expected
+    # resume the filtered scan
+    iterator, _ = connector.search('?s', 'http://example.org/p1', '?o', filters=filters)
+    iterator.next()
+    resumed, _ = connector.search('?s', 'http://example.org/p1', '?o', last_read=iterator.last_read(), filters=filters)
+    assert read_all(resumed) == expected[1:]
+    iterator, _ = connector.search('?s', 'http://example.org/p1', '?o', filters=[('object', 'lang', 'en')])
+    assert read_all(iterator) == []
+
+
+class RecordingCursor(object):
+    """Wraps a SQlite cursor to record the size of the batches fetched"""
+
+    def __init__(self, cursor):
+        self._cursor = cursor
+        self.sizes = list()
+
+    def fetchmany(self, size):
+        self.sizes.append(size)
+        return self._cursor.fetchmany(size=size)
+
+    def close(self):
+        self._cursor.close()
+
+
+def test_adaptive_fetch_size(connector):
+    iterator, _ = connector.search('?s', '?p', '?o')
+    assert iterator.has_next()
+    cursor = RecordingCursor(iterator._cursor)
+    iterator._cursor = cursor
+    expected, _ = connector.search('?s', '?p', '?o')
+    assert read_all(iterator) == read_all(expected)
+    # after a first batch of 8 triples, the batches grow geometrically
+    assert cursor.sizes[:3] == [16, 32, 64]
+    # the batches are capped by the number of triples needed by the query engine
+    iterator, _ = connector.search('?s', '?p', '?o')
+    iterator.limit_fetch(3)
+    assert iterator.has_next()
+    cursor = RecordingCursor(iterator._cursor)
+    iterator._cursor = cursor
+    read_all(iterator)
+    assert set(cursor.sizes) == {3}
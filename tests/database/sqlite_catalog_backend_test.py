@@ -0,0 +1,125 @@
+# sqlite_catalog_backend_test.py
+# Author: Thomas MINIER - MIT License 2017-2020
+import sqlite3
+import pytest
+from sage.cli.sqlite_utils import get_analyze_query, get_create_indexes_queries, get_create_tables_queries, get_insert_into_catalog_query, get_insert_into_query, get_select_identifier_query
+from sage.database.hdt.connector import HDTFileConnector
+from sage.database.sqlite_backends.sqlite_catalog.connector import CatalogSQliteConnector
+from sage.database.term_cache import TermCache
+from sage.database.core.graph import Graph
+from sage.database.term_dictionary import EncodedTerm
+from sage.query_engine.iterators.nlj import IndexJoinIterator
+from sage.query_engine.iterators.projection import ProjectionIterator
+from sage.query_engine.iterators.scan import ScanIterator
+from sage.query_engine.sage_engine import SageEngine
+
+engine = SageEngine()
+
+
+def read_all(iterator):
+    triples = list()
+    while iterator.has_next():
+        triples.append(tuple(iterator.next()))
+    return triples
+
+
+@pytest.fixture(scope="module")
+def hdt_connector():
+    return HDTFileConnector('tests/data/test.hdt')
+
+
+@pytest.fixture(scope="module")
+def connector(tmp_path_factory, hdt_connector):
+    database = str(tmp_path_factory.mktemp("sqlite") / "test.db")
+    # load the RDF triples of the test HDT file into a SQlite database, using the catalog schema
+    triples, _ = hdt_connector.search('?s', '?p', '?o')
+    triples = read_all(triples)
+    connection = sqlite3.connect(database)
+    cursor = connection.cursor()
+    for query in get_create_tables_queries('testdata', 'sqlite-catalog') + get_create_indexes_queries('testdata', 'sqlite-catalog'):
+        cursor.execute(query)
+    terms = {term for triple in triples for term in triple}
+    cursor.executemany(get_insert_into_catalog_query(), [[term] for term in terms])
+    identifiers = {term: cursor.execute(get_select_identifier_query(), [term]).fetchone()[0] for term in terms}
+    cursor.executemany(get_insert_into_query('testdata'), [tuple(identifiers[term] for term in triple) for triple in triples])
+    cursor.execute(get_analyze_query('testdata'))
+    connection.commit()
+    connection.close()
+    connector = CatalogSQliteConnector('testdata', database)
+    yield connector
+    connector.close()
+
+
+@pytest.mark.parametrize("subject,predicate,obj", [
+    ('?s', '?p', '?o'),
+    ('http://example.org/s1', '?p', '?o'),
+    ('?s', 'http://example.org/p1', '?o'),
+    ('?s', 'http://example.org/p1', 'http://example.org/o001'),
+    ('http://example.org/unknown', '?p', '?o')
+])
+def test_catalog_search(connector, hdt_connector, subject, predicate, obj):
+    iterator, _ = connector.search(subject, predicate, obj)
+    expected, _ = hdt_connector.search(subject, predicate, obj)
+    assert sorted(read_all(iterator)) == sorted(read_all(expected))
+
+
+def test_catalog_search_resume(connector):
+    iterator, _ = connector.search('?s', 'http://example.org/p2', '?o')
+    expected = read_all(iterator)
+    iterator, _ = connector.search('?s', 'http://example.org/p2', '?o')
+    iterator.next()
+    iterator.next()
+    resumed, _ = connector.search('?s', 'http://example.org/p2', '?o', last_read=iterator.last_read())
+    assert read_all(resumed) == expected[2:]
+
+
+def test_catalog_term_cache(connector):
+    iterator, _ = connector.search('http://example.org/s1', '?p', '?o')
+    read_all(iterator)
+    stats = connector.term_cache.stats()
+    # the same triple pattern is evaluated without looking up the catalog for its bound terms
+    iterator, _ = connector.search('http://example.org/s1', '?p', '?o')
+    assert connector.term_cache.stats()['hits'] > stats['hits']
+    assert connector.term_cache.stats()['misses'] == stats['misses']
+
+
+def test_term_cache_lru():
+    cache = TermCache(max_size=2)
+    database = {'a': 1, 'b': 2, 'c': 3}
+    lookups = list()
+
+    def locate(terms):
+        lookups.append(terms)
+        return {term: database[term] for term in terms if term in database}
+
+    assert cache.get_ids(['a', 'b', 'x'], locate) == {'a': 1, 'b': 2}
+    # unknown terms are not cached
+    assert cache.get_ids(['a', 'x'], locate) == {'a': 1}
+    assert lookups == [['a', 'b', 'x'], ['x']]
+    # 'b' is the least recently used term
+    cache.get_ids(['c'], locate)
+    assert len(cache) == 2
+    assert cache.get_terms([1, 3], lambda identifiers: {}) == {1: 'a', 3: 'c'}
+    cache.get_ids(['b'], locate)
+    assert lookups[-1] == ['b']
+
+
+@pytest.mark.asyncio
+async def test_catalog_late_materialization(connector, hdt_connector):
+    context = { 'quantum': 10e7, 'max_results': 10e7 }
+    left = {'subject': '?s1', 'predicate': 'http://example.org/p1', 'object': '?common', 'graph': 'testdata'}
+    right = {'subject': '?s2', 'predicate': 'http://example.org/p2', 'object': '?common', 'graph': 'testdata'}
+    results = list()
+    for db in [connector, hdt_connector]:
+        db = Graph('testdata', 'testdata', 'test graph', db, late_materialization=True)
+        join = IndexJoinIterator(ScanIterator(db, left, context), ScanIterator(db, right, context), context)
+        (solutions, _, done, _) = await engine.execute(ProjectionIterator(join, context), context)
+        assert done
+        results.append(sorted([tuple(sorted(mu.items())) for mu in solutions]))
+    assert len(results[0]) == 20
+    assert results[0] == results[1]
+    # the inner scans are bound using identifiers
+    iterator, _ = connector.search_ids('?s', 'http://example.org/p1', '?o')
+    s, p, o = iterator.next()
+    bound, _ = connector.search_ids(s, p, '?o')
+    assert type(o) is EncodedTerm and o in [triple[2] for triple in read_all(bound)]
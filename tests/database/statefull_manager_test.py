@@ -0,0 +1,72 @@
+# statefull_manager_test.py
+# Author: Thomas MINIER - MIT License 2017-2020
+import pytest
+from sage.database.core.yaml_config import load_config
+from sage.database.statefull.memory_manager import MemoryManager
+from sage.database.statefull.sqlite_manager import SQliteManager
+
+
+def test_memory_manager_lru():
+    manager = MemoryManager(max_size=25)
+    manager.save_plan('a', 'x' * 9)
+    manager.save_plan('b', 'x' * 9)
+    manager.get_plan('a')
+    # 'b' is the least recently used plan
+    manager.save_plan('c', 'x' * 9)
+    assert len(manager) == 2 and manager.size == 20
+    assert manager.get_plan('a') == 'x' * 9
+    with pytest.raises(KeyError):
+        manager.get_plan('b')
+    manager.delete_plan('a')
+    manager.delete_plan('b')
+    assert len(manager) == 1
+
+
+def test_memory_manager_ttl():
+    manager = MemoryManager(ttl=0)
+    manager.save_plan('a', 'plan')
+    with pytest.raises(KeyError):
+        manager.get_plan('a')
+    assert manager.size == 0
+
+
+def test_sqlite_manager(tmp_path):
+    database = str(tmp_path / 'plans.db')
+    # two managers on the same database, as used by two server processes
+    first, second = SQliteManager(database), SQliteManager(database)
+    first.save_plan('a', 'plan')
+    assert second.get_plan('a') == 'plan'
+    second.save_plan('a', 'next plan')
+    assert first.get_plan('a') == 'next plan'
+    first.delete_plan('a')
+    with pytest.raises(KeyError):
+        second.get_plan('a')
+    expired = SQliteManager(database, ttl=0)
+    expired.save_plan('b', 'plan')
+    with pytest.raises(KeyError):
+        expired.get_plan('b')
+    first.close()
+    second.close()
+    expired.close()
+
+
+def test_saved_plans_config(tmp_path):
+    config = tmp_path / 'config.yaml'
+    config.write_text(f"""
+name: SaGe Test server
+stateless: false
+saved_plans:
+  backend: sqlite
+  database: {tmp_path / 'plans.db'}
+  ttl: 60
+graphs:
+-
+  name: testdata
+  uri: http://localhost:8000/sparql/testdata
+  backend: hdt-file
+  file: tests/data/test.hdt
+""")
+    dataset = load_config(str(config))
+    assert type(dataset.statefull_manager) is SQliteManager
+    dataset.statefull_manager.save_plan('a', 'plan')
+    assert dataset.statefull_manager.get_plan('a') == 'plan'
@@ -2,7 +2,10 @@
 # Author: Thomas MINIER - MIT License 2017-2018
 import grpc
 import pytest
+from asyncio import new_event_loop, run_coroutine_threadsafe
+from threading import Thread
 from sage.grpc import service_pb2_grpc
+from sage.grpc.grpc_client import SageClient
 from sage.grpc.grpc_server import get_server
 from sage.grpc.service_pb2 import SageQuery
 
@@ -36,15 +39,34 @@ bgp_queries = [
 ]
 
 
+class GRPCServerThread(object):
+    """Run a gRPC server in the event loop of a background thread"""
+
+    def __init__(self, config_file, workers=0):
+      self._loop = new_event_loop()
+      self._thread = Thread(target=self._loop.run_forever, daemon=True)
+      self._thread.start()
+      self._server = run_coroutine_threadsafe(self._start(config_file, workers), self._loop).result()
+
+    async def _start(self, config_file, workers):
+      server = get_server(config_file, workers=workers)
+      await server.start()
+      return server
+
+    def stop(self):
+      run_coroutine_threadsafe(self._server.stop(None), self._loop).result()
+      self._loop.call_soon_threadsafe(self._loop.stop)
+      self._thread.join()
+
+
 class TestGRPCInterface(object):
     @classmethod
     def setup_class(self):
-      self._server = get_server('tests/data/test_config.yaml', workers=1)
-      self._server.start()
+      self._server = GRPCServerThread('tests/data/test_config.yaml')
 
     @classmethod
     def teardown_class(self):
-      self._server.stop(None)
+      self._server.stop()
 
     @pytest.mark.parametrize("query,cardinality", bgp_queries)
     def test_grpc_interface(self, query, cardinality):
@@ -65,3 +87,49 @@ class TestGRPCInterface(object):
             grpc_query = SageQuery(query = query, default_graph_uri = 'http://testserver/sparql/watdiv100', next_link = next_link)
         assert nbResults == cardinality
         assert nbCalls >= 1
+
+
+class TestGRPCPages(object):
+    @classmethod
+    def setup_class(self):
+      self._server = GRPCServerThread('tests/grpc/config.yaml')
+
+    @classmethod
+    def teardown_class(self):
+      self._server.stop()
+
+    def test_grpc_pages(self):
+      query = "SELECT * WHERE { ?s1 <http://example.org/p1> ?common . ?s2 <http://example.org/p2> ?common . }"
+      with grpc.insecure_channel('localhost:8000') as channel:
+        client = service_pb2_grpc.SageSPARQLStub(channel)
+        response = client.Query(SageQuery(query = query, default_graph_uri = 'http://testserver/sparql/testdata'))
+        # a page has at most 7 results
+        assert len(response.bindings) == 7 and not response.is_done
+      with SageClient('localhost:8000') as client:
+        results = list(client.query(query, 'http://testserver/sparql/testdata'))
+        assert len(results) == 20
+        assert len({frozenset(mu.items()) for mu in results}) == 20
+
+    def test_grpc_unknown_graph(self):
+      with grpc.insecure_channel('localhost:8000') as channel:
+        client = service_pb2_grpc.SageSPARQLStub(channel)
+        with pytest.raises(grpc.RpcError) as error:
+          client.Query(SageQuery(query = "SELECT * WHERE { ?s ?p ?o }", default_graph_uri = 'http://testserver/sparql/unknown'))
+        assert error.value.code() == grpc.StatusCode.NOT_FOUND
+
+    def test_grpc_stream(self):
+      query = "SELECT * WHERE { ?s1 <http://example.org/p1> ?common . ?s2 <http://example.org/p2> ?common . }"
+      with grpc.insecure_channel('localhost:8000') as channel:
+        client = service_pb2_grpc.SageSPARQLStub(channel)
+        responses = list(client.QueryStream(SageQuery(query = query, default_graph_uri = 'http://testserver/sparql/testdata')))
+        # solutions of the quantum, then the next link
+        assert sum([len(response.bindings) for response in responses]) == 7
+        assert len(responses[-1].bindings) == 0 and not responses[-1].is_done and len(responses[-1].next_link) > 0
+        # the server resumes the query by itself
+        responses = list(client.QueryStream(SageQuery(query = query, default_graph_uri = 'http://testserver/sparql/testdata', auto_continue = True)))
+        assert sum([len(response.bindings) for response in responses]) == 20
+        assert responses[-1].is_done and len(responses[-1].next_link) == 0
+      with SageClient('localhost:8000') as client:
+        for auto_continue in [True, False]:
+          results = list(client.query_stream(query, 'http://testserver/sparql/testdata', auto_continue = auto_continue))
+          assert len({frozenset(mu.items()) for mu in results}) == 20
@@ -0,0 +1,30 @@
+# conftest.py
+# Author: Thomas MINIER - MIT License 2017-2020
+import pytest
+from yaml import dump
+
+# configuration of a SaGe server over the test HDT dataset, without optional features
+BASE_CONFIG = {
+    'name': 'SaGe testing Server',
+    'maintainer': 'Thomas Minier',
+    'quota': 100000,
+    'max_results': 7,
+    'graphs': [{
+        'name': 'testdata',
+        'uri': 'http://testserver/sparql/testdata',
+        'description': 'Sample dataset in HDT format, used for testing',
+        'backend': 'hdt-file',
+        'file': 'tests/data/test.hdt'
+    }]
+}
+
+
+@pytest.fixture(scope="module")
+def make_config(tmp_path_factory):
+    """Build configuration files for the test HDT dataset, with options overriding the ones of `BASE_CONFIG`"""
+    def make(**options) -> str:
+        path = tmp_path_factory.mktemp('config') / 'config.yaml'
+        with open(path, 'w') as config_file:
+            dump(dict(BASE_CONFIG, **options), config_file)
+        return str(path)
+    return make
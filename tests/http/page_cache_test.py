@@ -0,0 +1,62 @@
+# page_cache_test.py
+# Author: Thomas MINIER - MIT License 2017-2020
+import gzip
+import zlib
+import pytest
+from sage.http_server.compression import Compressor, choose_encoding
+from sage.http_server.server import run_app
+from starlette.testclient import TestClient
+from tests.http.utils import TEST_GRAPH, TEST_QUERY, read_pages
+
+
+def post_page(client, next_link=None, headers=dict()):
+    headers = dict(headers, accept="text/plain")
+    return client.post('/sparql', json={'query': TEST_QUERY, 'defaultGraph': TEST_GRAPH, 'next': next_link}, headers=headers)
+
+
+@pytest.fixture(scope="module")
+def client(make_config):
+    return TestClient(run_app(make_config(page_cache={'size': 10, 'ttl': 600})))
+
+
+def test_cached_pages(client):
+    def fetch_page(next_link):
+        first = post_page(client, next_link)
+        # the same page is served from the cache
+        second = post_page(client, next_link)
+        assert first.status_code == 200 and second.status_code == 200
+        assert first.headers['etag'] == second.headers['etag'] and 'max-age=600' in first.headers['cache-control']
+        assert second.json()['stats']['page_cache']['hits'] > first.json()['stats']['page_cache']['hits']
+        assert second.json()['bindings'] == first.json()['bindings']
+        return (first.json()['bindings'], first.json()['next'])
+    results = read_pages(fetch_page)
+    assert len({frozenset(mu.items()) for mu in results}) == 20
+
+
+def test_not_modified(client):
+    response = post_page(client)
+    response = post_page(client, headers={'if-none-match': response.headers['etag']})
+    assert response.status_code == 304 and len(response.content) == 0
+
+
+def test_compression(client):
+    response = post_page(client, headers={'accept-encoding': 'gzip'})
+    assert response.headers['content-encoding'] == 'gzip'
+    assert len(response.json()['bindings']) == 7
+    response = post_page(client, headers={'accept-encoding': 'identity'})
+    assert 'content-encoding' not in response.headers
+
+
+def test_choose_encoding():
+    assert choose_encoding('gzip, deflate') == 'gzip'
+    assert choose_encoding('gzip;q=0, deflate') is None
+    assert choose_encoding('*') in ['br', 'gzip']
+    assert choose_encoding('') is None
+
+
+def test_streamed_compression():
+    compressor = Compressor('gzip')
+    # each chunk can be decoded as soon as it is received
+    first = compressor.compress(b'{"bindings":[', True)
+    assert zlib.decompressobj(31).decompress(first) == b'{"bindings":['
+    assert gzip.decompress(first + compressor.compress(b']}', False)) == b'{"bindings":[]}'
@@ -0,0 +1,40 @@
+# process_pool_test.py
+# Author: Thomas MINIER - MIT License 2017-2020
+import pytest
+from sage.database.core.yaml_config import load_config
+from sage.http_server.executor import QueryProcessPool
+from sage.http_server.server import execute_query
+from tests.http.utils import TEST_GRAPH, TEST_QUERY, async_read_pages
+
+
+@pytest.fixture(scope="module")
+def config_file(make_config):
+    return make_config(workers=2)
+
+
+@pytest.fixture(scope="module")
+def dataset(config_file):
+    return load_config(config_file)
+
+
+@pytest.fixture(scope="module")
+def pool(config_file, dataset):
+    pool = QueryProcessPool(config_file, dataset.workers)
+    yield pool
+    pool.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_process_pool_execution(dataset, pool):
+    async def fetch_page(next_link):
+        bindings, next_link, stats = await execute_query(TEST_QUERY, TEST_GRAPH, next_link, dataset, pool=pool)
+        assert len(bindings) <= 7
+        return (bindings, next_link)
+    results = await async_read_pages(fetch_page)
+    # the workers send back dict-based solution mappings
+    assert all(type(mu) is dict for mu in results)
+    assert len(results) == 20
+    assert len({frozenset(mu.items()) for mu in results}) == 20
+    # same results as a query executed by the server process
+    expected, next_link, _ = await execute_query(TEST_QUERY, TEST_GRAPH, None, dataset)
+    assert list(map(dict, expected)) == results[:len(expected)]
@@ -0,0 +1,90 @@
+# query_scheduler_test.py
+# Author: Thomas MINIER - MIT License 2017-2020
+import pytest
+from asyncio import ensure_future, sleep
+from sage.database.core.yaml_config import load_config
+from sage.http_server.query_scheduler import QueryScheduler, SchedulerSaturated
+from sage.http_server.server import execute_query, run_app
+from starlette.testclient import TestClient
+from tests.http.utils import TEST_GRAPH as graph, TEST_QUERY as query
+
+
+@pytest.fixture(scope="module")
+def config_file(make_config):
+    return make_config(scheduler={'max_running': 1, 'max_waiting': 0})
+
+
+async def start_quanta(scheduler, requests, started):
+    async def run(client, graph_uri):
+        await scheduler.acquire(client, graph_uri)
+        started.append(client)
+    tasks = list()
+    for client, graph_uri in requests:
+        tasks.append(ensure_future(run(client, graph_uri)))
+        await sleep(0)
+    await sleep(0)
+    return tasks
+
+
+@pytest.mark.asyncio
+async def test_fair_share():
+    scheduler = QueryScheduler(max_running=1, max_waiting=10)
+    await scheduler.acquire("a", "g")
+    started = list()
+    # client a sends many quanta before client b
+    await start_quanta(scheduler, [("a", "g"), ("a", "g"), ("a", "g"), ("b", "g")], started)
+    assert scheduler.nb_waiting == 4 and len(started) == 0
+    for _ in range(4):
+        scheduler.release("g")
+        await sleep(0)
+    # client b gets its share before the other quanta of client a
+    assert started == ["b", "a", "a", "a"]
+
+
+@pytest.mark.asyncio
+async def test_graph_limits():
+    scheduler = QueryScheduler(max_running=3, max_waiting=10, max_running_per_graph=1)
+    await scheduler.acquire("a", "g1")
+    started = list()
+    # the quantum over g1 waits, but does not block the quantum over g2
+    tasks = await start_quanta(scheduler, [("a", "g1"), ("b", "g2")], started)
+    assert started == ["b"] and scheduler.nb_running == 2
+    scheduler.release("g1")
+    await sleep(0)
+    assert started == ["b", "a"]
+    # a cancelled quantum leaves the run queue
+    await start_quanta(scheduler, [("c", "g1")], started)
+    assert scheduler.nb_waiting == 1
+    tasks = await start_quanta(scheduler, [("d", "g1")], started)
+    tasks[0].cancel()
+    await sleep(0)
+    assert scheduler.nb_waiting == 1
+
+
+@pytest.mark.asyncio
+async def test_saturation():
+    scheduler = QueryScheduler(max_running=1, max_waiting=1)
+    await scheduler.acquire("a", "g")
+    await start_quanta(scheduler, [("b", "g")], list())
+    with pytest.raises(SchedulerSaturated) as err:
+        await scheduler.acquire("c", "g")
+    assert err.value.retry_after >= 1
+    assert scheduler.stats() == {"running": 1, "waiting": 1, "rejected": 1}
+
+
+@pytest.mark.asyncio
+async def test_execute_query_saturated(config_file):
+    dataset = load_config(config_file)
+    bindings, next_page, stats = await execute_query(query, graph, None, dataset, client="a")
+    assert len(bindings) == 7 and stats["scheduler"] == {"running": 0, "waiting": 0, "rejected": 0}
+    await dataset.scheduler.acquire("b", graph)
+    with pytest.raises(SchedulerSaturated):
+        await execute_query(query, graph, next_page, dataset, client="a")
+    dataset.scheduler.release(graph)
+
+
+def test_http_scheduler(config_file):
+    client = TestClient(run_app(config_file))
+    response = client.post('/sparql', json={'query': query, 'defaultGraph': graph, 'next': None}, headers={'accept': 'text/plain'})
+    assert response.status_code == 200
+    assert response.json()['stats']['scheduler']['rejected'] == 0
@@ -0,0 +1,95 @@
+# responses_test.py
+# Author: Thomas MINIER - MIT License 2017-2020
+import pytest
+from json import loads
+from xml.etree import ElementTree
+from sage.http_server.responses import BindingsEncoder, arrow_stream, csv_streaming, raw_json_streaming, tsv_streaming, w3c_json_streaming, w3c_xml
+from sage.http_server.server import ARROW_MIMETYPE, create_response
+
+bindings = [
+    {'?s': 'http://example.org/s1', '?o': '"Anna"@en'},
+    {'?s': '_:b0', '?o': '"42"^^<http://www.w3.org/2001/XMLSchema#integer>'},
+    {'?s': 'http://example.org/s1', '?o': '"Anna"@en'}
+]
+
+
+def test_w3c_json_serialization():
+    page = loads(b''.join(w3c_json_streaming(bindings, 'next-plan', {}, 'http://testserver')))
+    assert page['head']['vars'] == ['s', 'o'] and page['head']['next'] == 'next-plan'
+    assert page['results']['bindings'] == [
+        {'s': {'value': 'http://example.org/s1', 'type': 'uri'}, 'o': {'value': 'Anna', 'type': 'literal', 'xml:lang': 'en'}},
+        {'s': {'value': 'http://testserver/bnode#b0', 'type': 'uri'}, 'o': {'value': '42', 'type': 'literal', 'datatype': 'http://www.w3.org/2001/XMLSchema#integer'}},
+        {'s': {'value': 'http://example.org/s1', 'type': 'uri'}, 'o': {'value': 'Anna', 'type': 'literal', 'xml:lang': 'en'}}
+    ]
+
+
+def test_raw_json_serialization():
+    page = loads(b''.join(raw_json_streaming(bindings, None, {'import': 1}, 'http://testserver')))
+    assert page['bindings'][1] == {'?s': 'http://testserver/bnode#b0', '?o': '"42"^^<http://www.w3.org/2001/XMLSchema#integer>'}
+    assert page['pageSize'] == 3 and not page['hasNext'] and page['next'] is None and page['stats'] == {'import': 1}
+
+
+def test_w3c_xml_serialization():
+    page = ElementTree.fromstring(b''.join(w3c_xml(bindings, None, {}, 'http://testserver')))
+    ns = {'sparql': 'http://www.w3.org/2005/sparql-results#'}
+    results = page.findall('sparql:results/sparql:result', ns)
+    assert len(results) == 3
+    literal = results[1].find("sparql:binding[@name='o']/sparql:literal", ns)
+    assert literal.text == '42' and literal.get('datatype') == 'http://www.w3.org/2001/XMLSchema#integer'
+    assert page.find('sparql:head/sparql:controls/sparql:hasNext', ns).text == 'False'
+
+
+def test_encoder_term_cache():
+    encoder = BindingsEncoder("w3c-json", 'http://testserver')
+    buffer = bytearray()
+    assert list(encoder.encode(bindings, buffer)) == []
+    # each distinct RDF term is serialized once per page
+    assert len(encoder._terms) == 4 and encoder.nb_bindings == 3
+    assert loads(b'[' + buffer + b']')[0] == loads(b'[' + buffer + b']')[2]
+
+
+def test_csv_serialization():
+    page = b''.join(csv_streaming(bindings + [{'?s': 'http://example.org/s2'}], 'http://testserver')).decode('utf-8')
+    assert page.split('\r\n') == ['s,o', 'http://example.org/s1,Anna', 'http://testserver/bnode#b0,42', 'http://example.org/s1,Anna', 'http://example.org/s2,', '']
+
+
+def test_tsv_serialization():
+    page = b''.join(tsv_streaming([{'?o': '"a\tb"@en'}] + bindings, 'http://testserver')).decode('utf-8')
+    assert page.split('\n') == [
+        '?o\t?s',
+        '"a\\tb"@en\t',
+        '"Anna"@en\t<http://example.org/s1>',
+        '"42"^^<http://www.w3.org/2001/XMLSchema#integer>\t<http://testserver/bnode#b0>',
+        '"Anna"@en\t<http://example.org/s1>',
+        ''
+    ]
+
+
+def test_arrow_serialization():
+    pyarrow = pytest.importorskip('pyarrow')
+    table = pyarrow.ipc.open_stream(arrow_stream(bindings, 'next-plan', {'import': 1}, 'http://testserver')).read_all()
+    assert table.column_names == ['s', 'o'] and table.num_rows == 3
+    # RDF terms are dictionary-encoded
+    assert pyarrow.types.is_dictionary(table.schema.field('o').type)
+    assert table.column('s').to_pylist() == ['http://example.org/s1', 'http://testserver/bnode#b0', 'http://example.org/s1']
+    assert table.schema.metadata[b'next'] == b'next-plan' and loads(table.schema.metadata[b'stats']) == {'import': 1}
+
+
+@pytest.mark.parametrize("mimetype,media_type", [
+    ("text/csv", "text/csv"),
+    ("text/tab-separated-values", "text/tab-separated-values"),
+    ("application/sparql-results+xml", "application/xml")
+])
+def test_create_response_negotiation(mimetype, media_type):
+    response = create_response([mimetype], bindings, 'next-plan', {}, 'http://testserver')
+    assert response.media_type == media_type
+    if mimetype.startswith("text/"):
+        assert response.headers['x-sage-next'] == 'next-plan' and response.headers['x-sage-has-next'] == 'true'
+
+
+def test_create_response_arrow_negotiation():
+    pyarrow = pytest.importorskip('pyarrow')
+    response = create_response([ARROW_MIMETYPE], bindings, 'next-plan', {}, 'http://testserver')
+    assert response.media_type == ARROW_MIMETYPE
+    table = pyarrow.ipc.open_stream(response.body).read_all()
+    assert table.num_rows == 3 and table.schema.metadata[b'next'] == b'next-plan'
@@ -0,0 +1,75 @@
+# saved_plan_encoding_test.py
+# Author: Thomas MINIER - MIT License 2017-2020
+import pytest
+import zlib
+from base64 import b64encode, urlsafe_b64encode
+from sage.database.hdt.connector import HDTFileConnector
+from sage.http_server.utils import DEFLATE_COMPRESSION, MAX_PLAN_SIZE, SAVED_PLAN_VERSION, InvalidSavedPlan, decode_saved_plan, encode_saved_plan
+from sage.query_engine.iterators.loader import load
+from sage.query_engine.optimizer.query_parser import parse_query
+from sage.http_server.server import run_app
+from sage.query_engine.sage_engine import SageEngine
+from starlette.testclient import TestClient
+from tests.http.utils import TEST_GRAPH, TEST_QUERY
+from tests.utils import DummyDataset
+
+hdtDoc = HDTFileConnector('tests/data/test.hdt')
+dataset = DummyDataset(hdtDoc, 'testdata')
+engine = SageEngine()
+query = """
+    SELECT * WHERE {
+        ?s1 <http://example.org/p1> ?common .
+        ?s2 <http://example.org/p2> ?common .
+        ?s3 <http://example.org/p1> ?common .
+    }
+"""
+
+
+@pytest.mark.asyncio
+async def test_encode_saved_plan():
+    context = { 'quantum': 10e7, 'max_results': 10e7 }
+    plan, _ = parse_query(query, dataset, 'testdata', context)
+    (results, _, _, _) = await engine.execute(plan, context)
+    cardinality = len(results)
+    context = { 'quantum': 10e7, 'max_results': 10 }
+    plan, _ = parse_query(query, dataset, 'testdata', context)
+    (results, saved, done, _) = await engine.execute(plan, context)
+    assert not done
+    encoded = encode_saved_plan(saved)
+    # the dictionary encoding and the compression make the encoding smaller than the legacy one
+    legacy = b64encode(saved.SerializeToString()).decode('utf-8')
+    assert len(encoded) < len(legacy)
+    assert decode_saved_plan(encoded) == saved
+    assert decode_saved_plan(legacy) == saved
+    # resume query execution from the decoded plan
+    context = { 'quantum': 10e7, 'max_results': 10e7 }
+    nb_results = len(results)
+    plan = load(decode_saved_plan(encoded), dataset, context)
+    (results, _, done, _) = await engine.execute(plan, context)
+    assert done
+    assert nb_results + len(results) == cardinality
+
+
+def test_decode_unsupported_version():
+    with pytest.raises(ValueError):
+        decode_saved_plan(b64encode(bytes([2, 0])).decode('utf-8'))
+
+
+def decompression_bomb() -> str:
+    """Encode a next link which is small, but which is decompressed into a saved plan larger than MAX_PLAN_SIZE"""
+    compressor = zlib.compressobj(9, zlib.DEFLATED, -15)
+    payload = compressor.compress(bytes(MAX_PLAN_SIZE + 1)) + compressor.flush()
+    return urlsafe_b64encode(bytes([SAVED_PLAN_VERSION, DEFLATE_COMPRESSION]) + payload).decode('utf-8')
+
+
+def test_decode_decompression_bomb():
+    encoded = decompression_bomb()
+    assert len(encoded) < 20000
+    with pytest.raises(InvalidSavedPlan):
+        decode_saved_plan(encoded)
+
+
+def test_http_decompression_bomb(make_config):
+    client = TestClient(run_app(make_config()))
+    response = client.post('/sparql', json={'query': TEST_QUERY, 'defaultGraph': TEST_GRAPH, 'next': decompression_bomb()}, headers={'accept': 'text/plain'})
+    assert response.status_code == 400
@@ -0,0 +1,56 @@
+# stream_results_test.py
+# Author: Thomas MINIER - MIT License 2017-2020
+import pytest
+from asyncio import sleep
+from json import loads
+from sage.database.core.yaml_config import load_config
+from sage.http_server.executor import QuantumStream
+from sage.http_server.server import stream_query
+from tests.http.utils import TEST_GRAPH, TEST_QUERY, async_read_pages
+
+
+@pytest.fixture(scope="module")
+def dataset(make_config):
+    return load_config(make_config(batch_size=2, stream_results=True))
+
+
+@pytest.mark.asyncio
+async def test_quantum_stream(dataset):
+    stream = QuantumStream(TEST_QUERY, TEST_GRAPH, None, dataset)
+    batches = [batch async for batch in stream]
+    # batches are sent as soon as the engine produces them
+    assert [len(batch) for batch in batches] == [2, 2, 2, 1]
+    bindings, saved_plan, is_done, abort_reason, stats = stream.results
+    assert len(bindings) == 0 and saved_plan is not None and not is_done and abort_reason is None
+
+
+@pytest.mark.asyncio
+async def test_stream_query(dataset):
+    async def fetch_page(next_link):
+        response = await stream_query(TEST_QUERY, TEST_GRAPH, next_link, dataset, 'http://testserver')
+        page = loads(b''.join([chunk async for chunk in response.body_iterator]))
+        assert page['pageSize'] == len(page['bindings']) and len(page['bindings']) <= 7
+        assert page['hasNext'] == (page['next'] is not None) and 'import' in page['stats']
+        return (page['bindings'], page['next'])
+    results = await async_read_pages(fetch_page)
+    assert len({frozenset(mu.items()) for mu in results}) == 20
+
+
+@pytest.mark.asyncio
+async def test_stream_query_disconnect(make_config):
+    dataset = load_config(make_config(batch_size=2, stream_results=True, scheduler={'max_running': 1, 'max_waiting': 0}))
+
+    async def receive():
+        await sleep(10)
+
+    async def send(message):
+        # the client disconnects as soon as the page starts
+        if message['type'] == 'http.response.body':
+            raise ConnectionResetError()
+
+    response = await stream_query(TEST_QUERY, TEST_GRAPH, None, dataset, 'http://testserver', client='a')
+    assert dataset.scheduler.nb_running == 1
+    with pytest.raises(Exception):
+        await response({'type': 'http'}, receive, send)
+    # the slot of the time quantum is freed with the response, even if it has failed
+    assert dataset.scheduler.nb_running == 0
@@ -2,6 +2,10 @@
 # Author: Thomas MINIER - MIT License 2017-2020
 from sage.http_server.server import SagePostQuery
 
+# query over the test HDT dataset, whose 20 results span several pages
+TEST_QUERY = "SELECT * WHERE { ?s1 <http://example.org/p1> ?common . ?s2 <http://example.org/p2> ?common . }"
+TEST_GRAPH = "http://testserver/sparql/testdata"
+
 
 def post_sparql(client, query, next_link, graph_uri):
     """Execute a POST SPARQL query using FastAPI TestClient"""
@@ -15,3 +19,28 @@ def post_sparql(client, query, next_link, graph_uri):
     )
     res = client.post('/sparql', json=query.dict(), headers=headers)
     return res
+
+
+def read_pages(fetch_page):
+    """Fetch all the pages of a query by following their next links, and return all the solution bindings.
+
+    `fetch_page` takes the next link of the page to fetch (`None` for the first page) and returns its solution bindings and its next link.
+    """
+    results = list()
+    next_link = None
+    while True:
+        bindings, next_link = fetch_page(next_link)
+        results += bindings
+        if next_link is None:
+            return results
+
+
+async def async_read_pages(fetch_page):
+    """Like `read_pages`, for a coroutine `fetch_page`"""
+    results = list()
+    next_link = None
+    while True:
+        bindings, next_link = await fetch_page(next_link)
+        results += bindings
+        if next_link is None:
+            return results
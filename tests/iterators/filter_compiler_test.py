@@ -0,0 +1,75 @@
+# filter_compiler_test.py
+# Author: Thomas MINIER - MIT License 2017-2020
+import pytest
+from sage.query_engine.sage_engine import SageEngine
+from sage.query_engine.iterators.scan import ScanIterator
+from sage.query_engine.iterators.filter import FilterIterator
+from sage.query_engine.iterators.filter_compiler import compile_filter
+from sage.database.hdt.connector import HDTFileConnector
+
+hdtDoc = HDTFileConnector('tests/data/test.hdt')
+engine = SageEngine()
+mappings = {
+    '?s': 'http://example.org/s1',
+    '?name': '"Thomas"@en',
+    '?label': '"hello world"',
+    '?age': '"26"^^http://www.w3.org/2001/XMLSchema#integer',
+    '?price': '"12.5"^^<http://www.w3.org/2001/XMLSchema#decimal>',
+    '?date': '"2020-01-01T00:00:00"^^http://www.w3.org/2001/XMLSchema#dateTime'
+}
+
+
+@pytest.mark.parametrize("expression,expected", [
+    ("?s = <http://example.org/s1>", True),
+    ("?s != <http://example.org/s1>", False),
+    ("?age = 26", True),
+    ("?age > 20 && ?age < 30", True),
+    ("?age + 4 = 30", True),
+    ("?age / 4 = 6.5", True),
+    ("?price * 2 >= 25", True),
+    ("-?age < 0", True),
+    ("!(?age > 20)", False),
+    ("?age IN (1, 26)", True),
+    ("?age NOT IN (1, 26)", False),
+    ("?age > 100 || ?label = \"hello world\"", True),
+    ("isIRI(?s) && isLiteral(?name) && isNumeric(?age) && !isNumeric(?label)", True),
+    ("lang(?name) = \"en\" && langMatches(lang(?name), \"EN\")", True),
+    ("datatype(?age) = <http://www.w3.org/2001/XMLSchema#integer>", True),
+    ("str(?s) = \"http://example.org/s1\"", True),
+    ("regex(?label, \"^HELLO\", \"i\")", True),
+    ("regex(?label, \"^HELLO\")", False),
+    ("contains(?label, \"world\") && strstarts(?label, \"hello\") && strends(?label, \"world\")", True),
+    ("strlen(?label) = 11 && ucase(?label) = \"HELLO WORLD\"", True),
+    ("?date < \"2021-01-01T00:00:00\"^^<http://www.w3.org/2001/XMLSchema#dateTime>", True),
+    ("bound(?s) && !bound(?unknown)", True),
+    # literals of incompatible kinds are not equal
+    ("?name = \"Thomas\"", False),
+    ("!(?name = \"Thomas\")", True),
+    ("?label != \"hello world\"@en", True),
+    ("?name = \"Thomas\"@fr", False),
+    ("?age = \"26\"", False),
+    # errors eliminate solutions, unless they are discarded by a logical operator
+    ("?unknown = 1", False),
+    ("!(?unknown = 1)", False),
+    ("?unknown = 1 || ?age = 26", True),
+    ("?label > 2", False),
+    ("10 = 5 * 2", True)
+])
+def test_compile_filter(expression, expected):
+    assert compile_filter(expression)(mappings) == expected
+
+
+@pytest.mark.asyncio
+async def test_filter_iterator_read():
+    context = { 'quantum': 10e7, 'max_results': 10e7 }
+    triple = {
+        'subject': 'http://example.org/s1',
+        'predicate': '?p',
+        'object': '?o',
+        'graph': 'watdiv100'
+    }
+    expression = "?o IN (<http://example.org/o001>, <http://example.org/o002>) || regex(str(?o), \"o00[34]$\")"
+    iterator = FilterIterator(ScanIterator(hdtDoc, triple, context), expression, context)
+    (results, saved, done, _) = await engine.execute(iterator, context)
+    assert done
+    assert sorted([mu['?o'] for mu in results]) == ['http://example.org/o001', 'http://example.org/o002', 'http://example.org/o003', 'http://example.org/o004']
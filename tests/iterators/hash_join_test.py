@@ -0,0 +1,71 @@
+# hash_join_test.py
+# Author: Thomas MINIER - MIT License 2017-2020
+import pytest
+from sage.query_engine.sage_engine import SageEngine
+from sage.query_engine.iterators.scan import ScanIterator
+from sage.query_engine.iterators.hash_join import SymmetricHashJoinIterator
+from sage.query_engine.iterators.loader import load
+from sage.database.core.graph import Graph
+from sage.database.hdt.connector import HDTFileConnector
+from tests.utils import DummyDataset
+
+hdtDoc = HDTFileConnector('tests/data/test.hdt')
+engine = SageEngine()
+triple = {
+    'subject': '?s1',
+    'predicate': 'http://example.org/p1',
+    'object': '?common',
+    'graph': 'watdiv100'
+}
+innerTriple = {
+    'subject': '?s2',
+    'predicate': 'http://example.org/p2',
+    'object': '?common',
+    'graph': 'watdiv100'
+}
+
+
+@pytest.mark.asyncio
+async def test_hash_join_read():
+    context = { 'quantum': 10e7, 'max_results': 10e7 }
+    left_scan = ScanIterator(hdtDoc, triple, context)
+    right_scan = ScanIterator(hdtDoc, innerTriple, context)
+    join = SymmetricHashJoinIterator(left_scan, right_scan, ['?common'], context)
+    (results, saved, done, _) = await engine.execute(join, context)
+    assert len(results) == 20
+    for res in results:
+        assert '?s1' in res and '?s2' in res and '?common' in res
+    assert done
+
+
+@pytest.mark.asyncio
+async def test_hash_join_resume():
+    context = { 'quantum': 10e7, 'max_results': 3, 'batch_size': 2 }
+    left_scan = ScanIterator(hdtDoc, triple, context)
+    right_scan = ScanIterator(hdtDoc, innerTriple, context)
+    join = SymmetricHashJoinIterator(left_scan, right_scan, ['?common'], context)
+    (results, saved, done, _) = await engine.execute(join, context)
+    all_results = results
+    while not done:
+        assert len(results) <= 3
+        reloaded = load(saved.SerializeToString(), DummyDataset(hdtDoc, 'watdiv100'), context)
+        assert type(reloaded) is SymmetricHashJoinIterator
+        (results, saved, done, _) = await engine.execute(reloaded, context)
+        all_results += results
+    assert len(all_results) == 20
+    assert len({frozenset(mu.items()) for mu in all_results}) == 20
+
+
+@pytest.mark.asyncio
+async def test_hash_join_late_materialization():
+    context = { 'quantum': 10e7, 'max_results': 10e7 }
+    graph = Graph('watdiv100', 'watdiv100', 'test graph', hdtDoc, late_materialization=True)
+    # join keys encoded by the HDT dictionary, on both sides or mixed with RDF terms
+    for right_source in [graph, hdtDoc]:
+        left_scan = ScanIterator(graph, triple, context)
+        right_scan = ScanIterator(right_source, innerTriple, context)
+        join = SymmetricHashJoinIterator(left_scan, right_scan, ['?common'], context)
+        (results, saved, done, _) = await engine.execute(join, context)
+        assert done
+        assert len(results) == 20
+        assert len({frozenset(mu.items()) for mu in results}) == 20
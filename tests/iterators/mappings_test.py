@@ -0,0 +1,48 @@
+# mappings_test.py
+# Author: Thomas MINIER - MIT License 2017-2020
+import pytest
+from sage.query_engine.sage_engine import SageEngine
+from sage.query_engine.iterators.scan import ScanIterator
+from sage.query_engine.iterators.nlj import IndexJoinIterator
+from sage.query_engine.iterators.mappings import MappingsSchema, SolutionMappings, merge_mappings
+from sage.database.hdt.connector import HDTFileConnector
+
+hdtDoc = HDTFileConnector('tests/data/test.hdt')
+engine = SageEngine()
+
+
+def test_mappings_selection():
+    schema = MappingsSchema()
+    selector = schema.selector(['?s', None, '?o'])
+    mu = schema.select((':Ann', 'foaf:knows', ':Bob'), selector)
+    assert mu == {'?s': ':Ann', '?o': ':Bob'}
+    assert '?s' in mu and '?p' not in mu
+    assert len(mu) == 2
+    with pytest.raises(KeyError):
+        mu['?p']
+    assert not hasattr(mu, '__dict__')
+
+
+def test_mappings_merge_project():
+    schema = MappingsSchema()
+    left = schema.select((':Ann', 'foaf:knows', ':Bob'), schema.selector(['?s', None, '?o']))
+    # a variable added to the schema after the left mappings were built
+    right = schema.select((':Bob', 'foaf:name', '"Bob"'), schema.selector(['?o', None, '?name']))
+    mu = merge_mappings(left, right)
+    assert type(mu) is SolutionMappings
+    assert mu.to_dict() == {'?s': ':Ann', '?o': ':Bob', '?name': '"Bob"'}
+    assert mu.project(['?s', '?name']) == {'?s': ':Ann', '?name': '"Bob"'}
+    assert merge_mappings(left, {'?x': ':Carl'}) == {'?s': ':Ann', '?o': ':Bob', '?x': ':Carl'}
+
+
+@pytest.mark.asyncio
+async def test_nlj_compact_mappings():
+    context = { 'quantum': 10e7, 'max_results': 10e7 }
+    left = {'subject': '?s1', 'predicate': 'http://example.org/p1', 'object': '?common', 'graph': 'watdiv100'}
+    right = {'subject': '?s2', 'predicate': 'http://example.org/p2', 'object': '?common', 'graph': 'watdiv100'}
+    join = IndexJoinIterator(ScanIterator(hdtDoc, left, context), ScanIterator(hdtDoc, right, context), context)
+    (results, saved, done, _) = await engine.execute(join, context)
+    assert done and len(results) == 20
+    for mu in results:
+        assert type(mu) is SolutionMappings and mu.schema is context['schema']
+        assert set(mu.keys()) == {'?s1', '?s2', '?common'}
@@ -5,6 +5,8 @@ from sage.query_engine.sage_engine import SageEngine
 from sage.query_engine.iterators.scan import ScanIterator
 from sage.query_engine.iterators.nlj import IndexJoinIterator
 from sage.database.hdt.connector import HDTFileConnector
+from sage.query_engine.iterators.loader import load
+from tests.utils import DummyDataset
 
 hdtDoc = HDTFileConnector('tests/data/test.hdt')
 engine = SageEngine()
@@ -43,3 +45,36 @@ async def test_nlj_interrupt():
     join = IndexJoinIterator(left_scan, right_scan, context)
     (results, saved, done, _) = await engine.execute(join, context)
     assert len(results) <= 20
+
+
+@pytest.mark.asyncio
+async def test_nlj_batch_resume():
+    context = { 'quantum': 10e7, 'max_results': 7, 'batch_size': 3 }
+    left_scan = ScanIterator(hdtDoc, triple, context)
+    right_scan = ScanIterator(hdtDoc, innerTriple, context)
+    join = IndexJoinIterator(left_scan, right_scan, context)
+    (results, saved, done, _) = await engine.execute(join, context)
+    all_results = results
+    while not done:
+        assert len(results) <= 7
+        reloaded = load(saved.SerializeToString(), DummyDataset(hdtDoc, 'watdiv100'), context)
+        (results, saved, done, _) = await engine.execute(reloaded, context)
+        all_results += results
+    assert len(all_results) == 20
+    assert len({frozenset(mu.items()) for mu in all_results}) == 20
+
+
+@pytest.mark.asyncio
+async def test_nlj_preemption_resume():
+    context = { 'quantum': 0, 'max_results': 10e7, 'clock_interval': 4 }
+    left_scan = ScanIterator(hdtDoc, triple, context)
+    right_scan = ScanIterator(hdtDoc, innerTriple, context)
+    join = IndexJoinIterator(left_scan, right_scan, context)
+    (results, saved, done, _) = await engine.execute(join, context)
+    all_results = results
+    while not done:
+        reloaded = load(saved.SerializeToString(), DummyDataset(hdtDoc, 'watdiv100'), context)
+        (results, saved, done, _) = await engine.execute(reloaded, context)
+        all_results += results
+    assert len(all_results) == 20
+    assert len({frozenset(mu.items()) for mu in all_results}) == 20
@@ -4,9 +4,12 @@ import pytest
 from sage.query_engine.sage_engine import SageEngine
 from sage.query_engine.iterators.scan import ScanIterator
 from sage.query_engine.iterators.projection import ProjectionIterator
+from sage.database.core.graph import Graph
 from sage.database.hdt.connector import HDTFileConnector
+from sage.database.term_dictionary import EncodedTerm
 
 hdtDoc = HDTFileConnector('tests/data/test.hdt')
+hdtGraph = Graph('watdiv100', 'watdiv100', 'test graph', hdtDoc, late_materialization=True)
 engine = SageEngine()
 triple = {
     'subject': '?s1',
@@ -37,3 +40,21 @@ async def test_projection_read_stopped():
     assert len(results) <= scan.__len__()
     for res in results:
         assert '?common' in res and '?s1' not in res
+
+
+@pytest.mark.asyncio
+async def test_projection_late_materialization():
+    context = { 'quantum': 10e7, 'max_results': 10e7 }
+    scan = ScanIterator(hdtGraph, triple, context)
+    # the scan reads identifiers from the HDT dictionary
+    mappings = await scan.next_batch(1)
+    assert type(mappings[0]['?common']) is EncodedTerm
+    assert mappings[0]['?common'] == 'http://example.org/o001'
+    scan = ScanIterator(hdtGraph, triple, context)
+    proj = ProjectionIterator(scan, context, ['?s1', '?common'])
+    (results, saved, done, _) = await engine.execute(proj, context)
+    expected, _ = hdtDoc.search(triple['subject'], triple['predicate'], triple['object'])
+    expected = [{'?s1': s, '?common': o} for s, p, o in iter(expected.next, None)]
+    # RDF terms are decoded by the projection
+    assert results == expected
+    assert all(type(value) is str for mappings in results for value in mappings.values())
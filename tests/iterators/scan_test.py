@@ -1,9 +1,16 @@
 # scan_test.py
 # Author: Thomas MINIER - MIT License 2017-2020
 import pytest
+from threading import get_ident
+from time import time
+from sage.database.db_iterator import DBIterator
 from sage.query_engine.sage_engine import SageEngine
 from sage.query_engine.iterators.scan import ScanIterator
 from sage.database.hdt.connector import HDTFileConnector
+from sage.query_engine.iterators.loader import load
+from sage.query_engine.preemption import PreemptionScheduler
+from sage.query_engine.protobuf.iterators_pb2 import RootTree
+from tests.utils import DummyDataset
 
 hdtDoc = HDTFileConnector('tests/data/test.hdt')
 engine = SageEngine()
@@ -15,6 +22,50 @@ triple = {
 }
 
 
+class BlockingIterator(DBIterator):
+    """A DBIterator which fetches RDF triples by batches of 5, like the iterators of a SQL database"""
+
+    def __init__(self, source, threads):
+        super(BlockingIterator, self).__init__(dict())
+        self._source = source
+        self._threads = threads
+        self._buffer = list()
+
+    def last_read(self):
+        # like the SQL iterators, the scan resumes from the next RDF triple to read, which may be fetched
+        if not self.has_next():
+            return ''
+        return self._source.last_read()
+
+    def next(self):
+        return self._buffer.pop(0) if self.has_next() else None
+
+    def must_fetch(self):
+        return len(self._buffer) == 0 and self._source.has_next()
+
+    def has_next(self):
+        if self.must_fetch():
+            self._threads.add(get_ident())
+            while len(self._buffer) < 5 and self._source.has_next():
+                self._buffer.append(self._source.next())
+        return len(self._buffer) > 0
+
+
+class BlockingConnector(object):
+    """A database connector which performs blocking I/O"""
+
+    def __init__(self):
+        self.threads = set()
+
+    @property
+    def blocking_io(self):
+        return True
+
+    def search(self, s, p, o, last_read=None, as_of=None):
+        source, cardinality = hdtDoc.search(s, p, o, last_read=last_read, as_of=as_of)
+        return BlockingIterator(source, self.threads), cardinality
+
+
 @pytest.mark.asyncio
 async def test_scan_read():
     context = { 'quantum': 10e7, 'max_results': 10e7 }
@@ -37,3 +88,131 @@ async def test_scan_save_interrupt():
     scan = ScanIterator(hdtDoc, triple, context)
     (results, saved, done, _) = await engine.execute(scan, context)
     assert len(results) <= scan.__len__()
+
+
+@pytest.mark.asyncio
+async def test_scan_batch_resume():
+    context = { 'quantum': 10e7, 'max_results': 10, 'batch_size': 4 }
+    scan = ScanIterator(hdtDoc, triple, context)
+    (results, saved, done, _) = await engine.execute(scan, context)
+    all_results = results
+    while not done:
+        assert len(results) == 10
+        reloaded = load(saved.SerializeToString(), DummyDataset(hdtDoc, 'watdiv100'), context)
+        (results, saved, done, _) = await engine.execute(reloaded, context)
+        all_results += results
+    assert len(all_results) == len(scan)
+    assert len({frozenset(mu.items()) for mu in all_results}) == len(scan)
+
+
+@pytest.mark.asyncio
+async def test_scan_filters_resume():
+    context = { 'quantum': 10e7, 'max_results': 3, 'batch_size': 2 }
+    filters = ['(?p = <http://example.org/p1>)', 'STRSTARTS(STR(?o), "http://example.org/o00")']
+    scan = ScanIterator(hdtDoc, triple, context, filters=filters)
+    # the equality constraint is evaluated by the HDT connector
+    assert len(scan) == 110
+    (results, saved, done, _) = await engine.execute(scan, context)
+    all_results = results
+    while not done:
+        assert list(saved.scan_source.filters) == filters
+        reloaded = load(saved.SerializeToString(), DummyDataset(hdtDoc, 'watdiv100'), context)
+        (results, saved, done, _) = await engine.execute(reloaded, context)
+        all_results += results
+    assert len(all_results) == 18
+    for mu in all_results:
+        assert mu['?p'] == 'http://example.org/p1' and mu['?o'].startswith('http://example.org/o00')
+
+
+@pytest.mark.asyncio
+async def test_scan_lazy_resume(monkeypatch):
+    context = { 'quantum': 10e7, 'max_results': 10 }
+    scan = ScanIterator(hdtDoc, triple, context)
+    (results, saved, done, _) = await engine.execute(scan, context)
+    calls = list()
+    search = hdtDoc.search
+    monkeypatch.setattr(hdtDoc, 'search', lambda *args, **kwargs: calls.append(args) or search(*args, **kwargs))
+    reloaded = load(saved.SerializeToString(), DummyDataset(hdtDoc, 'watdiv100'), context)
+    # the saved cardinality is reused and the database is not searched until the scan is read
+    assert len(reloaded) == len(scan)
+    assert len(calls) == 0
+    assert reloaded.save() == saved.scan_source
+    assert len(calls) == 0
+    (results, saved, done, _) = await engine.execute(reloaded, context)
+    assert len(results) == 10
+    assert len(calls) == 1
+
+
+@pytest.mark.asyncio
+async def test_scan_save_next_stage(monkeypatch):
+    context = { 'quantum': 10e7, 'max_results': 10e7 }
+    pattern = {'subject': '?s', 'predicate': 'http://example.org/p1', 'object': '?o', 'graph': 'watdiv100'}
+    scan = ScanIterator(hdtDoc, pattern, context)
+    await scan.next()
+    calls = list()
+    search = hdtDoc.search
+    monkeypatch.setattr(hdtDoc, 'search', lambda *args, **kwargs: calls.append(args) or search(*args, **kwargs))
+    scan.next_stage({'?s': 'http://example.org/s1'})
+    # the new stage of the scan is saved without searching the database
+    saved = RootTree()
+    saved.scan_source.CopyFrom(scan.save())
+    assert len(calls) == 0
+    assert saved.scan_source.from_start
+    # and is resumed from its first RDF triple
+    reloaded = load(saved.SerializeToString(), DummyDataset(hdtDoc, 'watdiv100'), context)
+    (results, _, done, _) = await engine.execute(reloaded, context)
+    expected, cardinality = hdtDoc.search('http://example.org/s1', 'http://example.org/p1', '?o')
+    assert done
+    assert len(results) == cardinality
+    assert len(results) > 0
+
+
+@pytest.mark.asyncio
+async def test_scan_blocking_io():
+    context = { 'quantum': 10e7, 'max_results': 10e7 }
+    connector = BlockingConnector()
+    scan = ScanIterator(connector, triple, context)
+    (results, saved, done, _) = await engine.execute(scan, context)
+    assert done
+    assert len(results) == len(scan)
+    # RDF triples are fetched in the thread pool, not by the thread running the event loop
+    assert get_ident() not in connector.threads
+
+
+@pytest.mark.asyncio
+async def test_scan_blocking_io_save():
+    # the page ends when the buffer of the iterator is drained, so saving the scan fetches RDF triples
+    context = { 'quantum': 10e7, 'max_results': 5 }
+    connector = BlockingConnector()
+    scan = ScanIterator(connector, triple, context)
+    (results, saved, done, _) = await engine.execute(scan, context)
+    assert not done and len(results) == 5 and saved.scan_source.last_read != ''
+    assert len(connector.threads) > 0 and get_ident() not in connector.threads
+
+
+def test_preemption_scheduler():
+    scheduler = PreemptionScheduler(interval=10)
+    scheduler.start(time(), 10e7)
+    for _ in range(100):
+        assert not scheduler.tick()
+    # the wall clock is only read every 10 ticks
+    assert scheduler.ticks == 100 and scheduler.clock_readings == 10
+    scheduler.start(time(), 0)
+    assert not scheduler.tick(9) and not scheduler.exhausted
+    assert scheduler.tick() and scheduler.exhausted
+
+
+@pytest.mark.asyncio
+async def test_scan_preemption_resume():
+    # the time quantum is exhausted as soon as the clock is read, so each quantum reads a few triples
+    context = { 'quantum': 0, 'max_results': 10e7, 'clock_interval': 8 }
+    scan = ScanIterator(hdtDoc, triple, context)
+    (results, saved, done, _) = await engine.execute(scan, context)
+    all_results = results
+    while not done:
+        assert len(results) <= 8
+        reloaded = load(saved.SerializeToString(), DummyDataset(hdtDoc, 'watdiv100'), context)
+        (results, saved, done, _) = await engine.execute(reloaded, context)
+        all_results += results
+    assert len(all_results) == len(scan)
+    assert len({frozenset(mu.items()) for mu in all_results}) == len(scan)
@@ -61,3 +61,90 @@
 #     (results, saved, done) = engine.execute(union, 10e-4)
 #     assert len(results) < card1 + card2
 #     assert not done
+
+
+import pytest
+from sage.query_engine.sage_engine import SageEngine
+from sage.query_engine.iterators.scan import ScanIterator
+from sage.query_engine.iterators.union import BagUnionIterator, ParallelBagUnionIterator, build_union
+from sage.query_engine.iterators.loader import load
+from sage.database.hdt.connector import HDTFileConnector
+from tests.utils import DummyDataset
+
+hdtDoc = HDTFileConnector('tests/data/test.hdt')
+engine = SageEngine()
+
+
+class BlockingHDTConnector(HDTFileConnector):
+    """An HDT connector which claims to perform blocking I/O, like a PostgreSQL connector"""
+
+    @property
+    def blocking_io(self) -> bool:
+        return True
+
+
+left_triple = {
+    'subject': '?s',
+    'predicate': 'http://example.org/p1',
+    'object': '?o',
+    'graph': 'watdiv100'
+}
+right_triple = {
+    'subject': '?s',
+    'predicate': 'http://example.org/p2',
+    'object': '?o2',
+    'graph': 'watdiv100'
+}
+
+
+@pytest.mark.asyncio
+async def test_parallel_union_read():
+    context = { 'quantum': 10e7, 'max_results': 10e7, 'batch_size': 10 }
+    left = ScanIterator(hdtDoc, left_triple, context)
+    right = ScanIterator(hdtDoc, right_triple, context)
+    union = ParallelBagUnionIterator(left, right, context)
+    expected = len(left) + len(right)
+    (results, saved, done, _) = await engine.execute(union, context)
+    assert done
+    assert len(results) == expected
+
+
+@pytest.mark.asyncio
+async def test_parallel_union_batch():
+    context = { 'quantum': 10e7, 'max_results': 10e7 }
+    left = ScanIterator(hdtDoc, left_triple, context)
+    right = ScanIterator(hdtDoc, right_triple, context)
+    union = ParallelBagUnionIterator(left, right, context)
+    # both operands are read by the same batch
+    batch = await union.next_batch(10)
+    assert len([mu for mu in batch if '?o' in mu]) == 5
+    assert len([mu for mu in batch if '?o2' in mu]) == 5
+
+
+@pytest.mark.asyncio
+async def test_parallel_union_resume():
+    context = { 'quantum': 10e7, 'max_results': 7, 'batch_size': 4 }
+    left = ScanIterator(hdtDoc, left_triple, context)
+    right = ScanIterator(hdtDoc, right_triple, context)
+    expected = len(left) + len(right)
+    union = ParallelBagUnionIterator(left, right, context)
+    (results, saved, done, _) = await engine.execute(union, context)
+    all_results = results
+    while not done:
+        assert len(results) <= 7
+        reloaded = load(saved.SerializeToString(), DummyDataset(hdtDoc, 'watdiv100'), context)
+        (results, saved, done, _) = await engine.execute(reloaded, context)
+        all_results += results
+    assert len(all_results) == expected
+
+
+def test_build_union():
+    context = { 'quantum': 10e7, 'max_results': 10e7 }
+    blockingDoc = BlockingHDTConnector('tests/data/test.hdt')
+    # the I/O of operands which read the same database, or databases without blocking I/O, cannot overlap
+    union = build_union(ScanIterator(hdtDoc, left_triple, context), ScanIterator(hdtDoc, right_triple, context), context)
+    assert type(union) is BagUnionIterator
+    union = build_union(ScanIterator(blockingDoc, left_triple, context), ScanIterator(blockingDoc, right_triple, context), context)
+    assert type(union) is BagUnionIterator
+    union = build_union(ScanIterator(hdtDoc, left_triple, context), ScanIterator(blockingDoc, right_triple, context), context)
+    assert type(union) is ParallelBagUnionIterator
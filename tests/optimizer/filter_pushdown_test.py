@@ -0,0 +1,47 @@
+# filter_pushdown_test.py
+# Author: Thomas MINIER - MIT License 2017-2020
+import pytest
+from sage.database.hdt.connector import HDTFileConnector
+from sage.query_engine.optimizer.query_parser import parse_query
+from sage.query_engine.sage_engine import SageEngine
+from tests.utils import DummyDataset
+
+hdtDoc = HDTFileConnector('tests/data/test.hdt')
+dataset = DummyDataset(hdtDoc, 'testdata')
+engine = SageEngine()
+
+
+@pytest.mark.asyncio
+async def test_push_down_filter():
+    context = { 'quantum': 10e7, 'max_results': 10e7 }
+    query = """
+        SELECT * WHERE {
+            ?s1 <http://example.org/p1> ?common .
+            ?s2 <http://example.org/p2> ?common .
+            FILTER(?common = <http://example.org/o001> && ?s1 != ?s2)
+        }
+    """
+    plan, cardinalities = parse_query(query, dataset, 'testdata', context)
+    # the equality is evaluated by the scans, so their cardinalities are estimated accordingly
+    assert sorted([c['cardinality'] for c in cardinalities]) == [1, 2]
+    (results, _, done, _) = await engine.execute(plan, context)
+    assert done
+    assert len(results) == 2
+    for mu in results:
+        assert mu['?common'] == 'http://example.org/o001' and mu['?s1'] != mu['?s2']
+
+
+@pytest.mark.asyncio
+async def test_push_down_whole_filter():
+    context = { 'quantum': 10e7, 'max_results': 10e7 }
+    query = """
+        SELECT * WHERE {
+            ?s1 <http://example.org/p1> ?common .
+            FILTER(strStarts(str(?common), "http://example.org/o00") && ?s1 = <http://example.org/s1>)
+        }
+    """
+    plan, cardinalities = parse_query(query, dataset, 'testdata', context)
+    assert "FilterIterator" not in repr(plan)
+    (results, _, done, _) = await engine.execute(plan, context)
+    assert done
+    assert len(results) == 9
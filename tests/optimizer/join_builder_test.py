@@ -0,0 +1,71 @@
+# join_builder_test.py
+# Author: Thomas MINIER - MIT License 2017-2020
+import pytest
+from sage.database.hdt.connector import HDTFileConnector
+from sage.http_server.utils import encode_saved_plan
+from sage.query_engine.iterators.hash_join import SymmetricHashJoinIterator
+from sage.query_engine.iterators.nlj import IndexJoinIterator
+from sage.query_engine.optimizer.join_builder import build_left_join_tree
+from sage.query_engine.optimizer.query_parser import parse_query
+from sage.query_engine.sage_engine import SageEngine
+from tests.utils import DummyDataset
+
+hdtDoc = HDTFileConnector('tests/data/test.hdt')
+dataset = DummyDataset(hdtDoc, 'testdata')
+query = "SELECT * WHERE { ?s1 <http://example.org/p1> ?common . ?s2 <http://example.org/p2> ?common . ?s2 ?p3 ?o3 . }"
+
+
+def bgp():
+    return [
+        {'subject': '?s1', 'predicate': 'http://example.org/p1', 'object': '?common'},
+        {'subject': '?s2', 'predicate': 'http://example.org/p2', 'object': '?common'},
+        {'subject': '?s2', 'predicate': '?p3', 'object': '?o3'}
+    ]
+
+
+def test_hash_join_threshold():
+    context = { 'quantum': 10e7, 'max_results': 10e7, 'hash_join_threshold': 1 }
+    pipeline, _, _ = build_left_join_tree(bgp(), dataset, 'testdata', context)
+    assert type(pipeline) is SymmetricHashJoinIterator
+    assert type(pipeline._left) is SymmetricHashJoinIterator
+
+
+def test_pipeline_cardinality():
+    context = { 'quantum': 10e7, 'max_results': 10e7, 'hash_join_threshold': 100 }
+    bgp = [
+        {'subject': '?s1', 'predicate': 'http://example.org/p2', 'object': '?o1'},
+        {'subject': '?s2', 'predicate': 'http://example.org/p3', 'object': '?common'},
+        {'subject': '?s3', 'predicate': 'http://example.org/p1', 'object': '?common'}
+    ]
+    pipeline, _, cardinalities = build_left_join_tree(bgp, dataset, 'testdata', context)
+    assert [c['cardinality'] for c in cardinalities] == [10, 12, 110]
+    # the cartesian product of the first two patterns is estimated to 120 solutions, so it is joined with the last one using a hash join
+    assert type(pipeline) is SymmetricHashJoinIterator
+    assert type(pipeline._left) is IndexJoinIterator
+
+
+def test_stateless_hash_join():
+    context = { 'quantum': 10e7, 'max_results': 10e7, 'hash_join_threshold': 1, 'stateless': True }
+    pipeline, _, _ = build_left_join_tree(bgp(), dataset, 'testdata', context)
+    # the hash tables would be saved in the next links
+    assert type(pipeline) is IndexJoinIterator
+    assert type(pipeline._left) is IndexJoinIterator
+    context['stateless'] = False
+    pipeline, _, _ = build_left_join_tree(bgp(), dataset, 'testdata', context)
+    assert type(pipeline) is SymmetricHashJoinIterator
+
+
+async def preempted_next_link(stateless):
+    context = { 'quantum': 10e7, 'max_results': 5, 'hash_join_threshold': 1, 'stateless': stateless }
+    plan, _ = parse_query(query, dataset, 'testdata', context)
+    (results, saved_plan, done, _) = await SageEngine().execute(plan, context)
+    assert len(results) == 5 and not done
+    return encode_saved_plan(saved_plan)
+
+
+@pytest.mark.asyncio
+async def test_stateless_next_link_size():
+    # in statefull mode, the next link holds the hash tables of the joins
+    assert len(await preempted_next_link(False)) > 512
+    # in stateless mode, it only holds the positions of the scans
+    assert len(await preempted_next_link(True)) < 512
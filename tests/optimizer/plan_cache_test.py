@@ -0,0 +1,61 @@
+# plan_cache_test.py
+# Author: Thomas MINIER - MIT License 2017-2020
+import pytest
+from sage.database.hdt.connector import HDTFileConnector
+from sage.query_engine.optimizer.plan_cache import PlanCache, normalize_query
+from sage.query_engine.optimizer.query_parser import parse_query
+from sage.query_engine.sage_engine import SageEngine
+from tests.utils import DummyDataset
+
+hdtDoc = HDTFileConnector('tests/data/test.hdt')
+dataset = DummyDataset(hdtDoc, 'testdata')
+engine = SageEngine()
+
+query = """
+    SELECT * WHERE {
+        ?s1 <http://example.org/p1> ?common .
+        ?s2 <http://example.org/p2> ?common .
+    }
+"""
+
+
+def test_normalize_query():
+    assert normalize_query("SELECT *   WHERE {\n\t?s ?p ?o }") == "SELECT * WHERE { ?s ?p ?o }"
+    assert normalize_query("# comment\nSELECT * WHERE { ?s ?p ?o } # comment") == "SELECT * WHERE { ?s ?p ?o }"
+    assert normalize_query('SELECT * WHERE { ?s ?p "a  # b" }') == 'SELECT * WHERE { ?s ?p "a  # b" }'
+    assert normalize_query('SELECT * WHERE { <http://example.org/a#b> ?p ?o }') == 'SELECT * WHERE { <http://example.org/a#b> ?p ?o }'
+
+
+@pytest.mark.asyncio
+async def test_plan_cache():
+    cache = PlanCache(size=10)
+    context = { 'quantum': 10e7, 'max_results': 10e7 }
+    plan, cardinalities = parse_query(query, dataset, 'testdata', context, plan_cache=cache)
+    assert cache.stats() == {"hits": 0, "misses": 1}
+    (results, _, done, _) = await engine.execute(plan, context)
+    assert len(results) == 20 and done
+    # a query with different whitespaces must reuse the cached plan and join order
+    plan, cached_cardinalities = parse_query(" ".join(query.split()), dataset, 'testdata', context, plan_cache=cache)
+    assert cache.stats() == {"hits": 1, "misses": 1}
+    assert [c['cardinality'] for c in cached_cardinalities] == [c['cardinality'] for c in cardinalities]
+    (results, _, done, _) = await engine.execute(plan, context)
+    assert len(results) == 20 and done
+    # the default graph is part of the key
+    parse_query(query, dataset, 'othergraph', context, plan_cache=cache)
+    assert cache.stats() == {"hits": 1, "misses": 2}
+
+
+def test_plan_cache_ttl():
+    cache = PlanCache(size=10, ttl=0)
+    context = { 'quantum': 10e7, 'max_results': 10e7 }
+    parse_query(query, dataset, 'testdata', context, plan_cache=cache)
+    parse_query(query, dataset, 'testdata', context, plan_cache=cache)
+    assert cache.stats() == {"hits": 0, "misses": 2}
+
+
+def test_plan_cache_update():
+    cache = PlanCache(size=10)
+    context = { 'quantum': 10e7, 'max_results': 10e7 }
+    # SPARQL UPDATE queries are not cached, so they are not counted as misses
+    parse_query("INSERT DATA { <http://example.org/s> <http://example.org/p> <http://example.org/o> . }", dataset, 'testdata', context, plan_cache=cache)
+    assert cache.stats() == {"hits": 0, "misses": 0}